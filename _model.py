@@ -1,9 +1,17 @@
 import asyncio
+import hashlib
 import logging
+import os
+from collections import deque
+from collections.abc import AsyncIterable, AsyncIterator, Iterable
+from contextvars import ContextVar
+from datetime import timedelta
 from threading import Thread
 from types import CoroutineType
-from typing import Any, Literal, Optional, Union
+from time import perf_counter
+from typing import Any, Awaitable, Callable, Literal, Optional, Union, cast, get_args
 
+import numpy as np
 from pydantic import AnyUrl, SecretStr
 
 from errors.database import (
@@ -12,28 +20,73 @@ from errors.database import (
     DatabaseMigrationError,
     DatabaseRequiredCredentialsMissingError,
 )
-from errors.kenec import CannotClusterArticleError
+from errors.kenec import CannotClusterArticleError, KENECNotReadyError
 from modal.database.node import Article
 from modal.database.util.auth import DatabaseAuth
-from modules.database import Neo4jAdapter
-from modules.keyword_extractor import YakeKeywordExtractor
+from modules.clustering import (
+    AnnCandidateGenerator,
+    BackfillJob,
+    GroupConsolidator,
+    PostingListCandidateGenerator,
+    ShardedClusterer,
+    TermStatistics,
+    build_article_profile,
+    group_stripes,
+    keyword_key,
+    profile_delta,
+    profile_similarity_columns,
+)
+from modules.database import LookupCache, Neo4jAdapter, TTLCache
+from modules.governor import LoadGovernor, ResourceGovernor
+from modules.keyword_extractor import (
+    NumpyYakeKeywordExtractor,
+    SharedParseKeywordExtractor,
+    YakeKeywordExtractor,
+)
 from modules.ner import (
+    CascadeEntityModel,
     FlairEntityModel,
+    GazetteerEntityModel,
+    RemoteEntityModel,
+    ReplicaPool,
     SpacyEntityModel,
     XlmRobertaLargeFinetunedConll03EnglishEntityModel,
 )
+from modules.preprocessor import TextPreprocessor
 from type.article import Entity, Keyword
-from type.database import DatabaseVariant
+from type.clustering import (
+    BackfillReport,
+    ConsolidationReport,
+    GroupAssignmentReport,
+    ShardedClusteringReport,
+    ShardingStrategy,
+    TermProfile,
+    TermStatisticsReport,
+)
+from type.database import CacheReport, DatabaseVariant, LookupCacheReport
+from type.governor import LoadGovernorReport, ProcessingMode, ResourceReport
+from type.kenec import ReadinessReport, UnitState
+from type.ner import CascadeReport, GazetteerReport
 
-NERModelClass = Union[
+SingleNERModelClass = Union[
     SpacyEntityModel,
     FlairEntityModel,
     XlmRobertaLargeFinetunedConll03EnglishEntityModel,
 ]
-KeywordExtractorClass = Union[YakeKeywordExtractor]
+NERModelClass = Union[
+    SingleNERModelClass,
+    CascadeEntityModel,
+    GazetteerEntityModel,
+    RemoteEntityModel,
+    ReplicaPool,
+]
+KeywordExtractorClass = Union[
+    YakeKeywordExtractor, NumpyYakeKeywordExtractor, SharedParseKeywordExtractor
+]
 DatabaseClass = Union[Neo4jAdapter]
+CandidateGeneratorClass = Union[PostingListCandidateGenerator, AnnCandidateGenerator]
 
-NERModelOption = Literal[
+SingleNERModelOption = Literal[
     # Hugging face models
     "xlm_roberta_large_finetuned",
     # Spacy Models
@@ -45,7 +98,106 @@ NERModelOption = Literal[
     "flair_english_ontonotes",
     "flair_english_ontonotes_large",
 ]
-KeywordExtractorOption = Literal["yake"]
+CascadeNERModelOption = Literal[
+    # Fast model first, accurate model only when a quality signal fails
+    "cascade_spacy_web_sm_xlm_roberta_large_finetuned",
+    "cascade_spacy_web_sm_flair_english_ontonotes_large",
+]
+GazetteerNERModelOption = Literal[
+    # Known entity surface forms of the graph only
+    "gazetteer",
+    # Known surface forms first, model only on the sentences they do not cover
+    "gazetteer_spacy_web_sm",
+    "gazetteer_xlm_roberta_large_finetuned",
+]
+RemoteNERModelOption = Literal[
+    # Model hosted by a local NER server (`python -m modules.ner.server`)
+    "remote",
+]
+NERModelOption = Literal[
+    SingleNERModelOption,
+    CascadeNERModelOption,
+    GazetteerNERModelOption,
+    RemoteNERModelOption,
+]
+KeywordExtractorOption = Literal[
+    "yake",
+    "numpy_yake",
+    # YAKE scores over the tokens of the NER model's parse (spaCy and Flair models)
+    "shared_parse_yake",
+]
+CandidateGeneratorOption = Literal[
+    "posting_list",  # Groups sharing the most terms, traversed in the database
+    "hnsw",  # Approximate nearest neighbours of hashed group profiles, in memory
+]
+
+# Beam width of spaCy models whose entities need a confidence score
+_SCORING_BEAM_WIDTH = 8
+
+# (fast model, accurate model) of each cascade option
+CASCADE_NER_MODEL_OPTIONS: dict[
+    CascadeNERModelOption, tuple[SingleNERModelOption, SingleNERModelOption]
+] = {
+    "cascade_spacy_web_sm_xlm_roberta_large_finetuned": (
+        "spacy_web_sm",
+        "xlm_roberta_large_finetuned",
+    ),
+    "cascade_spacy_web_sm_flair_english_ontonotes_large": (
+        "spacy_web_sm",
+        "flair_english_ontonotes_large",
+    ),
+}
+
+# An article with its extracted keywords and entities, group id and whether the group is new
+ClusteredArticle = tuple[Article, list[Keyword], list[Entity], str, bool]
+
+# Live stories are revised for about a day
+_PARAGRAPH_CACHE_TTL = timedelta(days=1)
+
+# Set while `KENEC.create` runs the constructor, which then leaves loading to it
+_defer_unit_loading: ContextVar[bool] = ContextVar(
+    "kenec_defer_unit_loading", default=False
+)
+
+# Fallback model of each gazetteer option
+GAZETTEER_NER_MODEL_OPTIONS: dict[
+    GazetteerNERModelOption, Optional[SingleNERModelOption]
+] = {
+    "gazetteer": None,
+    "gazetteer_spacy_web_sm": "spacy_web_sm",
+    "gazetteer_xlm_roberta_large_finetuned": "xlm_roberta_large_finetuned",
+}
+
+
+def load_ner_model(
+    option: SingleNERModelOption, *, scored: bool = False
+) -> SingleNERModelClass:
+    """Loads the NER Model class of a single (non-cascade) option
+
+    Args:
+        option (SingleNERModelOption): NER Option
+        scored (bool): Whether entities need a confidence score. spaCy models then decode with a beam, the other backends always score their entities.
+
+    Returns:
+        SingleNERModelClass: The loaded NER Model class
+    """
+    beam_width = _SCORING_BEAM_WIDTH if scored else 1
+    if option == "xlm_roberta_large_finetuned":
+        return XlmRobertaLargeFinetunedConll03EnglishEntityModel()
+    elif option == "spacy_web_sm":
+        return SpacyEntityModel(model="en_core_web_sm", beam_width=beam_width)
+    elif option == "spacy_web_md":
+        return SpacyEntityModel(model="en_core_web_md", beam_width=beam_width)
+    elif option == "spacy_web_lg":
+        return SpacyEntityModel(model="en_core_web_lg", beam_width=beam_width)
+    elif option == "spacy_web_trf":
+        return SpacyEntityModel(model="en_core_web_trf", beam_width=beam_width)
+    elif option == "flair_english_ontonotes":
+        return FlairEntityModel(model="ner-english-ontonotes")
+    elif option == "flair_english_ontonotes_large":
+        return FlairEntityModel(model="ner-english-ontonotes-large")
+    else:
+        raise ValueError(f"Invalid option selection '{option}'")
 
 
 class KENEC:
@@ -53,55 +205,278 @@ class KENEC:
 
     __entity_extractor: NERModelClass
     __keyword_extractor: KeywordExtractorClass
+    __degraded_entity_extractor: Optional[NERModelClass] = None
+    __degraded_keyword_extractor: Optional[KeywordExtractorClass] = None
+    __load_governor: Optional[LoadGovernor] = None
+    __gazetteer: Optional[GazetteerEntityModel] = None
+    __ner_socket_path: Optional[str] = None
+    __ner_replicas: Optional[int] = None
+    __ner_intra_op_threads: Optional[int] = None
+    __resources: Optional[ResourceGovernor] = None
+    __preprocessor: TextPreprocessor
+    # Keywords and entities of each paragraph, by processing mode and paragraph hash
+    __paragraph_cache: TTLCache[
+        tuple[ProcessingMode, str], tuple[list[Keyword], list[Entity]]
+    ]
     __database: DatabaseClass
+    __lookup_cache: Optional[LookupCache] = None
+    __term_statistics: Optional[TermStatistics] = None
+    __candidate_generator: CandidateGeneratorClass
+    __consolidator: Optional[GroupConsolidator] = None
+    __sharded_clusterer: ShardedClusterer
+    __sharding_report: Optional[ShardedClusteringReport] = None
+    __creation_stripes: int
+    __max_creation_attempts: int
+    __assignment_report: GroupAssignmentReport
     match_threshold: float
-    __unit_intializers: list[Thread]
+    candidate_limit: int
+    __model_units: list[tuple[str, Callable[..., None], list[Any]]]
+    __prepare_db: bool
+    __unit_states: dict[str, UnitState]
+    __startup: Optional[asyncio.Task]
+    __startup_error: Optional[str] = None
 
     def __init__(
         self,
         *,
         match_threshold: float = 0.87,
+        candidate_limit: int = 20,
+        candidate_generator: CandidateGeneratorOption = "posting_list",
+        snapshot_directory: Optional[str] = None,
+        lookup_cache: Optional[LookupCache] = None,
+        term_statistics: Optional[TermStatistics] = None,
         ner_model: NERModelOption = "xlm_roberta_large_finetuned",
+        ner_socket_path: Optional[str] = None,
+        ner_replicas: Optional[int] = None,
+        ner_intra_op_threads: Optional[int] = None,
+        resources: Optional[ResourceGovernor] = None,
         kw_extractor: KeywordExtractorOption = "yake",
         database: DatabaseVariant = "neo4j",
         db_auth: DatabaseAuth,
         prepare_db: bool = True,
+        load_governor: Optional[LoadGovernor] = None,
+        degraded_ner_model: SingleNERModelOption = "spacy_web_sm",
+        preprocessor: Optional[TextPreprocessor] = None,
+        paragraph_cache_size: int = 50_000,
+        shard_processes: Optional[int] = None,
+        sharding: ShardingStrategy = "entity",
+        creation_stripes: int = 4096,
+        max_creation_attempts: int = 3,
     ):
         """Initialize the model with preferences
 
         Args:
             match_threshold (float): A threshold to match in which a matching news group is determined (Should be a value between 0 and 1).
+            candidate_limit (int): Number of candidate groups shortlisted for detailed matching per article.
+            ner_model (NERModelOption): NER model. The "gazetteer" options tag the entity surface forms already stored in the database, loaded when the database is prepared.
+            ner_socket_path (Optional[str]): Unix socket of the NER server used by the "remote" NER option. Defaults to the server's default socket.
+            ner_replicas (Optional[int]): Number of replicas of each loaded NER model, so that concurrent calls (e.g. `add_article` from a thread pool) infer in parallel. Models are loaded once and shared without a guard if not provided.
+            ner_intra_op_threads (Optional[int]): Torch intra-op threads of each NER model replica, e.g. the number of cores divided by `ner_replicas`. Only used with `ner_replicas`.
+            resources (Optional[ResourceGovernor]): Thread and CPU settings of the process, applied before any model is loaded. Its NER replica settings replace `ner_replicas` and `ner_intra_op_threads`. Every library sizes its own thread pools if not provided.
+            kw_extractor (KeywordExtractorOption): Keyword extractor. "shared_parse_yake" scores the tokens the NER model split the text into, so the text is tokenized once. Texts of NER models that expose no tokens are tokenized by the keyword extractor.
+            candidate_generator (CandidateGeneratorOption): How candidate groups are shortlisted. "hnsw" keeps an in-memory index of all groups, built when the database is prepared.
+            snapshot_directory (Optional[str]): Directory of the snapshots of the in-memory matching state. The state is restored from the latest snapshot when the database is prepared, replaying only the changes since.
+            load_governor (Optional[LoadGovernor]): Governor that degrades extraction while a backlog builds up. Extraction is never degraded if not provided.
+            degraded_ner_model (SingleNERModelOption): NER model used while extraction is degraded by the load governor.
+            lookup_cache (Optional[LookupCache]): Read-through cache of the database's term and article group lookups. Every lookup goes to the database if not provided.
+            term_statistics (Optional[TermStatistics]): Document frequencies of the terms, to weight terms by IDF and leave ultra-common ones out of shortlisting. Every term is shortlisted with its extracted weight if not provided.
+            preprocessor (Optional[TextPreprocessor]): Text preparation applied once before both extractors. Defaults to boilerplate stripping and normalization without a token budget.
+            paragraph_cache_size (int): Number of paragraphs whose keywords and entities are cached, so `update_article` only extracts the paragraphs a revision changed.
+            shard_processes (Optional[int]): Worker processes grouping the shards of a batch in `add_articles`. Defaults to the number of CPUs.
+            sharding (ShardingStrategy): How `add_articles` partitions a batch into shards.
+            creation_stripes (int): Number of lock stripes new article groups are created under. Workers ingesting into the same database only wait on each other when creating groups in a shared stripe.
+            max_creation_attempts (int): Attempts at creating a new group for an article before creating it despite groups created concurrently by other workers.
+
+        Loads every unit before returning, which blocks the calling thread and
+        runs its own event loop to prepare the database. Inside a running loop,
+        use `await KENEC.create(...)` instead.
         """
         logging.info(f"Initializing KENEC model {self.__str__()}")
         self.match_threshold = self.__validate_match_threshold(match_threshold)
-        unit_init_functions = [
-            (
-                self.__initialize_database_from_option,
-                [database],
-                (db_auth.__dict__),
-                "database",
-            ),
+        self.candidate_limit = candidate_limit
+        self.__load_governor = load_governor
+        self.__lookup_cache = lookup_cache
+        self.__term_statistics = term_statistics
+        self.__ner_socket_path = ner_socket_path
+        if resources is not None and resources.ner_replicas is not None:
+            if ner_replicas is not None:
+                raise ValueError(
+                    "NER replicas should be set on either KENEC or its "
+                    "resource governor"
+                )
+            ner_replicas = resources.ner_replicas
+            ner_intra_op_threads = resources.ner_intra_op_threads
+        if ner_replicas is not None and ner_replicas <= 0:
+            raise ValueError("NER replicas should be a value > 0")
+        if ner_intra_op_threads is not None and ner_intra_op_threads <= 0:
+            raise ValueError("NER intra-op threads should be a value > 0")
+        if creation_stripes <= 0:
+            raise ValueError("Creation stripes should be a value > 0")
+        if max_creation_attempts <= 0:
+            raise ValueError("Max creation attempts should be a value > 0")
+        self.__resources = resources
+        self.__ner_replicas = ner_replicas
+        self.__ner_intra_op_threads = ner_intra_op_threads
+        self.__preprocessor = (
+            preprocessor if preprocessor is not None else TextPreprocessor()
+        )
+        self.__paragraph_cache = TTLCache(
+            max_size=paragraph_cache_size, ttl=_PARAGRAPH_CACHE_TTL
+        )
+        self.__creation_stripes = creation_stripes
+        self.__max_creation_attempts = max_creation_attempts
+        self.__assignment_report = GroupAssignmentReport(
+            created_groups=0, conflicts=0, conflict_joins=0, forced_groups=0
+        )
+        # Starts its worker processes on first use
+        self.__sharded_clusterer = ShardedClusterer(
+            processes=shard_processes or os.cpu_count() or 1, strategy=sharding
+        )
+        # Building the adapter and candidate generator does no I/O
+        self.__initialize_database_from_option(database, **db_auth.__dict__)
+        self.__initialize_candidate_generator_from_option(
+            candidate_generator, snapshot_directory
+        )
+        if ner_model in GAZETTEER_NER_MODEL_OPTIONS:
+            # Built up front so preparing the database can fill it while the fallback model loads
+            self.__gazetteer = GazetteerEntityModel(database=self.__database)
+        self.__model_units = [
             (
+                "kw_extractor",
                 self.__initialize_kw_extractor_from_option,
                 [kw_extractor],
-                None,
-                "kw_extractor",
             ),
-            (self.__initialize_ner_model_from_option, [ner_model], None, "ner"),
+            ("ner", self.__initialize_ner_model_from_option, [ner_model]),
         ]
+        if load_governor is not None:
+            self.__model_units.append(
+                (
+                    "degraded",
+                    self.__initialize_degraded_extractors,
+                    [
+                        degraded_ner_model,
+                        kw_extractor,
+                        load_governor.degraded_max_ngram_size,
+                    ],
+                )
+            )
+        self.__prepare_db = prepare_db
+        self.__unit_states = {name: "pending" for name, _, _ in self.__model_units}
+        if prepare_db:
+            self.__unit_states["database"] = "pending"
+        self.__startup = None
+        if resources is not None:
+            # Once the arguments are valid, so a constructor that raises leaves the
+            # process as it was, and before any model loads its thread pools
+            resources.apply()
+        if _defer_unit_loading.get():
+            # `create` loads the units on the caller's loop
+            return
         __unit_intializers = []
-        for func, args, kwargs, name_suffix in unit_init_functions:
+        for name, func, args in self.__model_units:
             unit_thread = Thread(
-                target=func, args=args, kwargs=kwargs, name=f"kenec_{name_suffix}_unit"
+                target=self.__load_unit,
+                args=[name, func, *args],
+                name=f"kenec_{name}_unit",
             )
             unit_thread.start()
             __unit_intializers.append(unit_thread)
-        db_unit_thread = __unit_intializers.pop(0)
-        db_unit_thread.join()
         if prepare_db:
-            asyncio.run(self.prepare_database())
+            asyncio.run(self.__run_unit("database", self.prepare_database()))
         for unit_thread in __unit_intializers:
             unit_thread.join()
+        self.__log_resource_report()
+
+    @classmethod
+    async def create(cls, *, wait_until_ready: bool = True, **kwargs: Any) -> "KENEC":
+        """Initialize the model without blocking the running event loop
+
+        The database is connected, migrated and loaded on the running loop while
+        the extractor models load in the default executor, so startup takes
+        about as long as the slowest unit. Use this instead of the constructor
+        inside a running loop (e.g. an ASGI app).
+
+        Args:
+            wait_until_ready (bool): Whether to return only once every unit is ready. Otherwise the units keep loading in the background, see `readiness` and `wait_until_ready`.
+            **kwargs: Arguments of `KENEC.__init__`
+
+        Returns:
+            KENEC: The model
+
+        Raises:
+            Exception: The error of the first unit that failed to load, if waiting until ready
+        """
+        token = _defer_unit_loading.set(True)
+        try:
+            kenec = cls(**kwargs)
+        finally:
+            _defer_unit_loading.reset(token)
+        kenec.__startup = asyncio.create_task(kenec.__start(), name="kenec_startup")
+        if wait_until_ready:
+            await kenec.wait_until_ready()
+        return kenec
+
+    async def __start(self):
+        """Load every unit concurrently, extractor models in the default executor"""
+        start = perf_counter()
+        units = [
+            self.__run_unit(name, asyncio.to_thread(func, *args))
+            for name, func, args in self.__model_units
+        ]
+        if self.__prepare_db:
+            units.append(self.__run_unit("database", self.prepare_database()))
+        await asyncio.gather(*units)
+        logging.info("KENEC model is ready (%.2fs)", perf_counter() - start)
+        self.__log_resource_report()
+
+    def __load_unit(self, name: str, func: Callable[..., None], *args: Any):
+        """Load a unit in the calling thread, tracking its state"""
+        self.__unit_states[name] = "loading"
+        try:
+            func(*args)
+        except Exception as e:
+            self.__unit_states[name] = "failed"
+            self.__startup_error = self.__startup_error or f"{name}: {e}"
+            logging.error("Loading the '%s' unit failed: %s", name, e)
+            raise
+        self.__unit_states[name] = "ready"
+
+    async def __run_unit(self, name: str, load: Awaitable[None]):
+        """Load a unit on the running loop, tracking its state"""
+        self.__unit_states[name] = "loading"
+        try:
+            await load
+        except Exception as e:
+            self.__unit_states[name] = "failed"
+            self.__startup_error = self.__startup_error or f"{name}: {e}"
+            logging.error("Loading the '%s' unit failed: %s", name, e)
+            raise
+        self.__unit_states[name] = "ready"
+
+    async def wait_until_ready(self):
+        """Wait until every unit is loaded
+
+        Raises:
+            Exception: The error of the first unit that failed to load
+        """
+        if self.__startup is not None:
+            # Shielded, so a caller timing out does not cancel the startup
+            await asyncio.shield(self.__startup)
+
+    def readiness(self) -> ReadinessReport:
+        """Readiness probe of the model
+
+        Returns:
+            ReadinessReport: State of each unit and whether articles can be added
+        """
+        return ReadinessReport(
+            ready=self.__is_ready(),
+            units=dict(self.__unit_states),
+            error=self.__startup_error,
+        )
+
+    def __is_ready(self) -> bool:
+        return all(state == "ready" for state in self.__unit_states.values())
 
     def __validate_match_threshold(self, v: float):
         """The validator to determine if the given match threshold is a valid value
@@ -131,27 +506,53 @@ class KENEC:
         Args:
             option (NERModelOption): NER Option
         """
-        if option == "xlm_roberta_large_finetuned":
-            self.__entity_extractor = (
-                XlmRobertaLargeFinetunedConll03EnglishEntityModel()
+        if option in GAZETTEER_NER_MODEL_OPTIONS:
+            assert self.__gazetteer is not None
+            fallback_option = GAZETTEER_NER_MODEL_OPTIONS[option]
+            if fallback_option is not None:
+                self.__gazetteer.fallback_model = self.__load_ner_model(fallback_option)
+            self.__entity_extractor = self.__gazetteer
+        elif option in CASCADE_NER_MODEL_OPTIONS:
+            fast_option, accurate_option = CASCADE_NER_MODEL_OPTIONS[option]
+            self.__entity_extractor = CascadeEntityModel(
+                # Scored, for the cascade's confidence signal
+                fast_model=self.__load_ner_model(fast_option, scored=True),
+                accurate_model=self.__load_ner_model(accurate_option),
             )
-        elif option == "spacy_web_sm":
-            self.__entity_extractor = SpacyEntityModel(model="en_core_web_sm")
-        elif option == "spacy_web_md":
-            self.__entity_extractor = SpacyEntityModel(model="en_core_web_md")
-        elif option == "spacy_web_lg":
-            self.__entity_extractor = SpacyEntityModel(model="en_core_web_lg")
-        elif option == "spacy_web_trf":
-            self.__entity_extractor = SpacyEntityModel(model="en_core_web_trf")
-        elif option == "flair_english_ontonotes":
-            self.__entity_extractor = FlairEntityModel(model="ner-english-ontonotes")
-        elif option == "flair_english_ontonotes_large":
-            self.__entity_extractor = FlairEntityModel(
-                model="ner-english-ontonotes-large"
+        elif option == "remote":
+            self.__entity_extractor = RemoteEntityModel(self.__ner_socket_path)
+        elif option in get_args(SingleNERModelOption):
+            self.__entity_extractor = self.__load_ner_model(
+                cast(SingleNERModelOption, option)
             )
         else:
             raise ValueError(f"Invalid option selection '{option}'")
 
+    def __load_ner_model(
+        self, option: SingleNERModelOption, *, scored: bool = False
+    ) -> Union[SingleNERModelClass, ReplicaPool]:
+        """Loads the NER Model class of a single option, as a replica pool if configured
+
+        Args:
+            option (SingleNERModelOption): NER Option
+            scored (bool): Whether entities need a confidence score
+
+        Returns:
+            Union[SingleNERModelClass, ReplicaPool]: The loaded NER Model class
+        """
+        if self.__ner_replicas is None:
+            return load_ner_model(option, scored=scored)
+        return ReplicaPool(
+            lambda: load_ner_model(option, scored=scored),
+            self.__ner_replicas,
+            intra_op_threads=self.__ner_intra_op_threads,
+            cpu_sets=(
+                self.__resources.replica_cpu_sets()
+                if self.__resources is not None
+                else None
+            ),
+        )
+
     def __initialize_kw_extractor_from_option(
         self,
         option: KeywordExtractorOption,
@@ -161,11 +562,47 @@ class KENEC:
         Args:
             option (KeywordExtractorOption): Keyword Extractor Option
         """
+        self.__keyword_extractor = self.__load_kw_extractor(option)
+
+    def __load_kw_extractor(
+        self, option: KeywordExtractorOption, max_ngram_size: int = 3
+    ) -> KeywordExtractorClass:
+        """Loads the Keyword Extractor class of an option
+
+        Args:
+            option (KeywordExtractorOption): Keyword Extractor Option
+            max_ngram_size (int): Maximum number of words in a keyword
+
+        Returns:
+            KeywordExtractorClass: The loaded Keyword Extractor class
+        """
         if option == "yake":
-            self.__keyword_extractor = YakeKeywordExtractor()
+            return YakeKeywordExtractor(max_ngram_size=max_ngram_size)
+        elif option == "numpy_yake":
+            return NumpyYakeKeywordExtractor(max_ngram_size=max_ngram_size)
+        elif option == "shared_parse_yake":
+            return SharedParseKeywordExtractor(max_ngram_size=max_ngram_size)
         else:
             raise ValueError(f"Invalid option selection '{option}'")
 
+    def __initialize_degraded_extractors(
+        self,
+        ner_option: SingleNERModelOption,
+        kw_option: KeywordExtractorOption,
+        max_ngram_size: int,
+    ):
+        """Initializes the cheaper extractors used while extraction is degraded
+
+        Args:
+            ner_option (SingleNERModelOption): NER Option of the degraded mode
+            kw_option (KeywordExtractorOption): Keyword Extractor Option of the degraded mode
+            max_ngram_size (int): Maximum keyword n-gram size of the degraded mode
+        """
+        self.__degraded_entity_extractor = self.__load_ner_model(ner_option)
+        self.__degraded_keyword_extractor = self.__load_kw_extractor(
+            kw_option, max_ngram_size=max_ngram_size
+        )
+
     def __initialize_database_from_option(
         self,
         option: DatabaseVariant,
@@ -202,11 +639,35 @@ class KENEC:
                 username=kwargs["username"],
                 password=kwargs["password"],
                 database=kwargs["database"],
+                cache=self.__lookup_cache,
+                max_term_articles=(
+                    self.__term_statistics.max_term_articles
+                    if self.__term_statistics is not None
+                    else None
+                ),
             )
         else:
             logging.error(f"Invalid database option: {option}")
             raise ValueError(f"Invalid option selection '{option}'")
 
+    def __initialize_candidate_generator_from_option(
+        self, option: CandidateGeneratorOption, snapshot_directory: Optional[str]
+    ):
+        """Initializes the Candidate Generator class for the selected option
+
+        Args:
+            option (CandidateGeneratorOption): Candidate Generator Option
+            snapshot_directory (Optional[str]): Directory of the in-memory state snapshots
+        """
+        if option == "posting_list":
+            self.__candidate_generator = PostingListCandidateGenerator(self.__database)
+        elif option == "hnsw":
+            self.__candidate_generator = AnnCandidateGenerator(
+                self.__database, snapshot_directory=snapshot_directory
+            )
+        else:
+            raise ValueError(f"Invalid option selection '{option}'")
+
     async def prepare_database(self):
         """Prepare/Setup the database for usage
 
@@ -241,29 +702,364 @@ class KENEC:
                 logging.debug(
                     f"Succesfully initialized '{constraint}' {def_type} for '{field}' in '{label}'"
                 )
+        # Plan the data-path statements before the first article arrives
+        await self.__database.prepare_statements()
+        # Build the in-memory state of the candidate generator
+        await self.__candidate_generator.load()
+        if self.__term_statistics is not None:
+            await self.__term_statistics.refresh(self.__database)
+        if self.__gazetteer is not None:
+            await self.__gazetteer.refresh()
+
+    def ner_report(self) -> Optional[CascadeReport]:
+        """Escalation rates and quality tradeoff of the cascade NER model
+
+        Returns:
+            Optional[CascadeReport]: The report, or None if the NER model is not a cascade
+        """
+        if isinstance(self.__entity_extractor, CascadeEntityModel):
+            return self.__entity_extractor.report()
+        return None
+
+    def gazetteer_report(self) -> Optional[GazetteerReport]:
+        """Coverage of the gazetteer NER model
+
+        Returns:
+            Optional[GazetteerReport]: The report, or None if the NER model is not a gazetteer
+        """
+        if self.__gazetteer is not None:
+            return self.__gazetteer.report()
+        return None
+
+    async def refresh_gazetteer(self):
+        """Add the entities other processes stored since the previous refresh to the gazetteer"""
+        if self.__gazetteer is not None:
+            await self.__gazetteer.refresh()
+
+    def resource_report(self) -> Optional[ResourceReport]:
+        """Thread and CPU settings in effect in the process
+
+        Returns:
+            Optional[ResourceReport]: The report, or None if no resource governor is configured
+        """
+        if self.__resources is not None:
+            return self.__resources.report()
+        return None
+
+    def __log_resource_report(self):
+        """Log the settings in effect once the models started their thread pools"""
+        report = self.resource_report()
+        if report is None:
+            return
+        logging.info(
+            "Resource settings: %d/%d CPUs, torch %s intra-op and %s inter-op "
+            "threads, BLAS threads %s, tokenizers parallelism %s, %s NER replicas "
+            "of %s threads, %d process threads",
+            len(report.available_cpus),
+            report.cpus,
+            report.torch_intra_op_threads,
+            report.torch_inter_op_threads,
+            report.blas_threads or "unknown",
+            report.tokenizers_parallelism,
+            report.ner_replicas,
+            report.ner_intra_op_threads,
+            report.process_threads,
+        )
+
+    def load_report(self) -> Optional[LoadGovernorReport]:
+        """Load and processing mode statistics of the load governor
+
+        Returns:
+            Optional[LoadGovernorReport]: The report, or None if no load governor is configured
+        """
+        if self.__load_governor is not None:
+            return self.__load_governor.report()
+        return None
+
+    def cache_report(self) -> Optional[LookupCacheReport]:
+        """Hit ratios of the database lookup cache
+
+        Returns:
+            Optional[LookupCacheReport]: The report, or None if no lookup cache is configured
+        """
+        if self.__lookup_cache is not None:
+            return self.__lookup_cache.report()
+        return None
+
+    async def consolidate_article_groups(self) -> ConsolidationReport:
+        """Merge article groups whose profiles converged since the previous pass
+
+        Returns:
+            ConsolidationReport: Outcome of the pass
+        """
+        if self.__consolidator is None:
+            self.__consolidator = GroupConsolidator(
+                self.__database,
+                match_threshold=self.match_threshold,
+                candidate_limit=self.candidate_limit,
+                candidate_generator=self.__candidate_generator,
+            )
+        return await self.__consolidator.run_once()
+
+    def start_group_consolidation(
+        self, interval: timedelta = timedelta(minutes=10)
+    ) -> asyncio.Task:
+        """Run article group consolidation periodically in the background of the running loop
+
+        Args:
+            interval (timedelta): Time between consolidation passes
+
+        Returns:
+            asyncio.Task: The background task, cancel it to stop consolidating
+        """
+        if self.__consolidator is None:
+            self.__consolidator = GroupConsolidator(
+                self.__database,
+                match_threshold=self.match_threshold,
+                candidate_limit=self.candidate_limit,
+                candidate_generator=self.__candidate_generator,
+            )
+        return asyncio.create_task(
+            self.__consolidator.run_periodically(interval),
+            name="kenec_group_consolidation",
+        )
+
+    async def backfill(
+        self,
+        *,
+        reextract: bool = False,
+        workers: int = 8,
+        page_size: int = 500,
+        on_progress: Optional[Callable[[BackfillReport], None]] = None,
+    ) -> BackfillReport:
+        """Re-cluster every stored article with the current threshold (and models) and swap the new groups in
+
+        The new groups are built in a shadow namespace and replace the live ones
+        in a single transaction, so readers never see a half-built clustering.
+        Articles added while the backfill runs are picked up before the swap.
+        Other processes serving the same database need to reload their
+        candidate generator afterwards.
+
+        Args:
+            reextract (bool): Whether to extract the keywords and entities of every article again (after a model change) instead of reusing the stored ones (after a threshold change)
+            workers (int): Maximum number of articles extracted concurrently
+            page_size (int): Number of articles read from the database per query
+            on_progress (Optional[Callable[[BackfillReport], None]]): Called with the periodic progress reports
+
+        Returns:
+            BackfillReport: Final report of the backfill
+
+        Raises:
+            KENECNotReadyError: If the model's units are not all loaded
+            BackfillSwapError: If the new groups could not be swapped in
+        """
+        if not self.__is_ready():
+            raise KENECNotReadyError(
+                "The model is still loading"
+                if self.__startup_error is None
+                else f"The model failed to load ({self.__startup_error})"
+            )
+
+        async def extract(article: Article) -> tuple[list[Keyword], list[Entity]]:
+            # Never degraded, the lag of old articles is not a sign of load
+            return await self.__extract(article, "full")
+
+        report = await BackfillJob(
+            self.__database,
+            match_threshold=self.match_threshold,
+            candidate_limit=self.candidate_limit,
+            extract=extract if reextract else None,
+            workers=workers,
+            page_size=page_size,
+            on_progress=on_progress,
+        ).run()
+        await self.__candidate_generator.groups_replaced()
+        if self.__gazetteer is not None:
+            await self.__gazetteer.refresh()
+        return report
+
+    async def save_snapshot(self):
+        """Write a snapshot of the in-memory matching state, if a snapshot directory is configured"""
+        await self.__candidate_generator.save_snapshot()
+
+    def start_snapshots(
+        self, interval: timedelta = timedelta(minutes=15)
+    ) -> asyncio.Task:
+        """Write snapshots of the in-memory matching state periodically in the background of the running loop
+
+        Args:
+            interval (timedelta): Time between snapshots
+
+        Returns:
+            asyncio.Task: The background task, cancel it to stop writing snapshots
+        """
+
+        async def save_periodically():
+            while True:
+                await asyncio.sleep(interval.total_seconds())
+                try:
+                    await self.save_snapshot()
+                except Exception as e:
+                    logging.error("Writing a snapshot failed: %s", e)
+
+        return asyncio.create_task(save_periodically(), name="kenec_snapshots")
+
+    async def close(self):
+        """Shut down the model, writing a final snapshot of the in-memory matching state"""
+        await self.save_snapshot()
+        self.__sharded_clusterer.close()
 
     async def add_article(
         self, news_article: Article
-    ) -> tuple[list[Keyword], list[Entity]]:
+    ) -> tuple[list[Keyword], list[Entity], str, bool]:
         """Add a new article to be clustered
 
         Args:
             news_article (NewsArticle): The new News Article's data
 
         Returns:
-            tuple[list[Keyword], list[Entity]]: Extracted keywords and entities from the article.
+            tuple[list[Keyword], list[Entity], str, bool]: Extracted keywords and entities from the article, the article's group id and whether the group is new.
+
+        Raises:
+            KENECNotReadyError: If the model's units are not all loaded
+            CannotClusterArticleError: If no keywords or entities were extracted from the article
         """
-        merged_article_content: str = news_article.title + "\n" + news_article.content
+        article_keywords, article_entities = await self.__extract_for_grouping(
+            news_article, revision=False
+        )
+        group_id, is_new_group = await self.__find_or_create_article_group(
+            news_article, article_keywords, article_entities
+        )
+        if self.__gazetteer is not None:
+            # Entities the fallback model found are known surface forms from now on
+            self.__gazetteer.add_entities(article_entities)
+        return article_keywords, article_entities, group_id, is_new_group
 
-        # Extract keywords and entities
-        kw_coro: CoroutineType[Any, Any, list[Keyword]] = (
-            self.__keyword_extractor.get_keywords_from_text(text=merged_article_content)
+    async def update_article(
+        self, news_article: Article
+    ) -> tuple[list[Keyword], list[Entity], str, bool]:
+        """Re-cluster a revised article, extracting only its changed paragraphs
+
+        Keywords and entities are extracted and cached per paragraph, like on
+        every path storing articles, so a revision only runs the models on the
+        paragraphs it added or changed. The article stays in its group, whose
+        term weights are only updated for the terms whose weight changed. An
+        article that is not stored yet is added like in `add_article`.
+
+        Args:
+            news_article (Article): The revised article, with the id it was stored with
+
+        Returns:
+            tuple[list[Keyword], list[Entity], str, bool]: Extracted keywords and entities from the article, the article's group id and whether its terms changed.
+
+        Raises:
+            KENECNotReadyError: If the model's units are not all loaded
+            CannotClusterArticleError: If no keywords or entities were extracted from the article
+        """
+        article_keywords, article_entities = await self.__extract_for_grouping(
+            news_article, revision=True
         )
-        ent_coro: CoroutineType[Any, Any, list[Entity]] = (
-            self.__entity_extractor.get_entities_from_text(text=merged_article_content)
+        stored = None
+        if news_article.id is not None:
+            stored = await self.__database.get_article_profile(str(news_article.id))
+        if stored is not None:
+            _, previous_profile = stored
+            profile = build_article_profile(article_keywords, article_entities)
+            delta = profile_delta(previous_profile, profile)
+            group_id = await self.__database.update_article(
+                news_article, profile, delta
+            )
+            if group_id is not None:
+                changed = bool(delta.entities or delta.keywords)
+                if changed:
+                    await self.__candidate_generator.article_revised(group_id, delta)
+                    if self.__term_statistics is not None:
+                        self.__term_statistics.article_revised(
+                            previous_profile, profile
+                        )
+                    if self.__gazetteer is not None:
+                        self.__gazetteer.add_entities(article_entities)
+                logging.debug(
+                    "Updated article '%s', %d terms changed",
+                    news_article.title,
+                    len(delta.entities) + len(delta.keywords),
+                )
+                return article_keywords, article_entities, group_id, changed
+        group_id, _ = await self.__find_or_create_article_group(
+            news_article, article_keywords, article_entities
         )
+        if self.__gazetteer is not None:
+            self.__gazetteer.add_entities(article_entities)
+        return article_keywords, article_entities, group_id, True
 
-        article_keywords, article_entities = await asyncio.gather(kw_coro, ent_coro)
+    async def extract(
+        self, news_article: Article
+    ) -> tuple[list[Keyword], list[Entity]]:
+        """Extract the keywords and entities of an article without grouping it
+
+        Extraction is always in full mode and never touches the database, so
+        a model built with `prepare_db=False` can be used (e.g. to evaluate
+        the grouping offline).
+
+        Args:
+            news_article (Article): The News Article's data
+
+        Returns:
+            tuple[list[Keyword], list[Entity]]: Extracted keywords and entities from the article.
+
+        Raises:
+            KENECNotReadyError: If the extractor models are not loaded
+        """
+        if any(
+            self.__unit_states[name] != "ready" for name, _, _ in self.__model_units
+        ):
+            raise KENECNotReadyError(
+                "The models are still loading"
+                if self.__startup_error is None
+                else f"The model failed to load ({self.__startup_error})"
+            )
+        return await self.__extract(news_article, "full")
+
+    def paragraph_cache_report(self) -> CacheReport:
+        """Hit ratio of the per-paragraph extraction cache, reused by `update_article`
+
+        Returns:
+            CacheReport: Cache statistics
+        """
+        return self.__paragraph_cache.report()
+
+    async def __extract_for_grouping(
+        self, news_article: Article, revision: bool
+    ) -> tuple[list[Keyword], list[Entity]]:
+        """Extract the keywords and entities of an article under the load governor
+
+        Args:
+            news_article (Article): The News Article's data
+            revision (bool): Whether the article is a revision of a stored article, whose publication date is no measure of lag
+
+        Raises:
+            KENECNotReadyError: If the model's units are not all loaded
+            CannotClusterArticleError: If no keywords or entities were extracted from the article
+        """
+        if not self.__is_ready():
+            raise KENECNotReadyError(
+                "The model is still loading"
+                if self.__startup_error is None
+                else f"The model failed to load ({self.__startup_error})"
+            )
+        mode: ProcessingMode = "full"
+        if self.__load_governor is not None:
+            mode = self.__load_governor.acquire(
+                None if revision else news_article.published_date
+            )
+        try:
+            article_keywords, article_entities = await self.__extract(
+                news_article, mode
+            )
+        finally:
+            if self.__load_governor is not None:
+                self.__load_governor.release()
+        news_article.processing_mode = mode
 
         logging.debug(
             "Extracted %d keywords and %d entities for article '%s'",
@@ -286,11 +1082,326 @@ class KENEC:
 
         return article_keywords, article_entities
 
-    def __find_or_create_article_group(self, article: Article) -> tuple[str, bool]:
+    async def stream(
+        self,
+        articles: Iterable[Article] | AsyncIterable[Article],
+        *,
+        concurrency: int = 8,
+        ordered: bool = False,
+    ) -> AsyncIterator[ClusteredArticle]:
+        """Cluster a stream of articles, yielding each result as soon as it is available
+
+        At most `concurrency` articles are read from the input and processed at
+        a time, so memory use does not grow with the size of the input.
+        Articles without keywords or entities are logged and skipped.
+
+        Args:
+            articles (Iterable[Article] | AsyncIterable[Article]): The articles to cluster
+            concurrency (int): Maximum number of articles processed at a time
+            ordered (bool): Whether to yield results in input order instead of completion order. A slow article then holds back the ones after it.
+
+        Yields:
+            ClusteredArticle: The article, its extracted keywords and entities, its group id and whether the group is new
+
+        Raises:
+            KENECNotReadyError: If the model's units are not all loaded
+        """
+        if concurrency <= 0:
+            raise ValueError("Concurrency should be a value > 0")
+        source = (
+            aiter(articles)
+            if isinstance(articles, AsyncIterable)
+            else _async_iterator(articles)
+        )
+        pending: deque[asyncio.Task[Optional[ClusteredArticle]]] = deque()
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(pending) < concurrency:
+                    try:
+                        article = await anext(source)
+                    except StopAsyncIteration:
+                        exhausted = True
+                        break
+                    pending.append(
+                        asyncio.create_task(self.__cluster_for_stream(article))
+                    )
+                if not pending:
+                    return
+                if ordered:
+                    done = [pending.popleft()]
+                    await asyncio.wait(done)
+                else:
+                    finished, _ = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    done = [task for task in pending if task in finished]
+                    for task in done:
+                        pending.remove(task)
+                for task in done:
+                    result = task.result()
+                    if result is not None:
+                        yield result
+        finally:
+            # The consumer stopped early or an article failed
+            for task in pending:
+                task.cancel()
+
+    async def add_articles(
+        self, news_articles: Iterable[Article], *, concurrency: int = 8
+    ) -> list[ClusteredArticle]:
+        """Cluster a batch of articles, grouping its shards in parallel worker processes
+
+        The batch is partitioned into shards (see `sharding`), each shard is
+        grouped on its own and the groups spanning shards are merged, always
+        with the same outcome for the same batch. Each resulting batch group
+        then joins the stored group that best matches its first article, or
+        becomes a new group. The grouping is close to, but not always the same
+        as, adding the articles one by one; `python -m
+        modules.clustering.evaluation --shards` measures the difference.
+
+        Articles without keywords or entities are logged and skipped.
+
+        Args:
+            news_articles (Iterable[Article]): The articles to cluster
+            concurrency (int): Maximum number of articles extracted at a time
+
+        Returns:
+            list[ClusteredArticle]: The clustered articles in batch order, with their extracted keywords and entities, group id and whether the group is new
+
+        Raises:
+            KENECNotReadyError: If the model's units are not all loaded
+        """
+        if concurrency <= 0:
+            raise ValueError("Concurrency should be a value > 0")
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def extract(
+            article: Article,
+        ) -> Optional[tuple[list[Keyword], list[Entity]]]:
+            async with semaphore:
+                try:
+                    return await self.__extract_for_grouping(article, revision=False)
+                except CannotClusterArticleError:
+                    return None
+
+        articles = list(news_articles)
+        extracted: list[tuple[Article, list[Keyword], list[Entity], TermProfile]] = []
+        for article, extraction in zip(
+            articles, await asyncio.gather(*map(extract, articles))
+        ):
+            if extraction is not None:
+                keywords, entities = extraction
+                profile = build_article_profile(keywords, entities)
+                extracted.append((article, keywords, entities, profile))
+        if len(extracted) < len(articles):
+            logging.info(
+                "Skipped %d articles without keywords or entities",
+                len(articles) - len(extracted),
+            )
+        if not extracted:
+            return []
+        assignments, _, report = await self.__sharded_clusterer.cluster(
+            [profile for _, _, _, profile in extracted],
+            [article.published_date for article, _, _, _ in extracted],
+            self.match_threshold,
+        )
+        self.__sharding_report = report
+
+        # Stored group of each batch group, decided by its first article
+        group_ids: dict[int, Optional[str]] = {}
+        clustered: list[ClusteredArticle] = []
+        for (article, keywords, entities, profile), group in zip(
+            extracted, assignments
+        ):
+            if group in group_ids:
+                group_id, is_new_group = await self.__database.save_article(
+                    article, profile, group_ids[group]
+                )
+            else:
+                group_id, is_new_group = await self.__assign_article_group(
+                    article, profile
+                )
+            group_ids[group] = group_id
+            await self.__candidate_generator.article_saved(
+                group_id, profile, is_new_group
+            )
+            if self.__term_statistics is not None:
+                self.__term_statistics.article_saved(profile)
+            if self.__gazetteer is not None:
+                self.__gazetteer.add_entities(entities)
+            clustered.append((article, keywords, entities, group_id, is_new_group))
+        logging.info(
+            "Clustered %d articles into %d groups over %d shards (%.1f articles/s)",
+            report.articles,
+            report.groups,
+            report.shards,
+            report.articles_per_second,
+        )
+        return clustered
+
+    def term_statistics_report(self) -> Optional[TermStatisticsReport]:
+        """Corpus statistics used to weight and stop-list terms
+
+        Returns:
+            Optional[TermStatisticsReport]: The report, or None if no term statistics are configured
+        """
+        if self.__term_statistics is None:
+            return None
+        return self.__term_statistics.report()
+
+    async def recount_term_frequencies(self):
+        """Recompute the document frequency of every stored term
+
+        Only needed once on a graph stored before document frequencies were
+        tracked, they are kept current by every write since.
+        """
+        await self.__database.recount_term_articles()
+        if self.__term_statistics is not None:
+            await self.__term_statistics.refresh(self.__database)
+
+    def assignment_report(self) -> GroupAssignmentReport:
+        """Outcome of the new article groups this instance tried to create
+
+        Returns:
+            GroupAssignmentReport: The report
+        """
+        return self.__assignment_report.model_copy()
+
+    def sharding_report(self) -> Optional[ShardedClusteringReport]:
+        """Outcome of the sharded grouping of the latest `add_articles` batch
+
+        Returns:
+            Optional[ShardedClusteringReport]: The report, or None if no batch was added yet
+        """
+        return self.__sharding_report
+
+    async def __cluster_for_stream(
+        self, article: Article
+    ) -> Optional[ClusteredArticle]:
+        """Cluster an article of a stream, None if it cannot be clustered"""
+        try:
+            keywords, entities, group_id, is_new_group = await self.add_article(article)
+        except CannotClusterArticleError:
+            return None
+        return article, keywords, entities, group_id, is_new_group
+
+    async def __extract(
+        self, news_article: Article, mode: ProcessingMode
+    ) -> tuple[list[Keyword], list[Entity]]:
+        """Extract keywords and entities from an article in the given processing mode
+
+        Each paragraph is extracted on its own and cached, so the stored
+        profile of an article and of its later revisions are scored alike and
+        a revision reuses its unchanged paragraphs.
+
+        Args:
+            news_article (Article): The News Article's data
+            mode (ProcessingMode): Processing mode decided by the load governor
+
+        Returns:
+            tuple[list[Keyword], list[Entity]]: Extracted keywords and entities from the article.
+        """
+        content = news_article.content
+        keyword_extractor = self.__keyword_extractor
+        entity_extractor = self.__entity_extractor
+        if (
+            mode == "degraded"
+            and self.__load_governor is not None
+            and self.__degraded_keyword_extractor is not None
+            and self.__degraded_entity_extractor is not None
+        ):
+            content = content[: self.__load_governor.degraded_max_content_chars]
+            keyword_extractor = self.__degraded_keyword_extractor
+            entity_extractor = self.__degraded_entity_extractor
+        return await self.__extract_paragraphs(
+            self.__preprocessor.prepare_paragraphs(news_article.title, content),
+            mode,
+            keyword_extractor,
+            entity_extractor,
+        )
+
+    @staticmethod
+    async def __extract_text(
+        text: str,
+        keyword_extractor: KeywordExtractorClass,
+        entity_extractor: NERModelClass,
+    ) -> tuple[list[Keyword], list[Entity]]:
+        """Extract keywords and entities from a prepared text"""
+        if isinstance(keyword_extractor, SharedParseKeywordExtractor):
+            # One parse of the NER model serves both extractors
+            parse = await entity_extractor.get_entities_and_tokens_from_text(text)
+            article_entities, tokens = parse
+            if tokens is None:
+                article_keywords = await keyword_extractor.get_keywords_from_text(text)
+            else:
+                article_keywords = await keyword_extractor.get_keywords_from_tokens(
+                    tokens
+                )
+            return article_keywords, article_entities
+
+        kw_coro: CoroutineType[Any, Any, list[Keyword]] = (
+            keyword_extractor.get_keywords_from_text(text=text)
+        )
+        ent_coro: CoroutineType[Any, Any, list[Entity]] = (
+            entity_extractor.get_entities_from_text(text=text)
+        )
+
+        article_keywords, article_entities = await asyncio.gather(kw_coro, ent_coro)
+        return article_keywords, article_entities
+
+    async def __extract_paragraphs(
+        self,
+        paragraphs: list[str],
+        mode: ProcessingMode,
+        keyword_extractor: KeywordExtractorClass,
+        entity_extractor: NERModelClass,
+    ) -> tuple[list[Keyword], list[Entity]]:
+        """Extract keywords and entities paragraph by paragraph, only running the models on uncached paragraphs
+
+        Returns:
+            tuple[list[Keyword], list[Entity]]: Keywords (best score of each) and entities (every mention) of all paragraphs
+        """
+        keys = [
+            (mode, hashlib.blake2b(paragraph.encode(), digest_size=16).hexdigest())
+            for paragraph in paragraphs
+        ]
+        extractions, missing = self.__paragraph_cache.get_many(dict.fromkeys(keys))
+        if missing:
+            texts = {key: paragraph for key, paragraph in zip(keys, paragraphs)}
+            extracted = await asyncio.gather(
+                *(
+                    self.__extract_text(texts[key], keyword_extractor, entity_extractor)
+                    for key in missing
+                )
+            )
+            for key, extraction in zip(missing, extracted):
+                self.__paragraph_cache.put(key, extraction)
+                extractions[key] = extraction
+        logging.debug(
+            "Ran extraction on %d of %d paragraphs, the others were cached",
+            len(missing),
+            len(paragraphs),
+        )
+        keywords: dict[str, Keyword] = {}
+        entities: list[Entity] = []
+        for key in keys:
+            paragraph_keywords, paragraph_entities = extractions[key]
+            for keyword in paragraph_keywords:
+                # A lower YAKE score is a more relevant keyword
+                known = keywords.get(keyword_key(keyword.word))
+                if known is None or keyword.score < known.score:
+                    keywords[keyword_key(keyword.word)] = keyword
+            entities.extend(paragraph_entities)
+        return sorted(keywords.values(), key=lambda keyword: keyword.score), entities
+
+    async def __find_or_create_article_group(
+        self, article: Article, keywords: list[Keyword], entities: list[Entity]
+    ) -> tuple[str, bool]:
         """Find an existing article group for an article or create a new one
 
         Uses a two-step process:
-        1. Shortlist candidate groups based on title similarity
+        1. Shortlist candidate groups with the configured candidate generator
         2. Apply detailed entity and keyword matching to find best group
 
         Args:
@@ -301,4 +1412,111 @@ class KENEC:
         Returns:
             tuple[str, bool]: Tuple of (group_id, is_new_group)
         """
-        raise NotImplementedError()
+        profile = build_article_profile(keywords, entities)
+        group_id, is_new_group = await self.__assign_article_group(article, profile)
+        await self.__candidate_generator.article_saved(group_id, profile, is_new_group)
+        if self.__term_statistics is not None:
+            self.__term_statistics.article_saved(profile)
+        return group_id, is_new_group
+
+    async def __assign_article_group(
+        self, article: Article, profile: TermProfile
+    ) -> tuple[str, bool]:
+        """Save an article into its best matching group, or into a new group no other worker created concurrently
+
+        Joining a group only adds to it, so concurrent joins need no
+        coordination. Creating one is optimistic: the versions of the article's
+        stripes are read before matching, and the group is only created if no
+        group was created in these stripes since. Otherwise the groups created
+        in the meantime, which the candidate generator may not know yet, are
+        scored as well and the article joins one of them if it matches, or
+        tries creating its group again.
+
+        Returns:
+            tuple[str, bool]: Tuple of (group_id, is_new_group)
+        """
+        stripes = group_stripes(profile, self.__creation_stripes)
+        versions = {
+            state.stripe: state.version
+            for state in await self.__database.get_group_stripes(stripes)
+        }
+        best_group_id = await self.__match_article_group(profile)
+        attempts = 0
+        while best_group_id is None and attempts < self.__max_creation_attempts:
+            attempts += 1
+            group_id, states = await self.__database.create_article_group(
+                article, profile, versions
+            )
+            if group_id is not None:
+                self.__assignment_report.created_groups += 1
+                return group_id, True
+            self.__assignment_report.conflicts += 1
+            # Newest first, as many as were created since the versions were read
+            concurrent_group_ids = {
+                concurrent_group_id
+                for state in states
+                for concurrent_group_id in state.recent_group_ids[
+                    : state.version - versions[state.stripe]
+                ]
+            }
+            versions = {state.stripe: state.version for state in states}
+            best_group_id = await self.__match_article_group(
+                profile, list(concurrent_group_ids)
+            )
+            if best_group_id is not None:
+                self.__assignment_report.conflict_joins += 1
+        if best_group_id is not None:
+            return await self.__database.save_article(article, profile, best_group_id)
+        # A duplicate group is merged by the next group consolidation
+        logging.warning(
+            "Creating a group for article '%s' after %d conflicting attempts",
+            article.title,
+            attempts,
+        )
+        # Still registered in the stripes, so the other workers see it
+        group_id, _ = await self.__database.create_article_group(
+            article, profile, versions, force=True
+        )
+        assert group_id is not None
+        self.__assignment_report.forced_groups += 1
+        return group_id, True
+
+    async def __match_article_group(
+        self, profile: TermProfile, group_ids: Optional[list[str]] = None
+    ) -> Optional[str]:
+        """Stored group best matching a profile, None if none reaches the match threshold
+
+        Args:
+            profile (TermProfile): Term profile of the article
+            group_ids (Optional[list[str]]): Groups scored besides the shortlisted candidates
+        """
+        shortlisted, scored = profile, profile
+        if self.__term_statistics is not None:
+            await self.__term_statistics.refresh_if_stale(self.__database)
+            shortlisted = self.__term_statistics.shortlist_profile(profile)
+            scored = self.__term_statistics.weighted_profile(profile)
+        candidate_columns = [
+            await self.__candidate_generator.find_candidate_columns(
+                shortlisted, self.candidate_limit
+            )
+        ]
+        if group_ids:
+            candidate_columns.append(
+                await self.__database.get_article_group_columns(group_ids)
+            )
+        best_group_id = None
+        best_score = 0.0
+        for candidates in candidate_columns:
+            if not candidates.ids:
+                continue
+            scores = profile_similarity_columns(scored, candidates)
+            best = int(np.argmax(scores))
+            if scores[best] >= self.match_threshold and scores[best] > best_score:
+                best_group_id, best_score = candidates.ids[best], float(scores[best])
+        return best_group_id
+
+
+async def _async_iterator(items: Iterable[Article]) -> AsyncIterator[Article]:
+    """Iterate a synchronous iterable of articles asynchronously"""
+    for item in items:
+        yield item
@@ -44,3 +44,11 @@ class DatabaseMigrationError(DatabaseError):
 
     def __init__(self, message: Optional[str] = None):
         super().__init__(message)
+
+
+# ================== Statement Errors ==================
+class DatabaseStatementError(DatabaseError):
+    """A query statement refers to an unknown label, relationship type or property"""
+
+    def __init__(self, statement_name: str, message: str):
+        super().__init__(f"Invalid statement '{statement_name}':: {message}")
@@ -0,0 +1,21 @@
+"""
+Export-Related Exceptions
+"""
+
+from typing import Optional
+
+
+class ExportError(Exception):
+    """An Export Related Error"""
+
+    def __init__(self, message: Optional[str] = None):
+        super().__init__(message)
+
+
+class ExportDependencyMissingError(ExportError):
+    """The optional dependencies of the export are not installed"""
+
+    def __init__(self, package: str):
+        super().__init__(
+            f"`{package}` is required to export, install it with `pip install kenec[export]`"
+        )
@@ -17,3 +17,17 @@ class CannotClusterArticleError(KENECException):
 
     def __init__(self, message: str):
         super().__init__(message)
+
+
+class KENECNotReadyError(KENECException):
+    """The model's units are still loading or failed to load"""
+
+    def __init__(self, message: str):
+        super().__init__(message)
+
+
+class BackfillSwapError(KENECException):
+    """Articles kept being stored faster than a backfill could group them"""
+
+    def __init__(self, message: str):
+        super().__init__(message)
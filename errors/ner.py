@@ -0,0 +1,36 @@
+"""
+NER-Related Exceptions
+"""
+
+from typing import Optional
+
+
+class NERError(Exception):
+    """A NER Related Error"""
+
+    def __init__(self, message: Optional[str] = None):
+        super().__init__(message)
+
+
+class NERServerError(NERError):
+    """The NER server failed to extract the entities of a text"""
+
+    def __init__(self, message: Optional[str] = None):
+        super().__init__(message)
+
+
+class NERServerAlreadyRunningError(NERError):
+    """Another NER server is listening on the socket"""
+
+    def __init__(self, socket_path: str):
+        super().__init__(f"A NER server is already listening at '{socket_path}'")
+
+
+class NERServerUnavailableError(NERError):
+    """The NER server could not be reached, or closed the connection"""
+
+    def __init__(self, socket_path: str, reason: Optional[str] = None):
+        super().__init__(
+            f"NER server at '{socket_path}' is unavailable"
+            + (f": {reason}" if reason else "")
+        )
@@ -4,7 +4,9 @@ from ._article import Article
 from ._article_group import ArticleGroup
 from ._entity import Entity
 from ._entity_group import EntityGroup
+from ._group_stripe import GroupStripe
 from ._keyword_group import KeywordGroup
+from ._shadow_article_group import ShadowArticleGroup
 from ._source import Source
 
 NodeType = Union[Article, ArticleGroup, Source, Entity, EntityGroup, KeywordGroup]
@@ -14,7 +16,9 @@ __all__ = [
     "ArticleGroup",
     "Entity",
     "EntityGroup",
+    "GroupStripe",
     "KeywordGroup",
+    "ShadowArticleGroup",
     "Source",
     "NodeType",
 ]
@@ -1,9 +1,10 @@
 from datetime import datetime
-from typing import Any, Optional, Union
+from typing import Any, ClassVar, Optional, Union
 
 from pydantic import BaseModel, Field, FileUrl, HttpUrl
 
-from type import REQUIRED, UNIQUE
+from type import REQUIRED, UNIQUE, NodeIndexType, fulltext_index, range_index
+from type.governor import ProcessingMode
 
 from ._common import BaseNode
 
@@ -19,3 +20,11 @@ class Article(BaseNode, BaseModel):
     tags: Optional[list[str]] = None
     metadata: Optional[dict[str, Any]] = None
     images: Optional[list[Union[HttpUrl, FileUrl]]] = None
+    processing_mode: Optional[ProcessingMode] = None
+
+    indexes: ClassVar[tuple[NodeIndexType, ...]] = (
+        # Keyset paging and time range filters of the backfill and exports
+        range_index("published_date", "id"),
+        # Title shortlisting
+        fulltext_index("title"),
+    )
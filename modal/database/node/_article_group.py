@@ -1,5 +1,9 @@
+from typing import ClassVar, Optional
+
 from pydantic import BaseModel
 
+from type import NodeIndexType, range_index
+
 from ._common import BaseNode
 
 
@@ -8,3 +12,10 @@ class ArticleGroup(BaseNode, BaseModel):
 
     total_entity_scorable: float
     total_keyword_scorable: float
+    # Incremented by every write to the group, None on groups stored before versioning
+    version: Optional[int] = None
+
+    indexes: ClassVar[tuple[NodeIndexType, ...]] = (
+        # Incremental reloads of the groups changed since the last one
+        range_index("updated_on"),
+    )
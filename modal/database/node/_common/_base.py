@@ -1,13 +1,13 @@
 from abc import ABC
 from datetime import datetime
 from functools import cache
-from typing import Annotated, Optional, Type
+from typing import Annotated, ClassVar, Optional, Type
 from uuid import UUID
 
 from pydantic import BaseModel, Field
 from pydantic.types import UuidVersion
 
-from type import PRIMARY_KEY, REQUIRED
+from type import PRIMARY_KEY, REQUIRED, NodeIndexType
 
 _registry: set[Type["BaseNode"]] = set()
 
@@ -19,6 +19,9 @@ class BaseNode(BaseModel, ABC):
     created_on: Optional[datetime] = Field(..., metadata=REQUIRED)
     updated_on: Optional[datetime] = Field(..., metadata=REQUIRED)
 
+    # Indexes over the node as a whole (composite, full-text), beyond the field markers
+    indexes: ClassVar[tuple[NodeIndexType, ...]] = ()
+
     @classmethod
     @cache
     def node_type(cls) -> str:
@@ -1,4 +1,8 @@
-from pydantic import BaseModel
+from typing import ClassVar, Optional
+
+from pydantic import BaseModel, Field
+
+from type import INDEXED, REQUIRED, NodeIndexType, range_index
 
 from ._common import BaseNode
 
@@ -6,4 +10,14 @@ from ._common import BaseNode
 class EntityGroup(BaseNode, BaseModel):
     """Structure of a Entity Group Node in the Database"""
 
-    entity_type: str
+    word: str = Field(..., metadata=INDEXED)
+    entity_type: str = Field(..., metadata=REQUIRED)
+    # Articles mentioning the entity (its document frequency), None on entities stored before it was tracked
+    article_count: Optional[int] = Field(None, metadata=INDEXED)
+
+    indexes: ClassVar[tuple[NodeIndexType, ...]] = (
+        # Entities are merged and looked up by word and type together
+        range_index("word", "entity_type"),
+        # Incremental reloads of the entities created since the last one
+        range_index("created_on"),
+    )
@@ -0,0 +1,20 @@
+from pydantic import BaseModel, Field
+
+from type import UNIQUE_INDEXED
+
+from ._common import BaseNode
+
+
+class GroupStripe(BaseNode, BaseModel):
+    """Structure of a Group Stripe Node in the Database
+
+    New article groups are created under the lock of the stripes of their
+    first article's main entities, so concurrent ingestion workers creating a
+    group for the same story notice each other.
+    """
+
+    stripe: int = Field(..., metadata=UNIQUE_INDEXED)
+    # Incremented by every group created in the stripe
+    version: int
+    # Latest groups created in the stripe, newest first
+    recent_group_ids: list[str]
@@ -1,4 +1,8 @@
-from pydantic import BaseModel
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+from type import INDEXED, UNIQUE_INDEXED
 
 from ._common import BaseNode
 
@@ -6,4 +10,6 @@ from ._common import BaseNode
 class KeywordGroup(BaseNode, BaseModel):
     """Structure of a Keyword Group Node in the Database"""
 
-    pass
+    word: str = Field(..., metadata=UNIQUE_INDEXED)
+    # Articles having the keyword (its document frequency), None on keywords stored before it was tracked
+    article_count: Optional[int] = Field(None, metadata=INDEXED)
@@ -0,0 +1,11 @@
+from pydantic import Field
+
+from type import INDEXED
+
+from ._article_group import ArticleGroup
+
+
+class ShadowArticleGroup(ArticleGroup):
+    """Structure of an Article Group Node rebuilt by a backfill, swapped in as an `ArticleGroup` once complete"""
+
+    job_id: str = Field(..., metadata=INDEXED)
@@ -0,0 +1,50 @@
+from ._candidate_base import BaseCandidateGenerator
+from ._hashing import embed_hashed_profile, group_stripes, hash_profile
+from ._scoring import (
+    build_article_profile,
+    columns_from_profiles,
+    coverage_weights,
+    entity_key,
+    group_similarity,
+    keyword_key,
+    profile_delta,
+    profile_similarity,
+    profile_similarity_columns,
+    split_entity_key,
+)
+from ._union_find import UnionFind
+from .ann import AnnCandidateGenerator
+from .backfill import BackfillJob
+from .consolidation import GroupConsolidator
+from .evaluation import GroupingReplay, clustering_metrics
+from .hnsw import HNSWIndex
+from .posting_list import PostingListCandidateGenerator
+from .sharding import ShardedClusterer
+from .term_statistics import TermStatistics
+
+__all__ = [
+    "build_article_profile",
+    "columns_from_profiles",
+    "coverage_weights",
+    "entity_key",
+    "group_similarity",
+    "keyword_key",
+    "profile_delta",
+    "profile_similarity",
+    "profile_similarity_columns",
+    "split_entity_key",
+    "embed_hashed_profile",
+    "group_stripes",
+    "hash_profile",
+    "UnionFind",
+    "HNSWIndex",
+    "BaseCandidateGenerator",
+    "PostingListCandidateGenerator",
+    "AnnCandidateGenerator",
+    "GroupConsolidator",
+    "BackfillJob",
+    "GroupingReplay",
+    "clustering_metrics",
+    "ShardedClusterer",
+    "TermStatistics",
+]
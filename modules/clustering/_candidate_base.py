@@ -0,0 +1,80 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from modules.clustering._scoring import columns_from_profiles
+from type.clustering import GroupProfile, GroupProfileColumns, TermProfile
+
+
+class BaseCandidateGenerator(ABC):
+    """Base Class for shortlisting the article groups an article may belong to"""
+
+    async def load(self):
+        """Build any in-memory state from the database, called once it is connected"""
+        pass
+
+    async def save_snapshot(self):
+        """Persist any in-memory state so the next `load` does not rebuild it from scratch"""
+        pass
+
+    @abstractmethod
+    async def find_candidates(
+        self, profile: TermProfile, limit: int, exclude: Optional[str] = None
+    ) -> list[GroupProfile]:
+        """Shortlist the article groups most likely to match a profile
+
+        Args:
+            profile (TermProfile): Term profile to match
+            limit (int): Maximum number of groups to return
+            exclude (Optional[str]): Group id left out of the shortlist (e.g. the group being matched)
+
+        Returns:
+            list[GroupProfile]: Profiles of the shortlisted groups
+        """
+        raise NotImplementedError
+
+    async def find_candidate_columns(
+        self, profile: TermProfile, limit: int
+    ) -> GroupProfileColumns:
+        """Shortlist the article groups most likely to match a profile, as columns for vectorized scoring
+
+        Args:
+            profile (TermProfile): Term profile to match
+            limit (int): Maximum number of groups to return
+
+        Returns:
+            GroupProfileColumns: Profiles of the shortlisted groups
+        """
+        return columns_from_profiles(await self.find_candidates(profile, limit))
+
+    async def article_saved(
+        self, group_id: str, profile: TermProfile, is_new_group: bool
+    ):
+        """Track an article that was added to an article group
+
+        Args:
+            group_id (str): Group the article was added to
+            profile (TermProfile): Term profile of the article
+            is_new_group (bool): Whether the group was created for the article
+        """
+        pass
+
+    async def article_revised(self, group_id: str, delta: TermProfile):
+        """Track a revised article whose term weights changed in its group
+
+        Args:
+            group_id (str): Group of the article
+            delta (TermProfile): Change of term weights from the stored profile (see `profile_delta`)
+        """
+        pass
+
+    async def groups_merged(self, merges: dict[str, list[str]]):
+        """Track article groups that were merged into surviving groups
+
+        Args:
+            merges (dict[str, list[str]]): Absorbed group ids of each surviving group id
+        """
+        pass
+
+    async def groups_replaced(self):
+        """Rebuild any in-memory state after every article group was replaced (e.g. by a backfill)"""
+        await self.load()
@@ -0,0 +1,115 @@
+from functools import lru_cache
+from hashlib import blake2b
+
+import numpy as np
+
+from type.clustering import TermProfile
+
+# Identifies the hash function and vector layout, stored with snapshots
+HASHING_SCHEME = "blake2b64-signed-entity-keyword-halves"
+
+
+@lru_cache(maxsize=1 << 16)
+def _term_bucket(key: str, buckets: int) -> tuple[int, float]:
+    """Stable bucket and sign of a term (Python's `hash` is salted per process)"""
+    digest = int.from_bytes(blake2b(key.encode("utf-8"), digest_size=8).digest())
+    return (digest >> 1) % buckets, 1.0 if digest & 1 else -1.0
+
+
+def hash_profile(profile: TermProfile, dimensions: int) -> np.ndarray:
+    """Feature-hash a term profile into a fixed-width vector
+
+    The first half of the vector holds the entity terms and the second half the
+    keyword terms. The vector is not normalized, so the vector of a group is the
+    sum of the vectors of its articles.
+
+    Args:
+        profile (TermProfile): Term profile to hash
+        dimensions (int): Width of the vector (even)
+
+    Returns:
+        np.ndarray: The hashed `float32` vector
+    """
+    half = dimensions // 2
+    vector = np.zeros(dimensions, dtype=np.float32)
+    for offset, terms in ((0, profile.entities), (half, profile.keywords)):
+        for key, weight in terms.items():
+            bucket, sign = _term_bucket(key, half)
+            vector[offset + bucket] += sign * weight
+    return vector
+
+
+def embed_hashed_profile(
+    vector: np.ndarray, entity_weight: float = 0.5
+) -> tuple[np.ndarray, tuple[float, float]]:
+    """Turn a hashed profile into a unit vector for cosine search
+
+    Each half is normalized on its own and scaled so that the dot product of two
+    embeddings is the entity-weighted mean of the entity and keyword cosines,
+    mirroring the weighting of `profile_similarity`.
+
+    Args:
+        vector (np.ndarray): Vector returned by `hash_profile`
+        entity_weight (float): Weight of the entity half, the keyword half gets the rest
+
+    Returns:
+        tuple[np.ndarray, tuple[float, float]]: The embedding and the norms of the entity and keyword halves
+    """
+    half = vector.shape[0] // 2
+    embedding = np.zeros_like(vector)
+    norms = []
+    for part, weight in (
+        (slice(0, half), entity_weight),
+        (slice(half, None), 1 - entity_weight),
+    ):
+        norm = float(np.linalg.norm(vector[part]))
+        norms.append(norm)
+        if norm > 0:
+            embedding[part] = vector[part] * (np.sqrt(weight) / norm)
+    # Profiles with only one kind of term still get a unit embedding
+    total = float(np.linalg.norm(embedding))
+    if total > 0:
+        embedding /= total
+    return embedding, (norms[0], norms[1])
+
+
+def unembed_hashed_profile(
+    embedding: np.ndarray, norms: tuple[float, float], entity_weight: float = 0.5
+) -> np.ndarray:
+    """Recover the hashed profile from its embedding and the norms of its halves
+
+    Args:
+        embedding (np.ndarray): Vector returned by `embed_hashed_profile`
+        norms (tuple[float, float]): Norms returned by `embed_hashed_profile`
+        entity_weight (float): Entity weight the embedding was built with
+
+    Returns:
+        np.ndarray: The hashed profile
+    """
+    half = embedding.shape[0] // 2
+    vector = np.zeros_like(embedding)
+    for part, norm in ((slice(0, half), norms[0]), (slice(half, None), norms[1])):
+        part_norm = float(np.linalg.norm(embedding[part]))
+        if norm > 0 and part_norm > 0:
+            vector[part] = embedding[part] * (norm / part_norm)
+    return vector
+
+
+def group_stripes(profile: TermProfile, stripes: int, terms: int = 3) -> list[int]:
+    """Lock stripes guarding the creation of a group for a profile
+
+    Two articles similar enough to be grouped usually share their main
+    entities, and so a stripe, while articles of unrelated stories rarely do.
+
+    Args:
+        profile (TermProfile): Term profile of the group's first article
+        stripes (int): Number of stripes
+        terms (int): Number of the most weighted entities (keywords if there are none) hashed into stripes
+
+    Returns:
+        list[int]: The distinct stripes in ascending order, the order they are locked in
+    """
+    weights = profile.entities or profile.keywords
+    # Ties broken by key so the stripes never depend on dict order
+    top = sorted(weights.items(), key=lambda item: (-item[1], item[0]))[:terms]
+    return sorted({_term_bucket(key, stripes)[0] for key, _ in top})
@@ -0,0 +1,223 @@
+import re
+from collections import Counter
+
+import numpy as np
+
+from type.article import Entity, Keyword
+from type.clustering import GroupProfile, GroupProfileColumns, TermProfile
+
+_ENTITY_KEY_SEPARATOR = "::"
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_term(word: str) -> str:
+    """Case-fold a term and collapse its whitespace"""
+    return _WHITESPACE.sub(" ", word).strip().casefold()
+
+
+def entity_key(word: str, entity_type: str) -> str:
+    """Profile key of an entity term"""
+    return f"{entity_type}{_ENTITY_KEY_SEPARATOR}{normalize_term(word)}"
+
+
+def split_entity_key(key: str) -> tuple[str, str]:
+    """Split a profile key of an entity term into (word, entity type)"""
+    entity_type, word = key.split(_ENTITY_KEY_SEPARATOR, 1)
+    return word, entity_type
+
+
+def keyword_key(word: str) -> str:
+    """Profile key of a keyword term"""
+    return normalize_term(word)
+
+
+def build_article_profile(
+    keywords: list[Keyword], entities: list[Entity]
+) -> TermProfile:
+    """Build the term profile of an article from its extracted keywords and entities
+
+    Entities are weighted by their number of mentions. Keywords are weighted by
+    `1 / (1 + score)` since a lower YAKE score means a more relevant keyword.
+
+    Args:
+        keywords (list[Keyword]): Keywords extracted from the article
+        entities (list[Entity]): Entities extracted from the article
+
+    Returns:
+        TermProfile: The article's term profile
+    """
+    entity_weights = Counter(
+        entity_key(entity.word, entity.type)
+        for entity in entities
+        if normalize_term(entity.word)
+    )
+    keyword_weights: dict[str, float] = {}
+    for keyword in keywords:
+        key = keyword_key(keyword.word)
+        if key:
+            keyword_weights[key] = max(
+                keyword_weights.get(key, 0.0), 1 / (1 + keyword.score)
+            )
+    return TermProfile(
+        entities={key: float(weight) for key, weight in entity_weights.items()},
+        keywords=keyword_weights,
+    )
+
+
+def coverage(terms: dict[str, float], reference: dict[str, float]) -> float:
+    """Fraction of the weight of `terms` that is also present in `reference`"""
+    total = sum(terms.values())
+    if total <= 0:
+        return 0.0
+    return sum(weight for key, weight in terms.items() if key in reference) / total
+
+
+def coverage_weights(
+    profile: TermProfile, entity_weight: float = 0.5
+) -> dict[str, float]:
+    """Share of `profile_similarity` each term of a profile contributes when a reference profile has it
+
+    Coverage only checks which terms the reference has, so the similarity to
+    any reference is the sum of these weights over the terms it has. Entity
+    terms are keyed "e:<entity key>" and keyword terms "k:<keyword key>".
+
+    Args:
+        profile (TermProfile): Profile being matched
+        entity_weight (float): Weight of the entity coverage, the keyword coverage gets the rest
+
+    Returns:
+        dict[str, float]: Weight of each term
+    """
+    weights: dict[str, float] = {}
+    for prefix, terms, weight in (
+        ("e", profile.entities, entity_weight),
+        ("k", profile.keywords, 1 - entity_weight),
+    ):
+        total = sum(terms.values())
+        if total <= 0:
+            continue
+        for key, term_weight in terms.items():
+            weights[f"{prefix}:{key}"] = weight * term_weight / total
+    return weights
+
+
+def profile_similarity(
+    profile: TermProfile, reference: TermProfile, entity_weight: float = 0.5
+) -> float:
+    """Weighted entity and keyword coverage of a profile by a reference profile
+
+    Args:
+        profile (TermProfile): Profile being matched (e.g. a new article)
+        reference (TermProfile): Profile matched against (e.g. an article group)
+        entity_weight (float): Weight of the entity coverage, the keyword coverage gets the rest
+
+    Returns:
+        float: Similarity between 0 and 1
+    """
+    return entity_weight * coverage(profile.entities, reference.entities) + (
+        1 - entity_weight
+    ) * coverage(profile.keywords, reference.keywords)
+
+
+def group_similarity(
+    first: TermProfile, second: TermProfile, entity_weight: float = 0.5
+) -> float:
+    """Similarity of two group profiles, as the coverage of the smaller one by the larger one
+
+    A story split early on usually leaves a small group whose terms are almost
+    all contained in the larger group, so the smaller group is the one matched.
+    """
+    first_total = sum(first.entities.values()) + sum(first.keywords.values())
+    second_total = sum(second.entities.values()) + sum(second.keywords.values())
+    if first_total <= second_total:
+        return profile_similarity(first, second, entity_weight)
+    return profile_similarity(second, first, entity_weight)
+
+
+def profile_delta(
+    previous: TermProfile, current: TermProfile, tolerance: float = 1e-9
+) -> TermProfile:
+    """Change of term weights between two versions of a profile
+
+    Args:
+        previous (TermProfile): Profile before the change
+        current (TermProfile): Profile after the change
+        tolerance (float): Weight changes up to this value are ignored
+
+    Returns:
+        TermProfile: `current - previous` of every changed term, empty if nothing changed
+    """
+    deltas = []
+    for previous_terms, current_terms in (
+        (previous.entities, current.entities),
+        (previous.keywords, current.keywords),
+    ):
+        delta = {}
+        for key in previous_terms.keys() | current_terms.keys():
+            change = current_terms.get(key, 0.0) - previous_terms.get(key, 0.0)
+            if abs(change) > tolerance:
+                delta[key] = change
+        deltas.append(delta)
+    return TermProfile(entities=deltas[0], keywords=deltas[1])
+
+
+def columns_from_profiles(profiles: list[GroupProfile]) -> GroupProfileColumns:
+    """Flatten group profiles into column-oriented profiles"""
+    entity_keys: list[str] = []
+    entity_weights: list[float] = []
+    entity_groups: list[int] = []
+    keyword_keys: list[str] = []
+    keyword_weights: list[float] = []
+    keyword_groups: list[int] = []
+    for row, profile in enumerate(profiles):
+        entity_keys.extend(profile.entities)
+        entity_weights.extend(profile.entities.values())
+        entity_groups.extend([row] * len(profile.entities))
+        keyword_keys.extend(profile.keywords)
+        keyword_weights.extend(profile.keywords.values())
+        keyword_groups.extend([row] * len(profile.keywords))
+    return GroupProfileColumns.model_construct(
+        ids=[profile.id for profile in profiles],
+        created_on=[profile.created_on for profile in profiles],
+        updated_on=[profile.updated_on for profile in profiles],
+        entity_keys=entity_keys,
+        entity_weights=np.asarray(entity_weights, dtype=np.float64),
+        entity_groups=np.asarray(entity_groups, dtype=np.int64),
+        keyword_keys=keyword_keys,
+        keyword_weights=np.asarray(keyword_weights, dtype=np.float64),
+        keyword_groups=np.asarray(keyword_groups, dtype=np.int64),
+    )
+
+
+def _coverage_columns(
+    terms: dict[str, float], keys: list[str], groups: np.ndarray, rows: int
+) -> np.ndarray:
+    """Coverage of `terms` by every group of flattened group terms"""
+    total = sum(terms.values())
+    if total <= 0 or not keys:
+        return np.zeros(rows)
+    weights = np.fromiter(
+        (terms.get(key, 0.0) for key in keys), dtype=np.float64, count=len(keys)
+    )
+    return np.bincount(groups, weights=weights, minlength=rows) / total
+
+
+def profile_similarity_columns(
+    profile: TermProfile, columns: GroupProfileColumns, entity_weight: float = 0.5
+) -> np.ndarray:
+    """`profile_similarity` of a profile against every group of column-oriented profiles
+
+    Args:
+        profile (TermProfile): Profile being matched (e.g. a new article)
+        columns (GroupProfileColumns): Groups matched against
+        entity_weight (float): Weight of the entity coverage, the keyword coverage gets the rest
+
+    Returns:
+        np.ndarray: Similarity of each group, in the order of `columns.ids`
+    """
+    rows = len(columns.ids)
+    return entity_weight * _coverage_columns(
+        profile.entities, columns.entity_keys, columns.entity_groups, rows
+    ) + (1 - entity_weight) * _coverage_columns(
+        profile.keywords, columns.keyword_keys, columns.keyword_groups, rows
+    )
@@ -0,0 +1,45 @@
+from typing import Generic, Hashable, TypeVar
+
+Item = TypeVar("Item", bound=Hashable)
+
+
+class UnionFind(Generic[Item]):
+    """Disjoint sets with path compression and union by size"""
+
+    __parent: dict[Item, Item]
+    __size: dict[Item, int]
+
+    def __init__(self):
+        self.__parent = {}
+        self.__size = {}
+
+    def add(self, item: Item):
+        if item not in self.__parent:
+            self.__parent[item] = item
+            self.__size[item] = 1
+
+    def find(self, item: Item) -> Item:
+        self.add(item)
+        root = item
+        while self.__parent[root] != root:
+            root = self.__parent[root]
+        while self.__parent[item] != root:
+            self.__parent[item], item = root, self.__parent[item]
+        return root
+
+    def union(self, first: Item, second: Item) -> Item:
+        first_root, second_root = self.find(first), self.find(second)
+        if first_root == second_root:
+            return first_root
+        if self.__size[first_root] < self.__size[second_root]:
+            first_root, second_root = second_root, first_root
+        self.__parent[second_root] = first_root
+        self.__size[first_root] += self.__size[second_root]
+        return first_root
+
+    def groups(self) -> list[list[Item]]:
+        """All sets with more than one item"""
+        members: dict[Item, list[Item]] = {}
+        for item in self.__parent:
+            members.setdefault(self.find(item), []).append(item)
+        return [group for group in members.values() if len(group) > 1]
@@ -0,0 +1,330 @@
+import asyncio
+import logging
+import os
+from collections.abc import Collection
+from datetime import datetime, timedelta, timezone
+from time import perf_counter
+from typing import Optional
+
+import numpy as np
+from typing_extensions import override
+
+from modules.clustering._candidate_base import BaseCandidateGenerator
+from modules.clustering._hashing import (
+    HASHING_SCHEME,
+    embed_hashed_profile,
+    hash_profile,
+    unembed_hashed_profile,
+)
+from modules.clustering._scoring import columns_from_profiles
+from modules.clustering.hnsw import HNSWIndex
+from modules.clustering.snapshot import (
+    SNAPSHOT_FORMAT_VERSION,
+    read_latest_snapshot,
+    write_snapshot,
+)
+from modules.database._base import BaseAdapter
+from type.clustering import (
+    GroupProfile,
+    GroupProfileColumns,
+    SnapshotManifest,
+    TermProfile,
+)
+
+_SNAPSHOT_KIND = "ann_candidate_generator"
+# Groups updated slightly before a snapshot are replayed too, replaying is idempotent
+_REPLAY_MARGIN = timedelta(minutes=1)
+
+
+class AnnCandidateGenerator(BaseCandidateGenerator):
+    """Shortlists groups by approximate nearest neighbour search over hashed group profiles
+
+    Every group is feature-hashed into a fixed-width vector and kept in an
+    in-memory HNSW index, so the cost of a shortlist does not grow with the
+    number of groups sharing a common term. Archived groups stay in the index,
+    so late articles can still be matched to old events.
+
+    With a snapshot directory, `load` maps the latest snapshot of the index and
+    only replays the groups changed since it was taken.
+    """
+
+    __database: BaseAdapter
+    __dimensions: int
+    __entity_weight: float
+    __m: int
+    __ef_construction: int
+    __seed: Optional[int]
+    __index: HNSWIndex[str]
+    # Norms of the entity and keyword halves of each group's hashed profile
+    __norms: dict[str, tuple[float, float]]
+    __snapshot_directory: Optional[str]
+    __snapshots_kept: int
+
+    def __init__(
+        self,
+        database: BaseAdapter,
+        *,
+        dimensions: int = 512,
+        entity_weight: float = 0.5,
+        m: int = 16,
+        ef_construction: int = 100,
+        ef_search: int = 64,
+        seed: Optional[int] = None,
+        snapshot_directory: Optional[str | os.PathLike] = None,
+        snapshots_kept: int = 2,
+    ):
+        """Initialize the candidate generator
+
+        Args:
+            database (BaseAdapter): Connected database adapter
+            dimensions (int): Width of the hashed profile vectors (even)
+            entity_weight (float): Weight of the entity terms in the vector similarity
+            m (int): Number of links per node of the HNSW graph
+            ef_construction (int): Size of the dynamic candidate list while inserting
+            ef_search (int): Size of the dynamic candidate list while searching (higher is better recall, fewer queries per second)
+            seed (Optional[int]): Seed of the HNSW level assignment
+            snapshot_directory (Optional[str | os.PathLike]): Directory of the index snapshots. The index is always rebuilt from the database if not provided.
+            snapshots_kept (int): Number of most recent snapshots kept on disk
+        """
+        if dimensions < 2 or dimensions % 2:
+            raise ValueError("Dimensions should be an even value >= 2")
+        self.__database = database
+        self.__dimensions = dimensions
+        self.__entity_weight = entity_weight
+        self.__m = m
+        self.__ef_construction = ef_construction
+        self.__snapshot_directory = (
+            os.fspath(snapshot_directory) if snapshot_directory is not None else None
+        )
+        self.__snapshots_kept = snapshots_kept
+        self.__seed = seed
+        self.__index = self.__new_index(ef_search)
+        self.__norms = {}
+
+    def __new_index(self, ef_search: int) -> HNSWIndex[str]:
+        return HNSWIndex(
+            self.__dimensions,
+            m=self.__m,
+            ef_construction=self.__ef_construction,
+            ef_search=ef_search,
+            seed=self.__seed,
+        )
+
+    @property
+    def ef_search(self) -> int:
+        return self.__index.ef_search
+
+    @ef_search.setter
+    def ef_search(self, value: int):
+        self.__index.ef_search = value
+
+    @property
+    def index(self) -> HNSWIndex[str]:
+        return self.__index
+
+    @override
+    async def load(self):
+        """Index every stored article group, starting from the latest snapshot if there is one"""
+        start = perf_counter()
+        since = self.__restore_snapshot()
+        groups = await self.__database.get_article_groups_changed_since(
+            since, hydration="trusted"
+        )
+        for group in groups:
+            self.__set_group_vector(group.id, hash_profile(group, self.__dimensions))
+        logging.info(
+            "Indexed %d article groups for candidate search, %d of them %s (%.2fs)",
+            len(self.__index),
+            len(groups),
+            "replayed since the snapshot" if since is not None else "from the database",
+            perf_counter() - start,
+        )
+
+    @override
+    async def groups_replaced(self):
+        """Index the stored article groups from scratch, the snapshots only hold replaced groups"""
+        start = perf_counter()
+        self.__index = self.__new_index(self.__index.ef_search)
+        self.__norms = {}
+        groups = await self.__database.get_article_groups_changed_since(
+            None, hydration="trusted"
+        )
+        for group in groups:
+            self.__set_group_vector(group.id, hash_profile(group, self.__dimensions))
+        logging.info(
+            "Re-indexed %d replaced article groups for candidate search (%.2fs)",
+            len(self.__index),
+            perf_counter() - start,
+        )
+        await self.save_snapshot()
+
+    @override
+    async def save_snapshot(self):
+        """Write a snapshot of the index to the snapshot directory"""
+        if self.__snapshot_directory is None:
+            return
+        start = perf_counter()
+        # Export in the event loop so no article is indexed half-way, write in a thread
+        created_on = datetime.now(timezone.utc)
+        arrays = self.__index.to_arrays()
+        arrays["norms"] = np.array(
+            [
+                self.__norms.get(label, (0.0, 0.0))
+                for label in arrays["labels"].tolist()
+            ],
+            dtype=np.float32,
+        ).reshape(-1, 2)
+        manifest = SnapshotManifest(
+            format_version=SNAPSHOT_FORMAT_VERSION,
+            created_on=created_on,
+            kind=_SNAPSHOT_KIND,
+            dimensions=self.__dimensions,
+            entity_weight=self.__entity_weight,
+            hashing_scheme=HASHING_SCHEME,
+            m=self.__m,
+            ef_construction=self.__ef_construction,
+            nodes=len(arrays["labels"]),
+            groups=len(self.__index),
+        )
+        path = await asyncio.to_thread(
+            write_snapshot,
+            self.__snapshot_directory,
+            manifest,
+            arrays,
+            self.__snapshots_kept,
+        )
+        logging.info(
+            "Wrote snapshot of %d indexed article groups to '%s' (%.2fs)",
+            manifest.groups,
+            path,
+            perf_counter() - start,
+        )
+
+    def __restore_snapshot(self) -> Optional[datetime]:
+        """Restore the index from the latest compatible snapshot
+
+        Returns:
+            Optional[datetime]: Time from which changes have to be replayed, or None if no snapshot was restored
+        """
+        if self.__snapshot_directory is None:
+            return None
+        snapshot = read_latest_snapshot(self.__snapshot_directory)
+        if snapshot is None:
+            return None
+        manifest, arrays = snapshot
+        if (
+            manifest.kind != _SNAPSHOT_KIND
+            or manifest.dimensions != self.__dimensions
+            or manifest.entity_weight != self.__entity_weight
+            or manifest.hashing_scheme != HASHING_SCHEME
+            or manifest.m != self.__m
+        ):
+            logging.warning(
+                "Ignoring snapshot of a differently configured index, rebuilding it from the database"
+            )
+            return None
+        self.__index = HNSWIndex.from_arrays(
+            arrays,
+            m=self.__m,
+            ef_construction=self.__ef_construction,
+            ef_search=self.__index.ef_search,
+        )
+        labels = arrays["labels"].tolist()
+        norms = arrays["norms"].tolist()
+        self.__norms = {
+            label: (entity_norm, keyword_norm)
+            for label, (entity_norm, keyword_norm) in zip(labels, norms)
+            if label in self.__index
+        }
+        return manifest.created_on - _REPLAY_MARGIN
+
+    @override
+    async def find_candidates(
+        self, profile: TermProfile, limit: int, exclude: Optional[str] = None
+    ) -> list[GroupProfile]:
+        group_ids = self.__nearest_group_ids(profile, limit, exclude)
+        if not group_ids:
+            return []
+        groups = {
+            group.id: group
+            for group in await self.__database.get_article_groups(
+                group_ids, hydration="trusted"
+            )
+        }
+        self.__forget_missing_groups(group_ids, groups.keys())
+        return [groups[group_id] for group_id in group_ids if group_id in groups]
+
+    @override
+    async def find_candidate_columns(
+        self, profile: TermProfile, limit: int
+    ) -> GroupProfileColumns:
+        group_ids = self.__nearest_group_ids(profile, limit)
+        if not group_ids:
+            return columns_from_profiles([])
+        columns = await self.__database.get_article_group_columns(group_ids)
+        self.__forget_missing_groups(group_ids, set(columns.ids))
+        return columns
+
+    def __nearest_group_ids(
+        self, profile: TermProfile, limit: int, exclude: Optional[str] = None
+    ) -> list[str]:
+        """Ids of the indexed groups nearest to a profile"""
+        embedding, _ = embed_hashed_profile(
+            hash_profile(profile, self.__dimensions), self.__entity_weight
+        )
+        neighbours = self.__index.search(
+            embedding, limit + 1 if exclude is not None else limit
+        )
+        return [group_id for group_id, _ in neighbours if group_id != exclude][:limit]
+
+    def __forget_missing_groups(self, group_ids: list[str], found: Collection[str]):
+        """Remove the searched groups the database no longer has from the index"""
+        for group_id in group_ids:
+            # Merged away by another process, or before the snapshot was restored
+            if group_id not in found and group_id in self.__index:
+                self.__index.remove(group_id)
+                self.__norms.pop(group_id, None)
+
+    @override
+    async def article_saved(
+        self, group_id: str, profile: TermProfile, is_new_group: bool
+    ):
+        vector = hash_profile(profile, self.__dimensions)
+        if not is_new_group and group_id in self.__index:
+            vector += self.__group_vector(group_id)
+        self.__set_group_vector(group_id, vector)
+
+    @override
+    async def article_revised(self, group_id: str, delta: TermProfile):
+        if group_id not in self.__index:
+            return
+        # Hashing is linear, so the group vector changes by the hashed delta
+        vector = self.__group_vector(group_id) + hash_profile(delta, self.__dimensions)
+        self.__set_group_vector(group_id, vector)
+
+    @override
+    async def groups_merged(self, merges: dict[str, list[str]]):
+        for survivor, absorbed_ids in merges.items():
+            vector = np.zeros(self.__dimensions, dtype=np.float32)
+            for group_id in (survivor, *absorbed_ids):
+                if group_id in self.__index:
+                    vector += self.__group_vector(group_id)
+            for group_id in absorbed_ids:
+                if group_id in self.__index:
+                    self.__index.remove(group_id)
+                    self.__norms.pop(group_id, None)
+            self.__set_group_vector(survivor, vector)
+
+    def __group_vector(self, group_id: str) -> np.ndarray:
+        """Hashed profile of an indexed group"""
+        return unembed_hashed_profile(
+            self.__index.get_vector(group_id),
+            self.__norms[group_id],
+            self.__entity_weight,
+        )
+
+    def __set_group_vector(self, group_id: str, vector: np.ndarray):
+        """Index (or re-index) a group from its hashed profile"""
+        embedding, norms = embed_hashed_profile(vector, self.__entity_weight)
+        self.__norms[group_id] = norms
+        self.__index.add(group_id, embedding)
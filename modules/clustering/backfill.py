@@ -0,0 +1,346 @@
+import asyncio
+import logging
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable
+from datetime import datetime, timedelta
+from time import perf_counter
+from typing import Optional
+from uuid import uuid4
+
+from errors.kenec import BackfillSwapError
+from modal.database.node import Article
+from modules.database._base import BaseAdapter
+from type.article import Entity, Keyword
+from type.clustering import BackfillPhase, BackfillReport, GroupProfile, TermProfile
+
+from ._hashing import embed_hashed_profile, hash_profile, unembed_hashed_profile
+from ._scoring import build_article_profile, profile_similarity
+from .hnsw import HNSWIndex
+
+# Extracts the keywords and entities of a stored article again
+ArticleExtractor = Callable[[Article], Awaitable[tuple[list[Keyword], list[Entity]]]]
+
+
+class BackfillJob:
+    """Re-clusters every stored article into a shadow namespace and swaps it in atomically
+
+    Articles are streamed out of the database in pages ordered by publication
+    date. Their terms are either re-extracted by a pool of workers (after a NER
+    or keyword extractor change) or reused from the stored articles (after a
+    threshold change). The articles are then grouped in publication order, the
+    same way the online path groups them, against an in-memory HNSW index of
+    the groups built so far.
+
+    Memberships are written to the shadow namespace as they are decided and
+    the group profiles once a pass is over. The swap runs in one transaction,
+    which does nothing while articles stored in the meantime are unassigned;
+    these are grouped by a catch-up pass before the swap is tried again.
+    """
+
+    __database: BaseAdapter
+    __extract: Optional[ArticleExtractor]
+    __match_threshold: float
+    __entity_weight: float
+    __candidate_limit: int
+    __workers: int
+    __page_size: int
+    __write_batch_size: int
+    __max_catch_up_passes: int
+    __progress_interval: float
+    __on_progress: Optional[Callable[[BackfillReport], None]]
+    __job_id: str
+    __dimensions: int
+    __index: HNSWIndex[str]
+    __norms: dict[str, tuple[float, float]]
+    __groups: dict[str, GroupProfile]
+    # Groups changed since their profile was last written
+    __dirty_groups: set[str]
+    __memberships: list[tuple[str, str, Optional[TermProfile]]]
+    __phase: BackfillPhase
+    __articles_total: int
+    __articles_processed: int
+    __articles_extracted: int
+    __articles_reused: int
+    __started: float
+    __pass_started: float
+    __pass_processed: int
+    __last_progress: float
+
+    def __init__(
+        self,
+        database: BaseAdapter,
+        *,
+        match_threshold: float,
+        extract: Optional[ArticleExtractor] = None,
+        entity_weight: float = 0.5,
+        candidate_limit: int = 20,
+        workers: int = 8,
+        page_size: int = 500,
+        write_batch_size: int = 1_000,
+        max_catch_up_passes: int = 3,
+        dimensions: int = 512,
+        progress_interval: timedelta = timedelta(seconds=10),
+        on_progress: Optional[Callable[[BackfillReport], None]] = None,
+    ):
+        """Initialize the backfill job
+
+        Args:
+            database (BaseAdapter): Connected database adapter
+            match_threshold (float): Similarity at which an article joins a group
+            extract (Optional[ArticleExtractor]): Extraction of the terms of an article. The stored terms are reused if not provided.
+            entity_weight (float): Weight of the entity coverage in the similarity
+            candidate_limit (int): Number of candidate groups scored per article
+            workers (int): Maximum number of articles extracted concurrently
+            page_size (int): Number of articles read from the database per query
+            write_batch_size (int): Maximum number of memberships or groups written per transaction
+            max_catch_up_passes (int): Passes over the articles stored during the backfill before giving up on the swap
+            dimensions (int): Width of the hashed group profiles of the candidate index
+            progress_interval (timedelta): Time between progress reports
+            on_progress (Optional[Callable[[BackfillReport], None]]): Called with every progress report, which is also logged
+        """
+        if workers <= 0:
+            raise ValueError("Workers should be a value > 0")
+        self.__database = database
+        self.__extract = extract
+        self.__match_threshold = match_threshold
+        self.__entity_weight = entity_weight
+        self.__candidate_limit = candidate_limit
+        self.__workers = workers
+        self.__page_size = page_size
+        self.__write_batch_size = write_batch_size
+        self.__max_catch_up_passes = max_catch_up_passes
+        self.__progress_interval = progress_interval.total_seconds()
+        self.__on_progress = on_progress
+        self.__job_id = str(uuid4())
+        self.__dimensions = dimensions
+        self.__index = HNSWIndex(dimensions)
+        self.__norms = {}
+        self.__groups = {}
+        self.__dirty_groups = set()
+        self.__memberships = []
+        self.__phase = "clustering"
+        self.__articles_total = 0
+        self.__articles_processed = 0
+        self.__articles_extracted = 0
+        self.__articles_reused = 0
+        self.__started = perf_counter()
+        self.__pass_started = self.__started
+        self.__pass_processed = 0
+        self.__last_progress = self.__started
+
+    @property
+    def job_id(self) -> str:
+        return self.__job_id
+
+    async def run(self) -> BackfillReport:
+        """Re-cluster every stored article and swap the new groups in
+
+        Returns:
+            BackfillReport: Final report of the job
+
+        Raises:
+            BackfillSwapError: If articles were still being stored faster than they were grouped after the last catch-up pass
+        """
+        self.__started = perf_counter()
+        try:
+            # Left over by a failed backfill
+            await self.__database.drop_shadow_groups()
+            await self.__run_pass("clustering")
+            for _ in range(self.__max_catch_up_passes + 1):
+                self.__phase = "swapping"
+                self.__report_progress(force=True)
+                unassigned = await self.__database.swap_shadow_groups(
+                    self.__job_id, replace_article_terms=self.__extract is not None
+                )
+                if not unassigned:
+                    self.__phase = "done"
+                    return self.__report_progress(force=True)
+                await self.__run_pass("catching_up")
+            raise BackfillSwapError(
+                "Articles were still unassigned after "
+                f"{self.__max_catch_up_passes} catch-up passes"
+            )
+        except BaseException:
+            self.__phase = "failed"
+            self.__report_progress(force=True)
+            await asyncio.shield(self.__database.drop_shadow_groups())
+            raise
+
+    def report(self) -> BackfillReport:
+        """Progress and throughput of the job so far
+
+        Returns:
+            BackfillReport: The report
+        """
+        elapsed = perf_counter() - self.__started
+        pass_elapsed = perf_counter() - self.__pass_started
+        rate = self.__pass_processed / pass_elapsed if pass_elapsed > 0 else 0.0
+        left = self.__articles_total - self.__pass_processed
+        return BackfillReport(
+            job_id=self.__job_id,
+            phase=self.__phase,
+            articles_total=self.__articles_total,
+            articles_processed=self.__articles_processed,
+            articles_extracted=self.__articles_extracted,
+            articles_reused=self.__articles_reused,
+            groups=len(self.__groups),
+            elapsed_seconds=elapsed,
+            articles_per_second=(
+                self.__articles_processed / elapsed if elapsed > 0 else 0.0
+            ),
+            eta_seconds=left / rate if rate > 0 and left >= 0 else None,
+        )
+
+    def __report_progress(self, force: bool = False) -> BackfillReport:
+        now = perf_counter()
+        if not force and now - self.__last_progress < self.__progress_interval:
+            return self.report()
+        self.__last_progress = now
+        report = self.report()
+        logging.info(
+            "Backfill %s %s: %d/%d articles, %d groups, %.1f articles/s%s",
+            report.job_id,
+            report.phase,
+            self.__pass_processed,
+            report.articles_total,
+            report.groups,
+            report.articles_per_second,
+            (
+                f", {report.eta_seconds:.0f}s left"
+                if report.eta_seconds is not None
+                else ""
+            ),
+        )
+        if self.__on_progress is not None:
+            self.__on_progress(report)
+        return report
+
+    async def __run_pass(self, phase: BackfillPhase):
+        """Group every unassigned article and write the changes to the shadow namespace"""
+        self.__phase = phase
+        self.__articles_total = await self.__database.count_unassigned_articles(
+            self.__job_id
+        )
+        self.__pass_started = perf_counter()
+        self.__pass_processed = 0
+        async for article, profile, extracted in self.__profiles():
+            self.__assign(article, profile, extracted)
+            self.__pass_processed += 1
+            self.__articles_processed += 1
+            if len(self.__memberships) >= self.__write_batch_size:
+                await self.__flush_memberships()
+            self.__report_progress()
+        await self.__flush_memberships()
+        dirty = [self.__groups[group_id] for group_id in self.__dirty_groups]
+        for offset in range(0, len(dirty), self.__write_batch_size):
+            await self.__database.write_shadow_groups(
+                self.__job_id, dirty[offset : offset + self.__write_batch_size]
+            )
+        self.__dirty_groups.clear()
+        self.__report_progress(force=True)
+
+    async def __pages(self) -> AsyncIterator[tuple[Article, TermProfile]]:
+        """Stream the unassigned articles and their stored terms by publication date"""
+        after: Optional[tuple[datetime, str]] = None
+        while True:
+            page = await self.__database.get_unassigned_articles_page(
+                self.__job_id, after, self.__page_size
+            )
+            for item in page:
+                yield item
+            if len(page) < self.__page_size:
+                return
+            last = page[-1][0]
+            after = (last.published_date, str(last.id))
+
+    async def __profiles(
+        self,
+    ) -> AsyncIterator[tuple[Article, TermProfile, bool]]:
+        """Term profiles of the unassigned articles in publication order, extracted by the worker pool
+
+        Yields:
+            tuple[Article, TermProfile, bool]: The article, its profile and whether the profile was extracted again
+        """
+        pending: deque[asyncio.Task[tuple[Article, TermProfile, bool]]] = deque()
+        pages = self.__pages()
+        try:
+            exhausted = False
+            while True:
+                while not exhausted and len(pending) < self.__workers:
+                    try:
+                        article, stored = await anext(pages)
+                    except StopAsyncIteration:
+                        exhausted = True
+                        break
+                    pending.append(
+                        asyncio.create_task(self.__profile_of(article, stored))
+                    )
+                if not pending:
+                    return
+                # In input order, so groups are built in publication order
+                yield await pending.popleft()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def __profile_of(
+        self, article: Article, stored: TermProfile
+    ) -> tuple[Article, TermProfile, bool]:
+        """Profile of an article, extracted again if an extractor is configured"""
+        if self.__extract is None:
+            return article, stored, False
+        keywords, entities = await self.__extract(article)
+        profile = build_article_profile(keywords, entities)
+        if not profile.entities or not profile.keywords:
+            # The online path would not have stored it, keep its previous terms
+            return article, stored, False
+        return article, profile, True
+
+    def __assign(self, article: Article, profile: TermProfile, extracted: bool):
+        """Add an article to its best matching group, or to a new group"""
+        vector = hash_profile(profile, self.__dimensions)
+        best_group_id = None
+        best_score = 0.0
+        if len(self.__index):
+            embedding, _ = embed_hashed_profile(vector, self.__entity_weight)
+            for group_id, _ in self.__index.search(embedding, self.__candidate_limit):
+                score = profile_similarity(
+                    profile, self.__groups[group_id], self.__entity_weight
+                )
+                if score >= self.__match_threshold and score > best_score:
+                    best_group_id, best_score = group_id, score
+        if best_group_id is None:
+            best_group_id = str(uuid4())
+            self.__groups[best_group_id] = GroupProfile(
+                id=best_group_id, entities={}, keywords={}
+            )
+        else:
+            vector += unembed_hashed_profile(
+                self.__index.get_vector(best_group_id),
+                self.__norms[best_group_id],
+                self.__entity_weight,
+            )
+        group = self.__groups[best_group_id]
+        for key, weight in profile.entities.items():
+            group.entities[key] = group.entities.get(key, 0.0) + weight
+        for key, weight in profile.keywords.items():
+            group.keywords[key] = group.keywords.get(key, 0.0) + weight
+        embedding, norms = embed_hashed_profile(vector, self.__entity_weight)
+        self.__norms[best_group_id] = norms
+        self.__index.add(best_group_id, embedding)
+        self.__dirty_groups.add(best_group_id)
+        self.__memberships.append(
+            (str(article.id), best_group_id, profile if extracted else None)
+        )
+        if extracted:
+            self.__articles_extracted += 1
+        else:
+            self.__articles_reused += 1
+
+    async def __flush_memberships(self):
+        if not self.__memberships:
+            return
+        await self.__database.write_shadow_memberships(
+            self.__job_id, self.__memberships
+        )
+        self.__memberships = []
@@ -0,0 +1,188 @@
+"""Recall@k and throughput of the candidate generators on a synthetic corpus
+
+Run with `python -m modules.clustering.benchmark [--groups N] [--queries N]`.
+
+Each synthetic event draws its entities and keywords from Zipf-distributed
+vocabularies (so a few terms appear in a large share of groups, like "United
+States" in the news), and groups are the sums of a few of their event's
+articles. Queries are new articles of random events. Recall@k is measured
+against exact cosine search over the same hashed vectors and hit@k is the
+share of queries whose own event's group is shortlisted. The posting-list
+baseline counts shared terms in memory the way the database query does.
+"""
+
+import argparse
+from collections import Counter, defaultdict
+from time import perf_counter
+
+import numpy as np
+
+from modules.clustering._hashing import embed_hashed_profile, hash_profile
+from modules.clustering.hnsw import HNSWIndex
+from type.clustering import TermProfile
+
+
+def _synthetic_article(
+    rng: np.random.Generator,
+    event_entities: np.ndarray,
+    event_keywords: np.ndarray,
+    entity_vocabulary: int,
+    keyword_vocabulary: int,
+) -> TermProfile:
+    """An article mentioning most of its event's terms plus a few background terms"""
+    entities: Counter[str] = Counter()
+    for term in event_entities:
+        if rng.random() < 0.7:
+            entities[f"ENTITY::e{term}"] += int(rng.integers(1, 4))
+    for term in rng.zipf(1.3, 3):
+        entities[f"ENTITY::e{min(term, entity_vocabulary)}"] += 1
+    keywords: dict[str, float] = {}
+    for term in event_keywords:
+        if rng.random() < 0.6:
+            keywords[f"k{term}"] = float(rng.uniform(0.2, 1.0))
+    for term in rng.zipf(1.3, 5):
+        keywords[f"k{min(term, keyword_vocabulary)}"] = float(rng.uniform(0.1, 0.5))
+    return TermProfile(
+        entities={key: float(weight) for key, weight in entities.items()},
+        keywords=keywords,
+    )
+
+
+def _synthetic_corpus(
+    rng: np.random.Generator,
+    groups: int,
+    queries: int,
+    entity_vocabulary: int = 50_000,
+    keyword_vocabulary: int = 200_000,
+) -> tuple[list[TermProfile], list[TermProfile], list[int]]:
+    events = [
+        (
+            np.minimum(rng.zipf(1.1, 8), entity_vocabulary),
+            np.minimum(rng.zipf(1.05, 20), keyword_vocabulary),
+        )
+        for _ in range(groups)
+    ]
+    group_profiles = []
+    for event_entities, event_keywords in events:
+        entities: Counter[str] = Counter()
+        keywords: Counter[str] = Counter()
+        for _ in range(int(rng.integers(1, 6))):
+            article = _synthetic_article(
+                rng,
+                event_entities,
+                event_keywords,
+                entity_vocabulary,
+                keyword_vocabulary,
+            )
+            entities.update(article.entities)
+            keywords.update(article.keywords)
+        group_profiles.append(
+            TermProfile(entities=dict(entities), keywords=dict(keywords))
+        )
+    query_events = [int(event) for event in rng.integers(groups, size=queries)]
+    query_profiles = [
+        _synthetic_article(rng, *events[event], entity_vocabulary, keyword_vocabulary)
+        for event in query_events
+    ]
+    return group_profiles, query_profiles, query_events
+
+
+def _recall(found: list[list[int]], exact: np.ndarray) -> float:
+    k = exact.shape[1]
+    return float(
+        np.mean(
+            [len(set(ids) & set(row.tolist())) / k for ids, row in zip(found, exact)]
+        )
+    )
+
+
+def _hits(found: list[list[int]], events: list[int]) -> float:
+    return float(np.mean([event in ids for ids, event in zip(found, events)]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--groups", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--dimensions", type=int, default=512)
+    parser.add_argument("--m", type=int, default=16)
+    parser.add_argument("--ef-construction", type=int, default=100)
+    parser.add_argument(
+        "--ef-search", type=int, nargs="+", default=[16, 32, 64, 128, 256]
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    group_profiles, query_profiles, query_events = _synthetic_corpus(
+        rng, args.groups, args.queries
+    )
+    group_vectors = np.stack(
+        [
+            embed_hashed_profile(hash_profile(profile, args.dimensions))[0]
+            for profile in group_profiles
+        ]
+    )
+    query_vectors = np.stack(
+        [
+            embed_hashed_profile(hash_profile(profile, args.dimensions))[0]
+            for profile in query_profiles
+        ]
+    )
+
+    start = perf_counter()
+    exact = np.argsort(-(query_vectors @ group_vectors.T), axis=1)[:, : args.k]
+    exact_seconds = perf_counter() - start
+    print(f"{args.groups} groups, {args.queries} queries, k={args.k}")
+    print(
+        f"exact cosine:   recall@k 1.000  hit@k {_hits(exact.tolist(), query_events):.3f}"
+        f"  {args.queries / exact_seconds:10.1f} q/s (batched)"
+    )
+
+    # Posting-list baseline: groups sharing the most terms with the query
+    postings: defaultdict[str, list[int]] = defaultdict(list)
+    for group, profile in enumerate(group_profiles):
+        for key in (*profile.entities, *profile.keywords):
+            postings[key].append(group)
+    start = perf_counter()
+    found = []
+    for profile in query_profiles:
+        shared: Counter[int] = Counter()
+        for key in (*profile.entities, *profile.keywords):
+            shared.update(postings.get(key, ()))
+        found.append([group for group, _ in shared.most_common(args.k)])
+    posting_seconds = perf_counter() - start
+    print(
+        f"posting lists:  recall@k {_recall(found, exact):.3f}"
+        f"  hit@k {_hits(found, query_events):.3f}"
+        f"  {args.queries / posting_seconds:10.1f} q/s"
+    )
+
+    index: HNSWIndex[int] = HNSWIndex(
+        args.dimensions,
+        m=args.m,
+        ef_construction=args.ef_construction,
+        seed=args.seed,
+    )
+    start = perf_counter()
+    for group, vector in enumerate(group_vectors):
+        index.add(group, vector)
+    build_seconds = perf_counter() - start
+    print(f"hnsw build:     {args.groups / build_seconds:.1f} inserts/s")
+    for ef in args.ef_search:
+        start = perf_counter()
+        found = [
+            [group for group, _ in index.search(vector, args.k, ef=ef)]
+            for vector in query_vectors
+        ]
+        seconds = perf_counter() - start
+        print(
+            f"hnsw ef={ef:<4}    recall@k {_recall(found, exact):.3f}"
+            f"  hit@k {_hits(found, query_events):.3f}"
+            f"  {args.queries / seconds:10.1f} q/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
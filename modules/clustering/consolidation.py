@@ -0,0 +1,146 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from time import perf_counter
+from typing import Optional
+
+from modules.database._base import BaseAdapter
+from type.clustering import ConsolidationReport, GroupProfile
+
+from ._candidate_base import BaseCandidateGenerator
+from ._scoring import group_similarity
+from ._union_find import UnionFind
+from .posting_list import PostingListCandidateGenerator
+
+
+class GroupConsolidator:
+    """Background job that merges article groups whose profiles have converged
+
+    One-pass online clustering splits a story into several groups when its early
+    articles share few terms. Each pass looks only at the groups changed since
+    the previous pass, shortlists their candidate groups the same way the online
+    path does, links pairs whose similarity reaches the match threshold and merges
+    every linked set (single linkage, via union-find) into its oldest group.
+    """
+
+    __database: BaseAdapter
+    __candidate_generator: BaseCandidateGenerator
+    __match_threshold: float
+    __entity_weight: float
+    __candidate_limit: int
+    __batch_size: int
+    __concurrency: int
+    __last_pass_started: Optional[datetime]
+
+    def __init__(
+        self,
+        database: BaseAdapter,
+        *,
+        match_threshold: float,
+        entity_weight: float = 0.5,
+        candidate_limit: int = 20,
+        batch_size: int = 100,
+        concurrency: int = 8,
+        candidate_generator: Optional[BaseCandidateGenerator] = None,
+    ):
+        """Initialize the consolidation job
+
+        Args:
+            database (BaseAdapter): Connected database adapter
+            match_threshold (float): Similarity at which two groups are merged
+            entity_weight (float): Weight of the entity coverage in the similarity
+            candidate_limit (int): Number of candidate groups shortlisted per changed group
+            batch_size (int): Maximum number of absorbed groups per transaction
+            concurrency (int): Maximum number of concurrent shortlisting queries
+            candidate_generator (Optional[BaseCandidateGenerator]): Shortlisting shared with the online path, notified of merges. Defaults to posting lists in the database.
+        """
+        self.__database = database
+        self.__candidate_generator = (
+            candidate_generator
+            if candidate_generator is not None
+            else PostingListCandidateGenerator(database)
+        )
+        self.__match_threshold = match_threshold
+        self.__entity_weight = entity_weight
+        self.__candidate_limit = candidate_limit
+        self.__batch_size = batch_size
+        self.__concurrency = concurrency
+        self.__last_pass_started = None
+
+    async def run_once(self) -> ConsolidationReport:
+        """Run one incremental consolidation pass
+
+        Returns:
+            ConsolidationReport: Outcome of the pass
+        """
+        started = datetime.now(timezone.utc)
+        start = perf_counter()
+        changed = await self.__database.get_article_groups_changed_since(
+            self.__last_pass_started
+        )
+
+        semaphore = asyncio.Semaphore(self.__concurrency)
+
+        async def shortlist(group: GroupProfile) -> list[GroupProfile]:
+            async with semaphore:
+                return await self.__candidate_generator.find_candidates(
+                    group, self.__candidate_limit, exclude=group.id
+                )
+
+        shortlists = await asyncio.gather(*(shortlist(group) for group in changed))
+
+        created_on: dict[str, datetime] = {}
+        linked: UnionFind[str] = UnionFind()
+        for group, candidates in zip(changed, shortlists):
+            for candidate in candidates:
+                similarity = group_similarity(group, candidate, self.__entity_weight)
+                if similarity >= self.__match_threshold:
+                    linked.union(group.id, candidate.id)
+                    for profile in (group, candidate):
+                        if profile.created_on is not None:
+                            created_on[profile.id] = profile.created_on
+
+        latest = datetime.max.replace(tzinfo=timezone.utc)
+        merges: dict[str, list[str]] = {}
+        for members in linked.groups():
+            members.sort(
+                key=lambda group_id: (created_on.get(group_id, latest), group_id)
+            )
+            survivor, *absorbed = members
+            merges[survivor] = absorbed
+
+        merged = 0
+        if merges:
+            merged = await self.__database.merge_article_groups(
+                merges, self.__batch_size
+            )
+            await self.__candidate_generator.groups_merged(merges)
+        self.__last_pass_started = started
+
+        report = ConsolidationReport(
+            examined_groups=len(changed),
+            merged_groups=merged,
+            merge_sets=len(merges),
+            seconds=perf_counter() - start,
+        )
+        logging.info(
+            "Consolidated article groups: examined %d, merged %d into %d groups (%.2fs)",
+            report.examined_groups,
+            report.merged_groups,
+            report.merge_sets,
+            report.seconds,
+        )
+        return report
+
+    async def run_periodically(self, interval: timedelta):
+        """Run consolidation passes forever, waiting `interval` between passes
+
+        Args:
+            interval (timedelta): Time between the end of a pass and the start of the next
+        """
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logging.error("Article group consolidation pass failed: %s", e)
+            await asyncio.sleep(interval.total_seconds())
@@ -0,0 +1,454 @@
+"""Threshold sweep of the article grouping on a labelled corpus
+
+Run with `python -m modules.clustering.evaluation CORPUS [--thresholds T ...]`.
+
+The corpus is a JSON lines file with a `title`, `content`, `published_date`
+and reference `label` (e.g. an event id) per article. Keywords and entities
+are extracted once with the KENEC extractors and cached next to the corpus,
+keyed by a hash of the corpus file and extraction options, so later sweeps
+load the cache and never run the models.
+
+Every threshold then replays the grouping in publication order over the
+cached profiles. The term ids and coverage weights of every article are
+computed once for the whole sweep, and an article is scored against every
+group built so far with one weighted `bincount` over the posting lists of
+its terms. This is the online grouping with a shortlist that always holds
+the best group, so it measures the threshold rather than the candidate
+generator. With `--shards N`, the sharded grouping of `ShardedClusterer` is
+also compared with the sequential one at every threshold.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+from collections.abc import Hashable, Sequence
+from hashlib import blake2b
+from itertools import chain
+from time import perf_counter
+from typing import Optional
+
+import numpy as np
+from pydantic import ValidationError
+
+from modal.database.node import Article
+from type.clustering import (
+    ClusteringMetrics,
+    ExtractedCorpus,
+    ShardingStrategy,
+    TermProfile,
+    ThresholdSweepResult,
+)
+
+from ._scoring import build_article_profile, coverage_weights
+
+DEFAULT_THRESHOLDS = [round(0.5 + 0.025 * step, 3) for step in range(20)]
+
+
+def _pairs(counts: np.ndarray) -> float:
+    """Number of unordered pairs within each count, summed"""
+    return float(np.sum(counts * (counts - 1)) / 2)
+
+
+def clustering_metrics(
+    labels: Sequence[Hashable], predicted: Sequence[Hashable]
+) -> ClusteringMetrics:
+    """B-cubed, adjusted Rand index and purity of a clustering against reference labels
+
+    Args:
+        labels (Sequence[Hashable]): Reference label of each article
+        predicted (Sequence[Hashable]): Cluster of each article
+
+    Returns:
+        ClusteringMetrics: The metrics
+    """
+    if len(labels) != len(predicted):
+        raise ValueError("Labels and predicted clusters should have the same length")
+    articles = len(labels)
+    if not articles:
+        return ClusteringMetrics(
+            articles=0,
+            clusters=0,
+            labels=0,
+            bcubed_precision=0.0,
+            bcubed_recall=0.0,
+            bcubed_f1=0.0,
+            adjusted_rand_index=0.0,
+            purity=0.0,
+            inverse_purity=0.0,
+        )
+    _, label_ids = np.unique(np.asarray(labels, dtype=object), return_inverse=True)
+    _, cluster_ids = np.unique(np.asarray(predicted, dtype=object), return_inverse=True)
+    label_sizes = np.bincount(label_ids)
+    cluster_sizes = np.bincount(cluster_ids)
+    # Non-empty cells of the contingency table
+    cells, counts = np.unique(
+        label_ids.astype(np.int64) * len(cluster_sizes) + cluster_ids,
+        return_counts=True,
+    )
+    cell_labels, cell_clusters = np.divmod(cells, len(cluster_sizes))
+
+    # Each article's share of its cluster (label) that shares its label (cluster)
+    precision = float(np.sum(counts**2 / cluster_sizes[cell_clusters]) / articles)
+    recall = float(np.sum(counts**2 / label_sizes[cell_labels]) / articles)
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+
+    index = _pairs(counts)
+    label_pairs = _pairs(label_sizes)
+    cluster_pairs = _pairs(cluster_sizes)
+    all_pairs = articles * (articles - 1) / 2
+    expected = label_pairs * cluster_pairs / all_pairs if all_pairs else 0.0
+    maximum = (label_pairs + cluster_pairs) / 2
+    adjusted_rand_index = (
+        (index - expected) / (maximum - expected) if maximum != expected else 1.0
+    )
+
+    majority_label = np.zeros(len(cluster_sizes), dtype=np.int64)
+    np.maximum.at(majority_label, cell_clusters, counts)
+    majority_cluster = np.zeros(len(label_sizes), dtype=np.int64)
+    np.maximum.at(majority_cluster, cell_labels, counts)
+    return ClusteringMetrics(
+        articles=articles,
+        clusters=len(cluster_sizes),
+        labels=len(label_sizes),
+        bcubed_precision=precision,
+        bcubed_recall=recall,
+        bcubed_f1=f1,
+        adjusted_rand_index=float(adjusted_rand_index),
+        purity=float(majority_label.sum() / articles),
+        inverse_purity=float(majority_cluster.sum() / articles),
+    )
+
+
+class GroupingReplay:
+    """Replays the grouping of a sequence of article profiles at any match threshold
+
+    The similarity of an article to a group is the sum of the
+    `coverage_weights` of the article's terms the group has. These weights are
+    computed once, and each replay only tracks which groups have which terms.
+    """
+
+    __term_ids: list[np.ndarray]
+    __weights: list[np.ndarray]
+    __vocabulary: int
+
+    def __init__(self, profiles: Sequence[TermProfile], entity_weight: float = 0.5):
+        """Precompute the term ids and coverage weights of every article
+
+        Args:
+            profiles (Sequence[TermProfile]): Profiles of the articles, in the order they are grouped
+            entity_weight (float): Weight of the entity coverage in the similarity
+        """
+        vocabulary: dict[str, int] = {}
+        self.__term_ids = []
+        self.__weights = []
+        for profile in profiles:
+            weights = coverage_weights(profile, entity_weight)
+            self.__term_ids.append(
+                np.fromiter(
+                    (vocabulary.setdefault(term, len(vocabulary)) for term in weights),
+                    np.int64,
+                    len(weights),
+                )
+            )
+            self.__weights.append(
+                np.fromiter(weights.values(), np.float64, len(weights))
+            )
+        self.__vocabulary = len(vocabulary)
+
+    def __len__(self) -> int:
+        return len(self.__term_ids)
+
+    def run(self, match_threshold: float) -> np.ndarray:
+        """Group the articles in order, each joining its most similar group or a new one
+
+        Args:
+            match_threshold (float): Similarity at which an article joins a group
+
+        Returns:
+            np.ndarray: Group number of each article
+        """
+        # Groups having each term, and terms of each group
+        postings: list[list[int]] = [[] for _ in range(self.__vocabulary)]
+        group_terms: list[set[int]] = []
+        assignments = np.empty(len(self.__term_ids), dtype=np.int64)
+        for article, (term_ids, weights) in enumerate(
+            zip(self.__term_ids, self.__weights)
+        ):
+            group = -1
+            if group_terms:
+                term_postings = [postings[term] for term in term_ids.tolist()]
+                lengths = np.fromiter(
+                    map(len, term_postings), np.int64, len(term_postings)
+                )
+                total = int(lengths.sum())
+                if total:
+                    groups = np.fromiter(
+                        chain.from_iterable(term_postings), np.int64, total
+                    )
+                    scores = np.bincount(groups, weights=np.repeat(weights, lengths))
+                    best = int(np.argmax(scores))
+                    if scores[best] >= match_threshold and scores[best] > 0.0:
+                        group = best
+            if group < 0:
+                group = len(group_terms)
+                group_terms.append(set())
+            terms = group_terms[group]
+            for term in term_ids.tolist():
+                if term not in terms:
+                    terms.add(term)
+                    postings[term].append(group)
+            assignments[article] = group
+        return assignments
+
+    def sweep(
+        self, labels: Sequence[Hashable], thresholds: Sequence[float]
+    ) -> list[ThresholdSweepResult]:
+        """Replay the grouping at each threshold and score it against reference labels
+
+        Args:
+            labels (Sequence[Hashable]): Reference label of each article
+            thresholds (Sequence[float]): Match thresholds to replay
+
+        Returns:
+            list[ThresholdSweepResult]: Metrics and replay throughput of each threshold
+        """
+        results = []
+        for threshold in thresholds:
+            start = perf_counter()
+            assignments = self.run(threshold)
+            seconds = perf_counter() - start
+            results.append(
+                ThresholdSweepResult(
+                    match_threshold=threshold,
+                    metrics=clustering_metrics(labels, assignments.tolist()),
+                    seconds=seconds,
+                    articles_per_second=len(self) / seconds if seconds > 0 else 0.0,
+                )
+            )
+        return results
+
+
+def _read_corpus(path: str) -> list[tuple[Article, str]]:
+    """Labelled articles of a JSON lines corpus, in publication order"""
+    articles = []
+    with open(path, encoding="utf-8") as file:
+        for number, line in enumerate(file, start=1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            label = record.pop("label", None)
+            if label is None:
+                raise ValueError(f"Article on line {number} of '{path}' has no label")
+            # Nullable but required fields of the node model
+            for field in ("id", "created_on", "updated_on", "url"):
+                record.setdefault(field, None)
+            articles.append((Article.model_validate(record), str(label)))
+    articles.sort(key=lambda item: item[0].published_date)
+    return articles
+
+
+def _fingerprint(path: str, ner_model: str, kw_extractor: str) -> str:
+    digest = blake2b(digest_size=16)
+    with open(path, "rb") as file:
+        while chunk := file.read(1 << 20):
+            digest.update(chunk)
+    digest.update(f"\0{ner_model}\0{kw_extractor}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+async def extract_corpus(
+    path: str,
+    *,
+    ner_model: str,
+    kw_extractor: str,
+    cache_path: Optional[str] = None,
+    workers: int = 4,
+) -> ExtractedCorpus:
+    """Term profiles of a labelled corpus, extracted by the KENEC extractors or loaded from the cache
+
+    Args:
+        path (str): JSON lines corpus with a `label` per article
+        ner_model (str): NER model option of KENEC
+        kw_extractor (str): Keyword extractor option of KENEC
+        cache_path (Optional[str]): Cache file, next to the corpus if not provided
+        workers (int): Maximum number of articles extracted concurrently
+
+    Returns:
+        ExtractedCorpus: Profiles and labels of the articles that can be grouped
+    """
+    fingerprint = _fingerprint(path, ner_model, kw_extractor)
+    if cache_path is None:
+        cache_path = f"{path}.{fingerprint}.extractions.json"
+    if os.path.exists(cache_path):
+        with open(cache_path, encoding="utf-8") as file:
+            try:
+                corpus = ExtractedCorpus.model_validate_json(file.read())
+            except ValidationError:
+                # Written by an earlier version of this tool
+                corpus = None
+        if corpus is not None and corpus.fingerprint == fingerprint:
+            logging.info(
+                "Loaded %d cached extractions from '%s'",
+                len(corpus.profiles),
+                cache_path,
+            )
+            return corpus
+        logging.info(
+            "Cached extractions of '%s' are stale, extracting again", cache_path
+        )
+
+    # Only needed on a cache miss, and loads the models
+    from _model import KENEC
+    from modal.database.util.auth import DatabaseAuth
+
+    articles = _read_corpus(path)
+    kenec = await KENEC.create(
+        ner_model=ner_model,
+        kw_extractor=kw_extractor,
+        prepare_db=False,
+        # Never connected, extraction does not touch the database
+        db_auth=DatabaseAuth(username="evaluation", password="", database="evaluation"),
+    )
+    semaphore = asyncio.Semaphore(workers)
+
+    async def profile_of(article: Article) -> TermProfile:
+        async with semaphore:
+            keywords, entities = await kenec.extract(article)
+        return build_article_profile(keywords, entities)
+
+    start = perf_counter()
+    profiles = await asyncio.gather(*(profile_of(article) for article, _ in articles))
+    extraction_seconds = perf_counter() - start
+    kept = [
+        (profile, article, label)
+        for profile, (article, label) in zip(profiles, articles)
+        # Like `add_article`, articles without keywords or entities are not grouped
+        if profile.entities and profile.keywords
+    ]
+    corpus = ExtractedCorpus(
+        fingerprint=fingerprint,
+        labels=[label for _, _, label in kept],
+        published_dates=[article.published_date for _, article, _ in kept],
+        profiles=[profile for profile, _, _ in kept],
+        skipped=len(articles) - len(kept),
+        extraction_seconds=extraction_seconds,
+    )
+    with open(cache_path, "w", encoding="utf-8") as file:
+        file.write(corpus.model_dump_json())
+    logging.info(
+        "Extracted %d articles in %.1fs (%.1f articles/s), cached in '%s'",
+        len(articles),
+        extraction_seconds,
+        len(articles) / extraction_seconds if extraction_seconds > 0 else 0.0,
+        cache_path,
+    )
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("corpus")
+    parser.add_argument("--cache")
+    parser.add_argument("--ner-model", default="xlm_roberta_large_finetuned")
+    parser.add_argument("--kw-extractor", default="yake")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--entity-weight", type=float, default=0.5)
+    parser.add_argument(
+        "--thresholds", type=float, nargs="+", default=DEFAULT_THRESHOLDS
+    )
+    parser.add_argument("--shards", type=int, default=1)
+    parser.add_argument("--sharding", choices=["entity", "date"], default="entity")
+    args = parser.parse_args()
+    if any(not 0 <= threshold <= 1 for threshold in args.thresholds):
+        parser.error("Thresholds should be values between 0 and 1")
+    logging.basicConfig(level=logging.INFO)
+
+    corpus = asyncio.run(
+        extract_corpus(
+            args.corpus,
+            ner_model=args.ner_model,
+            kw_extractor=args.kw_extractor,
+            cache_path=args.cache,
+            workers=args.workers,
+        )
+    )
+    start = perf_counter()
+    replay = GroupingReplay(corpus.profiles, args.entity_weight)
+    print(
+        f"{len(replay)} articles ({corpus.skipped} without terms skipped),"
+        f" {len(set(corpus.labels))} labels, prepared in {perf_counter() - start:.2f}s"
+    )
+    print(
+        "threshold  clusters  b3-prec  b3-rec   b3-f1    ari      "
+        "purity   inv-pur   articles/s"
+    )
+    start = perf_counter()
+    for result in replay.sweep(corpus.labels, sorted(args.thresholds)):
+        metrics = result.metrics
+        print(
+            f"{result.match_threshold:9.3f}  {metrics.clusters:8d}"
+            f"  {metrics.bcubed_precision:7.3f}  {metrics.bcubed_recall:7.3f}"
+            f"  {metrics.bcubed_f1:7.3f}  {metrics.adjusted_rand_index:7.3f}"
+            f"  {metrics.purity:7.3f}  {metrics.inverse_purity:8.3f}"
+            f"  {result.articles_per_second:11.1f}"
+        )
+    print(f"swept {len(args.thresholds)} thresholds in {perf_counter() - start:.2f}s")
+    if args.shards > 1:
+        asyncio.run(
+            _compare_sharded(
+                corpus,
+                replay,
+                sorted(args.thresholds),
+                args.shards,
+                args.sharding,
+                args.entity_weight,
+            )
+        )
+
+
+async def _compare_sharded(
+    corpus: ExtractedCorpus,
+    replay: GroupingReplay,
+    thresholds: list[float],
+    shards: int,
+    strategy: ShardingStrategy,
+    entity_weight: float,
+):
+    """Print how far the sharded grouping is from the sequential one at each threshold"""
+    # The sharded clusterer groups its shards with `GroupingReplay`
+    from .sharding import ShardedClusterer
+
+    clusterer = ShardedClusterer(
+        processes=shards, strategy=strategy, entity_weight=entity_weight
+    )
+    try:
+        # Start the worker processes outside of the measurements
+        await clusterer.cluster(
+            corpus.profiles[:shards], corpus.published_dates[:shards], 1.0
+        )
+        print(f"{shards} shards by {strategy}, agreement with the sequential grouping")
+        print("threshold  clusters  b3-f1    agree-f1 agree-ari articles/s  speedup")
+        for threshold in thresholds:
+            start = perf_counter()
+            sequential = replay.run(threshold).tolist()
+            sequential_seconds = perf_counter() - start
+            assignments, _, report = await clusterer.cluster(
+                corpus.profiles, corpus.published_dates, threshold
+            )
+            seconds = report.cluster_seconds + report.merge_seconds
+            metrics = clustering_metrics(corpus.labels, assignments)
+            agreement = clustering_metrics(sequential, assignments)
+            print(
+                f"{threshold:9.3f}  {report.groups:8d}  {metrics.bcubed_f1:7.3f}"
+                f"  {agreement.bcubed_f1:7.3f}  {agreement.adjusted_rand_index:8.3f}"
+                f"  {report.articles_per_second:10.1f}"
+                f"  {sequential_seconds / seconds if seconds > 0 else 0.0:7.2f}x"
+            )
+    finally:
+        clusterer.close()
+
+
+if __name__ == "__main__":
+    main()
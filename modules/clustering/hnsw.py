@@ -0,0 +1,449 @@
+import heapq
+import math
+import random
+from itertools import chain
+from collections.abc import Hashable, Iterable
+from typing import Generic, Optional, TypeVar
+
+import numpy as np
+
+T = TypeVar("T", bound=Hashable)
+
+
+class HNSWIndex(Generic[T]):
+    """Hierarchical Navigable Small World graph for approximate cosine search
+
+    Vectors are expected to be unit length, so the similarity is the dot
+    product. Inserting an existing label re-links it in place. Removed labels
+    stay in the graph as tombstones that are traversed but never returned, and
+    the graph is rebuilt once tombstones exceed `max_deleted_fraction`.
+
+    Recall is tuned with `ef_search` (size of the dynamic candidate list at
+    query time), at the cost of queries per second.
+    """
+
+    __dimensions: int
+    __m: int
+    __max_links_base: int
+    __ef_construction: int
+    __level_multiplier: float
+    __max_deleted_fraction: float
+    __random: random.Random
+    __vectors: np.ndarray
+    __labels: list[T]
+    __label_to_node: dict[T, int]
+    __links: list[list[list[int]]]
+    __deleted: set[int]
+    __entry_point: Optional[int]
+    __max_level: int
+    ef_search: int
+
+    def __init__(
+        self,
+        dimensions: int,
+        *,
+        m: int = 16,
+        ef_construction: int = 100,
+        ef_search: int = 64,
+        max_deleted_fraction: float = 0.25,
+        seed: Optional[int] = None,
+    ):
+        """Initialize an empty index
+
+        Args:
+            dimensions (int): Width of the indexed vectors
+            m (int): Number of links per node on the upper layers (twice as many on the base layer)
+            ef_construction (int): Size of the dynamic candidate list while linking a node
+            ef_search (int): Size of the dynamic candidate list while searching
+            max_deleted_fraction (float): Fraction of tombstones at which the graph is rebuilt
+            seed (Optional[int]): Seed for the level assignment random generator
+        """
+        if m < 2:
+            raise ValueError("M should be a value >= 2")
+        if not 0 < max_deleted_fraction <= 1:
+            raise ValueError(
+                "Maximum deleted fraction should be a value between 0 and 1"
+            )
+        self.__dimensions = dimensions
+        self.__m = m
+        self.__max_links_base = 2 * m
+        self.__ef_construction = max(ef_construction, m)
+        self.__level_multiplier = 1 / math.log(m)
+        self.__max_deleted_fraction = max_deleted_fraction
+        self.__random = random.Random(seed)
+        self.ef_search = ef_search
+        self.__reset()
+
+    def __reset(self):
+        self.__vectors = np.zeros((0, self.__dimensions), dtype=np.float32)
+        self.__labels = []
+        self.__label_to_node = {}
+        self.__links = []
+        self.__deleted = set()
+        self.__entry_point = None
+        self.__max_level = -1
+
+    def __len__(self) -> int:
+        return len(self.__label_to_node)
+
+    def __contains__(self, label: T) -> bool:
+        return label in self.__label_to_node
+
+    @property
+    def dimensions(self) -> int:
+        return self.__dimensions
+
+    def labels(self) -> list[T]:
+        """Labels of the live (not removed) vectors"""
+        return list(self.__label_to_node)
+
+    def get_vector(self, label: T) -> np.ndarray:
+        """Copy of the vector stored for a label
+
+        Raises:
+            KeyError: If the label is not in the index
+        """
+        return self.__vectors[self.__label_to_node[label]].copy()
+
+    def add(self, label: T, vector: np.ndarray):
+        """Insert a vector, or move the vector of an existing label
+
+        Args:
+            label (T): Label returned by searches
+            vector (np.ndarray): Unit vector of width `dimensions`
+        """
+        vector = np.asarray(vector, dtype=np.float32)
+        if vector.shape != (self.__dimensions,):
+            raise ValueError(
+                f"Vector should have shape ({self.__dimensions},), got {vector.shape}"
+            )
+        node = self.__label_to_node.get(label)
+        if node is not None:
+            self.__vectors[node] = vector
+            self.__link(node, len(self.__links[node]) - 1)
+            return
+
+        node = len(self.__labels)
+        if node == self.__vectors.shape[0]:
+            grown = np.zeros((max(node * 2, 1024), self.__dimensions), dtype=np.float32)
+            grown[:node] = self.__vectors[:node]
+            self.__vectors = grown
+        self.__vectors[node] = vector
+        self.__labels.append(label)
+        self.__label_to_node[label] = node
+        level = int(-math.log(1 - self.__random.random()) * self.__level_multiplier)
+        self.__links.append([[] for _ in range(level + 1)])
+
+        if self.__entry_point is None:
+            self.__entry_point = node
+            self.__max_level = level
+            return
+        self.__link(node, level)
+        if level > self.__max_level:
+            self.__entry_point = node
+            self.__max_level = level
+
+    def add_many(self, items: Iterable[tuple[T, np.ndarray]]):
+        """Insert several labelled vectors"""
+        for label, vector in items:
+            self.add(label, vector)
+
+    def remove(self, label: T):
+        """Remove a label from the results
+
+        Raises:
+            KeyError: If the label is not in the index
+        """
+        node = self.__label_to_node.pop(label)
+        self.__deleted.add(node)
+        if len(self.__deleted) > self.__max_deleted_fraction * len(self.__labels):
+            self.compact()
+
+    def compact(self):
+        """Rebuild the graph without the removed vectors"""
+        live = [
+            (label, self.__vectors[node].copy())
+            for label, node in self.__label_to_node.items()
+        ]
+        self.__reset()
+        self.add_many(live)
+
+    def to_arrays(self) -> dict[str, np.ndarray]:
+        """Export the graph as flat arrays, e.g. to store it in a snapshot
+
+        The links of every (node, layer) pair are concatenated in node order into
+        `link_targets`, delimited by `link_offsets`.
+
+        Returns:
+            dict[str, np.ndarray]: The graph arrays, restorable with `from_arrays`
+        """
+        count = len(self.__labels)
+        flat_links = [links for node_links in self.__links for links in node_links]
+        link_offsets = np.zeros(len(flat_links) + 1, dtype=np.int64)
+        np.cumsum([len(links) for links in flat_links], out=link_offsets[1:])
+        deleted = np.zeros(count, dtype=np.bool_)
+        deleted[list(self.__deleted)] = True
+        return {
+            "vectors": self.__vectors[:count].copy(),
+            "labels": np.array(self.__labels),
+            "levels": np.array(
+                [len(node_links) - 1 for node_links in self.__links], dtype=np.int32
+            ),
+            "link_offsets": link_offsets,
+            "link_targets": np.fromiter(
+                chain.from_iterable(flat_links),
+                dtype=np.int32,
+                count=int(link_offsets[-1]),
+            ),
+            "deleted": deleted,
+            "entry_point": np.array(
+                -1 if self.__entry_point is None else self.__entry_point
+            ),
+        }
+
+    @classmethod
+    def from_arrays(
+        cls,
+        arrays: dict[str, np.ndarray],
+        *,
+        m: int = 16,
+        ef_construction: int = 100,
+        ef_search: int = 64,
+        max_deleted_fraction: float = 0.25,
+        seed: Optional[int] = None,
+    ) -> "HNSWIndex":
+        """Restore an index exported with `to_arrays`
+
+        The vectors are used as given, so a copy-on-write memory map
+        (`np.load(..., mmap_mode="c")`) is restored without reading it upfront.
+
+        Args:
+            arrays (dict[str, np.ndarray]): Arrays returned by `to_arrays`
+            m (int): M the graph was built with
+            ef_construction (int): Size of the dynamic candidate list while linking a node
+            ef_search (int): Size of the dynamic candidate list while searching
+            max_deleted_fraction (float): Fraction of tombstones at which the graph is rebuilt
+            seed (Optional[int]): Seed for the level assignment random generator
+
+        Returns:
+            HNSWIndex: The restored index
+        """
+        vectors = arrays["vectors"]
+        index = cls(
+            vectors.shape[1],
+            m=m,
+            ef_construction=ef_construction,
+            ef_search=ef_search,
+            max_deleted_fraction=max_deleted_fraction,
+            seed=seed,
+        )
+        levels = arrays["levels"].tolist()
+        link_offsets = arrays["link_offsets"].tolist()
+        link_targets = arrays["link_targets"].tolist()
+        links: list[list[list[int]]] = []
+        position = 0
+        for level in levels:
+            offsets = link_offsets[position : position + level + 2]
+            links.append(
+                [
+                    link_targets[start:end]
+                    for start, end in zip(offsets[:-1], offsets[1:])
+                ]
+            )
+            position += level + 1
+
+        index.__vectors = vectors
+        index.__labels = arrays["labels"].tolist()
+        index.__links = links
+        index.__deleted = set(np.flatnonzero(arrays["deleted"]).tolist())
+        index.__label_to_node = {
+            label: node
+            for node, label in enumerate(index.__labels)
+            if node not in index.__deleted
+        }
+        entry_point = int(arrays["entry_point"])
+        if entry_point >= 0:
+            index.__entry_point = entry_point
+            index.__max_level = levels[entry_point]
+        return index
+
+    def search(
+        self, vector: np.ndarray, k: int, ef: Optional[int] = None
+    ) -> list[tuple[T, float]]:
+        """Find the approximate nearest neighbours of a vector
+
+        Args:
+            vector (np.ndarray): Unit query vector of width `dimensions`
+            k (int): Number of neighbours to return
+            ef (Optional[int]): Size of the dynamic candidate list, defaults to `ef_search`
+
+        Returns:
+            list[tuple[T, float]]: (label, cosine similarity) pairs, most similar first
+        """
+        if self.__entry_point is None or k <= 0 or not self.__label_to_node:
+            return []
+        query = np.asarray(vector, dtype=np.float32)
+        entry = self.__entry_point
+        entry_distance = self.__distance(query, entry)
+        for level in range(self.__max_level, 0, -1):
+            entry, entry_distance = self.__greedy_closest(
+                query, entry, entry_distance, level
+            )
+        nearest = self.__search_layer(
+            query,
+            [(entry_distance, entry)],
+            max(ef if ef is not None else self.ef_search, k),
+            0,
+            skip_deleted=True,
+        )
+        return [(self.__labels[node], 1 - distance) for distance, node in nearest[:k]]
+
+    def __distance(self, query: np.ndarray, node: int) -> float:
+        return 1 - float(self.__vectors[node] @ query)
+
+    def __distances(self, query: np.ndarray, nodes: list[int]) -> np.ndarray:
+        return 1 - self.__vectors[nodes] @ query
+
+    def __greedy_closest(
+        self, query: np.ndarray, entry: int, entry_distance: float, level: int
+    ) -> tuple[int, float]:
+        """Walk a layer towards the query while a neighbour is closer"""
+        changed = True
+        while changed:
+            changed = False
+            neighbours = self.__links[entry][level]
+            if not neighbours:
+                break
+            distances = self.__distances(query, neighbours)
+            closest = int(np.argmin(distances))
+            if distances[closest] < entry_distance:
+                entry, entry_distance = neighbours[closest], float(distances[closest])
+                changed = True
+        return entry, entry_distance
+
+    def __search_layer(
+        self,
+        query: np.ndarray,
+        entries: list[tuple[float, int]],
+        ef: int,
+        level: int,
+        skip_deleted: bool = False,
+        exclude: Optional[int] = None,
+    ) -> list[tuple[float, int]]:
+        """Best-first search of a layer
+
+        Returns:
+            list[tuple[float, int]]: Up to `ef` (distance, node) pairs, closest first
+        """
+        visited = {node for _, node in entries}
+        if exclude is not None:
+            visited.add(exclude)
+        candidates = list(entries)
+        heapq.heapify(candidates)
+        # Max-heap of the best results so far, as (-distance, node)
+        results = [
+            (-distance, node)
+            for distance, node in entries
+            if node != exclude and not (skip_deleted and node in self.__deleted)
+        ]
+        heapq.heapify(results)
+        while len(results) > ef:
+            heapq.heappop(results)
+
+        while candidates:
+            distance, node = heapq.heappop(candidates)
+            if len(results) >= ef and distance > -results[0][0]:
+                break
+            neighbours = [
+                neighbour
+                for neighbour in self.__links[node][level]
+                if neighbour not in visited
+            ]
+            if not neighbours:
+                continue
+            visited.update(neighbours)
+            for neighbour, neighbour_distance in zip(
+                neighbours, self.__distances(query, neighbours).tolist()
+            ):
+                if len(results) < ef or neighbour_distance < -results[0][0]:
+                    heapq.heappush(candidates, (neighbour_distance, neighbour))
+                    if skip_deleted and neighbour in self.__deleted:
+                        continue
+                    heapq.heappush(results, (-neighbour_distance, neighbour))
+                    if len(results) > ef:
+                        heapq.heappop(results)
+        return sorted((-distance, node) for distance, node in results)
+
+    def __select_neighbours(
+        self, candidates: list[tuple[float, int]], m: int
+    ) -> list[int]:
+        """Keep the closest candidates that are not closer to an already selected one
+
+        Args:
+            candidates (list[tuple[float, int]]): (distance, node) pairs, closest first
+            m (int): Maximum number of neighbours
+
+        Returns:
+            list[int]: The selected nodes
+        """
+        if len(candidates) <= m:
+            return [node for _, node in candidates]
+        nodes = [node for _, node in candidates]
+        vectors = self.__vectors[nodes]
+        pairwise = 1 - vectors @ vectors.T
+        # Distance of every candidate to its closest selected neighbour
+        to_selected = np.full(len(nodes), np.inf, dtype=np.float32)
+        selected: list[int] = []
+        pruned: list[int] = []
+        for position, (distance, node) in enumerate(candidates):
+            if len(selected) >= m:
+                break
+            if to_selected[position] < distance:
+                pruned.append(node)
+                continue
+            selected.append(node)
+            np.minimum(to_selected, pairwise[position], out=to_selected)
+        # Fill up with the closest pruned candidates to keep the graph connected
+        selected.extend(pruned[: m - len(selected)])
+        return selected
+
+    def __link(self, node: int, level: int):
+        """Connect a node to its neighbours on every layer up to `level`"""
+        assert self.__entry_point is not None
+        query = self.__vectors[node]
+        entry = self.__entry_point
+        top_level = self.__max_level
+        if entry == node:
+            # Moving the entry point itself, start from its highest neighbour
+            while top_level >= 0 and not self.__links[node][top_level]:
+                top_level -= 1
+            if top_level < 0:
+                return
+            entry = self.__links[node][top_level][0]
+        entry_distance = self.__distance(query, entry)
+        for current in range(top_level, level, -1):
+            entry, entry_distance = self.__greedy_closest(
+                query, entry, entry_distance, current
+            )
+        entries = [(entry_distance, entry)]
+        for current in range(min(level, top_level), -1, -1):
+            candidates = self.__search_layer(
+                query, entries, self.__ef_construction, current, exclude=node
+            )
+            max_links = self.__max_links_base if current == 0 else self.__m
+            neighbours = self.__select_neighbours(candidates, self.__m)
+            self.__links[node][current] = neighbours
+            for neighbour in neighbours:
+                neighbour_links = self.__links[neighbour][current]
+                if node in neighbour_links:
+                    continue
+                neighbour_links.append(node)
+                if len(neighbour_links) > max_links:
+                    distances = (
+                        1 - self.__vectors[neighbour_links] @ self.__vectors[neighbour]
+                    )
+                    self.__links[neighbour][current] = self.__select_neighbours(
+                        sorted(zip(distances.tolist(), neighbour_links)), max_links
+                    )
+            if candidates:
+                entries = candidates
@@ -0,0 +1,38 @@
+from typing import Optional
+
+from typing_extensions import override
+
+from modules.clustering._candidate_base import BaseCandidateGenerator
+from modules.database._base import BaseAdapter
+from type.clustering import GroupProfile, GroupProfileColumns, TermProfile
+
+
+class PostingListCandidateGenerator(BaseCandidateGenerator):
+    """Shortlists the groups sharing the most terms, by traversing the term nodes in the database"""
+
+    __database: BaseAdapter
+
+    def __init__(self, database: BaseAdapter):
+        """Initialize the candidate generator
+
+        Args:
+            database (BaseAdapter): Connected database adapter
+        """
+        self.__database = database
+
+    @override
+    async def find_candidates(
+        self, profile: TermProfile, limit: int, exclude: Optional[str] = None
+    ) -> list[GroupProfile]:
+        candidates = await self.__database.find_candidate_article_groups(
+            profile, limit + 1 if exclude is not None else limit
+        )
+        return [group for group in candidates if group.id != exclude][:limit]
+
+    @override
+    async def find_candidate_columns(
+        self, profile: TermProfile, limit: int
+    ) -> GroupProfileColumns:
+        return await self.__database.find_candidate_article_group_columns(
+            profile, limit
+        )
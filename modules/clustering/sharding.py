@@ -0,0 +1,322 @@
+import asyncio
+import multiprocessing
+from collections.abc import Sequence
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import datetime, timedelta
+from hashlib import blake2b
+from itertools import chain
+from time import perf_counter
+from typing import Optional
+
+import numpy as np
+
+from type.clustering import ShardedClusteringReport, ShardingStrategy, TermProfile
+
+from ._scoring import coverage_weights
+from .evaluation import GroupingReplay
+
+# Terms of a profile as sent to a worker process, (entities, keywords)
+_Terms = tuple[dict[str, float], dict[str, float]]
+
+
+def _stable_hash(value: str) -> int:
+    """Hash that is the same in every process (Python's `hash` is salted per process)"""
+    return int.from_bytes(blake2b(value.encode("utf-8"), digest_size=8).digest())
+
+
+def _cluster_shard(
+    terms: list[_Terms], match_threshold: float, entity_weight: float
+) -> tuple[list[int], list[_Terms]]:
+    """Group the articles of a shard in order, in a worker process
+
+    Returns:
+        tuple[list[int], list[_Terms]]: Local group of each article and terms of each local group
+    """
+    profiles = [
+        TermProfile(entities=entities, keywords=keywords)
+        for entities, keywords in terms
+    ]
+    assignments = GroupingReplay(profiles, entity_weight).run(match_threshold).tolist()
+    groups: list[_Terms] = []
+    for (entities, keywords), group in zip(terms, assignments):
+        if group == len(groups):
+            groups.append(({}, {}))
+        _add_terms(groups[group], entities, keywords)
+    return assignments, groups
+
+
+def _term_keys(entities: dict[str, float], keywords: dict[str, float]) -> list[str]:
+    """Keys of the entity and keyword terms, distinct even for equal words"""
+    return [f"e:{key}" for key in entities] + [f"k:{key}" for key in keywords]
+
+
+def _add_terms(terms: _Terms, entities: dict[str, float], keywords: dict[str, float]):
+    """Add term weights to terms being summed, in place"""
+    for summed, added in zip(terms, (entities, keywords)):
+        for key, weight in added.items():
+            summed[key] = summed.get(key, 0.0) + weight
+
+
+class ShardedClusterer:
+    """Groups a batch of articles across worker processes and reconciles the groups that span shards
+
+    Articles are partitioned into shards by a stable hash of their most
+    mentioned entity, or by publication date bucket. Each shard is grouped in
+    publication order in its own process, the same way `GroupingReplay`
+    replays the online grouping. Local groups are then merged across shards in
+    the order of their first article, which joins the merged group that covers
+    it best, like it would have in one sequential pass.
+
+    The partitioning, the order within a shard and the merge do not depend on
+    process scheduling, so the same batch always gives the same groups. They
+    differ from one sequential pass over the batch where a story's articles
+    land in several shards; `python -m modules.clustering.evaluation --shards`
+    measures by how much.
+    """
+
+    __processes: int
+    __strategy: ShardingStrategy
+    __date_bucket: timedelta
+    __entity_weight: float
+    __executor: Optional[Executor]
+
+    def __init__(
+        self,
+        *,
+        processes: int,
+        strategy: ShardingStrategy = "entity",
+        date_bucket: timedelta = timedelta(hours=6),
+        entity_weight: float = 0.5,
+    ):
+        """Initialize the clusterer, the worker processes are started on first use
+
+        Args:
+            processes (int): Number of shards, each grouped by its own worker process. A single shard is grouped in the calling process.
+            strategy (ShardingStrategy): How articles are partitioned into shards
+            date_bucket (timedelta): Width of the publication date buckets of the "date" strategy
+            entity_weight (float): Weight of the entity coverage in the similarity
+        """
+        if processes <= 0:
+            raise ValueError("Processes should be a value > 0")
+        if date_bucket <= timedelta(0):
+            raise ValueError("Date bucket should be a positive duration")
+        self.__processes = processes
+        self.__strategy = strategy
+        self.__date_bucket = date_bucket
+        self.__entity_weight = entity_weight
+        self.__executor = None
+
+    def shard_of(self, profile: TermProfile, published_date: datetime) -> int:
+        """Shard of an article
+
+        Args:
+            profile (TermProfile): Term profile of the article
+            published_date (datetime): Publication date of the article
+
+        Returns:
+            int: The shard number
+        """
+        if self.__strategy == "date":
+            bucket = published_date.timestamp() // self.__date_bucket.total_seconds()
+            return int(bucket) % self.__processes
+        if not profile.entities:
+            return 0
+        # Most mentioned entity, ties broken by key so the shard never depends on dict order
+        top_entity, _ = min(
+            profile.entities.items(), key=lambda item: (-item[1], item[0])
+        )
+        return _stable_hash(top_entity) % self.__processes
+
+    async def cluster(
+        self,
+        profiles: Sequence[TermProfile],
+        published_dates: Sequence[datetime],
+        match_threshold: float,
+    ) -> tuple[list[int], list[TermProfile], ShardedClusteringReport]:
+        """Group a batch of articles
+
+        Args:
+            profiles (Sequence[TermProfile]): Term profiles of the articles
+            published_dates (Sequence[datetime]): Publication dates of the articles
+            match_threshold (float): Similarity at which an article joins a group, and two groups of different shards merge
+
+        Returns:
+            tuple[list[int], list[TermProfile], ShardedClusteringReport]: Group of each article, profile of each group (numbered by their earliest article) and a report
+        """
+        if len(profiles) != len(published_dates):
+            raise ValueError("Profiles and published dates should have the same length")
+        start = perf_counter()
+        # Articles of each shard in publication order, ties in batch order
+        shards: list[list[int]] = [[] for _ in range(self.__processes)]
+        for article in sorted(
+            range(len(profiles)), key=lambda article: published_dates[article]
+        ):
+            shards[self.shard_of(profiles[article], published_dates[article])].append(
+                article
+            )
+        shard_results = await self.__run_shards(
+            [
+                [
+                    (profiles[article].entities, profiles[article].keywords)
+                    for article in shard
+                ]
+                for shard in shards
+            ],
+            match_threshold,
+        )
+        cluster_seconds = perf_counter() - start
+
+        start = perf_counter()
+        # Local groups of every shard by position, with their shard and first article
+        local_groups: list[tuple[int, _Terms]] = []
+        local_offsets: list[int] = []
+        first_articles: list[int] = []
+        for shard, (assignments, groups) in enumerate(shard_results):
+            local_offsets.append(len(local_groups))
+            local_groups.extend((shard, terms) for terms in groups)
+            first_articles.extend([-1] * len(groups))
+            for article, local_group in zip(shards[shard], assignments):
+                if first_articles[local_offsets[shard] + local_group] < 0:
+                    first_articles[local_offsets[shard] + local_group] = article
+        merged_of_group = self.__merge_across_shards(
+            local_groups,
+            [profiles[article] for article in first_articles],
+            sorted(
+                range(len(local_groups)),
+                key=lambda group: (
+                    published_dates[first_articles[group]],
+                    first_articles[group],
+                ),
+            ),
+            match_threshold,
+        )
+
+        group_of_article = [0] * len(profiles)
+        for shard, (assignments, _) in enumerate(shard_results):
+            for article, local_group in zip(shards[shard], assignments):
+                group_of_article[article] = merged_of_group[
+                    local_offsets[shard] + local_group
+                ]
+        # Number the merged groups by their first article in the batch
+        numbers: dict[int, int] = {}
+        group_terms: list[_Terms] = []
+        for article, root in enumerate(group_of_article):
+            if root not in numbers:
+                numbers[root] = len(group_terms)
+                group_terms.append(({}, {}))
+            group_of_article[article] = numbers[root]
+            _add_terms(
+                group_terms[numbers[root]],
+                profiles[article].entities,
+                profiles[article].keywords,
+            )
+        group_profiles = [
+            TermProfile(entities=entities, keywords=keywords)
+            for entities, keywords in group_terms
+        ]
+        merge_seconds = perf_counter() - start
+
+        seconds = cluster_seconds + merge_seconds
+        return (
+            group_of_article,
+            group_profiles,
+            ShardedClusteringReport(
+                articles=len(profiles),
+                shards=self.__processes,
+                shard_articles=[len(shard) for shard in shards],
+                local_groups=len(local_groups),
+                merged_groups=len(local_groups) - len(group_profiles),
+                groups=len(group_profiles),
+                cluster_seconds=cluster_seconds,
+                merge_seconds=merge_seconds,
+                articles_per_second=len(profiles) / seconds if seconds > 0 else 0.0,
+            ),
+        )
+
+    async def __run_shards(
+        self, shards: list[list[_Terms]], match_threshold: float
+    ) -> list[tuple[list[int], list[_Terms]]]:
+        if self.__processes == 1:
+            return [_cluster_shard(shards[0], match_threshold, self.__entity_weight)]
+        if self.__executor is None:
+            # Forking a process whose model threads may hold locks is unsafe
+            self.__executor = ProcessPoolExecutor(
+                self.__processes, mp_context=multiprocessing.get_context("spawn")
+            )
+        loop = asyncio.get_running_loop()
+        return await asyncio.gather(
+            *(
+                loop.run_in_executor(
+                    self.__executor,
+                    _cluster_shard,
+                    shard,
+                    match_threshold,
+                    self.__entity_weight,
+                )
+                for shard in shards
+            )
+        )
+
+    def __merge_across_shards(
+        self,
+        groups: list[tuple[int, _Terms]],
+        first_profiles: list[TermProfile],
+        order: list[int],
+        match_threshold: float,
+    ) -> list[int]:
+        """Merge each local group into the merged group that best covers its first article
+
+        Local groups are visited in the order of their first article, which is
+        scored against every merged group holding a local group of another
+        shard, the way it would have been scored in one sequential pass. Merged
+        groups are scored with all their terms, including the ones of articles
+        published after the first article.
+
+        Returns:
+            list[int]: Merged group of each local group, numbered in visiting order
+        """
+        merged_of_group = [0] * len(groups)
+        # Terms of each merged group, and merged groups having each term
+        merged_terms: list[set[str]] = []
+        postings: dict[str, list[int]] = {}
+        # Shard of each merged group, -1 once it spans several shards
+        merged_shard = np.empty(len(groups), dtype=np.int64)
+        for group in order:
+            shard, terms = groups[group]
+            best = -1
+            weights = coverage_weights(first_profiles[group], self.__entity_weight)
+            term_postings = [postings.get(term, []) for term in weights]
+            lengths = np.fromiter(map(len, term_postings), np.int64, len(term_postings))
+            total = int(lengths.sum())
+            if total:
+                merged_groups = np.fromiter(
+                    chain.from_iterable(term_postings), np.int64, total
+                )
+                term_weights = np.fromiter(weights.values(), np.float64, len(weights))
+                scores = np.bincount(
+                    merged_groups, weights=np.repeat(term_weights, lengths)
+                )
+                # The shard itself already decided its own groups do not match
+                scores[merged_shard[: len(scores)] == shard] = 0.0
+                candidate = int(np.argmax(scores))
+                if scores[candidate] >= match_threshold and scores[candidate] > 0.0:
+                    best = candidate
+            if best < 0:
+                best = len(merged_terms)
+                merged_terms.append(set())
+                merged_shard[best] = shard
+            elif merged_shard[best] != shard:
+                merged_shard[best] = -1
+            merged_of_group[group] = best
+            known = merged_terms[best]
+            for term in _term_keys(*terms):
+                if term not in known:
+                    known.add(term)
+                    postings.setdefault(term, []).append(best)
+        return merged_of_group
+
+    def close(self):
+        """Stop the worker processes"""
+        if self.__executor is not None:
+            self.__executor.shutdown()
+            self.__executor = None
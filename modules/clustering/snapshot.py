@@ -0,0 +1,102 @@
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from type.clustering import SnapshotManifest
+
+SNAPSHOT_FORMAT_VERSION = 1
+
+_MANIFEST_FILE = "manifest.json"
+_LATEST_FILE = "LATEST"
+_SNAPSHOT_PREFIX = "snapshot-"
+
+
+def write_snapshot(
+    directory: str | os.PathLike,
+    manifest: SnapshotManifest,
+    arrays: dict[str, np.ndarray],
+    keep: int = 2,
+) -> Path:
+    """Write a snapshot as a directory of `.npy` arrays plus a manifest
+
+    The snapshot is written to a temporary directory, renamed into place and
+    only then published through the `LATEST` pointer, so a crash while writing
+    never leaves a partially written snapshot behind the pointer.
+
+    Args:
+        directory (str | os.PathLike): Directory holding the snapshots
+        manifest (SnapshotManifest): Description of the stored state
+        arrays (dict[str, np.ndarray]): Arrays of the stored state, by name
+        keep (int): Number of most recent snapshots kept, older ones are deleted
+
+    Returns:
+        Path: Path of the written snapshot
+    """
+    root = Path(directory)
+    root.mkdir(parents=True, exist_ok=True)
+    name = f"{_SNAPSHOT_PREFIX}{manifest.created_on.strftime('%Y%m%dT%H%M%S%f')}"
+    staging = root / f".{name}.tmp"
+    if staging.exists():
+        shutil.rmtree(staging)
+    staging.mkdir()
+    for array_name, array in arrays.items():
+        np.save(staging / f"{array_name}.npy", array, allow_pickle=False)
+    (staging / _MANIFEST_FILE).write_text(manifest.model_dump_json(indent=2))
+    target = root / name
+    os.replace(staging, target)
+
+    pointer = root / f".{_LATEST_FILE}.tmp"
+    pointer.write_text(name)
+    os.replace(pointer, root / _LATEST_FILE)
+
+    snapshots = sorted(
+        path for path in root.glob(f"{_SNAPSHOT_PREFIX}*") if path.is_dir()
+    )
+    for stale in snapshots[: max(len(snapshots) - keep, 0)]:
+        shutil.rmtree(stale, ignore_errors=True)
+    return target
+
+
+def read_latest_snapshot(
+    directory: str | os.PathLike,
+) -> Optional[tuple[SnapshotManifest, dict[str, np.ndarray]]]:
+    """Map the latest snapshot of a directory into memory
+
+    Arrays are opened as copy-on-write memory maps, so nothing is read until
+    it is used and in-memory changes never reach the snapshot files.
+
+    Args:
+        directory (str | os.PathLike): Directory holding the snapshots
+
+    Returns:
+        Optional[tuple[SnapshotManifest, dict[str, np.ndarray]]]: The manifest and arrays, or None if there is no readable snapshot of the current format
+    """
+    root = Path(directory)
+    latest = root / _LATEST_FILE
+    if not latest.is_file():
+        return None
+    snapshot = root / latest.read_text().strip()
+    try:
+        manifest = SnapshotManifest.model_validate_json(
+            (snapshot / _MANIFEST_FILE).read_text()
+        )
+    except (OSError, ValueError) as e:
+        logging.warning("Ignoring unreadable snapshot '%s': %s", snapshot, e)
+        return None
+    if manifest.format_version != SNAPSHOT_FORMAT_VERSION:
+        logging.warning(
+            "Ignoring snapshot '%s' of format version %d (expected %d)",
+            snapshot,
+            manifest.format_version,
+            SNAPSHOT_FORMAT_VERSION,
+        )
+        return None
+    arrays = {
+        path.stem: np.load(path, mmap_mode="c", allow_pickle=False)
+        for path in snapshot.glob("*.npy")
+    }
+    return manifest, arrays
@@ -0,0 +1,240 @@
+import asyncio
+import logging
+from datetime import timedelta
+from math import log
+from time import monotonic
+from typing import Optional
+
+from modules.database._base import BaseAdapter
+from modules.database.cache import LookupCache, TermCacheKey
+from type.clustering import TermProfile, TermStatisticsReport
+
+
+class TermStatistics:
+    """Document frequencies of the common terms, to weight terms by IDF and leave ultra-common ones out of shortlisting
+
+    Entities like "United States" are mentioned by a large share of the
+    articles, so shortlisting through them touches a large share of the groups
+    while telling little about the story. Terms mentioned by more than
+    `max_document_ratio` of the articles (and at least `min_stop_articles`),
+    or by more than `max_term_articles`, are stop terms: they are left out of
+    candidate shortlisting, and the database also refuses to traverse terms
+    above `max_term_articles`. Scoring still uses every term, weighted by its
+    inverse document frequency when `idf_weighting` is set.
+
+    Only the frequencies of terms of at least `tracked_min_articles` articles
+    are loaded; rarer terms are weighted as if mentioned once. They are loaded
+    from the database on `refresh`, and kept current in between by counting
+    the articles saved in this process.
+    """
+
+    __max_document_ratio: float
+    __min_stop_articles: int
+    __max_term_articles: int
+    __tracked_min_articles: int
+    __idf_weighting: bool
+    __refresh_interval: float
+    __articles: int
+    __frequencies: dict[TermCacheKey, int]
+    __refreshed: Optional[float]
+    __refresh_lock: asyncio.Lock
+    __dropped_lookups: int
+
+    def __init__(
+        self,
+        *,
+        max_document_ratio: float = 0.02,
+        min_stop_articles: int = 500,
+        max_term_articles: int = 50_000,
+        tracked_min_articles: int = 10,
+        idf_weighting: bool = True,
+        refresh_interval: timedelta = timedelta(minutes=10),
+    ):
+        """Initialize empty statistics, loaded by `refresh`
+
+        Args:
+            max_document_ratio (float): Share of the articles above which a term is a stop term
+            min_stop_articles (int): Terms of fewer articles are never stop terms, which keeps small corpora from stop-listing their topics
+            max_term_articles (int): Terms of more articles are always stop terms, whatever the size of the corpus
+            tracked_min_articles (int): Terms of fewer articles are not loaded, and weighted like a term of one article
+            idf_weighting (bool): Whether article terms are weighted by their inverse document frequency when scoring groups
+            refresh_interval (timedelta): Time after which the frequencies are loaded from the database again
+        """
+        if not 0 < max_document_ratio <= 1:
+            raise ValueError("Max document ratio should be a value between 0 and 1")
+        if max_term_articles <= 0:
+            raise ValueError("Max term articles should be a value > 0")
+        self.__max_document_ratio = max_document_ratio
+        self.__min_stop_articles = min_stop_articles
+        self.__max_term_articles = max_term_articles
+        self.__tracked_min_articles = tracked_min_articles
+        self.__idf_weighting = idf_weighting
+        self.__refresh_interval = refresh_interval.total_seconds()
+        self.__articles = 0
+        self.__frequencies = {}
+        self.__refreshed = None
+        self.__refresh_lock = asyncio.Lock()
+        self.__dropped_lookups = 0
+
+    @property
+    def max_term_articles(self) -> int:
+        return self.__max_term_articles
+
+    def is_stale(self) -> bool:
+        """Whether the frequencies were never loaded, or were loaded longer than the refresh interval ago"""
+        return (
+            self.__refreshed is None
+            or monotonic() - self.__refreshed >= self.__refresh_interval
+        )
+
+    async def refresh(self, database: BaseAdapter):
+        """Load the number of articles and the frequencies of the common terms
+
+        Args:
+            database (BaseAdapter): Connected database adapter
+        """
+        async with self.__refresh_lock:
+            await self.__load(database)
+
+    async def refresh_if_stale(self, database: BaseAdapter):
+        """Load the frequencies again if they are stale, once for concurrent callers
+
+        Args:
+            database (BaseAdapter): Connected database adapter
+        """
+        if not self.is_stale():
+            return
+        async with self.__refresh_lock:
+            if self.is_stale():
+                await self.__load(database)
+
+    async def __load(self, database: BaseAdapter):
+        articles, frequencies = await database.get_term_document_frequencies(
+            self.__tracked_min_articles
+        )
+        self.__articles = articles
+        self.__frequencies = frequencies
+        self.__refreshed = monotonic()
+        logging.debug(
+            "Loaded the frequencies of %d terms over %d articles",
+            len(frequencies),
+            articles,
+        )
+
+    def document_frequency(self, key: TermCacheKey) -> int:
+        """Number of articles of a term, 0 if it is not tracked"""
+        return self.__frequencies.get(key, 0)
+
+    def idf(self, key: TermCacheKey) -> float:
+        """Smoothed inverse document frequency of a term, at least 1"""
+        frequency = max(self.document_frequency(key), 1)
+        return log((1 + self.__articles) / (1 + frequency)) + 1.0
+
+    def is_stop_term(self, key: TermCacheKey) -> bool:
+        """Whether a term is left out of candidate shortlisting"""
+        return self.__is_stop_frequency(self.document_frequency(key))
+
+    def __is_stop_frequency(self, frequency: int) -> bool:
+        return frequency > self.__max_term_articles or (
+            frequency >= self.__min_stop_articles
+            and frequency > self.__max_document_ratio * self.__articles
+        )
+
+    def shortlist_profile(self, profile: TermProfile) -> TermProfile:
+        """Profile without its stop terms, to shortlist candidate groups with
+
+        A profile made only of stop terms of one kind keeps its rarest term of
+        that kind, so an article about a very common entity still finds
+        candidates.
+
+        Args:
+            profile (TermProfile): Term profile of an article
+
+        Returns:
+            TermProfile: The profile without its stop terms
+        """
+        kept = []
+        for kind, terms in (
+            ("entity", profile.entities),
+            ("keyword", profile.keywords),
+        ):
+            selected = {
+                key: weight
+                for key, weight in terms.items()
+                if not self.is_stop_term((kind, key))
+            }
+            if terms and not selected:
+                rarest = min(
+                    terms, key=lambda key: (self.document_frequency((kind, key)), key)
+                )
+                selected = {rarest: terms[rarest]}
+            self.__dropped_lookups += len(terms) - len(selected)
+            kept.append(selected)
+        return TermProfile.model_construct(entities=kept[0], keywords=kept[1])
+
+    def weighted_profile(self, profile: TermProfile) -> TermProfile:
+        """Profile with its terms weighted by their inverse document frequency, to score groups with
+
+        Args:
+            profile (TermProfile): Term profile of an article
+
+        Returns:
+            TermProfile: The weighted profile, or the profile itself if IDF weighting is off
+        """
+        if not self.__idf_weighting:
+            return profile
+        return TermProfile.model_construct(
+            entities={
+                key: weight * self.idf(("entity", key))
+                for key, weight in profile.entities.items()
+            },
+            keywords={
+                key: weight * self.idf(("keyword", key))
+                for key, weight in profile.keywords.items()
+            },
+        )
+
+    def article_saved(self, profile: TermProfile):
+        """Count an article saved in this process until the next refresh
+
+        Args:
+            profile (TermProfile): Term profile of the article
+        """
+        self.__articles += 1
+        for key in LookupCache.term_keys(profile):
+            frequency = self.__frequencies.get(key)
+            if frequency is not None:
+                self.__frequencies[key] = frequency + 1
+
+    def article_revised(self, previous: TermProfile, current: TermProfile):
+        """Count the terms a revision added to or removed from an article
+
+        Args:
+            previous (TermProfile): Term profile of the article before the revision
+            current (TermProfile): Term profile of the revised article
+        """
+        previous_keys = set(LookupCache.term_keys(previous))
+        current_keys = set(LookupCache.term_keys(current))
+        for key, change in (
+            *((key, 1) for key in current_keys - previous_keys),
+            *((key, -1) for key in previous_keys - current_keys),
+        ):
+            frequency = self.__frequencies.get(key)
+            if frequency is not None:
+                self.__frequencies[key] = max(frequency + change, 0)
+
+    def report(self) -> TermStatisticsReport:
+        """Size of the tracked statistics and the terms left out so far
+
+        Returns:
+            TermStatisticsReport: The report
+        """
+        return TermStatisticsReport(
+            articles=self.__articles,
+            tracked_terms=len(self.__frequencies),
+            stop_terms=sum(map(self.__is_stop_frequency, self.__frequencies.values())),
+            dropped_lookups=self.__dropped_lookups,
+            refreshed_seconds_ago=(
+                monotonic() - self.__refreshed if self.__refreshed is not None else None
+            ),
+        )
@@ -1,3 +1,4 @@
+from .cache import LookupCache, TTLCache
 from .neo4j import Neo4jAdapter
 
-__all__ = ["Neo4jAdapter"]
+__all__ = ["Neo4jAdapter", "LookupCache", "TTLCache"]
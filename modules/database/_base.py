@@ -1,7 +1,13 @@
 from abc import ABC, abstractmethod
+from datetime import datetime
 from typing import Any, Coroutine, Generic, Optional, TypeVar
 
-from type.database import DatabaseVariant
+from modal.database.node import Article, EntityGroup
+from modules.database.cache import TermCacheKey
+from type import NodeType
+from type.clustering import GroupProfile, GroupProfileColumns, TermProfile
+from type.database import DatabaseVariant, GroupStripeState, ModelHydrationMode
+from type.export import ExportTable
 
 DatabaseConnection = TypeVar("DatabaseConnection")
 
@@ -60,3 +66,342 @@ class BaseAdapter(ABC, Generic[DatabaseConnection]):
     async def migrate(self) -> dict[str, tuple[str, Any]]:
         """Set Constraints and necessary configurations for the database"""
         pass
+
+    @abstractmethod
+    async def prepare_statements(self):
+        """Prepare the data-path statements (e.g. warm the query plan cache) after migration"""
+        pass
+
+    @abstractmethod
+    async def find_candidate_article_groups(
+        self, profile: TermProfile, limit: int, hydration: ModelHydrationMode = "model"
+    ) -> list[GroupProfile]:
+        """Shortlist the article groups sharing the most terms with a profile
+
+        Args:
+            profile (TermProfile): Term profile to match
+            limit (int): Maximum number of groups to return
+            hydration (ModelHydrationMode): How the returned profiles are built from the records
+
+        Returns:
+            list[GroupProfile]: Profiles of the shortlisted groups
+        """
+        pass
+
+    @abstractmethod
+    async def find_candidate_article_group_columns(
+        self, profile: TermProfile, limit: int
+    ) -> GroupProfileColumns:
+        """Shortlist the article groups sharing the most terms with a profile, as columns for vectorized scoring
+
+        Args:
+            profile (TermProfile): Term profile to match
+            limit (int): Maximum number of groups to return
+
+        Returns:
+            GroupProfileColumns: Profiles of the shortlisted groups
+        """
+        pass
+
+    @abstractmethod
+    async def get_term_document_frequencies(
+        self, min_articles: int
+    ) -> tuple[int, dict[TermCacheKey, int]]:
+        """Get the number of articles and the document frequencies of the common terms
+
+        Args:
+            min_articles (int): Only terms of at least this many articles are returned
+
+        Returns:
+            tuple[int, dict[TermCacheKey, int]]: Number of stored articles and the number of articles of each returned term
+        """
+        pass
+
+    @abstractmethod
+    async def recount_term_articles(self):
+        """Recompute the document frequency of every term from its article edges, e.g. on a graph stored before they were tracked"""
+        pass
+
+    @abstractmethod
+    async def get_article_groups(
+        self, group_ids: list[str], hydration: ModelHydrationMode = "model"
+    ) -> list[GroupProfile]:
+        """Get the profiles of article groups by id
+
+        Args:
+            group_ids (list[str]): Ids of the groups, unknown ids are skipped
+            hydration (ModelHydrationMode): How the returned profiles are built from the records
+
+        Returns:
+            list[GroupProfile]: Profiles of the found groups
+        """
+        pass
+
+    @abstractmethod
+    async def get_article_group_columns(
+        self, group_ids: list[str]
+    ) -> GroupProfileColumns:
+        """Get the profiles of article groups by id, as columns for vectorized scoring
+
+        Args:
+            group_ids (list[str]): Ids of the groups, unknown ids are skipped
+
+        Returns:
+            GroupProfileColumns: Profiles of the found groups
+        """
+        pass
+
+    @abstractmethod
+    async def save_article(
+        self, article: NodeType, profile: TermProfile, group_id: Optional[str]
+    ) -> tuple[str, bool]:
+        """Store an article with its terms and add it to an article group
+
+        Args:
+            article (NodeType): The article node
+            profile (TermProfile): Term profile of the article
+            group_id (Optional[str]): Group to add the article to, a new group is created if not provided (or no longer exists)
+
+        Returns:
+            tuple[str, bool]: Tuple of (group_id, is_new_group)
+        """
+        pass
+
+    @abstractmethod
+    async def get_group_stripes(self, stripes: list[int]) -> list[GroupStripeState]:
+        """Get the versions of group stripes, read before matching an article so a later creation can detect conflicts
+
+        Args:
+            stripes (list[int]): The stripes, as returned by `group_stripes`
+
+        Returns:
+            list[GroupStripeState]: State of each stripe, version 0 for a stripe no group was created in yet
+        """
+        pass
+
+    @abstractmethod
+    async def create_article_group(
+        self,
+        article: NodeType,
+        profile: TermProfile,
+        stripes: dict[int, int],
+        force: bool = False,
+    ) -> tuple[Optional[str], list[GroupStripeState]]:
+        """Store an article into a new article group, unless a group was created in one of its stripes since they were read
+
+        The stripes are locked for the duration of the write, so of several
+        workers creating a group in a shared stripe concurrently, only the
+        first one succeeds and the others see the group it created.
+
+        Args:
+            article (NodeType): The article node
+            profile (TermProfile): Term profile of the article
+            stripes (dict[int, int]): Version of each stripe of the article when it was read
+            force (bool): Whether to create the group even if one of its stripes changed, still registering it in the stripes
+
+        Returns:
+            tuple[Optional[str], list[GroupStripeState]]: Id of the new group and no states, or None and the current state of every stripe if one of them changed
+        """
+        pass
+
+    @abstractmethod
+    async def get_article_profile(
+        self, article_id: str
+    ) -> Optional[tuple[str, TermProfile]]:
+        """Get the group id and stored term profile of an article
+
+        Args:
+            article_id (str): Id of the article
+
+        Returns:
+            Optional[tuple[str, TermProfile]]: The article's group id and term profile, None if the article is not stored
+        """
+        pass
+
+    @abstractmethod
+    async def update_article(
+        self, article: NodeType, profile: TermProfile, delta: TermProfile
+    ) -> Optional[str]:
+        """Store a revised article, applying only its changed terms to its group
+
+        The group's term weights and totals are left untouched if `delta` is empty.
+
+        Args:
+            article (NodeType): The article node, with the id it was stored with
+            profile (TermProfile): Term profile of the revised article
+            delta (TermProfile): Change of term weights from the stored profile (see `profile_delta`)
+
+        Returns:
+            Optional[str]: The article's group id, None if the article is not stored
+        """
+        pass
+
+    @abstractmethod
+    async def get_article_groups_changed_since(
+        self, since: Optional[datetime], hydration: ModelHydrationMode = "model"
+    ) -> list[GroupProfile]:
+        """Get the profiles of article groups updated after a point in time
+
+        Args:
+            since (Optional[datetime]): Lower bound of the update time, all groups if not provided
+            hydration (ModelHydrationMode): How the returned profiles are built from the records
+
+        Returns:
+            list[GroupProfile]: Profiles of the changed groups
+        """
+        pass
+
+    @abstractmethod
+    async def get_entity_groups_created_since(
+        self, since: Optional[datetime], hydration: ModelHydrationMode = "model"
+    ) -> list[EntityGroup]:
+        """Get the entity groups (known entity surface forms) created after a point in time
+
+        Args:
+            since (Optional[datetime]): Lower bound of the creation time, all groups if not provided
+            hydration (ModelHydrationMode): How the returned nodes are built from the records
+
+        Returns:
+            list[EntityGroup]: The created entity groups
+        """
+        pass
+
+    @abstractmethod
+    async def merge_article_groups(
+        self, merges: dict[str, list[str]], batch_size: int
+    ) -> int:
+        """Merge article groups into surviving groups
+
+        Args:
+            merges (dict[str, list[str]]): Absorbed group ids of each surviving group id
+            batch_size (int): Maximum number of absorbed groups per transaction
+
+        Returns:
+            int: Number of absorbed groups
+        """
+        pass
+
+    @abstractmethod
+    async def count_unassigned_articles(self, job_id: str) -> int:
+        """Count the articles not yet assigned to a shadow group of a backfill
+
+        Args:
+            job_id (str): Id of the backfill job
+
+        Returns:
+            int: Number of unassigned articles
+        """
+        pass
+
+    @abstractmethod
+    async def get_unassigned_articles_page(
+        self, job_id: str, after: Optional[tuple[datetime, str]], limit: int
+    ) -> list[tuple[Article, TermProfile]]:
+        """Get a page of the articles not yet assigned to a shadow group, by publication date
+
+        Args:
+            job_id (str): Id of the backfill job
+            after (Optional[tuple[datetime, str]]): Publication date and id of the last article of the previous page, None for the first page
+            limit (int): Maximum number of articles to return
+
+        Returns:
+            list[tuple[Article, TermProfile]]: Each article with its stored term profile
+        """
+        pass
+
+    @abstractmethod
+    async def write_shadow_memberships(
+        self, job_id: str, memberships: list[tuple[str, str, Optional[TermProfile]]]
+    ):
+        """Assign articles to shadow groups of a backfill
+
+        Args:
+            job_id (str): Id of the backfill job
+            memberships (list[tuple[str, str, Optional[TermProfile]]]): Article id, shadow group id, and the article's re-extracted profile if it replaces the stored one
+        """
+        pass
+
+    @abstractmethod
+    async def write_shadow_groups(self, job_id: str, groups: list[GroupProfile]):
+        """Write the profiles of shadow groups of a backfill, replacing previously written weights
+
+        Args:
+            job_id (str): Id of the backfill job
+            groups (list[GroupProfile]): Complete profiles of the groups
+        """
+        pass
+
+    @abstractmethod
+    async def drop_shadow_groups(self):
+        """Delete every shadow group and re-extracted article term of a previous backfill"""
+        pass
+
+    @abstractmethod
+    async def swap_shadow_groups(self, job_id: str, replace_article_terms: bool) -> int:
+        """Replace the article groups by the shadow groups of a backfill, in one transaction
+
+        Args:
+            job_id (str): Id of the backfill job
+            replace_article_terms (bool): Whether the articles' terms are replaced by their re-extracted terms
+
+        Returns:
+            int: Number of articles without a shadow group, the groups are only swapped if it is 0
+        """
+        pass
+
+    @abstractmethod
+    async def get_export_page(
+        self,
+        table: ExportTable,
+        published_from: Optional[datetime],
+        published_to: Optional[datetime],
+        after_id: Optional[str],
+        limit: int,
+    ) -> tuple[list[dict[str, Any]], Optional[str]]:
+        """Get a page of the rows of an exported table, paged by the id of each row's node
+
+        Args:
+            table (ExportTable): The table
+            published_from (Optional[datetime]): Only rows of articles published at or after this time
+            published_to (Optional[datetime]): Only rows of articles published before this time
+            after_id (Optional[str]): Cursor returned with the previous page, None for the first page
+            limit (int): Number of nodes read, edge tables may return several rows per node
+
+        Returns:
+            tuple[list[dict[str, Any]], Optional[str]]: The rows of the page and the cursor of the next page, None after the last page
+        """
+        pass
+
+    @abstractmethod
+    async def search_article_titles(
+        self, query: str, limit: int
+    ) -> list[tuple[str, float]]:
+        """Find the articles whose title best matches a text
+
+        Args:
+            query (str): Words of the title, matched as plain text
+            limit (int): Maximum number of articles to return
+
+        Returns:
+            list[tuple[str, float]]: Id and relevance score of each article, best first
+        """
+        pass
+
+    @abstractmethod
+    async def explain_statement(
+        self,
+        name: str,
+        parameters: Optional[dict[str, Any]] = None,
+        profile: bool = False,
+    ) -> dict[str, Any]:
+        """Get the execution plan of a registered statement
+
+        Args:
+            name (str): Name of the statement
+            parameters (Optional[dict[str, Any]]): Parameters of the statement, required to profile it
+            profile (bool): Whether to run the statement and measure its plan, instead of only planning it
+
+        Returns:
+            dict[str, Any]: The plan tree, in the database's own format
+        """
+        pass
@@ -0,0 +1,105 @@
+from collections.abc import Iterable, Mapping
+from typing import Any, TypeVar
+
+import numpy as np
+from pydantic import BaseModel
+
+from modules.clustering._scoring import entity_key
+from type.clustering import GroupProfile, GroupProfileColumns
+from type.database import ModelHydrationMode
+
+M = TypeVar("M", bound=BaseModel)
+
+
+def native_value(value: Any) -> Any:
+    """Convert a driver value (e.g. `neo4j.time.DateTime`) into its Python equivalent"""
+    to_native = getattr(value, "to_native", None)
+    if to_native is not None:
+        return to_native()
+    return value
+
+
+def hydrate_models(
+    rows: Iterable[Mapping[str, Any]], model_class: type[M], mode: ModelHydrationMode
+) -> list[M]:
+    """Build models from rows of property values
+
+    Args:
+        rows (Iterable[Mapping[str, Any]]): Property values of each model, as returned by the driver
+        model_class (type[M]): Model to build, e.g. a `BaseNode` subclass
+        mode (ModelHydrationMode): "model" validates every field, "trusted" uses `model_construct` on the driver's values and should only be used on data this package wrote
+
+    Returns:
+        list[M]: The built models
+    """
+    build = model_class.model_validate if mode == "model" else None
+    models = []
+    for row in rows:
+        values = {name: native_value(value) for name, value in row.items()}
+        models.append(
+            build(values)
+            if build is not None
+            else model_class.model_construct(**values)
+        )
+    return models
+
+
+def hydrate_group_profiles(
+    records: Iterable[Mapping[str, Any]], mode: ModelHydrationMode
+) -> list[GroupProfile]:
+    """Build group profiles from records of a statement returning group profiles"""
+    return hydrate_models(
+        (
+            {
+                "id": record["id"],
+                "created_on": record["created_on"],
+                "updated_on": record["updated_on"],
+                "entities": {
+                    entity_key(word, entity_type): weight
+                    for word, entity_type, weight in record["entities"]
+                },
+                "keywords": {word: weight for word, weight in record["keywords"]},
+            }
+            for record in records
+        ),
+        GroupProfile,
+        mode,
+    )
+
+
+def hydrate_group_profile_columns(
+    records: Iterable[Mapping[str, Any]],
+) -> GroupProfileColumns:
+    """Build column-oriented group profiles from records of a statement returning group profiles"""
+    ids: list[str] = []
+    created_on = []
+    updated_on = []
+    entity_keys: list[str] = []
+    entity_weights: list[float] = []
+    entity_groups: list[int] = []
+    keyword_keys: list[str] = []
+    keyword_weights: list[float] = []
+    keyword_groups: list[int] = []
+    for row, record in enumerate(records):
+        ids.append(record["id"])
+        created_on.append(native_value(record["created_on"]))
+        updated_on.append(native_value(record["updated_on"]))
+        for word, entity_type, weight in record["entities"]:
+            entity_keys.append(entity_key(word, entity_type))
+            entity_weights.append(weight)
+            entity_groups.append(row)
+        for word, weight in record["keywords"]:
+            keyword_keys.append(word)
+            keyword_weights.append(weight)
+            keyword_groups.append(row)
+    return GroupProfileColumns.model_construct(
+        ids=ids,
+        created_on=created_on,
+        updated_on=updated_on,
+        entity_keys=entity_keys,
+        entity_weights=np.asarray(entity_weights, dtype=np.float64),
+        entity_groups=np.asarray(entity_groups, dtype=np.int64),
+        keyword_keys=keyword_keys,
+        keyword_weights=np.asarray(keyword_weights, dtype=np.float64),
+        keyword_groups=np.asarray(keyword_groups, dtype=np.int64),
+    )
@@ -0,0 +1,763 @@
+import re
+from collections.abc import Iterator
+from typing import LiteralString, Type
+
+import modal.database.node  # noqa: F401 (registers the node classes)
+from errors.database import DatabaseStatementError
+from modal.database.node._common import BaseNode
+from type.database import CypherStatement, RelationshipType, StatementAccess
+
+# Properties of each relationship type of the graph layout
+RELATIONSHIP_PROPERTIES: dict[RelationshipType, set[str]] = {
+    "IN_GROUP": set(),
+    "MENTIONS": {"weight"},
+    "HAS_KEYWORD": {"weight"},
+    "IN_SHADOW_GROUP": set(),
+    "SHADOW_MENTIONS": {"weight"},
+    "SHADOW_HAS_KEYWORD": {"weight"},
+}
+
+_NODE_PATTERN = re.compile(r"\(\s*(\w*)\s*:\s*(\w+)\s*(\{[^}]*\})?")
+_RELATIONSHIP_PATTERN = re.compile(r"\[\s*(\w*)\s*:\s*(\w+)\s*(\{[^}]*\})?")
+_MAP_KEY = re.compile(r"(\w+)\s*:")
+_PROPERTY_ACCESS = re.compile(r"\b([A-Za-z_]\w*)\.(\w+)\b")
+
+
+class StatementRegistry:
+    """Named, parameterized Cypher statements validated against the node models
+
+    Every statement is registered once, when this module is imported, and its
+    labels, relationship types and property names are checked against the
+    `BaseNode` classes and `RELATIONSHIP_PROPERTIES`. Values are only ever
+    passed as parameters, so each statement has one constant text and Neo4j
+    plans it once and then serves it from its plan cache.
+    """
+
+    __statements: dict[str, CypherStatement]
+    __node_properties: dict[str, set[str]]
+    __relationship_properties: dict[str, set[str]]
+
+    def __init__(
+        self,
+        node_classes: list[Type[BaseNode]],
+        relationship_properties: dict[RelationshipType, set[str]],
+    ):
+        """Initialize an empty registry
+
+        Args:
+            node_classes (list[Type[BaseNode]]): Node models whose labels and fields statements may use
+            relationship_properties (dict[RelationshipType, set[str]]): Relationship types and their properties statements may use
+        """
+        self.__statements = {}
+        self.__node_properties = {
+            node_class.node_type(): set(node_class.model_fields)
+            for node_class in node_classes
+        }
+        self.__relationship_properties = dict(relationship_properties)
+
+    def __getitem__(self, name: str) -> CypherStatement:
+        return self.__statements[name]
+
+    def __iter__(self) -> Iterator[CypherStatement]:
+        return iter(self.__statements.values())
+
+    def register(
+        self, name: str, text: LiteralString, *, access: StatementAccess
+    ) -> CypherStatement:
+        """Validate and register a statement
+
+        Args:
+            name (str): Unique name of the statement
+            text (LiteralString): Cypher text, with every value passed as a `$parameter`
+            access (StatementAccess): Kind of managed transaction the statement runs in
+
+        Returns:
+            CypherStatement: The registered statement
+
+        Raises:
+            DatabaseStatementError: If the name is taken, or the text uses an unknown label, relationship type or property
+        """
+        if name in self.__statements:
+            raise DatabaseStatementError(name, "a statement with this name exists")
+        text = "\n".join(line.strip() for line in text.strip().splitlines())
+        self.__validate(name, text)
+        statement = CypherStatement(name=name, text=text, access=access)
+        self.__statements[name] = statement
+        return statement
+
+    def __validate(self, name: str, text: str):
+        # Labels / relationship types each variable may be bound to
+        variables: dict[str, set[tuple[str, str]]] = {}
+        for pattern, kind, known in (
+            (_NODE_PATTERN, "label", self.__node_properties),
+            (
+                _RELATIONSHIP_PATTERN,
+                "relationship type",
+                self.__relationship_properties,
+            ),
+        ):
+            for match in pattern.finditer(text):
+                variable, label, properties = match.groups()
+                if label not in known:
+                    raise DatabaseStatementError(name, f"unknown {kind} '{label}'")
+                if variable:
+                    variables.setdefault(variable, set()).add((kind, label))
+                for key in _MAP_KEY.findall(properties or ""):
+                    if key not in known[label]:
+                        raise DatabaseStatementError(
+                            name, f"unknown property '{key}' of {kind} '{label}'"
+                        )
+        for variable, key in _PROPERTY_ACCESS.findall(text):
+            bindings = variables.get(variable)
+            if bindings is None:
+                # Not a node or relationship, e.g. an UNWIND row
+                continue
+            if not any(
+                key
+                in (
+                    self.__node_properties
+                    if kind == "label"
+                    else self.__relationship_properties
+                )[label]
+                for kind, label in bindings
+            ):
+                labels = "/".join(sorted(label for _, label in bindings))
+                raise DatabaseStatementError(
+                    name, f"unknown property '{key}' of '{variable}' ({labels})"
+                )
+
+
+STATEMENTS = StatementRegistry(BaseNode.all_node_classes(), RELATIONSHIP_PROPERTIES)
+
+# Graph layout of clustered articles:
+#   (:Article)-[:IN_GROUP]->(:ArticleGroup)
+#   (:Article|ArticleGroup)-[:MENTIONS {weight}]->(:EntityGroup {word, entity_type})
+#   (:Article|ArticleGroup)-[:HAS_KEYWORD {weight}]->(:KeywordGroup {word})
+# The weights of a group's edges are the sums of its articles' weights and the
+# group's `total_*_scorable` properties are the sums of its edge weights.
+#
+# A backfill rebuilds the groups as (:ShadowArticleGroup) nodes linked by the
+# IN_SHADOW_GROUP and SHADOW_* relationships, then swaps them in at once.
+
+_SAVE_ARTICLE_TERMS = """
+MERGE (a:Article {id: $article_id})
+SET a += $properties
+MERGE (a)-[:IN_GROUP]->(g)
+FOREACH (e IN $entities |
+    MERGE (eg:EntityGroup {word: e.word, entity_type: e.entity_type})
+    ON CREATE SET eg.id = randomUUID(), eg.created_on = $now, eg.updated_on = $now
+    MERGE (a)-[am:MENTIONS]->(eg)
+    ON CREATE SET eg.article_count = coalesce(eg.article_count, 0) + 1
+    SET am.weight = e.weight
+    MERGE (g)-[gm:MENTIONS]->(eg)
+    ON CREATE SET gm.weight = 0.0
+    SET gm.weight = gm.weight + e.weight
+)
+FOREACH (k IN $keywords |
+    MERGE (kg:KeywordGroup {word: k.word})
+    ON CREATE SET kg.id = randomUUID(), kg.created_on = $now, kg.updated_on = $now
+    MERGE (a)-[ak:HAS_KEYWORD]->(kg)
+    ON CREATE SET kg.article_count = coalesce(kg.article_count, 0) + 1
+    SET ak.weight = k.weight
+    MERGE (g)-[gk:HAS_KEYWORD]->(kg)
+    ON CREATE SET gk.weight = 0.0
+    SET gk.weight = gk.weight + k.weight
+)
+RETURN g.id AS group_id
+"""
+
+_GROUP_PROFILE_RETURN = """
+RETURN g.id AS id,
+    g.created_on AS created_on,
+    g.updated_on AS updated_on,
+    [(g)-[r:MENTIONS]->(eg:EntityGroup) | [eg.word, eg.entity_type, r.weight]] AS entities,
+    [(g)-[r:HAS_KEYWORD]->(kg:KeywordGroup) | [kg.word, r.weight]] AS keywords
+"""
+
+FIND_CANDIDATE_ARTICLE_GROUPS = STATEMENTS.register(
+    "find_candidate_article_groups",
+    """
+    CALL {
+        UNWIND $entities AS e
+        MATCH (eg:EntityGroup {word: e.word, entity_type: e.entity_type})
+        WHERE $max_term_articles IS NULL OR coalesce(eg.article_count, 0) <= $max_term_articles
+        MATCH (eg)<-[:MENTIONS]-(g:ArticleGroup)
+        RETURN g
+        UNION ALL
+        UNWIND $keywords AS word
+        MATCH (kg:KeywordGroup {word: word})
+        WHERE $max_term_articles IS NULL OR coalesce(kg.article_count, 0) <= $max_term_articles
+        MATCH (kg)<-[:HAS_KEYWORD]-(g:ArticleGroup)
+        RETURN g
+    }
+    WITH g, count(*) AS shared_terms
+    ORDER BY shared_terms DESC
+    LIMIT $limit
+    """
+    + _GROUP_PROFILE_RETURN,
+    access="read",
+)
+
+GET_TERM_POSTINGS = STATEMENTS.register(
+    "get_term_postings",
+    """
+    UNWIND $entities AS e
+    MATCH (eg:EntityGroup {word: e.word, entity_type: e.entity_type})
+    WHERE $max_term_articles IS NULL OR coalesce(eg.article_count, 0) <= $max_term_articles
+    MATCH (eg)<-[:MENTIONS]-(g:ArticleGroup)
+    RETURN "entity" AS kind, e.key AS key, collect(g.id) AS group_ids
+    UNION ALL
+    UNWIND $keywords AS word
+    MATCH (kg:KeywordGroup {word: word})
+    WHERE $max_term_articles IS NULL OR coalesce(kg.article_count, 0) <= $max_term_articles
+    MATCH (kg)<-[:HAS_KEYWORD]-(g:ArticleGroup)
+    RETURN "keyword" AS kind, word AS key, collect(g.id) AS group_ids
+    """,
+    access="read",
+)
+
+GET_ARTICLE_GROUPS = STATEMENTS.register(
+    "get_article_groups",
+    """
+    UNWIND $group_ids AS group_id
+    MATCH (g:ArticleGroup {id: group_id})
+    """
+    + _GROUP_PROFILE_RETURN,
+    access="read",
+)
+
+GET_ARTICLE_GROUPS_CHANGED_SINCE = STATEMENTS.register(
+    "get_article_groups_changed_since",
+    """
+    MATCH (g:ArticleGroup)
+    WHERE $since IS NULL OR g.updated_on > $since
+    """
+    + _GROUP_PROFILE_RETURN,
+    access="read",
+)
+
+GET_ENTITY_GROUPS_CREATED_SINCE = STATEMENTS.register(
+    "get_entity_groups_created_since",
+    """
+    MATCH (eg:EntityGroup)
+    WHERE $since IS NULL OR eg.created_on > $since
+    RETURN properties(eg) AS properties
+    """,
+    access="read",
+)
+
+# Uses the full-text index declared by `Article.indexes`
+SEARCH_ARTICLE_TITLES = STATEMENTS.register(
+    "search_article_titles",
+    """
+    CALL db.index.fulltext.queryNodes("Article_title_fulltext", $query, {limit: $limit})
+    YIELD node, score
+    RETURN node.id AS id, score
+    """,
+    access="read",
+)
+
+# Document frequencies of the terms, for IDF weighting and stop-listing
+COUNT_ARTICLES = STATEMENTS.register(
+    "count_articles",
+    """
+    MATCH (a:Article)
+    RETURN count(a) AS articles
+    """,
+    access="read",
+)
+
+GET_COMMON_TERMS = STATEMENTS.register(
+    "get_common_terms",
+    """
+    MATCH (eg:EntityGroup)
+    WHERE eg.article_count >= $min_articles
+    RETURN "entity" AS kind, eg.word AS word, eg.entity_type AS entity_type, eg.article_count AS articles
+    UNION ALL
+    MATCH (kg:KeywordGroup)
+    WHERE kg.article_count >= $min_articles
+    RETURN "keyword" AS kind, kg.word AS word, null AS entity_type, kg.article_count AS articles
+    """,
+    access="read",
+)
+
+RECOUNT_ENTITY_ARTICLES = STATEMENTS.register(
+    "recount_entity_articles",
+    """
+    MATCH (eg:EntityGroup)
+    SET eg.article_count = COUNT { (eg)<-[:MENTIONS]-(:Article) }
+    """,
+    access="write",
+)
+
+RECOUNT_KEYWORD_ARTICLES = STATEMENTS.register(
+    "recount_keyword_articles",
+    """
+    MATCH (kg:KeywordGroup)
+    SET kg.article_count = COUNT { (kg)<-[:HAS_KEYWORD]-(:Article) }
+    """,
+    access="write",
+)
+
+SAVE_ARTICLE_INTO_GROUP = STATEMENTS.register(
+    "save_article_into_group",
+    """
+    MATCH (g:ArticleGroup {id: $group_id})
+    SET g.total_entity_scorable = g.total_entity_scorable + $total_entity,
+        g.total_keyword_scorable = g.total_keyword_scorable + $total_keyword,
+        g.version = coalesce(g.version, 0) + 1,
+        g.updated_on = $now
+    WITH g
+    """
+    + _SAVE_ARTICLE_TERMS,
+    access="write",
+)
+
+SAVE_ARTICLE_INTO_NEW_GROUP = STATEMENTS.register(
+    "save_article_into_new_group",
+    """
+    CREATE (g:ArticleGroup {
+        id: $group_id,
+        total_entity_scorable: $total_entity,
+        total_keyword_scorable: $total_keyword,
+        version: 1,
+        created_on: $now,
+        updated_on: $now
+    })
+    WITH g
+    """
+    + _SAVE_ARTICLE_TERMS,
+    access="write",
+)
+
+# Optimistic group creation, see `Neo4jAdapter.create_article_group`
+GET_GROUP_STRIPES = STATEMENTS.register(
+    "get_group_stripes",
+    """
+    UNWIND $stripes AS stripe
+    OPTIONAL MATCH (s:GroupStripe {stripe: stripe})
+    RETURN stripe,
+        coalesce(s.version, 0) AS version,
+        coalesce(s.recent_group_ids, []) AS recent_group_ids
+    """,
+    access="read",
+)
+
+# Writing to the stripes takes their write locks until the transaction ends,
+# which only serializes the creations sharing a stripe
+LOCK_GROUP_STRIPES = STATEMENTS.register(
+    "lock_group_stripes",
+    """
+    UNWIND $stripes AS stripe
+    MERGE (s:GroupStripe {stripe: stripe})
+    ON CREATE SET s.id = randomUUID(),
+        s.version = 0,
+        s.recent_group_ids = [],
+        s.created_on = $now
+    SET s.updated_on = $now
+    RETURN s.stripe AS stripe, s.version AS version, s.recent_group_ids AS recent_group_ids
+    """,
+    access="write",
+)
+
+BUMP_GROUP_STRIPES = STATEMENTS.register(
+    "bump_group_stripes",
+    """
+    UNWIND $stripes AS stripe
+    MATCH (s:GroupStripe {stripe: stripe})
+    SET s.version = s.version + 1,
+        s.recent_group_ids = ([$group_id] + s.recent_group_ids)[..$recent_limit]
+    """,
+    access="write",
+)
+
+GET_ARTICLE_PROFILE = STATEMENTS.register(
+    "get_article_profile",
+    """
+    MATCH (a:Article {id: $article_id})-[:IN_GROUP]->(g:ArticleGroup)
+    RETURN g.id AS group_id,
+        [(a)-[r:MENTIONS]->(eg:EntityGroup) | [eg.word, eg.entity_type, r.weight]] AS entities,
+        [(a)-[r:HAS_KEYWORD]->(kg:KeywordGroup) | [kg.word, r.weight]] AS keywords
+    """,
+    access="read",
+)
+
+UPDATE_ARTICLE_PROPERTIES = STATEMENTS.register(
+    "update_article_properties",
+    """
+    MATCH (a:Article {id: $article_id})-[:IN_GROUP]->(g:ArticleGroup)
+    SET a += $properties
+    RETURN g.id AS group_id
+    """,
+    access="write",
+)
+
+# Only the changed terms of a revised article are passed, with their new
+# weight on the article and their weight delta on its group
+UPDATE_ARTICLE_TERMS = STATEMENTS.register(
+    "update_article_terms",
+    """
+    MATCH (a:Article {id: $article_id})-[:IN_GROUP]->(g:ArticleGroup)
+    SET a += $properties,
+        g.total_entity_scorable = g.total_entity_scorable + $total_entity_delta,
+        g.total_keyword_scorable = g.total_keyword_scorable + $total_keyword_delta,
+        g.version = coalesce(g.version, 0) + 1,
+        g.updated_on = $now
+    FOREACH (e IN $entities |
+        MERGE (eg:EntityGroup {word: e.word, entity_type: e.entity_type})
+        ON CREATE SET eg.id = randomUUID(), eg.created_on = $now, eg.updated_on = $now
+        MERGE (a)-[am:MENTIONS]->(eg)
+        ON CREATE SET eg.article_count = coalesce(eg.article_count, 0) + 1
+        SET am.weight = e.weight
+        MERGE (g)-[gm:MENTIONS]->(eg)
+        ON CREATE SET gm.weight = 0.0
+        SET gm.weight = gm.weight + e.delta
+        FOREACH (_ IN CASE WHEN e.weight <= 0 THEN [1] ELSE [] END |
+            SET eg.article_count = eg.article_count - 1
+            DELETE am
+        )
+        FOREACH (_ IN CASE WHEN gm.weight <= $epsilon THEN [1] ELSE [] END | DELETE gm)
+    )
+    FOREACH (k IN $keywords |
+        MERGE (kg:KeywordGroup {word: k.word})
+        ON CREATE SET kg.id = randomUUID(), kg.created_on = $now, kg.updated_on = $now
+        MERGE (a)-[ak:HAS_KEYWORD]->(kg)
+        ON CREATE SET kg.article_count = coalesce(kg.article_count, 0) + 1
+        SET ak.weight = k.weight
+        MERGE (g)-[gk:HAS_KEYWORD]->(kg)
+        ON CREATE SET gk.weight = 0.0
+        SET gk.weight = gk.weight + k.delta
+        FOREACH (_ IN CASE WHEN k.weight <= 0 THEN [1] ELSE [] END |
+            SET kg.article_count = kg.article_count - 1
+            DELETE ak
+        )
+        FOREACH (_ IN CASE WHEN gk.weight <= $epsilon THEN [1] ELSE [] END | DELETE gk)
+    )
+    RETURN g.id AS group_id
+    """,
+    access="write",
+)
+
+# Merging article groups, run together in one transaction per batch of pairs
+MERGE_GROUP_MEMBERSHIPS = STATEMENTS.register(
+    "merge_group_memberships",
+    """
+    UNWIND $pairs AS pair
+    MATCH (survivor:ArticleGroup {id: pair.survivor})
+    MATCH (a:Article)-[old:IN_GROUP]->(:ArticleGroup {id: pair.absorbed})
+    MERGE (a)-[:IN_GROUP]->(survivor)
+    DELETE old
+    """,
+    access="write",
+)
+
+MERGE_GROUP_MENTIONS = STATEMENTS.register(
+    "merge_group_mentions",
+    """
+    UNWIND $pairs AS pair
+    MATCH (survivor:ArticleGroup {id: pair.survivor})
+    MATCH (:ArticleGroup {id: pair.absorbed})-[old:MENTIONS]->(term:EntityGroup)
+    MERGE (survivor)-[new:MENTIONS]->(term)
+    ON CREATE SET new.weight = 0.0
+    SET new.weight = new.weight + old.weight
+    DELETE old
+    """,
+    access="write",
+)
+
+MERGE_GROUP_KEYWORDS = STATEMENTS.register(
+    "merge_group_keywords",
+    """
+    UNWIND $pairs AS pair
+    MATCH (survivor:ArticleGroup {id: pair.survivor})
+    MATCH (:ArticleGroup {id: pair.absorbed})-[old:HAS_KEYWORD]->(term:KeywordGroup)
+    MERGE (survivor)-[new:HAS_KEYWORD]->(term)
+    ON CREATE SET new.weight = 0.0
+    SET new.weight = new.weight + old.weight
+    DELETE old
+    """,
+    access="write",
+)
+
+MERGE_GROUP_TOTALS = STATEMENTS.register(
+    "merge_group_totals",
+    """
+    UNWIND $pairs AS pair
+    MATCH (survivor:ArticleGroup {id: pair.survivor})
+    MATCH (absorbed:ArticleGroup {id: pair.absorbed})
+    SET survivor.total_entity_scorable = survivor.total_entity_scorable + absorbed.total_entity_scorable,
+        survivor.total_keyword_scorable = survivor.total_keyword_scorable + absorbed.total_keyword_scorable,
+        survivor.version = coalesce(survivor.version, 0) + 1,
+        survivor.updated_on = $now
+    DETACH DELETE absorbed
+    """,
+    access="write",
+)
+
+# Backfill into the shadow namespace
+COUNT_UNASSIGNED_ARTICLES = STATEMENTS.register(
+    "count_unassigned_articles",
+    """
+    MATCH (a:Article)
+    WHERE NOT (a)-[:IN_SHADOW_GROUP]->(:ShadowArticleGroup {job_id: $job_id})
+    RETURN count(a) AS articles
+    """,
+    access="read",
+)
+
+# Keyset paging by (published_date, id), so a page costs the same wherever it is
+GET_UNASSIGNED_ARTICLES_PAGE = STATEMENTS.register(
+    "get_unassigned_articles_page",
+    """
+    MATCH (a:Article)
+    WHERE NOT (a)-[:IN_SHADOW_GROUP]->(:ShadowArticleGroup {job_id: $job_id})
+        AND ($after_published IS NULL
+            OR a.published_date > $after_published
+            OR (a.published_date = $after_published AND a.id > $after_id))
+    WITH a
+    ORDER BY a.published_date, a.id
+    LIMIT $limit
+    RETURN properties(a) AS properties,
+        [(a)-[r:MENTIONS]->(eg:EntityGroup) | [eg.word, eg.entity_type, r.weight]] AS entities,
+        [(a)-[r:HAS_KEYWORD]->(kg:KeywordGroup) | [kg.word, r.weight]] AS keywords
+    """,
+    access="read",
+)
+
+WRITE_SHADOW_MEMBERSHIPS = STATEMENTS.register(
+    "write_shadow_memberships",
+    """
+    UNWIND $memberships AS membership
+    MATCH (a:Article {id: membership.article_id})
+    MERGE (g:ShadowArticleGroup {id: membership.group_id})
+    ON CREATE SET g.job_id = $job_id,
+        g.total_entity_scorable = 0.0,
+        g.total_keyword_scorable = 0.0,
+        g.created_on = $now,
+        g.updated_on = $now
+    MERGE (a)-[:IN_SHADOW_GROUP]->(g)
+    FOREACH (e IN membership.entities |
+        MERGE (eg:EntityGroup {word: e.word, entity_type: e.entity_type})
+        ON CREATE SET eg.id = randomUUID(), eg.created_on = $now, eg.updated_on = $now
+        MERGE (a)-[am:SHADOW_MENTIONS]->(eg)
+        SET am.weight = e.weight
+    )
+    FOREACH (k IN membership.keywords |
+        MERGE (kg:KeywordGroup {word: k.word})
+        ON CREATE SET kg.id = randomUUID(), kg.created_on = $now, kg.updated_on = $now
+        MERGE (a)-[ak:SHADOW_HAS_KEYWORD]->(kg)
+        SET ak.weight = k.weight
+    )
+    """,
+    access="write",
+)
+
+# Weights are absolute, so a group can be written again after it grew
+WRITE_SHADOW_GROUPS = STATEMENTS.register(
+    "write_shadow_groups",
+    """
+    UNWIND $groups AS group
+    MERGE (g:ShadowArticleGroup {id: group.id})
+    ON CREATE SET g.job_id = $job_id, g.created_on = $now
+    SET g.total_entity_scorable = group.total_entity,
+        g.total_keyword_scorable = group.total_keyword,
+        g.updated_on = $now
+    FOREACH (e IN group.entities |
+        MERGE (eg:EntityGroup {word: e.word, entity_type: e.entity_type})
+        ON CREATE SET eg.id = randomUUID(), eg.created_on = $now, eg.updated_on = $now
+        MERGE (g)-[gm:MENTIONS]->(eg)
+        SET gm.weight = e.weight
+    )
+    FOREACH (k IN group.keywords |
+        MERGE (kg:KeywordGroup {word: k.word})
+        ON CREATE SET kg.id = randomUUID(), kg.created_on = $now, kg.updated_on = $now
+        MERGE (g)-[gk:HAS_KEYWORD]->(kg)
+        SET gk.weight = k.weight
+    )
+    """,
+    access="write",
+)
+
+DROP_SHADOW_GROUPS = STATEMENTS.register(
+    "drop_shadow_groups",
+    """
+    MATCH (g:ShadowArticleGroup)
+    DETACH DELETE g
+    """,
+    access="write",
+)
+
+DROP_SHADOW_ARTICLE_TERMS = STATEMENTS.register(
+    "drop_shadow_article_terms",
+    """
+    MATCH (:Article)-[r:SHADOW_MENTIONS|SHADOW_HAS_KEYWORD]->()
+    DELETE r
+    """,
+    access="write",
+)
+
+# Swapping the shadow namespace in, run together in one transaction
+SWAP_DROP_LIVE_GROUPS = STATEMENTS.register(
+    "swap_drop_live_groups",
+    """
+    MATCH (g:ArticleGroup)
+    DETACH DELETE g
+    """,
+    access="write",
+)
+
+SWAP_PROMOTE_SHADOW_GROUPS = STATEMENTS.register(
+    "swap_promote_shadow_groups",
+    """
+    MATCH (g:ShadowArticleGroup {job_id: $job_id})
+    SET g:ArticleGroup, g.updated_on = $now
+    REMOVE g:ShadowArticleGroup, g.job_id
+    """,
+    access="write",
+)
+
+SWAP_MEMBERSHIPS = STATEMENTS.register(
+    "swap_memberships",
+    """
+    MATCH (a:Article)-[r:IN_SHADOW_GROUP]->(g:ArticleGroup)
+    CREATE (a)-[:IN_GROUP]->(g)
+    DELETE r
+    """,
+    access="write",
+)
+
+SWAP_ARTICLE_MENTIONS = STATEMENTS.register(
+    "swap_article_mentions",
+    """
+    MATCH (a:Article)
+    WHERE (a)-[:SHADOW_MENTIONS]->(:EntityGroup)
+    OPTIONAL MATCH (a)-[old:MENTIONS]->(:EntityGroup)
+    DELETE old
+    WITH DISTINCT a
+    MATCH (a)-[r:SHADOW_MENTIONS]->(eg:EntityGroup)
+    CREATE (a)-[:MENTIONS {weight: r.weight}]->(eg)
+    DELETE r
+    """,
+    access="write",
+)
+
+SWAP_ARTICLE_KEYWORDS = STATEMENTS.register(
+    "swap_article_keywords",
+    """
+    MATCH (a:Article)
+    WHERE (a)-[:SHADOW_HAS_KEYWORD]->(:KeywordGroup)
+    OPTIONAL MATCH (a)-[old:HAS_KEYWORD]->(:KeywordGroup)
+    DELETE old
+    WITH DISTINCT a
+    MATCH (a)-[r:SHADOW_HAS_KEYWORD]->(kg:KeywordGroup)
+    CREATE (a)-[:HAS_KEYWORD {weight: r.weight}]->(kg)
+    DELETE r
+    """,
+    access="write",
+)
+
+# Columnar export, paged by the id of each row's node. An article is in range
+# by its publication date and a group or entity group when one of its articles is.
+_EXPORT_ARTICLE_IN_RANGE = """
+    ($published_from IS NULL OR a.published_date >= $published_from)
+    AND ($published_to IS NULL OR a.published_date < $published_to)
+"""
+
+_EXPORT_UNBOUNDED = "($published_from IS NULL AND $published_to IS NULL)"
+
+EXPORT_ARTICLES = STATEMENTS.register(
+    "export_articles",
+    """
+    MATCH (a:Article)
+    WHERE ($after_id IS NULL OR a.id > $after_id) AND
+    """
+    + _EXPORT_ARTICLE_IN_RANGE
+    + """
+    WITH a
+    ORDER BY a.id
+    LIMIT $limit
+    RETURN a.id AS cursor, [properties(a)] AS rows
+    """,
+    access="read",
+)
+
+EXPORT_MEMBERSHIPS = STATEMENTS.register(
+    "export_memberships",
+    """
+    MATCH (a:Article)
+    WHERE ($after_id IS NULL OR a.id > $after_id) AND
+    """
+    + _EXPORT_ARTICLE_IN_RANGE
+    + """
+    WITH a
+    ORDER BY a.id
+    LIMIT $limit
+    RETURN a.id AS cursor,
+        [(a)-[:IN_GROUP]->(g:ArticleGroup) | {article_id: a.id, group_id: g.id}] AS rows
+    """,
+    access="read",
+)
+
+EXPORT_ARTICLE_GROUPS = STATEMENTS.register(
+    "export_article_groups",
+    """
+    MATCH (g:ArticleGroup)
+    WHERE ($after_id IS NULL OR g.id > $after_id)
+        AND ("""
+    + _EXPORT_UNBOUNDED
+    + """ OR EXISTS {
+            MATCH (a:Article)-[:IN_GROUP]->(g)
+            WHERE """
+    + _EXPORT_ARTICLE_IN_RANGE
+    + """
+        })
+    WITH g
+    ORDER BY g.id
+    LIMIT $limit
+    RETURN g.id AS cursor, [properties(g)] AS rows
+    """,
+    access="read",
+)
+
+EXPORT_GROUP_MENTIONS = STATEMENTS.register(
+    "export_group_mentions",
+    """
+    MATCH (g:ArticleGroup)
+    WHERE ($after_id IS NULL OR g.id > $after_id)
+        AND ("""
+    + _EXPORT_UNBOUNDED
+    + """ OR EXISTS {
+            MATCH (a:Article)-[:IN_GROUP]->(g)
+            WHERE """
+    + _EXPORT_ARTICLE_IN_RANGE
+    + """
+        })
+    WITH g
+    ORDER BY g.id
+    LIMIT $limit
+    RETURN g.id AS cursor,
+        [(g)-[r:MENTIONS]->(eg:EntityGroup) | {group_id: g.id, entity_group_id: eg.id, weight: r.weight}] AS rows
+    """,
+    access="read",
+)
+
+EXPORT_ENTITY_GROUPS = STATEMENTS.register(
+    "export_entity_groups",
+    """
+    MATCH (eg:EntityGroup)
+    WHERE ($after_id IS NULL OR eg.id > $after_id)
+        AND ("""
+    + _EXPORT_UNBOUNDED
+    + """ OR EXISTS {
+            MATCH (a:Article)-[:MENTIONS]->(eg)
+            WHERE """
+    + _EXPORT_ARTICLE_IN_RANGE
+    + """
+        })
+    WITH eg
+    ORDER BY eg.id
+    LIMIT $limit
+    RETURN eg.id AS cursor, [properties(eg)] AS rows
+    """,
+    access="read",
+)
@@ -0,0 +1,223 @@
+"""Index advisor, flags the registered statements whose plan scans whole labels
+
+Run with `python -m modules.database.advisor [--parameters FILE.json]`, with
+the credentials in the `NEO4J_URI`, `NEO4J_USERNAME`, `NEO4J_PASSWORD` and
+`NEO4J_DATABASE_NAME` environment variables (or a `.env` file), after the
+database was migrated. Every statement is planned with EXPLAIN; the ones given
+parameters in the JSON file (`{"statement_name": {"parameter": value}}`) are
+run with PROFILE in a rolled back transaction instead. Exits with status 1 if a
+data-path statement scans a label or a statement cannot be planned.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+from collections.abc import Iterator, Sequence
+from typing import Any, Optional
+
+from errors.database import DatabaseConnectionAlreadyExists, DatabaseStatementError
+from modules.database._base import BaseAdapter
+from modules.database._statements import STATEMENTS
+from type.database import StatementPlanReport
+
+# Operators reading every node or relationship of a label or type, or of the graph
+_SCAN_OPERATORS = (
+    "AllNodesScan",
+    "NodeByLabelScan",
+    "NodeByLabelsScan",
+    "AllRelationshipsScan",
+    "RelationshipTypeScan",
+)
+
+# Statements that go over whole labels by design: passes over every article or
+# term (backfill, recount, export) and incremental reloads, which are full
+# loads when nothing was loaded yet
+EXPECTED_SCANS = frozenset(
+    {
+        "get_article_groups_changed_since",
+        "get_entity_groups_created_since",
+        "count_articles",
+        "recount_entity_articles",
+        "recount_keyword_articles",
+        "count_unassigned_articles",
+        "get_unassigned_articles_page",
+        "drop_shadow_groups",
+        "drop_shadow_article_terms",
+        "swap_drop_live_groups",
+        "swap_promote_shadow_groups",
+        "swap_memberships",
+        "swap_article_mentions",
+        "swap_article_keywords",
+        "export_articles",
+        "export_memberships",
+        "export_article_groups",
+        "export_group_mentions",
+        "export_entity_groups",
+    }
+)
+# A stale or misspelled name would go unnoticed, or allow another statement's scans
+_unregistered = sorted(EXPECTED_SCANS - {statement.name for statement in STATEMENTS})
+if _unregistered:
+    raise DatabaseStatementError(
+        _unregistered[0], "listed in EXPECTED_SCANS but not registered"
+    )
+
+
+def _operators(plan: dict[str, Any]) -> Iterator[tuple[str, dict[str, Any]]]:
+    """Operators of a plan tree, depth first, without their planner suffix ("NodeIndexSeek@neo4j")"""
+    operator = plan.get("operatorType", "").split("@", 1)[0]
+    yield operator, plan
+    for child in plan.get("children", []):
+        yield from _operators(child)
+
+
+def _arguments(plan: dict[str, Any]) -> dict[str, Any]:
+    """Arguments of a plan operator (`Details`, `EstimatedRows`, ...), keyed "args" in the summary"""
+    return plan.get("args", {})
+
+
+def _describe(operator: str, plan: dict[str, Any]) -> str:
+    details = _arguments(plan).get("Details")
+    return f"{operator}({details})" if details else operator
+
+
+def plan_report(name: str, plan: dict[str, Any]) -> StatementPlanReport:
+    """Index usage of the plan of a registered statement
+
+    Args:
+        name (str): Name of the statement
+        plan (dict[str, Any]): Its plan tree, as returned by `explain_statement`
+
+    Returns:
+        StatementPlanReport: The scans and index lookups of the plan
+    """
+    scans: list[str] = []
+    index_lookups: list[str] = []
+    db_hits: Optional[int] = None
+    for operator, node in _operators(plan):
+        if any(scan in operator for scan in _SCAN_OPERATORS):
+            scans.append(_describe(operator, node))
+        elif "Index" in operator:
+            index_lookups.append(_describe(operator, node))
+        hits = node.get("dbHits", _arguments(node).get("DbHits"))
+        if hits is not None:
+            db_hits = (db_hits or 0) + hits
+    return StatementPlanReport(
+        statement=name,
+        access=STATEMENTS[name].access,
+        scans=scans,
+        index_lookups=index_lookups,
+        estimated_rows=_arguments(plan).get("EstimatedRows"),
+        db_hits=db_hits,
+        expected_scans=name in EXPECTED_SCANS,
+        error=None,
+    )
+
+
+async def review_statement_plans(
+    database: BaseAdapter,
+    parameters: Optional[dict[str, dict[str, Any]]] = None,
+    names: Optional[Sequence[str]] = None,
+) -> list[StatementPlanReport]:
+    """Plan the registered statements and report their label scans
+
+    Args:
+        database (BaseAdapter): Connected and migrated database adapter
+        parameters (Optional[dict[str, dict[str, Any]]]): Parameters of the statements to profile, by statement name
+        names (Optional[Sequence[str]]): Statements to review, all of them if not provided
+
+    Returns:
+        list[StatementPlanReport]: A report per statement, in registration order
+    """
+    parameters = parameters or {}
+    reports: list[StatementPlanReport] = []
+    for statement in STATEMENTS:
+        if names is not None and statement.name not in names:
+            continue
+        try:
+            plan = await database.explain_statement(
+                statement.name,
+                parameters.get(statement.name),
+                profile=statement.name in parameters,
+            )
+        except Exception as e:
+            logging.warning("Failed to plan statement '%s': %s", statement.name, e)
+            reports.append(
+                StatementPlanReport(
+                    statement=statement.name,
+                    access=statement.access,
+                    scans=[],
+                    index_lookups=[],
+                    estimated_rows=None,
+                    db_hits=None,
+                    expected_scans=statement.name in EXPECTED_SCANS,
+                    error=str(e),
+                )
+            )
+            continue
+        reports.append(plan_report(statement.name, plan))
+    return reports
+
+
+async def _review(args: argparse.Namespace) -> list[StatementPlanReport]:
+    from dotenv import load_dotenv
+
+    from modules.database import Neo4jAdapter
+
+    load_dotenv()
+    database = Neo4jAdapter(
+        os.getenv("NEO4J_URI", ""),
+        os.getenv("NEO4J_USERNAME", ""),
+        os.getenv("NEO4J_PASSWORD", ""),
+        os.getenv("NEO4J_DATABASE_NAME", ""),
+    )
+    error = await database.connect()
+    if error is not None and not isinstance(error, DatabaseConnectionAlreadyExists):
+        raise error
+    parameters = None
+    if args.parameters is not None:
+        with open(args.parameters) as file:
+            parameters = json.load(file)
+    return await review_statement_plans(database, parameters, args.statements)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--parameters", help="JSON file of the statements to profile")
+    parser.add_argument(
+        "--statements",
+        nargs="+",
+        choices=[statement.name for statement in STATEMENTS],
+        help="Statements to review, all of them by default",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    flagged = 0
+    failed = 0
+    for report in asyncio.run(_review(args)):
+        if report.error is not None:
+            status = "FAILED"
+            failed += 1
+        elif not report.scans:
+            status = "ok"
+        elif report.expected_scans:
+            status = "scan (expected)"
+        else:
+            status = "SCAN"
+            flagged += 1
+        hits = f"  {report.db_hits} db hits" if report.db_hits is not None else ""
+        print(f"{report.statement:36s} {report.access:5s} {status}{hits}")
+        for scan in report.scans:
+            print(f"    {scan}")
+        if report.error is not None:
+            print(f"    {report.error}")
+    print(f"{flagged} data-path statements scan a label, {failed} failed to plan")
+    sys.exit(1 if flagged or failed else 0)
+
+
+if __name__ == "__main__":
+    main()
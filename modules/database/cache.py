@@ -0,0 +1,233 @@
+from collections import OrderedDict
+from collections.abc import Hashable, Iterable
+from datetime import timedelta
+from time import monotonic
+from typing import Generic, Optional, TypeVar
+
+from type.clustering import GroupProfile, TermProfile
+from type.database import CacheReport, LookupCacheReport
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+# Cache key of a term, entity and keyword keys live in separate namespaces
+TermCacheKey = tuple[str, str]
+
+
+class TTLCache(Generic[K, V]):
+    """Bounded least-recently-used cache whose entries also expire after a TTL"""
+
+    __max_size: int
+    __ttl: float
+    __entries: OrderedDict[K, tuple[float, V]]
+    __hits: int
+    __misses: int
+    __evictions: int
+    __expirations: int
+    __invalidations: int
+
+    def __init__(self, *, max_size: int, ttl: timedelta):
+        """Initialize an empty cache
+
+        Args:
+            max_size (int): Maximum number of entries, the least recently used entry is evicted beyond it
+            ttl (timedelta): Time after which an entry is treated as missing
+        """
+        if max_size <= 0:
+            raise ValueError("Maximum size should be a value > 0")
+        self.__max_size = max_size
+        self.__ttl = ttl.total_seconds()
+        self.__entries = OrderedDict()
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+        self.__expirations = 0
+        self.__invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __contains__(self, key: K) -> bool:
+        entry = self.__entries.get(key)
+        return entry is not None and entry[0] > monotonic()
+
+    def get_many(self, keys: Iterable[K]) -> tuple[dict[K, V], list[K]]:
+        """Look up several keys, counting hits and misses
+
+        Args:
+            keys (Iterable[K]): Keys to look up
+
+        Returns:
+            tuple[dict[K, V], list[K]]: The cached values and the keys that have to be loaded
+        """
+        now = monotonic()
+        found: dict[K, V] = {}
+        missing: list[K] = []
+        for key in keys:
+            entry = self.__entries.get(key)
+            if entry is not None and entry[0] <= now:
+                del self.__entries[key]
+                self.__expirations += 1
+                entry = None
+            if entry is None:
+                self.__misses += 1
+                missing.append(key)
+                continue
+            self.__hits += 1
+            self.__entries.move_to_end(key)
+            found[key] = entry[1]
+        return found, missing
+
+    def put(self, key: K, value: V):
+        """Store a value, evicting the least recently used entries beyond the size limit"""
+        self.__entries[key] = (monotonic() + self.__ttl, value)
+        self.__entries.move_to_end(key)
+        while len(self.__entries) > self.__max_size:
+            self.__entries.popitem(last=False)
+            self.__evictions += 1
+
+    def peek(self, key: K) -> Optional[V]:
+        """Get a live value without counting a hit or refreshing its recency"""
+        entry = self.__entries.get(key)
+        if entry is None or entry[0] <= monotonic():
+            return None
+        return entry[1]
+
+    def invalidate(self, key: K):
+        """Drop an entry after a write made it stale"""
+        if self.__entries.pop(key, None) is not None:
+            self.__invalidations += 1
+
+    def clear(self):
+        """Drop every entry"""
+        self.__invalidations += len(self.__entries)
+        self.__entries.clear()
+
+    def report(self) -> CacheReport:
+        """Hit ratio and occupancy of the cache
+
+        Returns:
+            CacheReport: Cache statistics
+        """
+        lookups = self.__hits + self.__misses
+        return CacheReport(
+            hits=self.__hits,
+            misses=self.__misses,
+            hit_ratio=self.__hits / lookups if lookups else 0.0,
+            size=len(self.__entries),
+            max_size=self.__max_size,
+            evictions=self.__evictions,
+            expirations=self.__expirations,
+            invalidations=self.__invalidations,
+        )
+
+
+class LookupCache:
+    """Read-through cache of the term and article group lookups of a database adapter
+
+    Terms map to the ids of the article groups linked to them (their posting
+    lists) and group ids map to group profiles. Popular terms are looked up by
+    almost every article, so their posting lists are kept up to date by the
+    write paths instead of being dropped on every write.
+    """
+
+    __terms: TTLCache[TermCacheKey, set[str]]
+    __groups: TTLCache[str, GroupProfile]
+
+    def __init__(
+        self,
+        *,
+        max_terms: int = 100_000,
+        max_groups: int = 50_000,
+        ttl: timedelta = timedelta(minutes=10),
+    ):
+        """Initialize the lookup cache
+
+        Args:
+            max_terms (int): Maximum number of cached term posting lists
+            max_groups (int): Maximum number of cached article group profiles
+            ttl (timedelta): Time after which a cached lookup is loaded again, bounding staleness from writes of other processes
+        """
+        self.__terms = TTLCache(max_size=max_terms, ttl=ttl)
+        self.__groups = TTLCache(max_size=max_groups, ttl=ttl)
+
+    @property
+    def terms(self) -> TTLCache[TermCacheKey, set[str]]:
+        return self.__terms
+
+    @property
+    def groups(self) -> TTLCache[str, GroupProfile]:
+        return self.__groups
+
+    @staticmethod
+    def term_keys(profile: TermProfile) -> list[TermCacheKey]:
+        """Cache keys of the terms of a profile"""
+        return [("entity", key) for key in profile.entities] + [
+            ("keyword", key) for key in profile.keywords
+        ]
+
+    def article_saved(self, group_id: str, profile: TermProfile):
+        """Keep the cache coherent with an article saved in this process
+
+        Args:
+            group_id (str): Group the article was added to
+            profile (TermProfile): Term profile of the article
+        """
+        self.__groups.invalidate(group_id)
+        for key in self.term_keys(profile):
+            group_ids = self.__terms.peek(key)
+            if group_ids is not None:
+                group_ids.add(group_id)
+
+    def article_revised(self, group_id: str, profile: TermProfile, delta: TermProfile):
+        """Keep the cache coherent with a revised article saved in this process
+
+        The group gains the terms whose weight grew. Terms the article no
+        longer has may have left the group with it, so their lookups are
+        dropped.
+
+        Args:
+            group_id (str): Group of the article
+            profile (TermProfile): Term profile of the revised article
+            delta (TermProfile): Change of term weights from the stored profile
+        """
+        self.__groups.invalidate(group_id)
+        for kind, terms, changes in (
+            ("entity", profile.entities, delta.entities),
+            ("keyword", profile.keywords, delta.keywords),
+        ):
+            for key, change in changes.items():
+                if key not in terms:
+                    self.__terms.invalidate((kind, key))
+                elif change > 0:
+                    group_ids = self.__terms.peek((kind, key))
+                    if group_ids is not None:
+                        group_ids.add(group_id)
+
+    def groups_merged(self, merges: dict[str, list[str]]):
+        """Keep the cache coherent with article groups merged in this process
+
+        Args:
+            merges (dict[str, list[str]]): Absorbed group ids of each surviving group id
+        """
+        for survivor, absorbed_ids in merges.items():
+            self.__groups.invalidate(survivor)
+            for group_id in absorbed_ids:
+                self.__groups.invalidate(group_id)
+        # The terms of the absorbed groups are not known here
+        self.__terms.clear()
+
+    def clear(self):
+        """Drop every cached lookup, e.g. after the article groups were replaced"""
+        self.__terms.clear()
+        self.__groups.clear()
+
+    def report(self) -> LookupCacheReport:
+        """Hit ratios and occupancy of the term and group caches
+
+        Returns:
+            LookupCacheReport: Cache statistics
+        """
+        return LookupCacheReport(
+            terms=self.__terms.report(), groups=self.__groups.report()
+        )
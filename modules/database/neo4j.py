@@ -7,20 +7,87 @@
 #     Source,
 # )
 import asyncio
+import json
 import logging
-from datetime import date, datetime, time, timedelta
+import re
+from collections import Counter
+from collections.abc import Mapping
+from datetime import date, datetime, time, timedelta, timezone
+from types import UnionType
 from typing import Any, List, Optional, Union, get_args, get_origin, override
+from uuid import UUID, uuid4
 
-from neo4j import AsyncDriver, AsyncGraphDatabase, AsyncResult, Driver
-from pydantic import HttpUrl
+from neo4j import (
+    AsyncDriver,
+    AsyncGraphDatabase,
+    AsyncManagedTransaction,
+    AsyncResult,
+    Driver,
+    Record,
+)
+from pydantic import AnyUrl, BaseModel, HttpUrl
 
 from errors.database import (
     DatabaseConnectionAlreadyExists,
     DatabaseConnectionError,
     DatabaseMigrationError,
 )
+from modal.database.node import Article, EntityGroup
 from modal.database.node._common import BaseNode
+from modules.clustering._scoring import (
+    columns_from_profiles,
+    entity_key,
+    split_entity_key,
+)
 from modules.database._base import BaseAdapter
+from modules.database._hydration import (
+    hydrate_group_profile_columns,
+    hydrate_group_profiles,
+    hydrate_models,
+    native_value,
+)
+from modules.database._statements import (
+    BUMP_GROUP_STRIPES,
+    COUNT_ARTICLES,
+    COUNT_UNASSIGNED_ARTICLES,
+    DROP_SHADOW_ARTICLE_TERMS,
+    DROP_SHADOW_GROUPS,
+    EXPORT_ARTICLE_GROUPS,
+    EXPORT_ARTICLES,
+    EXPORT_ENTITY_GROUPS,
+    EXPORT_GROUP_MENTIONS,
+    EXPORT_MEMBERSHIPS,
+    FIND_CANDIDATE_ARTICLE_GROUPS,
+    GET_ARTICLE_GROUPS,
+    GET_ARTICLE_GROUPS_CHANGED_SINCE,
+    GET_ARTICLE_PROFILE,
+    GET_COMMON_TERMS,
+    GET_ENTITY_GROUPS_CREATED_SINCE,
+    GET_GROUP_STRIPES,
+    GET_TERM_POSTINGS,
+    GET_UNASSIGNED_ARTICLES_PAGE,
+    LOCK_GROUP_STRIPES,
+    MERGE_GROUP_KEYWORDS,
+    MERGE_GROUP_MEMBERSHIPS,
+    MERGE_GROUP_MENTIONS,
+    MERGE_GROUP_TOTALS,
+    RECOUNT_ENTITY_ARTICLES,
+    RECOUNT_KEYWORD_ARTICLES,
+    SAVE_ARTICLE_INTO_GROUP,
+    SAVE_ARTICLE_INTO_NEW_GROUP,
+    SEARCH_ARTICLE_TITLES,
+    STATEMENTS,
+    SWAP_ARTICLE_KEYWORDS,
+    SWAP_ARTICLE_MENTIONS,
+    SWAP_DROP_LIVE_GROUPS,
+    SWAP_MEMBERSHIPS,
+    SWAP_PROMOTE_SHADOW_GROUPS,
+    UPDATE_ARTICLE_PROPERTIES,
+    UPDATE_ARTICLE_TERMS,
+    WRITE_SHADOW_GROUPS,
+    WRITE_SHADOW_MEMBERSHIPS,
+)
+from modules.database.cache import LookupCache, TermCacheKey
 from type import (
     INDEXED,
     PRIMARY_KEY,
@@ -29,8 +96,96 @@ from type import (
     UNIQUE_INDEXED,
     UNIQUE_REQUIRED,
     NodeType,
+    index_name,
+)
+from type.clustering import GroupProfile, GroupProfileColumns, TermProfile
+from type.database import (
+    CypherStatement,
+    DatabaseVariant,
+    GroupStripeState,
+    ModelHydrationMode,
 )
-from type.database import DatabaseVariant
+from type.export import ExportTable
+
+
+def _to_neo4j_value(value: Any) -> Any:
+    """Convert a node field value into a value storable as a Neo4j property"""
+    if isinstance(value, (AnyUrl, UUID)):
+        return str(value)
+    if isinstance(value, datetime) and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    if isinstance(value, dict):
+        return json.dumps(value, default=str)
+    if isinstance(value, list):
+        return [_to_neo4j_value(item) for item in value]
+    return value
+
+
+# Group edge weights left by floating point error after removing an article's terms
+_WEIGHT_EPSILON = 1e-9
+
+# Statement reading the pages of each exported table
+_EXPORT_STATEMENTS: dict[ExportTable, CypherStatement] = {
+    "articles": EXPORT_ARTICLES,
+    "article_groups": EXPORT_ARTICLE_GROUPS,
+    "entity_groups": EXPORT_ENTITY_GROUPS,
+    "memberships": EXPORT_MEMBERSHIPS,
+    "group_mentions": EXPORT_GROUP_MENTIONS,
+}
+
+# Groups remembered by each stripe for workers whose creation conflicted, more
+# than the creations racing on one stripe
+_RECENT_STRIPE_GROUPS = 16
+
+# Characters with a meaning in the Lucene syntax of full-text queries
+_LUCENE_SPECIAL = re.compile(r'([+\-&|!(){}\[\]^"~*?:\\/])')
+
+
+def _article_properties(article: NodeType, now: datetime) -> dict[str, Any]:
+    """Stored properties of an article node, stamping its update time"""
+    article.updated_on = now
+    return {
+        name: _to_neo4j_value(value)
+        for name, value in article.model_dump().items()
+        if value is not None and name != "id"
+    }
+
+
+def _from_neo4j_properties(
+    properties: Mapping[str, Any], model_class: type[BaseModel]
+) -> dict[str, Any]:
+    """Field values of a node stored with `_article_properties`, before validation
+
+    Dictionaries were stored as JSON text and `None` fields were not stored.
+    """
+    values = dict(properties)
+    for name, field in model_class.model_fields.items():
+        annotation = field.annotation
+        types = (
+            get_args(annotation)
+            if get_origin(annotation) in (Union, UnionType)
+            else (annotation,)
+        )
+        if name not in values:
+            if type(None) in types:
+                values[name] = None
+        elif isinstance(values[name], str) and any(
+            arg is dict or get_origin(arg) is dict for arg in types
+        ):
+            values[name] = json.loads(values[name])
+    return values
+
+
+def _term_parameters(profile: TermProfile) -> tuple[list[dict], list[dict]]:
+    """Entity and keyword parameters of a term profile"""
+    entities = []
+    for key, weight in profile.entities.items():
+        word, entity_type = split_entity_key(key)
+        entities.append({"word": word, "entity_type": entity_type, "weight": weight})
+    keywords = [
+        {"word": word, "weight": weight} for word, weight in profile.keywords.items()
+    ]
+    return entities, keywords
 
 
 class Neo4jAdapter(BaseAdapter[Driver]):
@@ -42,10 +197,32 @@ class Neo4jAdapter(BaseAdapter[Driver]):
     __conn_dbname: str
     __conn_driver: AsyncDriver
     __created_initial_connection: bool
+    __cache: Optional[LookupCache]
+    __max_term_articles: Optional[int]
     __DATABASE_VARIANT: DatabaseVariant = "neo4j"
 
-    def __init__(self, uri: str, username: str, password: str, database: str):
+    def __init__(
+        self,
+        uri: str,
+        username: str,
+        password: str,
+        database: str,
+        cache: Optional[LookupCache] = None,
+        max_term_articles: Optional[int] = None,
+    ):
+        """Initializes the Neo4j adapter
+
+        Args:
+            uri (str): The connection URI for the database.
+            username (str): The username for connecting to the database.
+            password (str): The password for connecting to the database.
+            database (str): The name of the database.
+            cache (Optional[LookupCache]): Read-through cache of term and article group lookups. Every lookup goes to the database if not provided.
+            max_term_articles (Optional[int]): Terms of more articles are not traversed when shortlisting candidate groups. Every term is traversed if not provided.
+        """
         super().__init__(uri, username, password, database)
+        self.__cache = cache
+        self.__max_term_articles = max_term_articles
         self.__conn_uri = uri
         self.__conn_username = username
         self.__conn_password = password
@@ -181,6 +358,10 @@ class Neo4jAdapter(BaseAdapter[Driver]):
 
             return None  # Skip unsupported types (e.g. dict, Any, complex unions)
 
+        def _escape(name: str) -> str:
+            """Escape a name used between backticks in a query"""
+            return name.replace("\\u0060", "`").replace("`", "``")
+
         async def result_derivition(
             const_idx_name: str,
             query_response: Optional[AsyncResult],
@@ -309,6 +490,29 @@ class Neo4jAdapter(BaseAdapter[Driver]):
                         key = f"{label}::{name}::{def_type}"
                         migration_queries.append((key, const_name, query.strip()))
 
+            # Composite and full-text indexes declared by the node model
+            for index in node_cls.indexes:
+                escaped_label = _escape(label)
+                properties = ", ".join(
+                    f"n.`{_escape(name)}`" for name in index["properties"]
+                )
+                if index["kind"] == "fulltext":
+                    const_name = "FULLTEXT_INDEX"
+                    query = f"""
+                    CREATE FULLTEXT INDEX `{_escape(index_name(label, index))}`
+                    IF NOT EXISTS
+                    FOR (n:`{escaped_label}`) ON EACH [{properties}]
+                    """
+                else:
+                    const_name = "RANGE_INDEX"
+                    query = f"""
+                    CREATE RANGE INDEX `{_escape(index_name(label, index))}`
+                    IF NOT EXISTS
+                    FOR (n:`{escaped_label}`) ON ({properties})
+                    """
+                key = f"{label}::{'+'.join(index['properties'])}::index"
+                migration_queries.append((key, const_name, query.strip()))
+
         async def run_single_query(query_info):
             key, const_idx_name, cypher = query_info
             async with self.__conn_driver.session(
@@ -327,3 +531,620 @@ class Neo4jAdapter(BaseAdapter[Driver]):
             query_results[key] = result_tuple
 
         return query_results
+
+    async def __execute(
+        self, statement: CypherStatement, **parameters: Any
+    ) -> list[Record]:
+        """Run a registered statement in a managed transaction of its access mode
+
+        Managed transactions are retried by the driver on transient errors and
+        read statements can be routed to read replicas.
+        """
+
+        async def work(tx: AsyncManagedTransaction) -> list[Record]:
+            result = await tx.run(statement.query, parameters)
+            return [record async for record in result]
+
+        async with self.__conn_driver.session(database=self.__conn_dbname) as session:
+            if statement.access == "read":
+                return await session.execute_read(work)
+            return await session.execute_write(work)
+
+    @override
+    async def prepare_statements(self):
+        """Plan every registered statement once so the per-article path hits the plan cache"""
+
+        async def explain(tx: AsyncManagedTransaction, statement: CypherStatement):
+            result = await tx.run(f"EXPLAIN {statement.query}")
+            await result.consume()
+
+        async with self.__conn_driver.session(database=self.__conn_dbname) as session:
+            for statement in STATEMENTS:
+                try:
+                    if statement.access == "read":
+                        await session.execute_read(explain, statement)
+                    else:
+                        await session.execute_write(explain, statement)
+                except Exception as e:
+                    logging.warning(
+                        "Failed to plan statement '%s': %s", statement.name, e
+                    )
+
+    @override
+    async def find_candidate_article_groups(
+        self, profile: TermProfile, limit: int, hydration: ModelHydrationMode = "model"
+    ) -> list[GroupProfile]:
+        """Shortlist the article groups sharing the most terms with a profile"""
+        if self.__cache is not None:
+            return await self.get_article_groups(
+                await self.__shortlist_from_cache(profile, limit), hydration
+            )
+        records = await self.__find_candidate_records(profile, limit)
+        return hydrate_group_profiles(records, hydration)
+
+    @override
+    async def find_candidate_article_group_columns(
+        self, profile: TermProfile, limit: int
+    ) -> GroupProfileColumns:
+        """Shortlist the article groups sharing the most terms with a profile, as columns"""
+        if self.__cache is not None:
+            return await self.get_article_group_columns(
+                await self.__shortlist_from_cache(profile, limit)
+            )
+        records = await self.__find_candidate_records(profile, limit)
+        return hydrate_group_profile_columns(records)
+
+    async def __find_candidate_records(
+        self, profile: TermProfile, limit: int
+    ) -> list[Record]:
+        """Shortlist candidate groups in the database"""
+        entities = [
+            dict(zip(("word", "entity_type"), split_entity_key(key)))
+            for key in profile.entities
+        ]
+        return await self.__execute(
+            FIND_CANDIDATE_ARTICLE_GROUPS,
+            entities=entities,
+            keywords=list(profile.keywords),
+            limit=limit,
+            max_term_articles=self.__max_term_articles,
+        )
+
+    async def __shortlist_from_cache(
+        self, profile: TermProfile, limit: int
+    ) -> list[str]:
+        """Shortlist candidate group ids from cached posting lists, loading only the missing ones"""
+        assert self.__cache is not None
+        postings, missing = self.__cache.terms.get_many(LookupCache.term_keys(profile))
+        if missing:
+            loaded = await self.__get_term_postings(missing)
+            for key in missing:
+                group_ids = loaded.get(key, set())
+                self.__cache.terms.put(key, group_ids)
+                postings[key] = group_ids
+        shared_terms: Counter[str] = Counter()
+        for group_ids in postings.values():
+            shared_terms.update(group_ids)
+        return [group_id for group_id, _ in shared_terms.most_common(limit)]
+
+    async def __get_term_postings(
+        self, keys: list[TermCacheKey]
+    ) -> dict[TermCacheKey, set[str]]:
+        """Get the ids of the article groups linked to each term"""
+        entities = []
+        keywords = []
+        for kind, key in keys:
+            if kind == "entity":
+                word, entity_type = split_entity_key(key)
+                entities.append({"key": key, "word": word, "entity_type": entity_type})
+            else:
+                keywords.append(key)
+        records = await self.__execute(
+            GET_TERM_POSTINGS,
+            entities=entities,
+            keywords=keywords,
+            max_term_articles=self.__max_term_articles,
+        )
+        return {
+            (record["kind"], record["key"]): set(record["group_ids"])
+            for record in records
+        }
+
+    @override
+    async def get_term_document_frequencies(
+        self, min_articles: int
+    ) -> tuple[int, dict[TermCacheKey, int]]:
+        """Get the number of articles and the document frequencies of the common terms"""
+        records = await self.__execute(COUNT_ARTICLES)
+        articles = records[0]["articles"] if records else 0
+        records = await self.__execute(GET_COMMON_TERMS, min_articles=min_articles)
+        return articles, {
+            (
+                record["kind"],
+                (
+                    entity_key(record["word"], record["entity_type"])
+                    if record["kind"] == "entity"
+                    else record["word"]
+                ),
+            ): record["articles"]
+            for record in records
+        }
+
+    @override
+    async def recount_term_articles(self):
+        """Recompute the document frequency of every term from its article edges"""
+        await self.__execute(RECOUNT_ENTITY_ARTICLES)
+        await self.__execute(RECOUNT_KEYWORD_ARTICLES)
+
+    @override
+    async def get_article_groups(
+        self, group_ids: list[str], hydration: ModelHydrationMode = "model"
+    ) -> list[GroupProfile]:
+        """Get the profiles of article groups by id"""
+        cached: dict[str, GroupProfile] = {}
+        if self.__cache is not None:
+            cached, group_ids = self.__cache.groups.get_many(group_ids)
+            if not group_ids:
+                return list(cached.values())
+        records = await self.__execute(GET_ARTICLE_GROUPS, group_ids=group_ids)
+        loaded = hydrate_group_profiles(records, hydration)
+        if self.__cache is None:
+            return loaded
+        for group in loaded:
+            self.__cache.groups.put(group.id, group)
+        return [*cached.values(), *loaded]
+
+    @override
+    async def get_article_group_columns(
+        self, group_ids: list[str]
+    ) -> GroupProfileColumns:
+        """Get the profiles of article groups by id, as columns, loading only the groups missing from the cache"""
+        if self.__cache is None:
+            records = await self.__execute(GET_ARTICLE_GROUPS, group_ids=group_ids)
+            return hydrate_group_profile_columns(records)
+        groups, missing = self.__cache.groups.get_many(group_ids)
+        if missing:
+            records = await self.__execute(GET_ARTICLE_GROUPS, group_ids=missing)
+            for group in hydrate_group_profiles(records, "trusted"):
+                self.__cache.groups.put(group.id, group)
+                groups[group.id] = group
+        return columns_from_profiles(
+            [groups[group_id] for group_id in group_ids if group_id in groups]
+        )
+
+    @override
+    async def save_article(
+        self, article: NodeType, profile: TermProfile, group_id: Optional[str]
+    ) -> tuple[str, bool]:
+        """Store an article with its terms and add it to an article group"""
+        parameters = self.__save_parameters(article, profile)
+        saved_group_id, is_new_group = await self.__write_article(group_id, parameters)
+        if self.__cache is not None:
+            self.__cache.article_saved(saved_group_id, profile)
+        return saved_group_id, is_new_group
+
+    @override
+    async def get_group_stripes(self, stripes: list[int]) -> list[GroupStripeState]:
+        """Get the versions of group stripes"""
+        records = await self.__execute(GET_GROUP_STRIPES, stripes=stripes)
+        return [GroupStripeState(**record.data()) for record in records]
+
+    @override
+    async def create_article_group(
+        self,
+        article: NodeType,
+        profile: TermProfile,
+        stripes: dict[int, int],
+        force: bool = False,
+    ) -> tuple[Optional[str], list[GroupStripeState]]:
+        """Store an article into a new article group, unless one of its stripes changed since it was read"""
+        parameters = self.__save_parameters(article, profile)
+        group_id = str(uuid4())
+
+        async def create(
+            tx: AsyncManagedTransaction,
+        ) -> tuple[Optional[str], list[GroupStripeState]]:
+            # Locked in ascending order, so two creations cannot deadlock
+            result = await tx.run(
+                LOCK_GROUP_STRIPES.query, stripes=sorted(stripes), now=parameters["now"]
+            )
+            states = [GroupStripeState(**record.data()) async for record in result]
+            if not force and any(
+                state.version != stripes[state.stripe] for state in states
+            ):
+                return None, states
+            result = await tx.run(
+                SAVE_ARTICLE_INTO_NEW_GROUP.query, group_id=group_id, **parameters
+            )
+            await result.consume()
+            result = await tx.run(
+                BUMP_GROUP_STRIPES.query,
+                stripes=sorted(stripes),
+                group_id=group_id,
+                recent_limit=_RECENT_STRIPE_GROUPS,
+            )
+            await result.consume()
+            return group_id, []
+
+        async with self.__conn_driver.session(database=self.__conn_dbname) as session:
+            created_group_id, states = await session.execute_write(create)
+        if created_group_id is not None and self.__cache is not None:
+            self.__cache.article_saved(created_group_id, profile)
+        return created_group_id, states
+
+    def __save_parameters(
+        self, article: NodeType, profile: TermProfile
+    ) -> dict[str, Any]:
+        """Parameters of the statements storing an article, stamping its id and creation time if missing"""
+        now = datetime.now(timezone.utc)
+        if article.id is None:
+            article.id = uuid4()
+        if article.created_on is None:
+            article.created_on = now
+        return {
+            "article_id": str(article.id),
+            "properties": _article_properties(article, now),
+            "entities": [
+                {
+                    "word": word,
+                    "entity_type": entity_type,
+                    "weight": weight,
+                }
+                for (word, entity_type), weight in (
+                    (split_entity_key(key), weight)
+                    for key, weight in profile.entities.items()
+                )
+            ],
+            "keywords": [
+                {"word": word, "weight": weight}
+                for word, weight in profile.keywords.items()
+            ],
+            "total_entity": sum(profile.entities.values()),
+            "total_keyword": sum(profile.keywords.values()),
+            "now": now,
+        }
+
+    @override
+    async def get_article_profile(
+        self, article_id: str
+    ) -> Optional[tuple[str, TermProfile]]:
+        """Get the group id and stored term profile of an article"""
+        records = await self.__execute(GET_ARTICLE_PROFILE, article_id=article_id)
+        if not records:
+            return None
+        record = records[0]
+        return record["group_id"], TermProfile.model_construct(
+            entities={
+                entity_key(word, entity_type): weight
+                for word, entity_type, weight in record["entities"]
+            },
+            keywords={word: weight for word, weight in record["keywords"]},
+        )
+
+    @override
+    async def update_article(
+        self, article: NodeType, profile: TermProfile, delta: TermProfile
+    ) -> Optional[str]:
+        """Store a revised article, applying only the changed terms to its group"""
+        now = datetime.now(timezone.utc)
+        properties = _article_properties(article, now)
+        if not delta.entities and not delta.keywords:
+            records = await self.__execute(
+                UPDATE_ARTICLE_PROPERTIES,
+                article_id=str(article.id),
+                properties=properties,
+            )
+            return records[0]["group_id"] if records else None
+        records = await self.__execute(
+            UPDATE_ARTICLE_TERMS,
+            article_id=str(article.id),
+            properties=properties,
+            entities=[
+                {
+                    "word": word,
+                    "entity_type": entity_type,
+                    "weight": profile.entities.get(key, 0.0),
+                    "delta": change,
+                }
+                for key, change in delta.entities.items()
+                for word, entity_type in (split_entity_key(key),)
+            ],
+            keywords=[
+                {
+                    "word": word,
+                    "weight": profile.keywords.get(word, 0.0),
+                    "delta": change,
+                }
+                for word, change in delta.keywords.items()
+            ],
+            total_entity_delta=sum(delta.entities.values()),
+            total_keyword_delta=sum(delta.keywords.values()),
+            epsilon=_WEIGHT_EPSILON,
+            now=now,
+        )
+        if not records:
+            return None
+        group_id = records[0]["group_id"]
+        if self.__cache is not None:
+            self.__cache.article_revised(group_id, profile, delta)
+        return group_id
+
+    async def __write_article(
+        self, group_id: Optional[str], parameters: dict[str, Any]
+    ) -> tuple[str, bool]:
+        """Write an article into an existing group, or into a new group if it no longer exists"""
+        if group_id is not None:
+            records = await self.__execute(
+                SAVE_ARTICLE_INTO_GROUP, group_id=group_id, **parameters
+            )
+            if records:
+                return records[0]["group_id"], False
+            logging.debug(
+                "Article group '%s' no longer exists, creating a new group",
+                group_id,
+            )
+        records = await self.__execute(
+            SAVE_ARTICLE_INTO_NEW_GROUP, group_id=str(uuid4()), **parameters
+        )
+        return records[0]["group_id"], True
+
+    @override
+    async def get_article_groups_changed_since(
+        self, since: Optional[datetime], hydration: ModelHydrationMode = "model"
+    ) -> list[GroupProfile]:
+        """Get the profiles of article groups updated after a point in time"""
+        records = await self.__execute(
+            GET_ARTICLE_GROUPS_CHANGED_SINCE, since=_to_neo4j_value(since)
+        )
+        return hydrate_group_profiles(records, hydration)
+
+    @override
+    async def get_entity_groups_created_since(
+        self, since: Optional[datetime], hydration: ModelHydrationMode = "model"
+    ) -> list[EntityGroup]:
+        """Get the entity groups created after a point in time"""
+        records = await self.__execute(
+            GET_ENTITY_GROUPS_CREATED_SINCE, since=_to_neo4j_value(since)
+        )
+        return hydrate_models(
+            (record["properties"] for record in records), EntityGroup, hydration
+        )
+
+    @override
+    async def merge_article_groups(
+        self, merges: dict[str, list[str]], batch_size: int
+    ) -> int:
+        """Merge article groups into surviving groups in batched transactions"""
+
+        async def merge_batch(tx: AsyncManagedTransaction, pairs: list[dict]):
+            now = datetime.now(timezone.utc)
+            # Move memberships, add up the term weights, then the totals
+            for statement in (
+                MERGE_GROUP_MEMBERSHIPS,
+                MERGE_GROUP_MENTIONS,
+                MERGE_GROUP_KEYWORDS,
+                MERGE_GROUP_TOTALS,
+            ):
+                result = await tx.run(statement.query, pairs=pairs, now=now)
+                await result.consume()
+
+        # Keep every merge set inside a single batch
+        batches: list[list[dict]] = [[]]
+        for survivor, absorbed_ids in merges.items():
+            if batches[-1] and len(batches[-1]) + len(absorbed_ids) > batch_size:
+                batches.append([])
+            batches[-1].extend(
+                {"survivor": survivor, "absorbed": absorbed}
+                for absorbed in absorbed_ids
+            )
+
+        merged = 0
+        try:
+            async with self.__conn_driver.session(
+                database=self.__conn_dbname
+            ) as session:
+                for pairs in batches:
+                    if not pairs:
+                        continue
+                    await session.execute_write(merge_batch, pairs)
+                    merged += len(pairs)
+        finally:
+            # Earlier batches are committed even if a later one fails
+            if self.__cache is not None:
+                self.__cache.groups_merged(merges)
+        return merged
+
+    @override
+    async def count_unassigned_articles(self, job_id: str) -> int:
+        """Count the articles not yet assigned to a shadow group of a backfill"""
+        records = await self.__execute(COUNT_UNASSIGNED_ARTICLES, job_id=job_id)
+        return records[0]["articles"]
+
+    @override
+    async def get_unassigned_articles_page(
+        self, job_id: str, after: Optional[tuple[datetime, str]], limit: int
+    ) -> list[tuple[Article, TermProfile]]:
+        """Get a page of the articles not yet assigned to a shadow group, by publication date"""
+        after_published, after_id = after if after is not None else (None, None)
+        records = await self.__execute(
+            GET_UNASSIGNED_ARTICLES_PAGE,
+            job_id=job_id,
+            after_published=_to_neo4j_value(after_published),
+            after_id=after_id,
+            limit=limit,
+        )
+        articles = hydrate_models(
+            (
+                _from_neo4j_properties(record["properties"], Article)
+                for record in records
+            ),
+            Article,
+            "model",
+        )
+        return [
+            (
+                article,
+                TermProfile.model_construct(
+                    entities={
+                        entity_key(word, entity_type): weight
+                        for word, entity_type, weight in record["entities"]
+                    },
+                    keywords={word: weight for word, weight in record["keywords"]},
+                ),
+            )
+            for article, record in zip(articles, records)
+        ]
+
+    @override
+    async def write_shadow_memberships(
+        self, job_id: str, memberships: list[tuple[str, str, Optional[TermProfile]]]
+    ):
+        """Assign articles to shadow groups of a backfill"""
+        parameters = []
+        for article_id, group_id, profile in memberships:
+            entities, keywords = (
+                _term_parameters(profile) if profile is not None else ([], [])
+            )
+            parameters.append(
+                {
+                    "article_id": article_id,
+                    "group_id": group_id,
+                    "entities": entities,
+                    "keywords": keywords,
+                }
+            )
+        await self.__execute(
+            WRITE_SHADOW_MEMBERSHIPS,
+            job_id=job_id,
+            memberships=parameters,
+            now=datetime.now(timezone.utc),
+        )
+
+    @override
+    async def write_shadow_groups(self, job_id: str, groups: list[GroupProfile]):
+        """Write the profiles of shadow groups of a backfill, replacing previously written weights"""
+        parameters = []
+        for group in groups:
+            entities, keywords = _term_parameters(group)
+            parameters.append(
+                {
+                    "id": group.id,
+                    "entities": entities,
+                    "keywords": keywords,
+                    "total_entity": sum(group.entities.values()),
+                    "total_keyword": sum(group.keywords.values()),
+                }
+            )
+        await self.__execute(
+            WRITE_SHADOW_GROUPS,
+            job_id=job_id,
+            groups=parameters,
+            now=datetime.now(timezone.utc),
+        )
+
+    @override
+    async def drop_shadow_groups(self):
+        """Delete every shadow group and re-extracted article term of a previous backfill"""
+        await self.__execute(DROP_SHADOW_GROUPS)
+        await self.__execute(DROP_SHADOW_ARTICLE_TERMS)
+
+    @override
+    async def swap_shadow_groups(self, job_id: str, replace_article_terms: bool) -> int:
+        """Replace the article groups by the shadow groups of a backfill, in one transaction"""
+
+        async def swap(tx: AsyncManagedTransaction) -> int:
+            # Articles stored since the backfill's last pass would lose their group
+            result = await tx.run(COUNT_UNASSIGNED_ARTICLES.query, job_id=job_id)
+            record = await result.single()
+            unassigned = record["articles"] if record is not None else 0
+            if unassigned:
+                return unassigned
+            now = datetime.now(timezone.utc)
+            statements = [
+                SWAP_DROP_LIVE_GROUPS,
+                SWAP_PROMOTE_SHADOW_GROUPS,
+                SWAP_MEMBERSHIPS,
+            ]
+            if replace_article_terms:
+                statements += [
+                    SWAP_ARTICLE_MENTIONS,
+                    SWAP_ARTICLE_KEYWORDS,
+                    RECOUNT_ENTITY_ARTICLES,
+                    RECOUNT_KEYWORD_ARTICLES,
+                ]
+            for statement in statements:
+                result = await tx.run(statement.query, job_id=job_id, now=now)
+                await result.consume()
+            return 0
+
+        async with self.__conn_driver.session(database=self.__conn_dbname) as session:
+            unassigned = await session.execute_write(swap)
+        if not unassigned and self.__cache is not None:
+            self.__cache.clear()
+        return unassigned
+
+    @override
+    async def get_export_page(
+        self,
+        table: ExportTable,
+        published_from: Optional[datetime],
+        published_to: Optional[datetime],
+        after_id: Optional[str],
+        limit: int,
+    ) -> tuple[list[dict[str, Any]], Optional[str]]:
+        """Get a page of the rows of an exported table"""
+        records = await self.__execute(
+            _EXPORT_STATEMENTS[table],
+            published_from=_to_neo4j_value(published_from),
+            published_to=_to_neo4j_value(published_to),
+            after_id=after_id,
+            limit=limit,
+        )
+        rows = [
+            {name: native_value(value) for name, value in row.items()}
+            for record in records
+            for row in record["rows"]
+        ]
+        cursor = records[-1]["cursor"] if len(records) == limit else None
+        return rows, cursor
+
+    @override
+    async def search_article_titles(
+        self, query: str, limit: int
+    ) -> list[tuple[str, float]]:
+        """Find the articles whose title best matches a text, with the full-text index"""
+        terms = _LUCENE_SPECIAL.sub(r"\\\1", query).strip()
+        if not terms:
+            return []
+        records = await self.__execute(SEARCH_ARTICLE_TITLES, query=terms, limit=limit)
+        return [(record["id"], record["score"]) for record in records]
+
+    @override
+    async def explain_statement(
+        self,
+        name: str,
+        parameters: Optional[dict[str, Any]] = None,
+        profile: bool = False,
+    ) -> dict[str, Any]:
+        """Get the execution plan of a registered statement
+
+        Profiled statements run in a transaction that is rolled back, so
+        profiling a write statement changes nothing.
+        """
+        statement = STATEMENTS[name]
+        prefix = "PROFILE" if profile else "EXPLAIN"
+        async with self.__conn_driver.session(database=self.__conn_dbname) as session:
+            tx = await session.begin_transaction()
+            try:
+                result = await tx.run(
+                    f"{prefix} {statement.query}",
+                    {
+                        key: _to_neo4j_value(value)
+                        for key, value in (parameters or {}).items()
+                    },
+                )
+                summary = await result.consume()
+            finally:
+                await tx.rollback()
+        plan = summary.profile if profile else summary.plan
+        return dict(plan or {})
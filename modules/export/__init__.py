@@ -0,0 +1,3 @@
+from .arrow import EXPORT_TABLES, ArrowExporter, export_schema
+
+__all__ = ["ArrowExporter", "EXPORT_TABLES", "export_schema"]
@@ -0,0 +1,307 @@
+"""Columnar export of the graph's articles, groups, entity groups and memberships
+
+Run with `python -m modules.export.arrow DIRECTORY [--from ISO] [--to ISO]`,
+with the credentials in the `NEO4J_URI`, `NEO4J_USERNAME`, `NEO4J_PASSWORD`
+and `NEO4J_DATABASE_NAME` environment variables (or a `.env` file). Each table
+is written to `DIRECTORY/<table>.parquet`.
+
+Requires the optional `pyarrow` dependency (`pip install kenec[export]`).
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+from collections.abc import AsyncIterator, Sequence
+from datetime import datetime
+from time import perf_counter
+from typing import TYPE_CHECKING, Annotated, Any, Optional, Union, get_args, get_origin
+
+from pydantic import BaseModel
+
+from errors.database import DatabaseConnectionAlreadyExists
+from errors.export import ExportDependencyMissingError
+from modal.database.node import Article, ArticleGroup, EntityGroup
+from modules.database._base import BaseAdapter
+from type.export import ExportReport, ExportTable
+
+if TYPE_CHECKING:
+    import pyarrow as pa  # pragma: no cover
+
+EXPORT_TABLES: tuple[ExportTable, ...] = get_args(ExportTable)
+
+# Node model whose fields are the columns of each node table
+_NODE_TABLES: dict[ExportTable, type[BaseModel]] = {
+    "articles": Article,
+    "article_groups": ArticleGroup,
+    "entity_groups": EntityGroup,
+}
+
+
+def _pyarrow() -> Any:
+    """Import pyarrow, which is an optional dependency"""
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ExportDependencyMissingError("pyarrow") from e
+    return pyarrow
+
+
+def _arrow_type(pa: Any, annotation: Any) -> "pa.DataType":
+    """Arrow type of the values a node field is stored as
+
+    URLs, UUIDs and literals are stored as strings and dicts as JSON text.
+    """
+    origin = get_origin(annotation)
+    args = get_args(annotation)
+    if origin is Annotated:
+        return _arrow_type(pa, args[0])
+    if origin is Union:
+        inner = [arg for arg in args if arg is not type(None)]
+        if len(inner) == 1:
+            return _arrow_type(pa, inner[0])
+        return pa.string()
+    if origin is list:
+        return pa.list_(_arrow_type(pa, args[0]) if args else pa.string())
+    if annotation is bool:
+        return pa.bool_()
+    if annotation is int:
+        return pa.int64()
+    if annotation is float:
+        return pa.float64()
+    if annotation is datetime:
+        return pa.timestamp("us", tz="UTC")
+    # Strings, URLs, UUIDs, literals and JSON text
+    return pa.string()
+
+
+def export_schema(table: ExportTable) -> "pa.Schema":
+    """Arrow schema of an exported table
+
+    Node tables have a column per field of their node model, edge tables the
+    ids of the nodes they link.
+
+    Args:
+        table (ExportTable): The table
+
+    Returns:
+        pa.Schema: The schema
+    """
+    pa = _pyarrow()
+    if table in _NODE_TABLES:
+        return pa.schema(
+            [
+                pa.field(name, _arrow_type(pa, field.annotation))
+                for name, field in _NODE_TABLES[table].model_fields.items()
+            ]
+        )
+    if table == "memberships":
+        return pa.schema(
+            [
+                pa.field("article_id", pa.string(), nullable=False),
+                pa.field("group_id", pa.string(), nullable=False),
+            ]
+        )
+    return pa.schema(
+        [
+            pa.field("group_id", pa.string(), nullable=False),
+            pa.field("entity_group_id", pa.string(), nullable=False),
+            pa.field("weight", pa.float64(), nullable=False),
+        ]
+    )
+
+
+class ArrowExporter:
+    """Streams tables of the graph out of a database adapter as Arrow record batches
+
+    Each table is read in pages of `batch_size` nodes, keyed by node id, and
+    every page becomes one record batch, so exporting never holds more than
+    one page of a table in memory. Batches can be written to Parquet with
+    `write_parquet`, or collected with `read_table` and handed to pandas
+    (`Table.to_pandas`) or Polars (`polars.from_arrow`) without copying.
+
+    With a time range, only the articles published in it are exported, with
+    their memberships and the groups and entity groups they belong to or
+    mention. Groups are exported with all their terms.
+    """
+
+    __database: BaseAdapter
+    __published_from: Optional[datetime]
+    __published_to: Optional[datetime]
+    __batch_size: int
+
+    def __init__(
+        self,
+        database: BaseAdapter,
+        *,
+        published_from: Optional[datetime] = None,
+        published_to: Optional[datetime] = None,
+        batch_size: int = 10_000,
+    ):
+        """Initialize the exporter
+
+        Args:
+            database (BaseAdapter): Connected database adapter
+            published_from (Optional[datetime]): Only export articles published at or after this time
+            published_to (Optional[datetime]): Only export articles published before this time
+            batch_size (int): Number of nodes read per page and record batch, edge tables may have several rows per node
+
+        Raises:
+            ExportDependencyMissingError: If pyarrow is not installed
+        """
+        _pyarrow()
+        if batch_size <= 0:
+            raise ValueError("Batch size should be a value > 0")
+        if (
+            published_from is not None
+            and published_to is not None
+            and published_from >= published_to
+        ):
+            raise ValueError("Published from should be before published to")
+        self.__database = database
+        self.__published_from = published_from
+        self.__published_to = published_to
+        self.__batch_size = batch_size
+
+    async def batches(self, table: ExportTable) -> AsyncIterator["pa.RecordBatch"]:
+        """Stream the record batches of a table
+
+        Args:
+            table (ExportTable): The table
+
+        Yields:
+            pa.RecordBatch: One batch per page of nodes, skipping pages without rows
+        """
+        pa = _pyarrow()
+        schema = export_schema(table)
+        cursor: Optional[str] = None
+        while True:
+            rows, cursor = await self.__database.get_export_page(
+                table,
+                self.__published_from,
+                self.__published_to,
+                cursor,
+                self.__batch_size,
+            )
+            if rows:
+                yield pa.RecordBatch.from_pylist(rows, schema=schema)
+            if cursor is None:
+                return
+
+    async def read_table(self, table: ExportTable) -> "pa.Table":
+        """Read a whole table into memory
+
+        Args:
+            table (ExportTable): The table
+
+        Returns:
+            pa.Table: The table, made of the streamed record batches
+        """
+        pa = _pyarrow()
+        return pa.Table.from_batches(
+            [batch async for batch in self.batches(table)], schema=export_schema(table)
+        )
+
+    async def write_parquet(
+        self,
+        directory: str,
+        tables: Sequence[ExportTable] = EXPORT_TABLES,
+        compression: str = "zstd",
+    ) -> ExportReport:
+        """Write tables to Parquet files, one batch at a time
+
+        Every table is written to `<table>.parquet` in the directory, which
+        only replaces an existing file once the table is complete.
+
+        Args:
+            directory (str): Directory of the files, created if missing
+            tables (Sequence[ExportTable]): Tables to export
+            compression (str): Parquet compression codec
+
+        Returns:
+            ExportReport: Rows and batches written per table
+        """
+        _pyarrow()
+        import pyarrow.parquet as pq
+
+        os.makedirs(directory, exist_ok=True)
+        start = perf_counter()
+        rows: dict[ExportTable, int] = {}
+        batches: dict[ExportTable, int] = {}
+        for table in tables:
+            path = os.path.join(directory, f"{table}.parquet")
+            partial_path = f"{path}.partial"
+            rows[table] = batches[table] = 0
+            try:
+                with pq.ParquetWriter(
+                    partial_path, export_schema(table), compression=compression
+                ) as writer:
+                    async for batch in self.batches(table):
+                        writer.write_batch(batch)
+                        rows[table] += batch.num_rows
+                        batches[table] += 1
+                os.replace(partial_path, path)
+            except BaseException:
+                if os.path.exists(partial_path):
+                    os.remove(partial_path)
+                raise
+            logging.info("Exported %d rows of %s to %s", rows[table], table, path)
+        elapsed = perf_counter() - start
+        return ExportReport(
+            rows=rows,
+            batches=batches,
+            elapsed_seconds=elapsed,
+            rows_per_second=sum(rows.values()) / elapsed if elapsed > 0 else 0.0,
+        )
+
+
+async def _export(args: argparse.Namespace) -> ExportReport:
+    from dotenv import load_dotenv
+
+    from modules.database import Neo4jAdapter
+
+    load_dotenv()
+    database = Neo4jAdapter(
+        os.getenv("NEO4J_URI", ""),
+        os.getenv("NEO4J_USERNAME", ""),
+        os.getenv("NEO4J_PASSWORD", ""),
+        os.getenv("NEO4J_DATABASE_NAME", ""),
+    )
+    error = await database.connect()
+    if error is not None and not isinstance(error, DatabaseConnectionAlreadyExists):
+        raise error
+    exporter = ArrowExporter(
+        database,
+        published_from=args.published_from,
+        published_to=args.published_to,
+        batch_size=args.batch_size,
+    )
+    return await exporter.write_parquet(
+        args.directory, args.tables, compression=args.compression
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("directory")
+    parser.add_argument("--from", dest="published_from", type=datetime.fromisoformat)
+    parser.add_argument("--to", dest="published_to", type=datetime.fromisoformat)
+    parser.add_argument(
+        "--tables", nargs="+", choices=EXPORT_TABLES, default=list(EXPORT_TABLES)
+    )
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--compression", default="zstd")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    report = asyncio.run(_export(args))
+    for table, rows in report.rows.items():
+        print(f"{table:15s} {rows:10d} rows  {report.batches[table]:6d} batches")
+    print(
+        f"exported in {report.elapsed_seconds:.1f}s"
+        f" ({report.rows_per_second:.0f} rows/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+from .load import LoadGovernor
+from .resources import ResourceGovernor
+
+__all__ = ["LoadGovernor", "ResourceGovernor"]
@@ -0,0 +1,167 @@
+import logging
+from datetime import datetime, timedelta
+from threading import Lock
+from typing import Optional
+
+from type.governor import LoadGovernorReport, ProcessingMode
+
+
+class LoadGovernor:
+    """Switches article extraction between full and degraded modes based on backlog
+
+    The governor watches the queue depth (articles in flight plus any externally
+    reported queue) and the smoothed lag between an article's `published_date`
+    and the time it is processed. It switches to the degraded mode when either
+    crosses its high watermark and back to the full mode only once both have
+    drained below their low watermarks, so it does not flap around a threshold.
+    """
+
+    __high_queue_depth: int
+    __low_queue_depth: int
+    __max_lag: timedelta
+    __recovery_lag: timedelta
+    __lag_smoothing: float
+    __degraded_max_content_chars: int
+    __degraded_max_ngram_size: int
+    __lock: Lock
+    __mode: ProcessingMode
+    __in_flight: int
+    __external_queue_depth: int
+    __lag_seconds: Optional[float]
+    __mode_switches: int
+    __articles_by_mode: dict[ProcessingMode, int]
+
+    def __init__(
+        self,
+        *,
+        high_queue_depth: int = 32,
+        low_queue_depth: int = 8,
+        max_lag: timedelta = timedelta(minutes=30),
+        recovery_lag: timedelta = timedelta(minutes=5),
+        lag_smoothing: float = 0.2,
+        degraded_max_content_chars: int = 2000,
+        degraded_max_ngram_size: int = 1,
+    ):
+        """Initialize the load governor
+
+        Args:
+            high_queue_depth (int): Queue depth at which extraction is degraded
+            low_queue_depth (int): Queue depth below which extraction may recover
+            max_lag (timedelta): Smoothed publication lag at which extraction is degraded
+            recovery_lag (timedelta): Smoothed publication lag below which extraction may recover
+            lag_smoothing (float): Weight of the newest lag sample in the moving average (between 0 and 1)
+            degraded_max_content_chars (int): Number of content characters kept in the degraded mode
+            degraded_max_ngram_size (int): Maximum keyword n-gram size in the degraded mode
+        """
+        if low_queue_depth > high_queue_depth:
+            raise ValueError("Low queue depth should not exceed the high queue depth")
+        if recovery_lag > max_lag:
+            raise ValueError("Recovery lag should not exceed the maximum lag")
+        if not 0 < lag_smoothing <= 1:
+            raise ValueError("Lag smoothing should be a value between 0 and 1")
+        self.__high_queue_depth = high_queue_depth
+        self.__low_queue_depth = low_queue_depth
+        self.__max_lag = max_lag
+        self.__recovery_lag = recovery_lag
+        self.__lag_smoothing = lag_smoothing
+        self.__degraded_max_content_chars = degraded_max_content_chars
+        self.__degraded_max_ngram_size = degraded_max_ngram_size
+        self.__lock = Lock()
+        self.__mode = "full"
+        self.__in_flight = 0
+        self.__external_queue_depth = 0
+        self.__lag_seconds = None
+        self.__mode_switches = 0
+        self.__articles_by_mode = {"full": 0, "degraded": 0}
+
+    @property
+    def mode(self) -> ProcessingMode:
+        return self.__mode
+
+    @property
+    def degraded_max_content_chars(self) -> int:
+        return self.__degraded_max_content_chars
+
+    @property
+    def degraded_max_ngram_size(self) -> int:
+        return self.__degraded_max_ngram_size
+
+    def report_queue_depth(self, depth: int):
+        """Report the depth of a queue that is waiting outside of KENEC
+
+        Args:
+            depth (int): Number of articles waiting to be added
+        """
+        with self.__lock:
+            self.__external_queue_depth = max(depth, 0)
+            self.__update_mode()
+
+    def acquire(self, published_date: Optional[datetime] = None) -> ProcessingMode:
+        """Register an article entering processing and decide its processing mode
+
+        Args:
+            published_date (Optional[datetime]): Publication date of the article, used to measure lag
+
+        Returns:
+            ProcessingMode: The mode in which the article should be processed
+        """
+        with self.__lock:
+            self.__in_flight += 1
+            if published_date is not None:
+                now = datetime.now(published_date.tzinfo)
+                lag = max((now - published_date).total_seconds(), 0.0)
+                self.__lag_seconds = (
+                    lag
+                    if self.__lag_seconds is None
+                    else self.__lag_smoothing * lag
+                    + (1 - self.__lag_smoothing) * self.__lag_seconds
+                )
+            self.__update_mode()
+            self.__articles_by_mode[self.__mode] += 1
+            return self.__mode
+
+    def release(self):
+        """Register an article leaving processing"""
+        with self.__lock:
+            self.__in_flight = max(self.__in_flight - 1, 0)
+            self.__update_mode()
+
+    def __update_mode(self):
+        """Move between modes using the high and low watermarks (caller holds the lock)"""
+        queue_depth = self.__in_flight + self.__external_queue_depth
+        lag = self.__lag_seconds if self.__lag_seconds is not None else 0.0
+        if self.__mode == "full" and (
+            queue_depth >= self.__high_queue_depth
+            or lag >= self.__max_lag.total_seconds()
+        ):
+            self.__mode = "degraded"
+        elif (
+            self.__mode == "degraded"
+            and queue_depth <= self.__low_queue_depth
+            and lag <= self.__recovery_lag.total_seconds()
+        ):
+            self.__mode = "full"
+        else:
+            return
+        self.__mode_switches += 1
+        logging.info(
+            "Switched extraction to '%s' mode (queue depth: %d, lag: %.0fs)",
+            self.__mode,
+            queue_depth,
+            lag,
+        )
+
+    def report(self) -> LoadGovernorReport:
+        """Current load and processing mode statistics
+
+        Returns:
+            LoadGovernorReport: Load governor statistics
+        """
+        with self.__lock:
+            return LoadGovernorReport(
+                mode=self.__mode,
+                queue_depth=self.__in_flight + self.__external_queue_depth,
+                lag_seconds=self.__lag_seconds,
+                mode_switches=self.__mode_switches,
+                articles_by_mode=dict(self.__articles_by_mode),
+            )
@@ -0,0 +1,431 @@
+"""CPU resource settings of a KENEC process, and a search for the best ones
+
+Run `python -m modules.governor.resources MODEL TEXTS [--cpus N]` to measure
+the NER throughput of every thread configuration that fits the machine, where
+MODEL is a single NER option of `KENEC` and TEXTS a file of one text per line.
+Each configuration is measured in a fresh process, since BLAS and torch
+inter-op thread counts cannot be changed once in use.
+"""
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+from typing import Optional, cast, get_args
+
+from type.governor import ResourceBenchmarkResult, ResourceReport
+
+# Thread count variables of the BLAS and OpenMP libraries, read when they are loaded
+_BLAS_THREAD_VARIABLES = (
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "BLIS_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+)
+
+
+def available_cpus() -> list[int]:
+    """CPUs the calling thread may run on"""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def _process_threads() -> int:
+    """OS threads of the process, including the ones of native libraries"""
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("Threads:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return threading.active_count()
+
+
+class ResourceGovernor:
+    """Central thread and CPU settings of a process running KENEC
+
+    Torch, spaCy's thinc, the HF tokenizers, BLAS and the NER replica pool
+    each size their thread pools for the whole machine by default, so a
+    process ends up with several times more busy threads than cores. The
+    governor sets all of them from one place, before the models are loaded:
+
+    - torch intra-op threads of the replicas (`ner_intra_op_threads`), and
+      of the process (`intra_op_threads`, `inter_op_threads`)
+    - BLAS/OpenMP threads, through their environment variables (also read by
+      worker processes) and threadpoolctl for the libraries already loaded
+    - HF tokenizers parallelism
+    - the CPUs of the process, and optionally one CPU set per NER replica
+
+    `apply` returns a report of the settings in effect, with a warning for
+    each one that could not be applied and for oversubscription.
+    """
+
+    __intra_op_threads: Optional[int]
+    __inter_op_threads: Optional[int]
+    __blas_threads: Optional[int]
+    __tokenizers_parallelism: Optional[bool]
+    __cpu_affinity: Optional[list[int]]
+    __ner_replicas: Optional[int]
+    __ner_intra_op_threads: Optional[int]
+    __pin_replicas: bool
+    __warnings: list[str]
+
+    def __init__(
+        self,
+        *,
+        ner_replicas: Optional[int] = None,
+        ner_intra_op_threads: Optional[int] = None,
+        intra_op_threads: Optional[int] = None,
+        inter_op_threads: Optional[int] = None,
+        blas_threads: Optional[int] = 1,
+        tokenizers_parallelism: Optional[bool] = False,
+        cpu_affinity: Optional[Sequence[int]] = None,
+        pin_replicas: bool = False,
+    ):
+        """Initialize the governor, nothing is applied yet
+
+        Args:
+            ner_replicas (Optional[int]): Number of replicas of each NER model. Models are shared without a replica pool if not provided.
+            ner_intra_op_threads (Optional[int]): Torch intra-op threads of each NER replica. Defaults to the available CPUs divided by the replicas.
+            intra_op_threads (Optional[int]): Torch intra-op threads of the threads outside the replica pool. Left to torch if not provided.
+            inter_op_threads (Optional[int]): Torch inter-op threads of the process. Left to torch if not provided.
+            blas_threads (Optional[int]): Threads of the BLAS/OpenMP libraries (NumPy's vector maths). Left to the libraries if None.
+            tokenizers_parallelism (Optional[bool]): Whether the HF tokenizers use their own thread pool. Left to the library if None.
+            cpu_affinity (Optional[Sequence[int]]): CPUs the process runs on (Linux only). Left unchanged if not provided.
+            pin_replicas (bool): Whether each NER replica thread is pinned to its own CPUs (Linux only)
+        """
+        for name, value in (
+            ("NER replicas", ner_replicas),
+            ("NER intra-op threads", ner_intra_op_threads),
+            ("Intra-op threads", intra_op_threads),
+            ("Inter-op threads", inter_op_threads),
+            ("BLAS threads", blas_threads),
+        ):
+            if value is not None and value <= 0:
+                raise ValueError(f"{name} should be a value > 0")
+        if cpu_affinity is not None and not cpu_affinity:
+            raise ValueError("CPU affinity should have at least one CPU")
+        if ner_intra_op_threads is not None and ner_replicas is None:
+            raise ValueError("NER intra-op threads need NER replicas")
+        self.__intra_op_threads = intra_op_threads
+        self.__inter_op_threads = inter_op_threads
+        self.__blas_threads = blas_threads
+        self.__tokenizers_parallelism = tokenizers_parallelism
+        self.__cpu_affinity = sorted(cpu_affinity) if cpu_affinity else None
+        self.__ner_replicas = ner_replicas
+        self.__ner_intra_op_threads = ner_intra_op_threads
+        self.__pin_replicas = pin_replicas
+        self.__warnings = []
+
+    @property
+    def ner_replicas(self) -> Optional[int]:
+        return self.__ner_replicas
+
+    @property
+    def ner_intra_op_threads(self) -> Optional[int]:
+        if self.__ner_replicas is None or self.__ner_intra_op_threads is not None:
+            return self.__ner_intra_op_threads
+        cpus = self.__cpu_affinity or available_cpus()
+        return max(1, len(cpus) // self.__ner_replicas)
+
+    def replica_cpu_sets(self) -> Optional[list[list[int]]]:
+        """CPUs of each NER replica, None if replicas are not pinned
+
+        Returns:
+            Optional[list[list[int]]]: One set of `ner_intra_op_threads` consecutive CPUs per replica
+        """
+        threads = self.ner_intra_op_threads
+        if not self.__pin_replicas or self.__ner_replicas is None or threads is None:
+            return None
+        if not hasattr(os, "sched_setaffinity"):
+            return None
+        cpus = self.__cpu_affinity or available_cpus()
+        if self.__ner_replicas * threads > len(cpus):
+            # Overlapping sets would pin replicas onto each other
+            return None
+        return [
+            cpus[replica * threads : (replica + 1) * threads]
+            for replica in range(self.__ner_replicas)
+        ]
+
+    def apply(self) -> ResourceReport:
+        """Apply the settings, before the models and pools start their threads
+
+        Returns:
+            ResourceReport: The settings in effect afterwards
+        """
+        self.__warnings = []
+        if self.__cpu_affinity is not None:
+            self.__apply_affinity(self.__cpu_affinity)
+        if self.__blas_threads is not None:
+            self.__apply_blas_threads(self.__blas_threads)
+        if self.__tokenizers_parallelism is not None:
+            os.environ["TOKENIZERS_PARALLELISM"] = (
+                "true" if self.__tokenizers_parallelism else "false"
+            )
+        if self.__intra_op_threads is not None or self.__inter_op_threads is not None:
+            self.__apply_torch_threads()
+        if self.__pin_replicas and self.replica_cpu_sets() is None:
+            self.__warnings.append(
+                "NER replicas are not pinned: it needs NER replicas, Linux and "
+                "enough CPUs for a set of intra-op threads per replica"
+            )
+
+        cpus = len(self.__cpu_affinity or available_cpus())
+        busy_threads = (self.__ner_replicas or 0) * (self.ner_intra_op_threads or 0)
+        if busy_threads > cpus:
+            self.__warnings.append(
+                f"{self.__ner_replicas} NER replicas of {self.ner_intra_op_threads} "
+                f"threads oversubscribe the {cpus} available CPUs"
+            )
+        for warning in self.__warnings:
+            logging.warning("Resource settings: %s", warning)
+        return self.report()
+
+    def report(self) -> ResourceReport:
+        """Settings in effect in the process
+
+        Returns:
+            ResourceReport: The report
+        """
+        torch_intra_op_threads = torch_inter_op_threads = None
+        if "torch" in sys.modules:
+            torch = sys.modules["torch"]
+            torch_intra_op_threads = torch.get_num_threads()
+            torch_inter_op_threads = torch.get_num_interop_threads()
+        blas_threads: dict[str, int] = {}
+        try:
+            from threadpoolctl import threadpool_info
+        except ImportError:
+            pass
+        else:
+            for info in threadpool_info():
+                library = (
+                    f"{info['internal_api']} ({os.path.basename(info['filepath'])})"
+                )
+                blas_threads[library] = info["num_threads"]
+        return ResourceReport(
+            cpus=os.cpu_count() or 1,
+            available_cpus=available_cpus(),
+            torch_intra_op_threads=torch_intra_op_threads,
+            torch_inter_op_threads=torch_inter_op_threads,
+            blas_threads=blas_threads,
+            tokenizers_parallelism=os.environ.get("TOKENIZERS_PARALLELISM"),
+            ner_replicas=self.__ner_replicas,
+            ner_intra_op_threads=self.ner_intra_op_threads,
+            process_threads=_process_threads(),
+            warnings=list(self.__warnings),
+        )
+
+    def __apply_affinity(self, cpus: list[int]):
+        if not hasattr(os, "sched_setaffinity"):
+            self.__warnings.append("CPU affinity is only supported on Linux")
+            return
+        try:
+            # Every thread already started, later threads inherit it from their parent
+            for thread_id in os.listdir("/proc/self/task"):
+                os.sched_setaffinity(int(thread_id), cpus)
+        except OSError as e:
+            self.__warnings.append(f"Could not set the CPU affinity: {e}")
+
+    def __apply_blas_threads(self, threads: int):
+        for variable in _BLAS_THREAD_VARIABLES:
+            os.environ[variable] = str(threads)
+        try:
+            from threadpoolctl import threadpool_limits
+        except ImportError:
+            self.__warnings.append(
+                "threadpoolctl is not installed (`pip install kenec[resources]`), "
+                "BLAS libraries loaded before the settings keep their thread count"
+            )
+            return
+        threadpool_limits(threads)
+
+    def __apply_torch_threads(self):
+        try:
+            import torch
+        except ImportError:
+            self.__warnings.append("torch is not installed, its threads are not set")
+            return
+        if self.__intra_op_threads is not None:
+            torch.set_num_threads(self.__intra_op_threads)
+        if self.__inter_op_threads is not None:
+            try:
+                torch.set_num_interop_threads(self.__inter_op_threads)
+            except RuntimeError as e:
+                # Only possible before torch runs its first inter-op parallel work
+                self.__warnings.append(f"Could not set the inter-op threads: {e}")
+
+
+def candidate_settings(
+    cpus: int, max_replicas: Optional[int] = None
+) -> list[tuple[int, int]]:
+    """(replicas, intra-op threads) configurations worth measuring on a number of CPUs
+
+    Powers of two of both, using between half and all of the CPUs.
+    """
+    settings = []
+    replicas = 1
+    while replicas <= min(cpus, max_replicas or cpus):
+        threads = 1
+        while replicas * threads <= cpus:
+            if replicas * threads * 2 > cpus:
+                settings.append((replicas, threads))
+            threads *= 2
+        replicas *= 2
+    return settings
+
+
+def _measure(
+    option: str,
+    texts: list[str],
+    replicas: int,
+    intra_op_threads: int,
+    blas_threads: int,
+    cpus: Optional[list[int]],
+) -> float:
+    """NER throughput of one configuration, in a fresh worker process"""
+    from _model import SingleNERModelOption, load_ner_model
+    from modules.ner import ReplicaPool
+
+    governor = ResourceGovernor(
+        ner_replicas=replicas,
+        ner_intra_op_threads=intra_op_threads,
+        blas_threads=blas_threads,
+        cpu_affinity=cpus,
+    )
+    governor.apply()
+    pool = ReplicaPool(
+        lambda: load_ner_model(cast(SingleNERModelOption, option)),
+        replicas,
+        intra_op_threads=intra_op_threads,
+    )
+
+    async def run() -> float:
+        # Warm every replica up first (lazy weights, allocator, caches)
+        await asyncio.gather(
+            *(pool.get_entities_from_text(text) for text in texts[:replicas])
+        )
+        start = perf_counter()
+        await asyncio.gather(*(pool.get_entities_from_text(text) for text in texts))
+        return len(texts) / (perf_counter() - start)
+
+    try:
+        return asyncio.run(run())
+    finally:
+        pool.close()
+
+
+def benchmark_resources(
+    option: str,
+    texts: list[str],
+    *,
+    cpus: Optional[int] = None,
+    max_replicas: Optional[int] = None,
+    blas_threads: Sequence[int] = (1,),
+) -> list[ResourceBenchmarkResult]:
+    """Measure the NER throughput of the thread configurations fitting the machine
+
+    Args:
+        option (str): Single NER option of `KENEC` whose model is measured
+        texts (list[str]): Texts extracted by every configuration
+        cpus (Optional[int]): Number of CPUs to use, the first ones available. Defaults to all available CPUs.
+        max_replicas (Optional[int]): Largest number of replicas tried, e.g. to fit the models in memory
+        blas_threads (Sequence[int]): BLAS thread counts tried with each configuration
+
+    Returns:
+        list[ResourceBenchmarkResult]: A result per configuration, fastest first
+    """
+    if not texts:
+        raise ValueError("Texts should not be empty")
+    used_cpus = available_cpus()[:cpus] if cpus is not None else available_cpus()
+    results = []
+    for replicas, threads in candidate_settings(len(used_cpus), max_replicas):
+        for blas in blas_threads:
+            # Spawned, so thread pools of this process are not inherited
+            with ProcessPoolExecutor(
+                1, mp_context=multiprocessing.get_context("spawn")
+            ) as executor:
+                try:
+                    texts_per_second = executor.submit(
+                        _measure,
+                        option,
+                        texts,
+                        replicas,
+                        threads,
+                        blas,
+                        used_cpus if cpus is not None else None,
+                    ).result()
+                    error = None
+                except Exception as e:
+                    texts_per_second, error = 0.0, str(e) or type(e).__name__
+            logging.info(
+                "%d replicas x %d threads, %d BLAS threads: %.1f texts/s",
+                replicas,
+                threads,
+                blas,
+                texts_per_second,
+            )
+            results.append(
+                ResourceBenchmarkResult(
+                    ner_replicas=replicas,
+                    ner_intra_op_threads=threads,
+                    blas_threads=blas,
+                    texts_per_second=texts_per_second,
+                    error=error,
+                )
+            )
+    return sorted(results, key=lambda result: -result.texts_per_second)
+
+
+def main():
+    from _model import SingleNERModelOption
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("model", choices=get_args(SingleNERModelOption))
+    parser.add_argument("texts", help="File of one text per line")
+    parser.add_argument("--cpus", type=int)
+    parser.add_argument("--max-replicas", type=int)
+    parser.add_argument("--blas-threads", type=int, nargs="+", default=[1])
+    parser.add_argument("--limit", type=int, default=500, help="Texts measured")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    with open(args.texts) as file:
+        texts = [line.strip() for line in file if line.strip()][: args.limit]
+    results = benchmark_resources(
+        args.model,
+        texts,
+        cpus=args.cpus,
+        max_replicas=args.max_replicas,
+        blas_threads=args.blas_threads,
+    )
+    print(f"{'replicas':>8s} {'threads':>7s} {'blas':>4s} {'texts/s':>9s}")
+    for result in results:
+        print(
+            f"{result.ner_replicas:8d} {result.ner_intra_op_threads:7d}"
+            f" {result.blas_threads:4d} {result.texts_per_second:9.1f}"
+            + (f"  ({result.error})" if result.error else "")
+        )
+    best = results[0]
+    if best.error is None:
+        print(
+            "\nBest: ResourceGovernor("
+            f"ner_replicas={best.ner_replicas}, "
+            f"ner_intra_op_threads={best.ner_intra_op_threads}, "
+            f"blas_threads={best.blas_threads})"
+        )
+
+
+if __name__ == "__main__":
+    main()
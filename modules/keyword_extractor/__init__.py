@@ -1,3 +1,9 @@
+from .numpy_yake import NumpyYakeKeywordExtractor
+from .shared_parse import SharedParseKeywordExtractor
 from .yake import YakeKeywordExtractor
 
-__all__ = ["YakeKeywordExtractor"]
+__all__ = [
+    "YakeKeywordExtractor",
+    "NumpyYakeKeywordExtractor",
+    "SharedParseKeywordExtractor",
+]
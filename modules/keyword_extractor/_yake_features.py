@@ -0,0 +1,455 @@
+"""
+Vectorized YAKE term and candidate scoring
+
+The statistics that `yake` computes with one Python object per term and a
+`networkx` co-occurrence graph are computed here with NumPy arrays over the
+tokens of a whole batch of documents. Term ids are unique across the batch, so
+every reduction runs once per batch and per-document statistics are gathered
+through each term's document index.
+"""
+
+import math
+import re
+import string
+from typing import Optional
+
+import numpy as np
+from segtok.segmenter import split_multi
+from segtok.tokenizer import split_contractions, web_tokenizer
+
+_PUNCTUATION = frozenset(string.punctuation)
+_SENTENCE_START = re.compile(r"^(\s*([A-Z]))")
+_SENTENCE_ENDS = frozenset({".", "!", "?", "...", "…"})
+_SENTENCE_CLOSERS = frozenset({")", "]", "”", "’", "»"})
+
+# Tag codes (YAKE tags: p = plain, n = proper noun, a = acronym, d = digit, u = unusual)
+_TAG_PLAIN, _TAG_NOUN, _TAG_ACRONYM, _TAG_DIGIT, _TAG_UNUSUAL = range(5)
+
+
+def tokenize_document(text: str) -> list[list[str]]:
+    """Split a text into sentences of tokens exactly as `yake` does
+
+    Args:
+        text (str): The raw text
+
+    Returns:
+        list[list[str]]: Tokens of each sentence
+    """
+    text = text.replace("\n", " ")
+    buffer = ""
+    for part in text.split("\n"):
+        buffer += ("\n\n" if _SENTENCE_START.match(part) else " ") + part.replace(
+            "\t", " "
+        )
+    return [
+        [
+            word
+            for word in split_contractions(web_tokenizer(sentence))
+            if not (word.startswith("'") and len(word) > 1) and len(word) > 0
+        ]
+        for sentence in split_multi(buffer)
+        if len(sentence.strip()) > 0
+    ]
+
+
+def split_token_sentences(tokens: list[str]) -> list[list[str]]:
+    """Split the tokens of a text, as another tokenizer split it, into sentences
+
+    Sentences end after `.`, `!` or `?` and the closing quotes or brackets
+    that follow it. Tokens are filtered like `tokenize_document` filters them.
+
+    Args:
+        tokens (list[str]): Tokens of the text, in order
+
+    Returns:
+        list[list[str]]: Tokens of each sentence
+    """
+    sentences: list[list[str]] = []
+    sentence: list[str] = []
+    ended = False
+    for word in tokens:
+        if not word.strip() or (word.startswith("'") and len(word) > 1):
+            continue
+        if ended and word not in _SENTENCE_CLOSERS:
+            sentences.append(sentence)
+            sentence = []
+            ended = False
+        sentence.append(word)
+        if word in _SENTENCE_ENDS:
+            ended = True
+    if sentence:
+        sentences.append(sentence)
+    return sentences
+
+
+def _tag(word: str, position: int) -> int:
+    """YAKE's heuristic tag of a word at a position in its sentence"""
+    if (
+        word.replace(",", "").isdigit()
+        or word.replace(",", "").replace(".", "", 1).isdigit()
+    ):
+        return _TAG_DIGIT
+    digits = sum(c.isdigit() for c in word)
+    alphas = sum(c.isalpha() for c in word)
+    punctuation = sum(c in _PUNCTUATION for c in word)
+    if (digits > 0 and alphas > 0) or (digits == 0 and alphas == 0) or punctuation > 1:
+        return _TAG_UNUSUAL
+    if word.isupper() and len(word) > 0:
+        return _TAG_ACRONYM
+    if len(word) > 1 and word[0].isupper() and position > 0:
+        if sum(c.isupper() for c in word) == 1:
+            return _TAG_NOUN
+    return _TAG_PLAIN
+
+
+def _term_key(lower_word: str, stopwords: set[str]) -> tuple[str, bool]:
+    """Normalized term of a lowercased word and whether it is a stopword"""
+    is_stopword = lower_word in stopwords
+    if lower_word.endswith("s") and len(lower_word) > 3:
+        lower_word = lower_word[:-1]
+    stripped = "".join(c for c in lower_word if c not in _PUNCTUATION)
+    return lower_word, (is_stopword or lower_word in stopwords or len(stripped) < 3)
+
+
+def score_documents(
+    documents: list[list[list[str]]],
+    stopwords: set[str],
+    *,
+    max_ngram_size: int = 3,
+    window_size: int = 1,
+) -> list[list[tuple[str, float]]]:
+    """Score the keyword candidates of a batch of tokenized documents
+
+    Args:
+        documents (list[list[list[str]]]): Documents as sentences of tokens
+        stopwords (set[str]): Lowercased stopwords
+        max_ngram_size (int): Maximum number of words in a candidate
+        window_size (int): Co-occurrence window of terms
+
+    Returns:
+        list[list[tuple[str, float]]]: Valid candidates of each document with their
+            YAKE score, sorted by score (lower is better)
+    """
+    # ---- Token pass: the only per-token Python work ----
+    token_doc: list[int] = []
+    token_sentence: list[int] = []
+    token_term: list[int] = []
+    token_surface: list[int] = []
+    token_tag: list[int] = []
+    token_block: list[int] = []
+    token_words: list[str] = []
+    term_doc: list[int] = []
+    term_stopword: list[bool] = []
+    sentence_counts: list[int] = []
+    tag_cache: dict[tuple[str, bool], int] = {}
+    punctuation_cache: dict[str, bool] = {}
+    surfaces: dict[tuple[int, str], int] = {}  # Lowercased words of each document
+    block = 0
+    for doc_id, sentences in enumerate(documents):
+        terms: dict[str, int] = {}
+        sentence_counts.append(len(sentences))
+        for sentence_id, sentence in enumerate(sentences):
+            block += 1
+            for position, word in enumerate(sentence):
+                is_punctuation = punctuation_cache.get(word)
+                if is_punctuation is None:
+                    is_punctuation = all(c in _PUNCTUATION for c in word)
+                    punctuation_cache[word] = is_punctuation
+                if is_punctuation:
+                    block += 1
+                    continue
+                tag_key = (word, position > 0)
+                tag = tag_cache.get(tag_key)
+                if tag is None:
+                    tag = _tag(word, position)
+                    tag_cache[tag_key] = tag
+                lower_word = word.lower()
+                surface_key = (doc_id, lower_word)
+                surface_id = surfaces.get(surface_key)
+                if surface_id is None:
+                    surface_id = len(surfaces)
+                    surfaces[surface_key] = surface_id
+                term_name, is_stopword = _term_key(lower_word, stopwords)
+                term_id = terms.get(term_name)
+                if term_id is None:
+                    term_id = len(term_doc)
+                    terms[term_name] = term_id
+                    term_doc.append(doc_id)
+                    term_stopword.append(is_stopword)
+                token_doc.append(doc_id)
+                token_sentence.append(sentence_id)
+                token_term.append(term_id)
+                token_surface.append(surface_id)
+                token_tag.append(tag)
+                token_block.append(block)
+                token_words.append(word)
+
+    results: list[list[tuple[str, float]]] = [[] for _ in documents]
+    if not token_term:
+        return results
+
+    n_docs = len(documents)
+    n_terms = len(term_doc)
+    doc_of_token = np.asarray(token_doc, dtype=np.int64)
+    sentence_of_token = np.asarray(token_sentence, dtype=np.int64)
+    term_of_token = np.asarray(token_term, dtype=np.int64)
+    surface_of_token = np.asarray(token_surface, dtype=np.int64)
+    tag_of_token = np.asarray(token_tag, dtype=np.int8)
+    block_of_token = np.asarray(token_block, dtype=np.int64)
+    doc_of_term = np.asarray(term_doc, dtype=np.int64)
+    stopword = np.asarray(term_stopword, dtype=bool)
+    sentences_per_doc = np.asarray(sentence_counts, dtype=np.float64)
+
+    # ---- Term frequencies and casing ----
+    tf = np.bincount(term_of_token, minlength=n_terms).astype(np.float64)
+    tf_acronym = np.bincount(
+        term_of_token, weights=tag_of_token == _TAG_ACRONYM, minlength=n_terms
+    )
+    tf_noun = np.bincount(
+        term_of_token, weights=tag_of_token == _TAG_NOUN, minlength=n_terms
+    )
+
+    valid_term = ~stopword
+    valid_per_doc = np.bincount(doc_of_term[valid_term], minlength=n_docs)
+    has_valid = valid_per_doc > 0
+    safe_valid_count = np.maximum(valid_per_doc, 1)
+    avg_tf = (
+        np.bincount(doc_of_term[valid_term], weights=tf[valid_term], minlength=n_docs)
+        / safe_valid_count
+    )
+    deviation = tf[valid_term] - avg_tf[doc_of_term[valid_term]]
+    std_tf = np.sqrt(
+        np.bincount(
+            doc_of_term[valid_term], weights=deviation * deviation, minlength=n_docs
+        )
+        / safe_valid_count
+    )
+    max_tf = np.zeros(n_docs, dtype=np.float64)
+    np.maximum.at(max_tf, doc_of_term, tf)
+
+    # ---- Co-occurrence graph as a sorted array of (left, right) edge codes ----
+    relatable = (tag_of_token != _TAG_DIGIT) & (tag_of_token != _TAG_UNUSUAL)
+    edge_codes_parts = []
+    for offset in range(1, window_size + 1):
+        left = np.arange(len(term_of_token) - offset)
+        right = left + offset
+        linked = (
+            (block_of_token[left] == block_of_token[right])
+            & relatable[left]
+            & relatable[right]
+        )
+        edge_codes_parts.append(
+            term_of_token[left[linked]] * n_terms + term_of_token[right[linked]]
+        )
+    edge_codes, edge_tf = np.unique(
+        np.concatenate(edge_codes_parts), return_counts=True
+    )
+    edge_tf = edge_tf.astype(np.float64)
+    edge_left = edge_codes // n_terms
+    edge_right = edge_codes % n_terms
+    out_degree = np.bincount(edge_left, minlength=n_terms).astype(np.float64)
+    out_weight = np.bincount(edge_left, weights=edge_tf, minlength=n_terms)
+    in_degree = np.bincount(edge_right, minlength=n_terms).astype(np.float64)
+    in_weight = np.bincount(edge_right, weights=edge_tf, minlength=n_terms)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        right_ratio = np.where(out_weight == 0, 0.0, out_degree / out_weight)
+        left_ratio = np.where(in_weight == 0, 0.0, in_degree / in_weight)
+
+    # ---- Sentence spread and position (median of distinct sentence ids) ----
+    max_sentences = int(sentences_per_doc.max()) + 1
+    term_sentence_codes = np.unique(term_of_token * max_sentences + sentence_of_token)
+    term_sentence_term = term_sentence_codes // max_sentences
+    term_sentence_id = (term_sentence_codes % max_sentences).astype(np.float64)
+    distinct_sentences = np.bincount(term_sentence_term, minlength=n_terms)
+    first = np.concatenate(([0], np.cumsum(distinct_sentences)[:-1]))
+    median_sentence = (
+        term_sentence_id[first + (distinct_sentences - 1) // 2]
+        + term_sentence_id[first + distinct_sentences // 2]
+    ) / 2
+
+    # ---- Term score ----
+    max_tf_of_term = max_tf[doc_of_term]
+    tf_ratio = tf / max_tf_of_term
+    w_rel = 0.5 + left_ratio * tf_ratio + (0.5 + right_ratio * tf_ratio)
+    freq_norm = (avg_tf + std_tf)[doc_of_term]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        w_freq = np.where(freq_norm > 0, tf / freq_norm, 0.0)
+    w_spread = distinct_sentences / sentences_per_doc[doc_of_term]
+    w_case = np.maximum(tf_acronym, tf_noun) / (1.0 + np.log(tf))
+    w_pos = np.log(np.log(3.0 + median_sentence))
+    term_h = w_pos * w_rel / (w_case + w_freq / w_rel + w_spread / w_rel)
+
+    # ---- Candidate n-grams in insertion order (token, then length) ----
+    n_tokens = len(term_of_token)
+    grams = []  # (first token, token of insertion order, length)
+    for length in range(1, max_ngram_size + 1):
+        end = np.arange(length - 1, n_tokens)
+        start = end - (length - 1)
+        same_block = block_of_token[start] == block_of_token[end]
+        grams.append(
+            np.stack(
+                (start[same_block], end[same_block], np.full(same_block.sum(), length))
+            )
+        )
+    gram_start, gram_end, gram_length = np.concatenate(grams, axis=1)
+    order = np.lexsort((gram_length, gram_end))
+    gram_start, gram_end, gram_length = (
+        gram_start[order],
+        gram_end[order],
+        gram_length[order],
+    )
+    gram_positions = gram_start[:, None] + np.arange(max_ngram_size)[None, :]
+    gram_in_range = np.arange(max_ngram_size)[None, :] < gram_length[:, None]
+    gram_positions = np.where(gram_in_range, gram_positions, 0)
+    gram_surfaces = np.where(gram_in_range, surface_of_token[gram_positions], -1)
+    gram_clean = np.all(~gram_in_range | relatable[gram_positions], axis=1)
+
+    _, candidate_first, candidate_of_gram, candidate_tf = np.unique(
+        gram_surfaces,
+        axis=0,
+        return_index=True,
+        return_inverse=True,
+        return_counts=True,
+    )
+    candidate_of_gram = candidate_of_gram.reshape(-1)
+    candidate_clean = np.bincount(candidate_of_gram, weights=gram_clean) > 0
+
+    candidate_positions = gram_positions[candidate_first]
+    candidate_in_range = gram_in_range[candidate_first]
+    candidate_length = gram_length[candidate_first]
+    candidate_terms = term_of_token[candidate_positions]
+    last_index = candidate_length - 1
+    rows = np.arange(len(candidate_first))
+    starts_or_ends_stopword = (
+        stopword[candidate_terms[:, 0]] | stopword[candidate_terms[rows, last_index]]
+    )
+    valid = candidate_clean & ~starts_or_ends_stopword
+
+    # ---- Candidate score ----
+    def edge_probability(left: np.ndarray, right: np.ndarray) -> np.ndarray:
+        if len(edge_codes) == 0:
+            return np.zeros(len(left))
+        codes = left * n_terms + right
+        index = np.minimum(np.searchsorted(edge_codes, codes), len(edge_codes) - 1)
+        found = edge_codes[index] == codes
+        return np.where(found, edge_tf[index], 0.0)
+
+    sum_h = np.zeros(len(candidate_first))
+    prod_h = np.ones(len(candidate_first))
+    for k in range(max_ngram_size):
+        present = candidate_in_range[:, k]
+        terms = candidate_terms[:, k]
+        is_stop = stopword[terms]
+        content = present & ~is_stop
+        sum_h = np.where(content, sum_h + term_h[terms], sum_h)
+        prod_h = np.where(content, prod_h * term_h[terms], prod_h)
+
+        probability_left = np.zeros(len(candidate_first))
+        probability_right = np.zeros(len(candidate_first))
+        if k > 0:
+            previous = candidate_terms[:, k - 1]
+            probability_left = edge_probability(previous, terms) / tf[previous]
+        if k + 1 < max_ngram_size:
+            following = candidate_terms[:, k + 1]
+            has_following = candidate_in_range[:, k + 1]
+            probability_right = np.where(
+                has_following,
+                edge_probability(terms, following) / tf[following],
+                0.0,
+            )
+        probability = probability_left * probability_right
+        linked_stop = present & is_stop
+        prod_h = np.where(linked_stop, prod_h * (1 + (1 - probability)), prod_h)
+        sum_h = np.where(linked_stop, sum_h - (1 - probability), sum_h)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        candidate_h = prod_h / ((sum_h + 1) * candidate_tf)
+
+    # ---- Per document ranking (ties keep the insertion order) ----
+    candidate_doc = doc_of_token[gram_start[candidate_first]]
+    valid &= has_valid[candidate_doc]
+    ranked = np.flatnonzero(valid)
+    ranked = ranked[
+        np.lexsort(
+            (candidate_first[ranked], candidate_h[ranked], candidate_doc[ranked])
+        )
+    ]
+    for candidate in ranked.tolist():
+        start = int(gram_start[candidate_first[candidate]])
+        keyword = " ".join(
+            token_words[start : start + int(candidate_length[candidate])]
+        )
+        results[int(candidate_doc[candidate])].append(
+            (keyword, float(candidate_h[candidate]))
+        )
+    return results
+
+
+def _bounded_levenshtein(first: str, second: str, limit: int) -> int:
+    """Levenshtein distance of two strings, or `limit + 1` once it exceeds `limit`
+
+    Only the diagonal band of width `2 * limit + 1` of the edit matrix is filled.
+    """
+    if len(first) < len(second):
+        first, second = second, first
+    if len(first) - len(second) > limit:
+        return limit + 1
+    beyond = limit + 1
+    previous = [j if j <= limit else beyond for j in range(len(second) + 1)]
+    for i, first_char in enumerate(first, start=1):
+        low = max(1, i - limit)
+        high = min(len(second), i + limit)
+        current = [beyond] * (len(second) + 1)
+        if i <= limit:
+            current[0] = i
+        for j in range(low, high + 1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (first_char != second[j - 1]),
+            )
+        if min(current[max(0, low - 1) : high + 1]) > limit:
+            return beyond
+        previous = current
+    return min(previous[-1], beyond)
+
+
+def _is_duplicate(first: str, second: str, threshold: float) -> bool:
+    """Whether 1 - (Levenshtein distance / longer length) exceeds the threshold"""
+    if first == second:
+        return True
+    longest = max(len(first), len(second))
+    limit = math.ceil((1 - threshold) * longest)
+    distance = _bounded_levenshtein(first, second, limit)
+    return distance <= limit and 1 - distance / longest > threshold
+
+
+def deduplicate(
+    candidates: list[tuple[str, float]],
+    *,
+    threshold: float = 0.9,
+    top: Optional[int] = 20,
+) -> list[tuple[str, float]]:
+    """Drop candidates too similar to a better ranked one, like `yake` does
+
+    Args:
+        candidates (list[tuple[str, float]]): Candidates sorted by score
+        threshold (float): Similarity above which a candidate is dropped (>= 1 disables deduplication)
+        top (Optional[int]): Maximum number of candidates to keep
+
+    Returns:
+        list[tuple[str, float]]: The kept candidates
+    """
+    if threshold >= 1.0:
+        return candidates[:top]
+    kept: list[tuple[str, float]] = []
+    kept_lower: list[str] = []
+    for keyword, score in candidates:
+        lower_keyword = keyword.lower()
+        if not any(
+            _is_duplicate(lower_keyword, other, threshold) for other in kept_lower
+        ):
+            kept.append((keyword, score))
+            kept_lower.append(lower_keyword)
+            if top is not None and len(kept) == top:
+                break
+    return kept
@@ -0,0 +1,73 @@
+from typing_extensions import override
+
+from type.article import Keyword
+
+from ._base import BaseClass
+from ._yake_features import split_token_sentences
+from .numpy_yake import NumpyYakeKeywordExtractor
+
+
+class SharedParseKeywordExtractor(BaseClass):
+    """Keyword Extractor computing YAKE scores over the tokens of the NER model's parse
+
+    The NER backends that split texts into words (spaCy, Flair) already
+    tokenized the text by the time its keywords are extracted. Scoring their
+    tokens saves YAKE's own segmentation and tokenization of the text.
+    Sentences are recovered from the tokens' end punctuation, so scores are
+    close to but not identical with `NumpyYakeKeywordExtractor`'s. Texts
+    without tokens are tokenized as `NumpyYakeKeywordExtractor` does.
+    """
+
+    __extractor: NumpyYakeKeywordExtractor
+
+    def __init__(
+        self,
+        max_ngram_size: int = 3,
+        *,
+        language: str = "en",
+        window_size: int = 1,
+        top: int = 20,
+        dedup_threshold: float = 0.9,
+    ):
+        """Initialize Model Class
+
+        Args:
+            max_ngram_size (int): Maximum number of words in a keyword
+            language (str): Language of the stopword list
+            window_size (int): Co-occurrence window of terms
+            top (int): Maximum number of keywords per text
+            dedup_threshold (float): Similarity above which a keyword is dropped in favour of a better ranked one
+        """
+        self.__extractor = NumpyYakeKeywordExtractor(
+            max_ngram_size,
+            language=language,
+            window_size=window_size,
+            top=top,
+            dedup_threshold=dedup_threshold,
+        )
+
+    @override
+    async def get_keywords_from_text(self, text: str) -> list[Keyword]:
+        """Extract Keywords from raw text, tokenizing it
+
+        Args:
+            text (str): The text of which the keywords need to be extracted
+
+        Returns:
+            list[Keyword]: A list of `Keyword` Objects
+        """
+        return await self.__extractor.get_keywords_from_text(text)
+
+    async def get_keywords_from_tokens(self, tokens: list[str]) -> list[Keyword]:
+        """Extract Keywords from the tokens of a text
+
+        Args:
+            tokens (list[str]): Tokens of the text as the NER model split it
+
+        Returns:
+            list[Keyword]: A list of `Keyword` Objects
+        """
+        (keywords,) = await self.__extractor.get_keywords_from_documents(
+            [split_token_sentences(tokens)]
+        )
+        return keywords
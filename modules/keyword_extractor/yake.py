@@ -11,9 +11,13 @@ class YakeKeywordExtractor(BaseClass):
 
     __extractor: KeywordExtractor
 
-    def __init__(self):
-        """Initialize Model Class"""
-        self.__extractor = KeywordExtractor()
+    def __init__(self, max_ngram_size: int = 3):
+        """Initialize Model Class
+
+        Args:
+            max_ngram_size (int): Maximum number of words in a keyword
+        """
+        self.__extractor = KeywordExtractor(n=max_ngram_size)
 
     @override
     async def get_keywords_from_text(self, text: str) -> list[Keyword]:
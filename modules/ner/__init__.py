@@ -1,4 +1,9 @@
+from .cascade import CascadeEntityModel
 from .flair import FlairEntityModel
+from .gazetteer import GazetteerEntityModel
+from .pool import ReplicaPool
+from .remote import RemoteEntityModel
+from .server import EntityModelServer
 from .spacy import SpacyEntityModel
 from .xlm_roberta_large_finetuned_conll03_english import (
     XlmRobertaLargeFinetunedConll03EnglishEntityModel,
@@ -8,4 +13,9 @@ __all__ = [
     "XlmRobertaLargeFinetunedConll03EnglishEntityModel",
     "SpacyEntityModel",
     "FlairEntityModel",
+    "CascadeEntityModel",
+    "GazetteerEntityModel",
+    "RemoteEntityModel",
+    "EntityModelServer",
+    "ReplicaPool",
 ]
@@ -0,0 +1,183 @@
+from collections import deque
+from typing import Generic, Optional, TypeVar
+
+V = TypeVar("V")
+
+_ROOT = 0
+
+
+class AhoCorasickAutomaton(Generic[V]):
+    """Multi-pattern matcher finding every known phrase of a text in one pass
+
+    Patterns are case-folded phrases whose whitespace was collapsed (see
+    `normalize_term`), and texts are normalized the same way while they are
+    scanned. Adding a pattern only extends the trie; the failure links are
+    recomputed once, on the next search after a batch of additions.
+    """
+
+    # Per-state tables, indexed by state number
+    __goto: list[dict[str, int]]
+    __fail: list[int]
+    __depth: list[int]
+    # Value of the pattern ending at a state, and the nearest pattern-ending state along the failure links
+    __values: list[Optional[V]]
+    __output: list[int]
+    __patterns: int
+    __stale: bool
+
+    def __init__(self):
+        """Initialize an automaton without patterns"""
+        self.__goto = [{}]
+        self.__fail = [_ROOT]
+        self.__depth = [0]
+        self.__values = [None]
+        self.__output = [-1]
+        self.__patterns = 0
+        self.__stale = False
+
+    def __len__(self) -> int:
+        return self.__patterns
+
+    def __contains__(self, pattern: str) -> bool:
+        state = self.__walk(pattern)
+        return state is not None and self.__values[state] is not None
+
+    def get(self, pattern: str) -> Optional[V]:
+        """Value of a pattern, None if it is not known"""
+        state = self.__walk(pattern)
+        return self.__values[state] if state is not None else None
+
+    def add(self, pattern: str, value: V):
+        """Add a pattern, or replace the value of a known one
+
+        Args:
+            pattern (str): Normalized phrase
+            value (V): Value returned with the matches of the pattern
+        """
+        if not pattern:
+            raise ValueError("Pattern should not be empty")
+        state = _ROOT
+        for char in pattern:
+            next_state = self.__goto[state].get(char)
+            if next_state is None:
+                next_state = len(self.__goto)
+                self.__goto[state][char] = next_state
+                self.__goto.append({})
+                self.__fail.append(_ROOT)
+                self.__depth.append(self.__depth[state] + 1)
+                self.__values.append(None)
+                self.__output.append(-1)
+                self.__stale = True
+            state = next_state
+        if self.__values[state] is None:
+            self.__patterns += 1
+            self.__stale = True
+        self.__values[state] = value
+
+    def __walk(self, pattern: str) -> Optional[int]:
+        state = _ROOT
+        for char in pattern:
+            state = self.__goto[state].get(char)
+            if state is None:
+                return None
+        return state
+
+    def __link(self):
+        """Compute the failure and output links of every state, breadth first"""
+        queue = deque(self.__goto[_ROOT].values())
+        for state in queue:
+            self.__fail[state] = _ROOT
+            self.__output[state] = state if self.__values[state] is not None else -1
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.__goto[state].items():
+                fail = self.__fail[state]
+                while fail != _ROOT and char not in self.__goto[fail]:
+                    fail = self.__fail[fail]
+                fail = self.__goto[fail].get(char, _ROOT)
+                self.__fail[next_state] = fail
+                self.__output[next_state] = (
+                    next_state
+                    if self.__values[next_state] is not None
+                    else self.__output[fail]
+                )
+                queue.append(next_state)
+        self.__stale = False
+
+    def find(self, text: str) -> list[tuple[int, int, V]]:
+        """Find the leftmost-longest, non-overlapping, whole-word matches of the patterns
+
+        Args:
+            text (str): Raw text, normalized on the fly
+
+        Returns:
+            list[tuple[int, int, V]]: Start and end offsets in `text` and value of each match, by start offset
+        """
+        if self.__stale:
+            self.__link()
+        goto = self.__goto
+        fail = self.__fail
+        output = self.__output
+        depth = self.__depth
+        # Offset in `text` of each normalized character, to map matches back
+        offsets: list[int] = []
+        # (normalized start, normalized end, state) of every match
+        found: list[tuple[int, int, int]] = []
+        state = _ROOT
+        previous_space = True
+        for offset, char in enumerate(text):
+            if char.isspace():
+                if previous_space:
+                    continue
+                folded = " "
+                previous_space = True
+            else:
+                folded = char.casefold()
+                previous_space = False
+            for normalized_char in folded:
+                offsets.append(offset)
+                while state != _ROOT and normalized_char not in goto[state]:
+                    state = fail[state]
+                state = goto[state].get(normalized_char, _ROOT)
+                match = output[state]
+                while match != -1:
+                    found.append((len(offsets) - depth[match], len(offsets), match))
+                    match = output[fail[match]]
+        # Longest whole-word match starting at each normalized position
+        longest: dict[int, tuple[int, int]] = {}
+        for start, end, match in found:
+            if end <= longest.get(start, (0, -1))[0]:
+                continue
+            if self.__is_whole_word(text, offsets, start, end):
+                longest[start] = (end, match)
+        matches: list[tuple[int, int, V]] = []
+        covered_until = 0
+        for start in sorted(longest):
+            end, match = longest[start]
+            if start < covered_until:
+                continue
+            value = self.__values[match]
+            assert value is not None
+            matches.append((offsets[start], offsets[end - 1] + 1, value))
+            covered_until = end
+        return matches
+
+    @staticmethod
+    def __is_whole_word(text: str, offsets: list[int], start: int, end: int) -> bool:
+        """Whether a match of normalized positions covers whole characters and words of the text"""
+        if start > 0 and offsets[start - 1] == offsets[start]:
+            return False
+        if end < len(offsets) and offsets[end] == offsets[end - 1]:
+            return False
+        text_start = offsets[start]
+        text_end = offsets[end - 1] + 1
+        return _is_word_boundary(text, text_start - 1, text_start) and (
+            _is_word_boundary(text, text_end - 1, text_end)
+        )
+
+
+def _is_word_boundary(text: str, before: int, after: int) -> bool:
+    """Whether there is a word boundary between two offsets of a text"""
+    if before < 0 or after >= len(text):
+        return True
+    return not (text[before].isalnum() and text[after].isalnum())
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import Optional
 
 from type.article import Entity
 
@@ -22,3 +23,34 @@ class BaseClass(ABC):
             list[Entity]: A list of `Entity` Objects
         """
         raise NotImplementedError
+
+    async def get_entities_from_texts(self, texts: list[str]) -> list[list[Entity]]:
+        """Extract Entities from several raw texts
+
+        Models that can run texts through their network together override
+        this, the default extracts the texts one at a time.
+
+        Args:
+            texts (list[str]): The texts of which the entities need to be extracted
+
+        Returns:
+            list[list[Entity]]: The `Entity` Objects of each text, in the order of the texts
+        """
+        return [await self.get_entities_from_text(text) for text in texts]
+
+    async def get_entities_and_tokens_from_text(
+        self, text: str
+    ) -> tuple[list[Entity], Optional[list[str]]]:
+        """Extract Entities from raw text, with the word tokens the model split it into
+
+        Lets other extractors reuse the model's tokenization instead of
+        tokenizing the text again. Models that split texts into words
+        override this, the default returns no tokens.
+
+        Args:
+            text (str): The text of which te entities need to be extracted
+
+        Returns:
+            tuple[list[Entity], Optional[list[str]]]: A list of `Entity` Objects and the tokens of the text, None if the model does not expose them
+        """
+        return await self.get_entities_from_text(text), None
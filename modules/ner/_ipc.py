@@ -0,0 +1,48 @@
+import asyncio
+import json
+import os
+import struct
+import tempfile
+from typing import Any, Optional
+
+# Socket of the NER server when none is configured, in a directory only the user can use
+DEFAULT_SOCKET_PATH = os.path.join(
+    os.environ.get("XDG_RUNTIME_DIR")
+    or os.path.join(tempfile.gettempdir(), f"kenec-{os.getuid()}"),
+    "kenec-ner.sock",
+)
+
+# Every message is a JSON object prefixed by its length in bytes (big-endian)
+_HEADER = struct.Struct(">I")
+# Longer than any article, and small enough that a corrupt header fails fast
+_MAX_FRAME_BYTES = 64 * 1024 * 1024
+
+
+def encode_frame(message: dict[str, Any]) -> bytes:
+    """Encode a message into a length-prefixed frame"""
+    payload = json.dumps(message, ensure_ascii=False, separators=(",", ":")).encode(
+        "utf-8"
+    )
+    return _HEADER.pack(len(payload)) + payload
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Optional[dict[str, Any]]:
+    """Read the next message of a stream
+
+    Returns:
+        Optional[dict[str, Any]]: The message, None once the other end closed the stream between messages
+
+    Raises:
+        ValueError: If a frame is larger than the maximum frame size
+        asyncio.IncompleteReadError: If the stream ended in the middle of a message
+    """
+    try:
+        header = await reader.readexactly(_HEADER.size)
+    except asyncio.IncompleteReadError as e:
+        if not e.partial:
+            return None
+        raise
+    (length,) = _HEADER.unpack(header)
+    if length > _MAX_FRAME_BYTES:
+        raise ValueError(f"Frame of {length} bytes is larger than the maximum")
+    return json.loads(await reader.readexactly(length))
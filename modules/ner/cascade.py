@@ -0,0 +1,200 @@
+import logging
+import random
+from time import perf_counter
+from typing import Optional
+
+from typing_extensions import override
+
+from modules.ner._base import BaseClass
+from type.article import Entity
+from type.ner import CascadeEscalationReason, CascadeReport
+
+
+class CascadeEntityModel(BaseClass):
+    """NER Model Class that runs a fast model first and escalates to an accurate model
+
+    The fast model's output is accepted unless one of the quality signals fails:
+    - the mean span confidence is below `min_confidence` (only for models exposing
+      scores, so `KENEC` loads spaCy fast models with beam decoding)
+    - the number of entities per 100 words is below `min_entity_density`
+    - on a sampled fraction of texts, the fast and accurate entities disagree too much
+    """
+
+    __fast_model: BaseClass
+    __accurate_model: BaseClass
+    __min_confidence: float
+    __min_entity_density: float
+    __min_words_for_density: int
+    __sample_rate: float
+    __max_sample_disagreement: float
+    __random: random.Random
+    __total: int
+    __escalations: dict[CascadeEscalationReason, int]
+    __sampled: int
+    __sample_agreement_sum: float
+    __fast_seconds: float
+    __accurate_seconds: float
+
+    def __init__(
+        self,
+        fast_model: BaseClass,
+        accurate_model: BaseClass,
+        *,
+        min_confidence: float = 0.80,
+        min_entity_density: float = 0.5,
+        min_words_for_density: int = 40,
+        sample_rate: float = 0.05,
+        max_sample_disagreement: float = 0.5,
+        seed: Optional[int] = None,
+    ):
+        """Initialize Cascade Model Class
+
+        Args:
+            fast_model (BaseClass): The cheap model that is run on every text
+            accurate_model (BaseClass): The expensive model that is run only on escalation
+            min_confidence (float): Minimum mean span confidence to accept the fast model's output
+            min_entity_density (float): Minimum number of entities per 100 words to accept the fast model's output
+            min_words_for_density (int): Texts shorter than this are not checked for entity density
+            sample_rate (float): Fraction of accepted texts that are also run through the accurate model to measure agreement
+            max_sample_disagreement (float): Maximum disagreement (1 - Jaccard similarity of entity words) on a sampled text before escalating it
+            seed (Optional[int]): Seed for the sampling random generator
+        """
+        if not 0 <= sample_rate <= 1:
+            raise ValueError("Sample rate should be a value between 0 and 1")
+        if not 0 <= max_sample_disagreement <= 1:
+            raise ValueError(
+                "Maximum sample disagreement should be a value between 0 and 1"
+            )
+        self.__fast_model = fast_model
+        self.__accurate_model = accurate_model
+        self.__min_confidence = min_confidence
+        self.__min_entity_density = min_entity_density
+        self.__min_words_for_density = min_words_for_density
+        self.__sample_rate = sample_rate
+        self.__max_sample_disagreement = max_sample_disagreement
+        self.__random = random.Random(seed)
+        self.reset_report()
+
+    @override
+    async def get_entities_from_text(self, text: str) -> list[Entity]:
+        """Extract Entities from raw text
+
+        Args:
+            text (str): The text of which te entities need to be extracted
+
+        Returns:
+            list[Entity]: A list of `Entity` Objects
+        """
+        entities, _ = await self.get_entities_and_tokens_from_text(text)
+        return entities
+
+    @override
+    async def get_entities_and_tokens_from_text(
+        self, text: str
+    ) -> tuple[list[Entity], Optional[list[str]]]:
+        """Extract Entities from raw text, with the tokens of the fast model
+
+        The fast model runs on every text, so its tokens are returned even
+        when the entities come from the accurate model.
+
+        Args:
+            text (str): The text of which te entities need to be extracted
+
+        Returns:
+            tuple[list[Entity], Optional[list[str]]]: A list of `Entity` Objects and the tokens of the text, None if the fast model does not expose them
+        """
+        self.__total += 1
+        start = perf_counter()
+        fast_model = self.__fast_model
+        fast_entities, tokens = await fast_model.get_entities_and_tokens_from_text(text)
+        self.__fast_seconds += perf_counter() - start
+
+        reason = self.__check_quality_signals(text, fast_entities)
+        sampled = reason is None and self.__random.random() < self.__sample_rate
+        if reason is None and not sampled:
+            return fast_entities, tokens
+
+        start = perf_counter()
+        accurate_entities = await self.__accurate_model.get_entities_from_text(text)
+        self.__accurate_seconds += perf_counter() - start
+
+        if sampled:
+            agreement = self.__entity_agreement(fast_entities, accurate_entities)
+            self.__sampled += 1
+            self.__sample_agreement_sum += agreement
+            if 1 - agreement > self.__max_sample_disagreement:
+                reason = "disagreement"
+
+        if reason is None:
+            return fast_entities, tokens
+        self.__escalations[reason] += 1
+        logging.debug("Escalated NER to the accurate model (reason: %s)", reason)
+        return accurate_entities, tokens
+
+    def __check_quality_signals(
+        self, text: str, entities: list[Entity]
+    ) -> Optional[CascadeEscalationReason]:
+        """Check the fast model's output against the quality signals
+
+        Args:
+            text (str): The text the entities were extracted from
+            entities (list[Entity]): Entities extracted by the fast model
+
+        Returns:
+            Optional[CascadeEscalationReason]: The failed signal, or None if the output is accepted
+        """
+        scores = [entity.score for entity in entities if entity.score is not None]
+        if scores and sum(scores) / len(scores) < self.__min_confidence:
+            return "low_confidence"
+        word_count = len(text.split())
+        if word_count >= self.__min_words_for_density:
+            density = len(entities) * 100 / word_count
+            if density < self.__min_entity_density:
+                return "few_entities"
+        return None
+
+    @staticmethod
+    def __entity_agreement(first: list[Entity], second: list[Entity]) -> float:
+        """Jaccard similarity of the entity words found by two models
+
+        Entity types are ignored since the backends use different label sets.
+        """
+        first_words = {entity.word.casefold() for entity in first}
+        second_words = {entity.word.casefold() for entity in second}
+        if not first_words and not second_words:
+            return 1.0
+        return len(first_words & second_words) / len(first_words | second_words)
+
+    def report(self) -> CascadeReport:
+        """Escalation rates and quality tradeoff of the cascade so far
+
+        Returns:
+            CascadeReport: Escalation and sampled agreement statistics
+        """
+        escalated = sum(self.__escalations.values())
+        return CascadeReport(
+            total=self.__total,
+            accepted_fast=self.__total - escalated,
+            escalated=escalated,
+            escalation_rate=escalated / self.__total if self.__total else 0.0,
+            escalations_by_reason=dict(self.__escalations),
+            sampled=self.__sampled,
+            mean_sample_agreement=(
+                self.__sample_agreement_sum / self.__sampled if self.__sampled else None
+            ),
+            fast_seconds=self.__fast_seconds,
+            accurate_seconds=self.__accurate_seconds,
+        )
+
+    def reset_report(self):
+        """Reset the escalation and quality statistics"""
+        self.__total = 0
+        self.__escalations = {
+            "low_confidence": 0,
+            "few_entities": 0,
+            "disagreement": 0,
+        }
+        self.__sampled = 0
+        self.__sample_agreement_sum = 0.0
+        self.__fast_seconds = 0.0
+        self.__accurate_seconds = 0.0
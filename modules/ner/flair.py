@@ -1,4 +1,4 @@
-from typing import Literal, cast
+from typing import Literal, Optional, cast
 
 from flair.data import Sentence
 from flair.models import SequenceTagger
@@ -34,8 +34,49 @@ class FlairEntityModel(BaseClass):
         """
         sentence = Sentence(text)
         self.__tagger.predict(sentence)
-        entities = [
-            Entity(word=ent.text, type=cast(EntityType, ent.get_label().value))
+        return self.__sentence_entities(sentence)
+
+    @override
+    async def get_entities_and_tokens_from_text(
+        self, text: str
+    ) -> tuple[list[Entity], Optional[list[str]]]:
+        """Extract Entities from raw text, with the tokens of the tagged `Sentence`
+
+        Args:
+            text (str): The text of which te entities need to be extracted
+
+        Returns:
+            tuple[list[Entity], Optional[list[str]]]: A list of `Entity` Objects and the tokens of the text
+        """
+        sentence = Sentence(text)
+        self.__tagger.predict(sentence)
+        return self.__sentence_entities(sentence), [
+            token.text for token in sentence.tokens
+        ]
+
+    @override
+    async def get_entities_from_texts(self, texts: list[str]) -> list[list[Entity]]:
+        """Extract Entities from several raw texts, in one mini-batch of the tagger
+
+        Args:
+            texts (list[str]): The texts of which the entities need to be extracted
+
+        Returns:
+            list[list[Entity]]: The `Entity` Objects of each text, in the order of the texts
+        """
+        if not texts:
+            return []
+        sentences = [Sentence(text) for text in texts]
+        self.__tagger.predict(sentences, mini_batch_size=len(sentences))
+        return [self.__sentence_entities(sentence) for sentence in sentences]
+
+    @staticmethod
+    def __sentence_entities(sentence: Sentence) -> list[Entity]:
+        return [
+            Entity(
+                word=ent.text,
+                type=cast(EntityType, ent.get_label().value),
+                score=ent.get_label().score,
+            )
             for ent in sentence.get_spans("ner")
         ]
-        return entities
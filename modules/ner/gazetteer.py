@@ -0,0 +1,273 @@
+import logging
+import re
+from collections.abc import Iterable
+from datetime import datetime, timedelta
+from time import perf_counter
+from typing import Optional, cast, get_args
+
+from segtok.segmenter import split_multi
+from typing_extensions import override
+
+from modules.clustering._scoring import normalize_term
+from modules.database._base import BaseAdapter
+from modules.ner._aho_corasick import AhoCorasickAutomaton
+from modules.ner._base import BaseClass
+from type.article import Entity, EntityType
+from type.ner import GazetteerReport
+
+# Types whose surface forms depend on context, e.g. "2" or "May"
+DEFAULT_EXCLUDED_TYPES: frozenset[str] = frozenset(
+    {"CARDINAL", "ORDINAL", "DATE", "TIME", "PERCENT", "MONEY", "QUANTITY"}
+)
+_ENTITY_TYPES = frozenset(get_args(EntityType))
+_TOKEN = re.compile(r"\w+")
+# Entity groups created slightly before a refresh are loaded again, adding them is idempotent
+_REFRESH_MARGIN = timedelta(minutes=1)
+
+
+class GazetteerEntityModel(BaseClass):
+    """NER Model Class tagging the entity surface forms already known to the graph
+
+    Every known (word, type) pair is compiled into an Aho-Corasick automaton, so
+    a text is tagged in a single pass whatever the number of known entities.
+    Surface forms known with several types are left untagged, and a form only
+    matches text that keeps its capitalization: acronyms as they were seen,
+    other forms with at least a capitalized first letter. Common nouns sharing
+    a form with an entity (e.g. "turkey", "apple") are therefore not tagged.
+
+    With a fallback model, the gazetteer is a pre-pass: a sentence is fully
+    tagged by the gazetteer unless it has a capitalized (not sentence-initial)
+    or numeric word outside the tagged spans, and only the remaining sentences
+    are run through the fallback model.
+    """
+
+    __automaton: AhoCorasickAutomaton[set[EntityType]]
+    # Capitalizations each normalized form was seen with, for the forms added with one
+    __capitalizations: dict[str, set[str]]
+    __fallback_model: Optional[BaseClass]
+    __database: Optional[BaseAdapter]
+    __min_length: int
+    __excluded_types: frozenset[str]
+    __refreshed_until: Optional[datetime]
+    __texts: int
+    __sentences: int
+    __sentences_to_model: int
+    __gazetteer_seconds: float
+    __model_seconds: float
+
+    def __init__(
+        self,
+        *,
+        fallback_model: Optional[BaseClass] = None,
+        database: Optional[BaseAdapter] = None,
+        min_length: int = 3,
+        excluded_types: Iterable[str] = DEFAULT_EXCLUDED_TYPES,
+    ):
+        """Initialize Gazetteer Model Class
+
+        Args:
+            fallback_model (Optional[BaseClass]): Model run on the sentences the gazetteer did not cover. Only known surface forms are tagged if not provided.
+            database (Optional[BaseAdapter]): Database whose entity groups are loaded by `refresh`
+            min_length (int): Minimum number of characters of a surface form
+            excluded_types (Iterable[str]): Entity types never added to the gazetteer
+        """
+        self.__automaton = AhoCorasickAutomaton()
+        self.__capitalizations = {}
+        self.__fallback_model = fallback_model
+        self.__database = database
+        self.__min_length = min_length
+        self.__excluded_types = frozenset(excluded_types)
+        self.__refreshed_until = None
+        self.reset_report()
+
+    @property
+    def fallback_model(self) -> Optional[BaseClass]:
+        return self.__fallback_model
+
+    @fallback_model.setter
+    def fallback_model(self, model: Optional[BaseClass]):
+        self.__fallback_model = model
+
+    def add(self, word: str, entity_type: str):
+        """Add a known surface form
+
+        Args:
+            word (str): Surface form of the entity
+            entity_type (str): Type of the entity
+        """
+        surface = " ".join(word.split())
+        word = normalize_term(word)
+        if (
+            len(word) < self.__min_length
+            or entity_type in self.__excluded_types
+            or entity_type not in _ENTITY_TYPES
+        ):
+            return
+        # Words loaded from the database were case-folded when stored
+        if surface != surface.lower():
+            self.__capitalizations.setdefault(word, set()).add(surface)
+        types = self.__automaton.get(word)
+        if types is None:
+            self.__automaton.add(word, {cast(EntityType, entity_type)})
+        else:
+            # Shared with the automaton, no relinking needed
+            types.add(cast(EntityType, entity_type))
+
+    def add_entities(self, entities: Iterable[Entity]):
+        """Add the surface forms of extracted entities (e.g. of an article just grouped)"""
+        for entity in entities:
+            self.add(entity.word, entity.type)
+
+    async def refresh(self):
+        """Add the entity groups created in the database since the previous refresh"""
+        if self.__database is None:
+            return
+        start = perf_counter()
+        since = (
+            self.__refreshed_until - _REFRESH_MARGIN
+            if self.__refreshed_until is not None
+            else None
+        )
+        groups = await self.__database.get_entity_groups_created_since(
+            since, hydration="trusted"
+        )
+        for group in groups:
+            self.add(group.word, group.entity_type)
+            if group.created_on is not None and (
+                self.__refreshed_until is None
+                or group.created_on > self.__refreshed_until
+            ):
+                self.__refreshed_until = group.created_on
+        logging.info(
+            "Loaded %d entity groups into the gazetteer, %d surface forms known (%.2fs)",
+            len(groups),
+            len(self.__automaton),
+            perf_counter() - start,
+        )
+
+    def tag(self, text: str) -> list[tuple[int, int, Entity]]:
+        """Tag the known, unambiguous surface forms of a text
+
+        Args:
+            text (str): The text to tag
+
+        Returns:
+            list[tuple[int, int, Entity]]: Start and end offsets and entity of each tagged span, by start offset
+        """
+        return [
+            (start, end, Entity(word=text[start:end], type=next(iter(types))))
+            for start, end, types in self.__automaton.find(text)
+            if len(types) == 1 and self.__keeps_capitalization(text[start:end])
+        ]
+
+    def __keeps_capitalization(self, surface: str) -> bool:
+        """Whether matched text is capitalized as the entity it matched"""
+        surface = " ".join(surface.split())
+        capitalizations = self.__capitalizations.get(normalize_term(surface), ())
+        if surface in capitalizations:
+            return True
+        if any(form.isupper() for form in capitalizations):
+            # Acronyms only match as they were seen
+            return False
+        return not surface[0].islower()
+
+    @override
+    async def get_entities_from_text(self, text: str) -> list[Entity]:
+        """Extract Entities from raw text
+
+        Args:
+            text (str): The text of which te entities need to be extracted
+
+        Returns:
+            list[Entity]: A list of `Entity` Objects
+        """
+        self.__texts += 1
+        start = perf_counter()
+        spans = self.tag(text)
+        if self.__fallback_model is None:
+            self.__gazetteer_seconds += perf_counter() - start
+            return [entity for _, _, entity in spans]
+
+        entities: list[Entity] = []
+        uncovered: list[str] = []
+        span_index = 0
+        offset = 0
+        for sentence in split_multi(text):
+            if not sentence.strip():
+                continue
+            sentence_start = text.find(sentence, offset)
+            if sentence_start < 0:
+                sentence_start = offset
+            sentence_end = sentence_start + len(sentence)
+            offset = sentence_end
+            sentence_spans = []
+            while span_index < len(spans) and spans[span_index][0] < sentence_end:
+                sentence_spans.append(spans[span_index])
+                span_index += 1
+            self.__sentences += 1
+            if self.__is_covered(text, sentence_start, sentence_end, sentence_spans):
+                entities.extend(entity for _, _, entity in sentence_spans)
+            else:
+                uncovered.append(sentence)
+        self.__gazetteer_seconds += perf_counter() - start
+
+        if uncovered:
+            self.__sentences_to_model += len(uncovered)
+            start = perf_counter()
+            entities.extend(
+                await self.__fallback_model.get_entities_from_text(" ".join(uncovered))
+            )
+            self.__model_seconds += perf_counter() - start
+        return entities
+
+    @staticmethod
+    def __is_covered(
+        text: str,
+        sentence_start: int,
+        sentence_end: int,
+        spans: list[tuple[int, int, Entity]],
+    ) -> bool:
+        """Whether every word of a sentence that may be part of an entity is tagged"""
+        span_index = 0
+        for position, token in enumerate(
+            _TOKEN.finditer(text, sentence_start, sentence_end)
+        ):
+            word = token.group()
+            # Capitalization of the first word of a sentence is not a signal
+            if not (
+                any(c.isdigit() for c in word) or (position > 0 and word[0].isupper())
+            ):
+                continue
+            while span_index < len(spans) and spans[span_index][1] <= token.start():
+                span_index += 1
+            if span_index == len(spans) or spans[span_index][0] > token.start():
+                return False
+        return True
+
+    def report(self) -> GazetteerReport:
+        """Coverage of the gazetteer so far
+
+        Returns:
+            GazetteerReport: Coverage and timing statistics
+        """
+        return GazetteerReport(
+            surface_forms=len(self.__automaton),
+            texts=self.__texts,
+            sentences=self.__sentences,
+            sentences_to_model=self.__sentences_to_model,
+            coverage=(
+                1 - self.__sentences_to_model / self.__sentences
+                if self.__sentences
+                else 0.0
+            ),
+            gazetteer_seconds=self.__gazetteer_seconds,
+            model_seconds=self.__model_seconds,
+        )
+
+    def reset_report(self):
+        """Reset the coverage statistics"""
+        self.__texts = 0
+        self.__sentences = 0
+        self.__sentences_to_model = 0
+        self.__gazetteer_seconds = 0.0
+        self.__model_seconds = 0.0
@@ -0,0 +1,250 @@
+import asyncio
+import os
+import threading
+from collections import deque
+from collections.abc import AsyncGenerator, Callable, Coroutine, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from time import perf_counter
+from typing import Any, Optional, TypeVar
+
+from typing_extensions import override
+
+from modules.ner._base import BaseClass
+from type.article import Entity
+from type.ner import ReplicaPoolReport
+
+_T = TypeVar("_T")
+
+# Event loop of each replica thread, reused by every call the replica runs
+_replica_thread = threading.local()
+
+
+def _start_replica_thread(
+    intra_op_threads: Optional[int], cpus: Optional[Sequence[int]]
+):
+    """Set up a replica's thread: its event loop, torch thread limit and CPUs"""
+    _replica_thread.loop = asyncio.new_event_loop()
+    if cpus is not None:
+        # On Linux, pins the calling thread and the threads it starts
+        os.sched_setaffinity(0, cpus)
+    if intra_op_threads is not None:
+        import torch
+
+        # With torch's OpenMP backend, the limit only applies to the calling thread
+        torch.set_num_threads(intra_op_threads)
+
+
+def _run_in_replica_thread(coroutine: Coroutine[Any, Any, _T]) -> _T:
+    return _replica_thread.loop.run_until_complete(coroutine)
+
+
+class _Replica:
+    """A model copy and the single thread it runs in"""
+
+    model: BaseClass
+    executor: ThreadPoolExecutor
+
+    def __init__(
+        self,
+        model: BaseClass,
+        index: int,
+        intra_op_threads: Optional[int],
+        cpus: Optional[Sequence[int]],
+    ):
+        self.model = model
+        self.executor = ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix=f"kenec_ner_replica_{index}",
+            initializer=_start_replica_thread,
+            initargs=(intra_op_threads, cpus),
+        )
+
+
+class ReplicaPool(BaseClass):
+    """NER Model Class that spreads texts over a pool of replicas of a model
+
+    The model objects of the backends (HF pipelines, spaCy languages, Flair
+    taggers) are not safe to share between concurrent calls. A call checks a
+    replica out of the pool, runs it in the replica's own thread and returns
+    it, waiting for a free replica if all are in use. Calls can come from any
+    number of event loops and threads, e.g. `add_article` called from a
+    thread pool, and the replicas infer in parallel as torch releases the GIL.
+
+    Each replica thread limits torch to `intra_op_threads` threads, so that
+    `replicas * intra_op_threads` is about the number of cores, instead of
+    every replica starting a thread per core.
+    """
+
+    __replicas: list[_Replica]
+    __lock: threading.Lock
+    __free: deque[_Replica]
+    __waiters: deque[tuple[asyncio.AbstractEventLoop, "asyncio.Future[_Replica]"]]
+    __checkouts: int
+    __waits: int
+    __wait_seconds: float
+
+    def __init__(
+        self,
+        load_model: Callable[[], BaseClass],
+        replicas: int,
+        *,
+        intra_op_threads: Optional[int] = None,
+        cpu_sets: Optional[Sequence[Sequence[int]]] = None,
+    ):
+        """Initialize Replica Pool Class, loading every replica
+
+        Args:
+            load_model (Callable[[], BaseClass]): Loads one replica of the model, called once per replica
+            replicas (int): Number of replicas, i.e. of texts inferred in parallel
+            intra_op_threads (Optional[int]): Torch intra-op threads of each replica. Torch's own default (one per core) if not provided.
+            cpu_sets (Optional[Sequence[Sequence[int]]]): CPUs each replica's thread is pinned to (Linux only), one set per replica. Replicas run on any CPU if not provided.
+        """
+        if replicas <= 0:
+            raise ValueError("Replicas should be a value > 0")
+        if intra_op_threads is not None and intra_op_threads <= 0:
+            raise ValueError("Intra-op threads should be a value > 0")
+        if cpu_sets is not None and len(cpu_sets) != replicas:
+            raise ValueError("CPU sets should have one set per replica")
+        self.__replicas = [
+            _Replica(
+                load_model(),
+                index,
+                intra_op_threads,
+                cpu_sets[index] if cpu_sets is not None else None,
+            )
+            for index in range(replicas)
+        ]
+        self.__lock = threading.Lock()
+        self.__free = deque(self.__replicas)
+        self.__waiters = deque()
+        self.reset_report()
+
+    @override
+    async def get_entities_from_text(self, text: str) -> list[Entity]:
+        """Extract Entities from raw text, with the first free replica
+
+        Args:
+            text (str): The text of which te entities need to be extracted
+
+        Returns:
+            list[Entity]: A list of `Entity` Objects
+        """
+        return await self.__run(lambda model: model.get_entities_from_text(text))
+
+    @override
+    async def get_entities_and_tokens_from_text(
+        self, text: str
+    ) -> tuple[list[Entity], Optional[list[str]]]:
+        """Extract Entities from raw text with the first free replica, with the tokens of the replica's model
+
+        Args:
+            text (str): The text of which te entities need to be extracted
+
+        Returns:
+            tuple[list[Entity], Optional[list[str]]]: A list of `Entity` Objects and the tokens of the text, None if the model does not expose them
+        """
+        return await self.__run(
+            lambda model: model.get_entities_and_tokens_from_text(text)
+        )
+
+    @override
+    async def get_entities_from_texts(self, texts: list[str]) -> list[list[Entity]]:
+        """Extract Entities from several raw texts, together with one replica
+
+        Args:
+            texts (list[str]): The texts of which the entities need to be extracted
+
+        Returns:
+            list[list[Entity]]: The `Entity` Objects of each text, in the order of the texts
+        """
+        return await self.__run(lambda model: model.get_entities_from_texts(texts))
+
+    def report(self) -> ReplicaPoolReport:
+        """Checkouts and waiting since the last reset
+
+        Returns:
+            ReplicaPoolReport: The report
+        """
+        with self.__lock:
+            return ReplicaPoolReport(
+                replicas=len(self.__replicas),
+                in_use=len(self.__replicas) - len(self.__free),
+                checkouts=self.__checkouts,
+                waits=self.__waits,
+                wait_seconds=self.__wait_seconds,
+            )
+
+    def reset_report(self):
+        """Reset the checkout statistics"""
+        self.__checkouts = 0
+        self.__waits = 0
+        self.__wait_seconds = 0.0
+
+    def close(self):
+        """Stop the replica threads once their current call is done"""
+        for replica in self.__replicas:
+            replica.executor.shutdown(wait=False)
+
+    async def __run(self, call: Callable[[BaseClass], Coroutine[Any, Any, _T]]) -> _T:
+        """Run a call of the model on the first free replica, in the replica's thread"""
+        async with self.__checkout() as replica:
+            return await asyncio.wrap_future(
+                replica.executor.submit(
+                    lambda: _run_in_replica_thread(call(replica.model))
+                )
+            )
+
+    @asynccontextmanager
+    async def __checkout(self) -> AsyncGenerator[_Replica, None]:
+        """Check out a free replica, waiting for one if all are in use"""
+        loop = asyncio.get_running_loop()
+        with self.__lock:
+            self.__checkouts += 1
+            if self.__free:
+                replica = self.__free.popleft()
+                waiter = None
+            else:
+                self.__waits += 1
+                waiter = loop.create_future()
+                self.__waiters.append((loop, waiter))
+        if waiter is not None:
+            start = perf_counter()
+            try:
+                replica = await waiter
+            except asyncio.CancelledError:
+                with self.__lock:
+                    if (loop, waiter) in self.__waiters:
+                        self.__waiters.remove((loop, waiter))
+                if waiter.done() and not waiter.cancelled():
+                    # Cancelled just as a replica was handed over
+                    self.__release(waiter.result())
+                raise
+            finally:
+                with self.__lock:
+                    self.__wait_seconds += perf_counter() - start
+        try:
+            yield replica
+        finally:
+            self.__release(replica)
+
+    def __release(self, replica: _Replica):
+        """Hand a replica over to the longest waiting caller, or put it back"""
+        with self.__lock:
+            if not self.__waiters:
+                self.__free.append(replica)
+                return
+            loop, waiter = self.__waiters.popleft()
+        try:
+            loop.call_soon_threadsafe(self.__hand_over, waiter, replica)
+        except RuntimeError:
+            # The waiter's loop was closed, its call will never resume
+            self.__release(replica)
+
+    def __hand_over(self, waiter: "asyncio.Future[_Replica]", replica: _Replica):
+        """Resolve a waiter with a replica, in the waiter's event loop"""
+        if waiter.done():
+            # The waiting call was cancelled in the meantime
+            self.__release(replica)
+        else:
+            waiter.set_result(replica)
@@ -0,0 +1,210 @@
+import asyncio
+import logging
+import threading
+import weakref
+from datetime import timedelta
+from typing import Optional
+
+from typing_extensions import override
+
+from errors.ner import NERServerError, NERServerUnavailableError
+from modules.ner._base import BaseClass
+from type.article import Entity
+
+from ._ipc import DEFAULT_SOCKET_PATH, encode_frame, read_frame
+
+
+class _Connection:
+    """The connection of one event loop to the server, with its requests in flight"""
+
+    writer: Optional[asyncio.StreamWriter]
+    receiver: Optional[asyncio.Task[None]]
+    connecting: asyncio.Lock
+    pending: dict[int, "asyncio.Future[list[Entity]]"]
+    next_id: int
+
+    def __init__(self):
+        self.writer = None
+        self.receiver = None
+        self.connecting = asyncio.Lock()
+        self.pending = {}
+        self.next_id = 0
+
+    def close(self):
+        """Close the connection, must be called in its event loop"""
+        writer, receiver = self.writer, self.receiver
+        self.writer = self.receiver = None
+        if receiver is not None:
+            receiver.cancel()
+        if writer is not None:
+            writer.close()
+
+
+class RemoteEntityModel(BaseClass):
+    """NER Model Class that extracts entities with a local `EntityModelServer`
+
+    Holds no model, so any number of workers can share the one loaded by the
+    server. Requests of concurrent calls are sent over one connection without
+    waiting for each other, so the server can batch them with the texts of
+    other workers. Every event loop using the model, e.g. the loops of
+    `add_article` calls from a thread pool, has its own connection, opened
+    on first use and opened again after it was lost.
+    """
+
+    __socket_path: str
+    __timeout: float
+    __connections: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _Connection]
+    __connections_lock: threading.Lock
+
+    def __init__(
+        self,
+        socket_path: Optional[str] = None,
+        timeout: timedelta = timedelta(seconds=60),
+    ):
+        """Initialize Remote Model Class, no connection is opened yet
+
+        Args:
+            socket_path (Optional[str]): Path of the Unix socket of the server, the server's default path if not provided
+            timeout (timedelta): Longest time to wait for the entities of a text, including its time in the server's queue
+        """
+        self.__socket_path = socket_path or DEFAULT_SOCKET_PATH
+        self.__timeout = timeout.total_seconds()
+        self.__connections = weakref.WeakKeyDictionary()
+        self.__connections_lock = threading.Lock()
+
+    @override
+    async def get_entities_from_text(self, text: str) -> list[Entity]:
+        """Extract Entities from raw text
+
+        Args:
+            text (str): The text of which te entities need to be extracted
+
+        Returns:
+            list[Entity]: A list of `Entity` Objects
+
+        Raises:
+            NERServerUnavailableError: If the server cannot be reached or the connection is lost
+            NERServerError: If the server's model failed on the text
+        """
+        (entities,) = await self.get_entities_from_texts([text])
+        return entities
+
+    @override
+    async def get_entities_from_texts(self, texts: list[str]) -> list[list[Entity]]:
+        """Extract Entities from several raw texts, sent to the server together
+
+        Args:
+            texts (list[str]): The texts of which the entities need to be extracted
+
+        Returns:
+            list[list[Entity]]: The `Entity` Objects of each text, in the order of the texts
+
+        Raises:
+            NERServerUnavailableError: If the server cannot be reached or the connection is lost
+            NERServerError: If the server's model failed on a text
+        """
+        if not texts:
+            return []
+        loop = asyncio.get_running_loop()
+        connection = self.__loop_connection(loop)
+        writer = await self.__connect(connection)
+        request_ids = []
+        frames = []
+        for text in texts:
+            request_id = connection.next_id
+            connection.next_id += 1
+            connection.pending[request_id] = loop.create_future()
+            request_ids.append(request_id)
+            frames.append(encode_frame({"id": request_id, "text": text}))
+        try:
+            writer.write(b"".join(frames))
+            await writer.drain()
+            async with asyncio.timeout(self.__timeout):
+                return await asyncio.gather(
+                    *(connection.pending[request_id] for request_id in request_ids)
+                )
+        except ConnectionError as e:
+            raise NERServerUnavailableError(self.__socket_path, str(e)) from e
+        except TimeoutError as e:
+            raise NERServerUnavailableError(
+                self.__socket_path, f"no response within {self.__timeout:.0f}s"
+            ) from e
+        finally:
+            for request_id in request_ids:
+                future = connection.pending.pop(request_id, None)
+                if future is not None and not future.done():
+                    future.cancel()
+
+    async def close(self):
+        """Close the connections to the server of every event loop"""
+        running_loop = asyncio.get_running_loop()
+        with self.__connections_lock:
+            connections = list(self.__connections.items())
+            self.__connections.clear()
+        for loop, connection in connections:
+            if loop is running_loop:
+                connection.close()
+                continue
+            try:
+                loop.call_soon_threadsafe(connection.close)
+            except RuntimeError:
+                # The loop was closed, and its connection with it
+                pass
+
+    def __loop_connection(self, loop: asyncio.AbstractEventLoop) -> _Connection:
+        """The connection state of an event loop, created on its first use"""
+        with self.__connections_lock:
+            connection = self.__connections.get(loop)
+            if connection is None:
+                connection = self.__connections[loop] = _Connection()
+            return connection
+
+    async def __connect(self, connection: _Connection) -> asyncio.StreamWriter:
+        """The open writer of a connection, opening it if needed"""
+        async with connection.connecting:
+            if connection.writer is None or connection.writer.is_closing():
+                try:
+                    reader, writer = await asyncio.open_unix_connection(
+                        self.__socket_path
+                    )
+                except OSError as e:
+                    raise NERServerUnavailableError(self.__socket_path, str(e)) from e
+                connection.writer = writer
+                connection.receiver = asyncio.create_task(
+                    self.__receive(reader, writer, connection)
+                )
+            return connection.writer
+
+    async def __receive(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        connection: _Connection,
+    ):
+        """Resolve the pending requests of a connection with the server's responses"""
+        reason = "connection closed by the server"
+        try:
+            while (response := await read_frame(reader)) is not None:
+                future = connection.pending.get(response.get("id"))
+                if future is None or future.done():
+                    # Timed out or cancelled in the meantime
+                    continue
+                if "error" in response:
+                    future.set_exception(NERServerError(response["error"]))
+                else:
+                    future.set_result(
+                        [
+                            Entity.model_validate(entity)
+                            for entity in response["entities"]
+                        ]
+                    )
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError) as e:
+            reason = str(e)
+            logging.warning("Lost the connection to the NER server: %s", e)
+        finally:
+            writer.close()
+            for future in connection.pending.values():
+                if not future.done():
+                    future.set_exception(
+                        NERServerUnavailableError(self.__socket_path, reason)
+                    )
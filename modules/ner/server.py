@@ -0,0 +1,397 @@
+"""Local NER inference server, shared by the KENEC workers of a machine
+
+Run with `python -m modules.ner.server MODEL [--socket PATH]`, where MODEL is
+a single or cascade NER option of `KENEC` (e.g. `xlm_roberta_large_finetuned`).
+Workers use it with `KENEC(ner_model="remote", ner_socket_path=PATH)`.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import stat
+from datetime import timedelta
+from time import perf_counter
+from typing import Any, Optional, get_args
+
+from errors.ner import NERServerAlreadyRunningError
+from modules.ner._base import BaseClass
+from modules.ner.cascade import CascadeEntityModel
+from type.article import Entity
+from type.ner import NERServerReport
+
+from ._ipc import DEFAULT_SOCKET_PATH, encode_frame, read_frame
+
+# A text waiting for its batch, with the future of its entities and when it was queued
+_QueuedText = tuple[str, "asyncio.Future[list[Entity]]", float]
+
+
+class EntityModelServer:
+    """Serves one NER model to many clients over a Unix socket, batching their texts
+
+    Every client connection sends requests (`{"id", "text"}`) and receives
+    the responses (`{"id", "entities"}` or `{"id", "error"}`) as they are
+    ready, so a client can have many texts in flight. Texts of all clients
+    go into one queue. A batch is started with the first queued text and
+    takes the texts queued within `max_wait` of it, up to `max_batch_size`,
+    and runs through the model's `get_entities_from_texts` in a worker
+    thread. Texts keep being queued while a batch is inferred, so batches
+    grow with the load and a lone text only waits `max_wait`. When the model
+    fails on a batch, its texts are run again one at a time, so only the
+    texts the model fails on get an error.
+
+    The model is only ever run by one batch at a time.
+    """
+
+    __model: BaseClass
+    __socket_path: str
+    __max_batch_size: int
+    __max_wait: float
+    __queue: asyncio.Queue[_QueuedText]
+    __server: Optional[asyncio.AbstractServer]
+    __batcher: Optional[asyncio.Task[None]]
+    __clients: set[asyncio.StreamWriter]
+    __texts: int
+    __batches: int
+    __largest_batch: int
+    __failed_texts: int
+    __queue_seconds: float
+    __inference_seconds: float
+
+    def __init__(
+        self,
+        model: BaseClass,
+        socket_path: str = DEFAULT_SOCKET_PATH,
+        *,
+        max_batch_size: int = 32,
+        max_wait: timedelta = timedelta(milliseconds=5),
+    ):
+        """Initialize the server, it listens once started
+
+        Args:
+            model (BaseClass): The loaded NER model served
+            socket_path (str): Path of the Unix socket, replaced if no server listens on it
+            max_batch_size (int): Maximum number of texts inferred together
+            max_wait (timedelta): Longest time the first text of a batch waits for more texts
+        """
+        if max_batch_size <= 0:
+            raise ValueError("Max batch size should be a value > 0")
+        if max_wait < timedelta(0):
+            raise ValueError("Max wait should not be negative")
+        self.__model = model
+        self.__socket_path = socket_path
+        self.__max_batch_size = max_batch_size
+        self.__max_wait = max_wait.total_seconds()
+        self.__server = None
+        self.__batcher = None
+        self.__clients = set()
+        self.reset_report()
+
+    @property
+    def socket_path(self) -> str:
+        return self.__socket_path
+
+    async def start(self):
+        """Listen on the socket and start batching
+
+        Raises:
+            NERServerAlreadyRunningError: If another server listens on the socket
+            PermissionError: If another user can replace the socket in its directory
+        """
+        if self.__server is not None:
+            return
+        directory = os.path.dirname(os.path.abspath(self.__socket_path))
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        status = os.stat(directory)
+        if (
+            status.st_uid != os.getuid()
+            and status.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+            and not status.st_mode & stat.S_ISVTX
+        ):
+            raise PermissionError(
+                f"Socket directory '{directory}' is writable by other users"
+            )
+        await self.__remove_stale_socket()
+        self.__queue = asyncio.Queue()
+        self.__server = await asyncio.start_unix_server(
+            self.__handle_connection, path=self.__socket_path
+        )
+        self.__batcher = asyncio.create_task(self.__run_batches())
+        logging.info("NER server listening on %s", self.__socket_path)
+
+    async def __remove_stale_socket(self):
+        """Remove a socket left over by a server that did not shut down
+
+        Raises:
+            NERServerAlreadyRunningError: If a server still listens on the socket
+        """
+        try:
+            mode = os.stat(self.__socket_path).st_mode
+        except FileNotFoundError:
+            return
+        if not stat.S_ISSOCK(mode):
+            # Not ours to remove, listening fails on it
+            return
+        try:
+            _, writer = await asyncio.open_unix_connection(self.__socket_path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            os.remove(self.__socket_path)
+            return
+        writer.close()
+        await writer.wait_closed()
+        raise NERServerAlreadyRunningError(self.__socket_path)
+
+    async def serve_forever(self):
+        """Start the server if needed and serve until cancelled"""
+        await self.start()
+        assert self.__server is not None
+        try:
+            await self.__server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self):
+        """Stop listening and batching, and close the client connections"""
+        if self.__server is None:
+            return
+        self.__server.close()
+        for writer in list(self.__clients):
+            writer.close()
+        if self.__batcher is not None:
+            self.__batcher.cancel()
+            try:
+                await self.__batcher
+            except asyncio.CancelledError:
+                pass
+            self.__batcher = None
+        while not self.__queue.empty():
+            _, future, _ = self.__queue.get_nowait()
+            if not future.done():
+                future.cancel()
+        self.__server = None
+        if os.path.exists(self.__socket_path):
+            os.remove(self.__socket_path)
+
+    def report(self) -> NERServerReport:
+        """Batching statistics since the last reset
+
+        Returns:
+            NERServerReport: The report
+        """
+        return NERServerReport(
+            connections=len(self.__clients),
+            texts=self.__texts,
+            batches=self.__batches,
+            mean_batch_size=self.__texts / self.__batches if self.__batches else 0.0,
+            max_batch_size=self.__largest_batch,
+            failed_texts=self.__failed_texts,
+            queue_seconds=self.__queue_seconds,
+            inference_seconds=self.__inference_seconds,
+            texts_per_second=(
+                self.__texts / self.__inference_seconds
+                if self.__inference_seconds > 0
+                else 0.0
+            ),
+        )
+
+    def reset_report(self):
+        """Reset the batching statistics"""
+        self.__texts = 0
+        self.__batches = 0
+        self.__largest_batch = 0
+        self.__failed_texts = 0
+        self.__queue_seconds = 0.0
+        self.__inference_seconds = 0.0
+
+    async def __handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        self.__clients.add(writer)
+        loop = asyncio.get_running_loop()
+        pending: set[asyncio.Future[list[Entity]]] = set()
+        try:
+            while (request := await read_frame(reader)) is not None:
+                future: asyncio.Future[list[Entity]] = loop.create_future()
+                future.add_done_callback(
+                    lambda done, request_id=request.get("id"): self.__respond(
+                        writer, request_id, done
+                    )
+                )
+                future.add_done_callback(pending.discard)
+                pending.add(future)
+                text = request.get("text")
+                if not isinstance(text, str):
+                    future.set_exception(ValueError("Request has no text"))
+                    continue
+                self.__queue.put_nowait((text, future, perf_counter()))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError) as e:
+            logging.warning("Closing NER client connection: %s", e)
+        finally:
+            self.__clients.discard(writer)
+            # The client is gone, the batcher skips its texts
+            for future in list(pending):
+                future.cancel()
+            writer.close()
+
+    @staticmethod
+    def __respond(
+        writer: asyncio.StreamWriter,
+        request_id: Any,
+        future: "asyncio.Future[list[Entity]]",
+    ):
+        """Write the response of a request once its entities are extracted"""
+        if future.cancelled() or writer.is_closing():
+            return
+        error = future.exception()
+        if error is not None:
+            message = {"id": request_id, "error": str(error) or type(error).__name__}
+        else:
+            message = {
+                "id": request_id,
+                "entities": [entity.model_dump() for entity in future.result()],
+            }
+        writer.write(encode_frame(message))
+
+    async def __next_batch(self) -> list[_QueuedText]:
+        """Wait for a text, then gather the texts queued within `max_wait` of it"""
+        loop = asyncio.get_running_loop()
+        batch = [await self.__queue.get()]
+        deadline = loop.time() + self.__max_wait
+        while len(batch) < self.__max_batch_size:
+            if not self.__queue.empty():
+                batch.append(self.__queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.__queue.get(), timeout))
+            except TimeoutError:
+                break
+        return batch
+
+    async def __run_batches(self):
+        while True:
+            batch = [item for item in await self.__next_batch() if not item[1].done()]
+            if not batch:
+                continue
+            start = perf_counter()
+            texts = [text for text, _, _ in batch]
+            try:
+                results = await self.__infer(texts)
+            except Exception as e:
+                if len(batch) > 1:
+                    logging.warning(
+                        "NER model failed on a batch of %d texts (%s), "
+                        "running them one at a time",
+                        len(batch),
+                        e,
+                    )
+                    await self.__run_one_at_a_time(batch)
+                else:
+                    logging.exception("NER model failed on a text")
+                    self.__failed_texts += 1
+                    (_, future, _) = batch[0]
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                for (_, future, _), entities in zip(batch, results):
+                    if not future.done():
+                        future.set_result(entities)
+            self.__texts += len(batch)
+            self.__batches += 1
+            self.__largest_batch = max(self.__largest_batch, len(batch))
+            self.__queue_seconds += sum(start - queued for _, _, queued in batch)
+            self.__inference_seconds += perf_counter() - start
+
+    async def __infer(self, texts: list[str]) -> list[list[Entity]]:
+        """Run the model on texts in a worker thread, so clients keep being read meanwhile"""
+
+        def infer() -> list[list[Entity]]:
+            return asyncio.run(self.__model.get_entities_from_texts(texts))
+
+        results = await asyncio.to_thread(infer)
+        if len(results) != len(texts):
+            raise RuntimeError(
+                f"Model returned {len(results)} results for {len(texts)} texts"
+            )
+        return results
+
+    async def __run_one_at_a_time(self, batch: list[_QueuedText]):
+        """Run the texts of a failed batch on their own, failing only the texts that fail
+
+        A batch mixes the texts of every client, so one text the model fails
+        on must not fail the others.
+        """
+        for text, future, _ in batch:
+            if future.done():
+                continue
+            try:
+                (entities,) = await self.__infer([text])
+            except Exception as e:
+                logging.exception("NER model failed on a text")
+                self.__failed_texts += 1
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(entities)
+
+
+async def _serve(args: argparse.Namespace):
+    from _model import CASCADE_NER_MODEL_OPTIONS, load_ner_model
+
+    if args.model in CASCADE_NER_MODEL_OPTIONS:
+        fast_option, accurate_option = CASCADE_NER_MODEL_OPTIONS[args.model]
+        model: BaseClass = CascadeEntityModel(
+            fast_model=load_ner_model(fast_option, scored=True),
+            accurate_model=load_ner_model(accurate_option),
+        )
+    else:
+        model = load_ner_model(args.model)
+    server = EntityModelServer(
+        model,
+        args.socket,
+        max_batch_size=args.max_batch_size,
+        max_wait=timedelta(milliseconds=args.max_wait_ms),
+    )
+    await server.start()
+    loop = asyncio.get_running_loop()
+    stopped = asyncio.Event()
+    for stop_signal in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(stop_signal, stopped.set)
+    try:
+        await stopped.wait()
+    finally:
+        report = server.report()
+        await server.close()
+        logging.info(
+            "Served %d texts in %d batches (%.1f texts per batch, %.1f texts/s)",
+            report.texts,
+            report.batches,
+            report.mean_batch_size,
+            report.texts_per_second,
+        )
+
+
+def main():
+    from _model import CASCADE_NER_MODEL_OPTIONS, SingleNERModelOption
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "model",
+        choices=[*get_args(SingleNERModelOption), *CASCADE_NER_MODEL_OPTIONS],
+    )
+    parser.add_argument("--socket", default=DEFAULT_SOCKET_PATH)
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    asyncio.run(_serve(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,52 @@
-from typing import Literal, cast
+from typing import Literal, Optional, cast
 
 import spacy
 from spacy import Language
+from spacy.pipeline import EntityRecognizer
+from spacy.tokens import Doc
 from typing_extensions import override
 
 from modules.ner._base import BaseClass
 from type.article import Entity, EntityType
 
+# Beam states whose probability is below this fraction of the best one are pruned
+_BEAM_DENSITY = 0.0001
+
 
 class SpacyEntityModel(BaseClass):
-    """NER Model Class for Spacy Models"""
+    """NER Model Class for Spacy Models
+
+    spaCy's entity recognizer decodes greedily and gives entities no score.
+    With a `beam_width` above 1 it decodes with a beam instead, and each
+    entity is scored with the probability of the beam parses containing it.
+    """
 
     __pipeline: Language
+    __recognizer: EntityRecognizer
+    __beam_width: int
 
     def __init__(
         self,
         model: Literal[
             "en_core_web_sm", "en_core_web_md", "en_core_web_lg", "en_core_web_trf"
         ] = "en_core_web_sm",
+        *,
+        beam_width: int = 1,
     ):
-        """Initialize Spacy Model Class"""
+        """Initialize Spacy Model Class
+
+        Args:
+            model (Literal): Name of the spaCy pipeline package
+            beam_width (int): Parses kept while decoding. Above 1, entities get a confidence score, at the cost of slower decoding.
+        """
+        if beam_width <= 0:
+            raise ValueError("Beam width should be a value > 0")
         if not spacy.util.is_package(model):
             spacy.cli.download(model)
         self.__pipeline = spacy.load(model)
         _ = self.__pipeline.select_pipes(enable="ner")
+        self.__recognizer = cast(EntityRecognizer, self.__pipeline.get_pipe("ner"))
+        self.__beam_width = beam_width
 
     @override
     async def get_entities_from_text(self, text: str) -> list[Entity]:
@@ -35,9 +58,70 @@ class SpacyEntityModel(BaseClass):
         Returns:
             list[Entity]: A list of `Entity` Objects
         """
-        spacy_entities = self.__pipeline(text)
-        entities = [
-            Entity(word=ent.text, type=cast(EntityType, ent.label_))
-            for ent in spacy_entities.ents
-        ]
+        ((_, entities),) = self.__parse([text])
         return entities
+
+    @override
+    async def get_entities_and_tokens_from_text(
+        self, text: str
+    ) -> tuple[list[Entity], Optional[list[str]]]:
+        """Extract Entities from raw text, with the tokens of the parsed `Doc`
+
+        Args:
+            text (str): The text of which te entities need to be extracted
+
+        Returns:
+            tuple[list[Entity], Optional[list[str]]]: A list of `Entity` Objects and the tokens of the text, without whitespace tokens
+        """
+        ((doc, entities),) = self.__parse([text])
+        return entities, [token.text for token in doc if not token.is_space]
+
+    @override
+    async def get_entities_from_texts(self, texts: list[str]) -> list[list[Entity]]:
+        """Extract Entities from several raw texts, in one batch of the pipeline
+
+        Args:
+            texts (list[str]): The texts of which the entities need to be extracted
+
+        Returns:
+            list[list[Entity]]: The `Entity` Objects of each text, in the order of the texts
+        """
+        return [entities for _, entities in self.__parse(texts)]
+
+    def __parse(self, texts: list[str]) -> list[tuple[Doc, list[Entity]]]:
+        """Run the texts through the pipeline, decoding with a beam if configured"""
+        if self.__beam_width == 1:
+            return [
+                (
+                    doc,
+                    [
+                        Entity(word=ent.text, type=cast(EntityType, ent.label_))
+                        for ent in doc.ents
+                    ],
+                )
+                for doc in self.__pipeline.pipe(texts, batch_size=max(len(texts), 1))
+            ]
+        docs = [self.__pipeline.make_doc(text) for text in texts]
+        # The recognizer cannot start a beam on a document without tokens
+        parsed = [doc for doc in docs if len(doc) > 0]
+        scores = iter(())
+        if parsed:
+            beams = self.__recognizer.beam_parse(
+                parsed, beam_width=self.__beam_width, beam_density=_BEAM_DENSITY
+            )
+            self.__recognizer.set_annotations(parsed, beams)
+            scores = iter(self.__recognizer.scored_ents(beams))
+        results: list[tuple[Doc, list[Entity]]] = []
+        for doc in docs:
+            # Probability of the beam parses containing each span with its label
+            doc_scores = next(scores) if len(doc) > 0 else {}
+            entities = [
+                Entity(
+                    word=ent.text,
+                    type=cast(EntityType, ent.label_),
+                    score=min(doc_scores[(ent.start, ent.end, ent.label_)], 1.0),
+                )
+                for ent in doc.ents
+            ]
+            results.append((doc, entities))
+        return results
@@ -29,6 +29,29 @@ class XlmRobertaLargeFinetunedConll03EnglishEntityModel(BaseClass):
             list[Entity]: A list of `Entity` Objects
         """
         pipeline_entites = self.__pipeline(text)
+        return await self.__to_entities(text, pipeline_entites)
+
+    @override
+    async def get_entities_from_texts(self, texts: list[str]) -> list[list[Entity]]:
+        """Extract Entities from several raw texts, in one batch of the pipeline
+
+        Args:
+            texts (list[str]): The texts of which the entities need to be extracted
+
+        Returns:
+            list[list[Entity]]: The `Entity` Objects of each text, in the order of the texts
+        """
+        if not texts:
+            return []
+        pipeline_entities = self.__pipeline(texts, batch_size=len(texts))
+        return [
+            await self.__to_entities(text, text_entities)
+            for text, text_entities in zip(texts, pipeline_entities)
+        ]
+
+    async def __to_entities(
+        self, text: str, pipeline_entites: list[dict]
+    ) -> list[Entity]:
         combined_entities = await self.__combine_same_entities(text, pipeline_entites)
 
         result_entities: list = []
@@ -48,6 +71,7 @@ class XlmRobertaLargeFinetunedConll03EnglishEntityModel(BaseClass):
                 Entity(
                     word=combined_entity_dict["word"],
                     type=entity_type,
+                    score=float(combined_entity_dict["score"]),
                 )
             )
         return result_entities
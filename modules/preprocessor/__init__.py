@@ -0,0 +1,3 @@
+from .text import TextPreprocessor
+
+__all__ = ["TextPreprocessor"]
@@ -0,0 +1,160 @@
+import re
+import unicodedata
+from typing import Literal, Optional
+
+from type.preprocessor import PreparedText
+
+# Lines that are dropped wherever they appear
+DEFAULT_BOILERPLATE_PATTERNS: list[str] = [
+    r"by [^.!?:]{1,80}",  # Bylines
+    r"(skip )?advertisement|sponsored( content)?|supported by",
+    r"share( this( article| story)?)?|follow us on .{1,60}",
+    r"(sign up|subscribe)\b.{0,120}",
+    r"(photo|image|video)( credit)?:.{0,200}",
+    r"(©|copyright\b).{0,200}",
+    r"(updated|published) .{0,40}\d{1,2}:\d{2}.{0,20}",
+]
+# Lines after which the rest of the content is dropped
+DEFAULT_CUTOFF_PATTERNS: list[str] = [
+    r"(related|more on this|recommended|read more|you may also like)( stories| articles| coverage)?:?",
+]
+
+_INVISIBLE_CHARACTERS = re.compile("[\u00ad\u200b\u200c\u200d\u2060\ufeff]")
+_HORIZONTAL_WHITESPACE = re.compile(r"[^\S\n]+")
+
+
+class TextPreprocessor:
+    """Prepares an article's title and content once before keyword and entity extraction
+
+    The preparation strips boilerplate lines, cuts "related stories" style blocks,
+    normalizes Unicode and whitespace, and keeps the title plus the lead paragraphs
+    within a token budget.
+    """
+
+    __unicode_form: Optional[Literal["NFC", "NFKC"]]
+    __boilerplate: Optional[re.Pattern[str]]
+    __cutoff: Optional[re.Pattern[str]]
+    __max_tokens: Optional[int]
+    __title_weight: int
+
+    def __init__(
+        self,
+        *,
+        unicode_form: Optional[Literal["NFC", "NFKC"]] = "NFKC",
+        strip_boilerplate: bool = True,
+        boilerplate_patterns: Optional[list[str]] = None,
+        cutoff_patterns: Optional[list[str]] = None,
+        max_tokens: Optional[int] = None,
+        title_weight: int = 1,
+    ):
+        """Initialize the text preprocessor
+
+        Args:
+            unicode_form (Optional[Literal["NFC", "NFKC"]]): Unicode normalization form, or None to skip normalization
+            strip_boilerplate (bool): Whether boilerplate lines and trailing blocks are removed
+            boilerplate_patterns (Optional[list[str]]): Regexes of whole lines to drop (case-insensitive). Defaults to `DEFAULT_BOILERPLATE_PATTERNS`.
+            cutoff_patterns (Optional[list[str]]): Regexes of whole lines after which the content is dropped (case-insensitive). Defaults to `DEFAULT_CUTOFF_PATTERNS`.
+            max_tokens (Optional[int]): Budget of whitespace tokens for the title and lead paragraphs. Unlimited if not provided.
+            title_weight (int): Number of times the title is repeated in the prepared text (>1 boosts title terms)
+        """
+        if max_tokens is not None and max_tokens <= 0:
+            raise ValueError("Maximum tokens should be a value > 0")
+        if title_weight < 1:
+            raise ValueError("Title weight should be a value >= 1")
+        self.__unicode_form = unicode_form
+        self.__boilerplate = None
+        self.__cutoff = None
+        if strip_boilerplate:
+            self.__boilerplate = self.__compile_line_patterns(
+                boilerplate_patterns
+                if boilerplate_patterns is not None
+                else DEFAULT_BOILERPLATE_PATTERNS
+            )
+            self.__cutoff = self.__compile_line_patterns(
+                cutoff_patterns
+                if cutoff_patterns is not None
+                else DEFAULT_CUTOFF_PATTERNS
+            )
+        self.__max_tokens = max_tokens
+        self.__title_weight = title_weight
+
+    @staticmethod
+    def __compile_line_patterns(patterns: list[str]) -> Optional[re.Pattern[str]]:
+        if not patterns:
+            return None
+        return re.compile(
+            "|".join(f"(?:{pattern})" for pattern in patterns), re.IGNORECASE
+        )
+
+    def prepare(self, title: str, content: str) -> PreparedText:
+        """Prepare an article's title and content for extraction
+
+        Args:
+            title (str): Title of the article
+            content (str): Body of the article
+
+        Returns:
+            PreparedText: The prepared text along with token counts before and after preparation
+        """
+        original_tokens = len(title.split()) + len(content.split())
+        paragraphs = self.prepare_paragraphs(title, content)
+        kept_tokens = sum(
+            len(paragraph.split())
+            for paragraph in paragraphs[self.__title_weight - 1 :]
+        )
+        return PreparedText(
+            text="\n".join(paragraphs),
+            original_tokens=original_tokens,
+            kept_tokens=kept_tokens,
+        )
+
+    def prepare_paragraphs(self, title: str, content: str) -> list[str]:
+        """Prepare an article's title and content for extraction, keeping its paragraphs apart
+
+        Args:
+            title (str): Title of the article
+            content (str): Body of the article
+
+        Returns:
+            list[str]: The (repeated) title and the kept paragraphs, `prepare` joins them by newlines
+        """
+        title = self.__normalize(title).replace("\n", " ").strip()
+        paragraphs = self.__paragraphs(self.__normalize(content))
+
+        budget = None
+        if self.__max_tokens is not None:
+            budget = self.__max_tokens - len(title.split())
+        kept_paragraphs: list[str] = []
+        for paragraph in paragraphs:
+            tokens = paragraph.split()
+            if budget is not None:
+                if budget <= 0:
+                    break
+                if len(tokens) > budget:
+                    tokens = tokens[:budget]
+                    paragraph = " ".join(tokens)
+                budget -= len(tokens)
+            kept_paragraphs.append(paragraph)
+        return [title] * self.__title_weight + kept_paragraphs
+
+    def __normalize(self, text: str) -> str:
+        """Normalize Unicode, drop invisible characters and collapse horizontal whitespace"""
+        if self.__unicode_form is not None:
+            text = unicodedata.normalize(self.__unicode_form, text)
+        text = _INVISIBLE_CHARACTERS.sub("", text)
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+        return _HORIZONTAL_WHITESPACE.sub(" ", text)
+
+    def __paragraphs(self, content: str) -> list[str]:
+        """Split normalized content into paragraphs without boilerplate"""
+        paragraphs: list[str] = []
+        for line in content.split("\n"):
+            line = line.strip()
+            if not line:
+                continue
+            if self.__cutoff is not None and self.__cutoff.fullmatch(line):
+                break
+            if self.__boilerplate is not None and self.__boilerplate.fullmatch(line):
+                continue
+            paragraphs.append(line)
+        return paragraphs
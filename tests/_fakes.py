@@ -0,0 +1,297 @@
+import re
+from datetime import datetime
+from typing import Any, Optional
+from unittest.mock import patch
+from uuid import uuid4
+
+from typing_extensions import override
+
+from _model import KENEC
+from modal.database.node import Article, EntityGroup
+from modal.database.util.auth import DatabaseAuth
+from modules.clustering._scoring import columns_from_profiles
+from modules.database._base import BaseAdapter
+from modules.database.cache import TermCacheKey
+from modules.ner._base import BaseClass as NERModelBase
+from type import NodeType
+from type.article import Entity
+from type.clustering import GroupProfile, GroupProfileColumns, TermProfile
+from type.database import GroupStripeState, ModelHydrationMode
+from type.export import ExportTable
+
+_CAPITALIZED = re.compile(r"\b[A-Z][a-z]+\b")
+
+
+class CapitalizedWordsEntityModel(NERModelBase):
+    """NER model tagging every capitalized word as an organization"""
+
+    def __init__(self):
+        pass
+
+    @override
+    async def get_entities_from_text(self, text: str) -> list[Entity]:
+        return [Entity(word=word, type="ORG") for word in _CAPITALIZED.findall(text)]
+
+
+class InMemoryAdapter(BaseAdapter[None]):
+    """Database adapter keeping article groups and group stripes in memory
+
+    Only the methods used to add and revise articles are implemented.
+    """
+
+    def __init__(self):
+        self.groups: dict[str, TermProfile] = {}
+        self.articles: dict[str, tuple[str, TermProfile]] = {}
+        self.stripes: dict[int, GroupStripeState] = {}
+        self.deltas: list[TermProfile] = []
+
+    def add_to_group(self, group_id: str, profile: TermProfile):
+        """Add the term weights of an article to a group, creating it if needed"""
+        group = self.groups.setdefault(group_id, TermProfile(entities={}, keywords={}))
+        for terms, weights in (
+            (group.entities, profile.entities),
+            (group.keywords, profile.keywords),
+        ):
+            for key, weight in weights.items():
+                terms[key] = terms.get(key, 0.0) + weight
+
+    def bump_stripes(self, stripes: list[int], group_id: str):
+        """Register a group created under stripes, as `create_article_group` does"""
+        for stripe in stripes:
+            state = self.__stripe(stripe)
+            self.stripes[stripe] = GroupStripeState(
+                stripe=stripe,
+                version=state.version + 1,
+                recent_group_ids=[group_id, *state.recent_group_ids],
+            )
+
+    def __stripe(self, stripe: int) -> GroupStripeState:
+        return self.stripes.get(
+            stripe, GroupStripeState(stripe=stripe, version=0, recent_group_ids=[])
+        )
+
+    def __profiles(self, group_ids: list[str]) -> list[GroupProfile]:
+        return [
+            GroupProfile(
+                id=group_id,
+                entities=self.groups[group_id].entities,
+                keywords=self.groups[group_id].keywords,
+            )
+            for group_id in group_ids
+            if group_id in self.groups
+        ]
+
+    def __store(self, article: NodeType, profile: TermProfile, group_id: str):
+        if article.id is None:
+            article.id = uuid4()
+        self.articles[str(article.id)] = (group_id, profile)
+        self.add_to_group(group_id, profile)
+
+    @override
+    async def _verify_connection(self) -> tuple[bool, Optional[Exception]]:
+        return True, None
+
+    @override
+    async def _verify_authentication(self) -> tuple[bool, Optional[Exception]]:
+        return True, None
+
+    @override
+    async def connect(self) -> Optional[Any]:
+        return None
+
+    @override
+    async def migrate(self) -> dict[str, tuple[str, Any]]:
+        return {}
+
+    @override
+    async def prepare_statements(self):
+        pass
+
+    @override
+    async def find_candidate_article_groups(
+        self, profile: TermProfile, limit: int, hydration: ModelHydrationMode = "model"
+    ) -> list[GroupProfile]:
+        return self.__profiles(
+            [
+                group_id
+                for group_id, group in self.groups.items()
+                if group.entities.keys() & profile.entities.keys()
+                or group.keywords.keys() & profile.keywords.keys()
+            ][:limit]
+        )
+
+    @override
+    async def find_candidate_article_group_columns(
+        self, profile: TermProfile, limit: int
+    ) -> GroupProfileColumns:
+        return columns_from_profiles(
+            await self.find_candidate_article_groups(profile, limit)
+        )
+
+    @override
+    async def get_term_document_frequencies(
+        self, min_articles: int
+    ) -> tuple[int, dict[TermCacheKey, int]]:
+        raise NotImplementedError
+
+    @override
+    async def recount_term_articles(self):
+        raise NotImplementedError
+
+    @override
+    async def get_article_groups(
+        self, group_ids: list[str], hydration: ModelHydrationMode = "model"
+    ) -> list[GroupProfile]:
+        return self.__profiles(group_ids)
+
+    @override
+    async def get_article_group_columns(
+        self, group_ids: list[str]
+    ) -> GroupProfileColumns:
+        return columns_from_profiles(self.__profiles(group_ids))
+
+    @override
+    async def save_article(
+        self, article: NodeType, profile: TermProfile, group_id: Optional[str]
+    ) -> tuple[str, bool]:
+        is_new_group = group_id is None or group_id not in self.groups
+        if group_id is None or is_new_group:
+            group_id = str(uuid4())
+        self.__store(article, profile, group_id)
+        return group_id, is_new_group
+
+    @override
+    async def get_group_stripes(self, stripes: list[int]) -> list[GroupStripeState]:
+        return [self.__stripe(stripe) for stripe in stripes]
+
+    @override
+    async def create_article_group(
+        self,
+        article: NodeType,
+        profile: TermProfile,
+        stripes: dict[int, int],
+        force: bool = False,
+    ) -> tuple[Optional[str], list[GroupStripeState]]:
+        states = [self.__stripe(stripe) for stripe in sorted(stripes)]
+        if not force and any(
+            state.version != stripes[state.stripe] for state in states
+        ):
+            return None, states
+        group_id = str(uuid4())
+        self.__store(article, profile, group_id)
+        self.bump_stripes(list(stripes), group_id)
+        return group_id, []
+
+    @override
+    async def get_article_profile(
+        self, article_id: str
+    ) -> Optional[tuple[str, TermProfile]]:
+        return self.articles.get(article_id)
+
+    @override
+    async def update_article(
+        self, article: NodeType, profile: TermProfile, delta: TermProfile
+    ) -> Optional[str]:
+        stored = self.articles.get(str(article.id))
+        if stored is None:
+            return None
+        group_id, _ = stored
+        self.deltas.append(delta)
+        self.articles[str(article.id)] = (group_id, profile)
+        self.add_to_group(group_id, delta)
+        return group_id
+
+    @override
+    async def get_article_groups_changed_since(
+        self, since: Optional[datetime], hydration: ModelHydrationMode = "model"
+    ) -> list[GroupProfile]:
+        raise NotImplementedError
+
+    @override
+    async def get_entity_groups_created_since(
+        self, since: Optional[datetime], hydration: ModelHydrationMode = "model"
+    ) -> list[EntityGroup]:
+        raise NotImplementedError
+
+    @override
+    async def merge_article_groups(
+        self, merges: dict[str, list[str]], batch_size: int
+    ) -> int:
+        raise NotImplementedError
+
+    @override
+    async def count_unassigned_articles(self, job_id: str) -> int:
+        raise NotImplementedError
+
+    @override
+    async def get_unassigned_articles_page(
+        self, job_id: str, after: Optional[tuple[datetime, str]], limit: int
+    ) -> list[tuple[Article, TermProfile]]:
+        raise NotImplementedError
+
+    @override
+    async def write_shadow_memberships(
+        self, job_id: str, memberships: list[tuple[str, str, Optional[TermProfile]]]
+    ):
+        raise NotImplementedError
+
+    @override
+    async def write_shadow_groups(self, job_id: str, groups: list[GroupProfile]):
+        raise NotImplementedError
+
+    @override
+    async def drop_shadow_groups(self):
+        raise NotImplementedError
+
+    @override
+    async def swap_shadow_groups(self, job_id: str, replace_article_terms: bool) -> int:
+        raise NotImplementedError
+
+    @override
+    async def get_export_page(
+        self,
+        table: ExportTable,
+        published_from: Optional[datetime],
+        published_to: Optional[datetime],
+        after_id: Optional[str],
+        limit: int,
+    ) -> tuple[list[dict[str, Any]], Optional[str]]:
+        raise NotImplementedError
+
+    @override
+    async def search_article_titles(
+        self, query: str, limit: int
+    ) -> list[tuple[str, float]]:
+        raise NotImplementedError
+
+    @override
+    async def explain_statement(
+        self,
+        name: str,
+        parameters: Optional[dict[str, Any]] = None,
+        profile: bool = False,
+    ) -> dict[str, Any]:
+        raise NotImplementedError
+
+
+def in_memory_kenec(database: InMemoryAdapter, **kwargs: Any) -> KENEC:
+    """KENEC over an in-memory database, with a NumPy YAKE keyword extractor and a NER model tagging capitalized words"""
+
+    def use_database(kenec: KENEC, option: str, **auth: Any):
+        setattr(kenec, "_KENEC__database", database)
+
+    with (
+        patch.object(KENEC, "_KENEC__initialize_database_from_option", use_database),
+        patch.object(
+            KENEC,
+            "_KENEC__load_ner_model",
+            lambda kenec, option, scored=False: CapitalizedWordsEntityModel(),
+        ),
+    ):
+        return KENEC(
+            kw_extractor="numpy_yake",
+            ner_model="spacy_web_sm",
+            db_auth=DatabaseAuth(username="neo4j", password="neo4j", database="neo4j"),
+            prepare_db=False,
+            **kwargs,
+        )
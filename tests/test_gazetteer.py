@@ -0,0 +1,48 @@
+import asyncio
+import unittest
+
+from modules.ner import GazetteerEntityModel
+from type.article import Entity
+
+
+class GazetteerCapitalizationTest(unittest.TestCase):
+    """`GazetteerEntityModel` only tags text capitalized as the entity it matches"""
+
+    def setUp(self):
+        self.gazetteer = GazetteerEntityModel()
+        # Case-folded, as loaded from the database
+        self.gazetteer.add("turkey", "GPE")
+        self.gazetteer.add("bush", "PERSON")
+        # Capitalized, as extracted from an article
+        self.gazetteer.add_entities(
+            [Entity(word="Apple", type="ORG"), Entity(word="NASA", type="ORG")]
+        )
+
+    def test_common_noun_homographs_are_not_tagged(self):
+        entities = asyncio.run(
+            self.gazetteer.get_entities_from_text(
+                "We ate turkey and an apple near the bush, said a nasa engineer."
+            )
+        )
+        self.assertEqual(entities, [])
+
+    def test_capitalized_entities_are_tagged(self):
+        entities = asyncio.run(
+            self.gazetteer.get_entities_from_text(
+                "Apple and NASA met in Turkey with George Bush."
+            )
+        )
+        self.assertEqual(
+            [(entity.word, entity.type) for entity in entities],
+            [("Apple", "ORG"), ("NASA", "ORG"), ("Turkey", "GPE"), ("Bush", "PERSON")],
+        )
+
+    def test_acronyms_keep_their_capitalization(self):
+        entities = asyncio.run(
+            self.gazetteer.get_entities_from_text("Nasa launched a rocket.")
+        )
+        self.assertEqual(entities, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import asyncio
+import unittest
+from datetime import datetime, timezone
+from typing import Optional
+
+from typing_extensions import override
+
+from modal.database.node import Article
+from tests._fakes import InMemoryAdapter, in_memory_kenec
+from type import NodeType
+from type.clustering import GroupProfileColumns, TermProfile
+from type.database import GroupStripeState
+
+UNRELATED = TermProfile(entities={"ORG::Nasa": 1.0}, keywords={"rocket launch": 1.0})
+
+
+class ConcurrentWorkerAdapter(InMemoryAdapter):
+    """In-memory database where another worker creates a group in the article's stripes right before each creation attempt
+
+    Args:
+        creations (int): Number of creation attempts preceded by a concurrent creation
+        similar (bool): Whether the concurrent groups share the article's terms
+    """
+
+    def __init__(self, creations: int, similar: bool):
+        super().__init__()
+        self.creations = creations
+        self.similar = similar
+        self.concurrent_group_ids: list[str] = []
+        self.scored_group_ids: list[list[str]] = []
+
+    @override
+    async def get_article_group_columns(
+        self, group_ids: list[str]
+    ) -> GroupProfileColumns:
+        self.scored_group_ids.append(group_ids)
+        return await super().get_article_group_columns(group_ids)
+
+    @override
+    async def create_article_group(
+        self,
+        article: NodeType,
+        profile: TermProfile,
+        stripes: dict[int, int],
+        force: bool = False,
+    ) -> tuple[Optional[str], list[GroupStripeState]]:
+        if len(self.concurrent_group_ids) < self.creations:
+            group_id = f"concurrent-{len(self.concurrent_group_ids)}"
+            self.add_to_group(group_id, profile if self.similar else UNRELATED)
+            self.bump_stripes(list(stripes), group_id)
+            self.concurrent_group_ids.append(group_id)
+        return await super().create_article_group(article, profile, stripes, force)
+
+
+def _article() -> Article:
+    return Article(
+        id=None,
+        created_on=None,
+        updated_on=None,
+        title="Flooding in northern Italy",
+        content=(
+            "Heavy rain caused flooding across northern Italy on Tuesday. Thousands "
+            "of residents of Emilia were evacuated from their homes."
+        ),
+        published_date=datetime.now(timezone.utc),
+        url=None,
+    )
+
+
+class OptimisticGroupCreationTest(unittest.TestCase):
+    """`KENEC` creates a group only if no worker created one in its stripes since they were read"""
+
+    def test_creates_a_group_without_concurrent_creations(self):
+        database = InMemoryAdapter()
+        kenec = in_memory_kenec(database, creation_stripes=8)
+        group_id, is_new_group = asyncio.run(kenec.add_article(_article()))[2:]
+        self.assertTrue(is_new_group)
+        self.assertTrue(database.stripes)
+        for state in database.stripes.values():
+            self.assertEqual(state.version, 1)
+            self.assertEqual(state.recent_group_ids, [group_id])
+        report = kenec.assignment_report()
+        self.assertEqual((report.created_groups, report.conflicts), (1, 0))
+
+    def test_joins_a_group_created_concurrently(self):
+        database = ConcurrentWorkerAdapter(creations=1, similar=True)
+        # Created before the stripes were read, so not scored again on conflict
+        database.add_to_group("older", UNRELATED)
+        kenec = in_memory_kenec(database, creation_stripes=1)
+        database.bump_stripes([0], "older")
+        group_id, is_new_group = asyncio.run(kenec.add_article(_article()))[2:]
+        self.assertEqual(group_id, "concurrent-0")
+        self.assertFalse(is_new_group)
+        self.assertEqual(database.scored_group_ids, [["concurrent-0"]])
+        self.assertEqual(database.stripes[0].version, 2)
+        report = kenec.assignment_report()
+        self.assertEqual(report.conflicts, 1)
+        self.assertEqual(report.conflict_joins, 1)
+        self.assertEqual((report.created_groups, report.forced_groups), (0, 0))
+
+    def test_forces_creation_after_the_last_attempt(self):
+        database = ConcurrentWorkerAdapter(creations=2, similar=False)
+        kenec = in_memory_kenec(database, creation_stripes=1, max_creation_attempts=2)
+        group_id, is_new_group = asyncio.run(kenec.add_article(_article()))[2:]
+        self.assertTrue(is_new_group)
+        self.assertNotIn(group_id, database.concurrent_group_ids)
+        # Registered in its stripe like any other creation
+        self.assertEqual(database.stripes[0].version, 3)
+        self.assertEqual(
+            database.stripes[0].recent_group_ids,
+            [group_id, "concurrent-1", "concurrent-0"],
+        )
+        report = kenec.assignment_report()
+        self.assertEqual((report.conflicts, report.conflict_joins), (2, 0))
+        self.assertEqual((report.created_groups, report.forced_groups), (0, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import asyncio
+import unittest
+from datetime import datetime, timezone
+from typing import Any
+from unittest.mock import patch
+
+from modal.database.node import Article
+from modules.database._statements import (
+    GET_UNASSIGNED_ARTICLES_PAGE,
+    SAVE_ARTICLE_INTO_NEW_GROUP,
+)
+from modules.database.neo4j import Neo4jAdapter
+from type.clustering import TermProfile
+from type.database import CypherStatement
+
+
+class _FakeGraph:
+    """Article nodes stored by the adapter's save statement, read back by the backfill's page statement"""
+
+    def __init__(self):
+        self.articles: list[dict[str, Any]] = []
+
+    async def execute(
+        self, statement: CypherStatement, **parameters: Any
+    ) -> list[dict[str, Any]]:
+        if statement is SAVE_ARTICLE_INTO_NEW_GROUP:
+            self.articles.append(
+                {**parameters["properties"], "id": parameters["article_id"]}
+            )
+            return [{"group_id": parameters["group_id"]}]
+        if statement is GET_UNASSIGNED_ARTICLES_PAGE:
+            return [
+                {"properties": properties, "entities": [], "keywords": []}
+                for properties in self.articles[: parameters["limit"]]
+            ]
+        raise AssertionError(f"Unexpected statement {statement.name}")
+
+
+class ArticleRoundTripTest(unittest.TestCase):
+    """Articles saved by `Neo4jAdapter` read back into equal `Article`s"""
+
+    def test_saved_articles_read_back_in_backfill_pages(self):
+        articles = [
+            Article(
+                id=None,
+                created_on=None,
+                updated_on=None,
+                title="Flooding in northern Italy",
+                content="Heavy rain caused flooding across northern Italy.",
+                published_date=datetime(2024, 5, 16, 8, 30, tzinfo=timezone.utc),
+                url="https://example.com/flooding",
+                metadata={"section": "world", "wire": {"agency": "AP", "id": 42}},
+            ),
+            Article(
+                id=None,
+                created_on=None,
+                updated_on=None,
+                title="Starship reaches orbit",
+                content="SpaceX launched its Starship rocket from Boca Chica.",
+                published_date=datetime(2024, 5, 17, 12, 0, tzinfo=timezone.utc),
+                url=None,
+            ),
+        ]
+        graph = _FakeGraph()
+        adapter = Neo4jAdapter("bolt://localhost:7687", "neo4j", "neo4j", "neo4j")
+        with patch.object(Neo4jAdapter, "_Neo4jAdapter__execute", graph.execute):
+
+            async def round_trip() -> list[tuple[Article, TermProfile]]:
+                for article in articles:
+                    await adapter.save_article(
+                        article, TermProfile(entities={}, keywords={}), None
+                    )
+                return await adapter.get_unassigned_articles_page("job", None, 10)
+
+            page = asyncio.run(round_trip())
+        self.assertEqual([article for article, _ in page], articles)
+        self.assertEqual(page[0][0].metadata, articles[0].metadata)
+        self.assertIsNone(page[1][0].url)
+        self.assertIsNone(page[1][0].metadata)
+
+
+if __name__ == "__main__":
+    unittest.main()
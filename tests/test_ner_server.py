@@ -0,0 +1,61 @@
+import asyncio
+import os
+import socket
+import tempfile
+import unittest
+
+from errors.ner import NERServerAlreadyRunningError
+from modules.ner.remote import RemoteEntityModel
+from modules.ner.server import EntityModelServer
+from tests._fakes import CapitalizedWordsEntityModel
+
+
+class EntityModelServerSocketTest(unittest.TestCase):
+    """`EntityModelServer` only replaces a socket no server listens on"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.socket_path = os.path.join(directory.name, "kenec-ner.sock")
+
+    def test_refuses_to_start_on_a_live_socket(self):
+        async def start_twice() -> list[str]:
+            server = EntityModelServer(CapitalizedWordsEntityModel(), self.socket_path)
+            await server.start()
+            try:
+                with self.assertRaises(NERServerAlreadyRunningError):
+                    await EntityModelServer(
+                        CapitalizedWordsEntityModel(), self.socket_path
+                    ).start()
+                # The running server still answers
+                entities = await RemoteEntityModel(
+                    self.socket_path
+                ).get_entities_from_text("Rain in Italy")
+                return [entity.word for entity in entities]
+            finally:
+                await server.close()
+
+        self.assertEqual(asyncio.run(start_twice()), ["Rain", "Italy"])
+
+    def test_replaces_a_stale_socket(self):
+        # Bound but not listening, as left by a server that was killed
+        stale = socket.socket(socket.AF_UNIX)
+        stale.bind(self.socket_path)
+        stale.close()
+
+        async def start() -> list[str]:
+            server = EntityModelServer(CapitalizedWordsEntityModel(), self.socket_path)
+            await server.start()
+            try:
+                entities = await RemoteEntityModel(
+                    self.socket_path
+                ).get_entities_from_text("Rain in Italy")
+                return [entity.word for entity in entities]
+            finally:
+                await server.close()
+
+        self.assertEqual(asyncio.run(start()), ["Rain", "Italy"])
+
+
+if __name__ == "__main__":
+    unittest.main()
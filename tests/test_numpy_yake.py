@@ -0,0 +1,78 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+
+from yake import KeywordExtractor
+
+from modules.keyword_extractor import NumpyYakeKeywordExtractor
+
+TEXTS = [
+    "The European Central Bank raised its key interest rate by a quarter point "
+    "on Thursday, the tenth increase in a row, as inflation in the euro zone "
+    "stays well above its 2% target. ECB President Christine Lagarde said "
+    "further hikes could not be ruled out.\n\nMarkets in Frankfurt and Paris "
+    "fell after the decision, while the euro rose against the U.S. dollar.",
+    "Heavy rain caused flooding across northern Italy on Tuesday. Thousands of "
+    "residents of Emilia-Romagna were evacuated and rescue teams worked through "
+    'the night. "We have never seen anything like this," said the mayor of '
+    "Faenza. The Italian government declared a state of emergency and promised "
+    "100 million euros in aid; farmers' associations estimate the damage at "
+    "several billion euros.",
+    "SpaceX launched its Starship rocket from Boca Chica, Texas. The vehicle "
+    "reached orbit for the first time, NASA administrator Bill Nelson "
+    "congratulated the team. Starship is central to NASA's Artemis program, "
+    "which aims to return astronauts to the Moon.",
+    "Short text.",
+    "",
+]
+
+
+class NumpyYakeRegressionTest(unittest.TestCase):
+    """`NumpyYakeKeywordExtractor` reproduces the keywords and scores of `yake`"""
+
+    def test_matches_reference_yake(self):
+        for max_ngram_size in (1, 2, 3):
+            reference = KeywordExtractor(n=max_ngram_size)
+            extractor = NumpyYakeKeywordExtractor(max_ngram_size)
+            batch = asyncio.run(extractor.get_keywords_from_texts(TEXTS))
+            for text, keywords in zip(TEXTS, batch):
+                with self.subTest(max_ngram_size=max_ngram_size, text=text[:30]):
+                    expected = reference.extract_keywords(text) if text else []
+                    self.assertEqual(
+                        [keyword.word for keyword in keywords],
+                        [word for word, _ in expected],
+                    )
+                    for keyword, (_, score) in zip(keywords, expected):
+                        self.assertAlmostEqual(keyword.score, score, places=12)
+
+    def test_single_text_matches_batch(self):
+        extractor = NumpyYakeKeywordExtractor()
+        batch = asyncio.run(extractor.get_keywords_from_texts(TEXTS))
+        for text, keywords in zip(TEXTS, batch):
+            with self.subTest(text=text[:30]):
+                self.assertEqual(
+                    asyncio.run(extractor.get_keywords_from_text(text)), keywords
+                )
+
+    def test_concurrent_texts_are_scored_together(self):
+        extractor = NumpyYakeKeywordExtractor()
+        batch = asyncio.run(extractor.get_keywords_from_texts(TEXTS))
+        score_texts = getattr(extractor, "_NumpyYakeKeywordExtractor__score_texts")
+        batches: list[list[str]] = []
+
+        def spy(self, texts: list[str]):
+            batches.append(texts)
+            return score_texts(texts)
+
+        async def concurrently():
+            return await asyncio.gather(*map(extractor.get_keywords_from_text, TEXTS))
+
+        with patch.object(
+            NumpyYakeKeywordExtractor, "_NumpyYakeKeywordExtractor__score_texts", spy
+        ):
+            self.assertEqual(asyncio.run(concurrently()), batch)
+        self.assertEqual(batches, [TEXTS])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import asyncio
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from modal.database.node import Article
+from modules.governor.load import LoadGovernor
+from tests._fakes import InMemoryAdapter, in_memory_kenec
+
+CONTENT = (
+    "Heavy rain caused flooding across northern Italy on Tuesday. Thousands of "
+    "residents of Emilia were evacuated and rescue teams worked through the night."
+    "\n\n"
+    "The Italian government declared a state of emergency. Farmers in Romagna "
+    "estimate the damage at several billion euros."
+)
+
+
+def _article(content: str = CONTENT) -> Article:
+    return Article(
+        id=None,
+        created_on=None,
+        updated_on=None,
+        title="Flooding in northern Italy",
+        content=content,
+        published_date=datetime.now(timezone.utc) - timedelta(hours=6),
+        url=None,
+    )
+
+
+class UpdateArticleTest(unittest.TestCase):
+    """`KENEC.update_article` only changes the terms a revision changed"""
+
+    def test_unchanged_revision_has_an_empty_delta(self):
+        database = InMemoryAdapter()
+        kenec = in_memory_kenec(database)
+        article = _article()
+
+        async def add_then_revise() -> bool:
+            await kenec.add_article(article)
+            revision = _article()
+            revision.id = article.id
+            _, _, _, changed = await kenec.update_article(revision)
+            return changed
+
+        self.assertFalse(asyncio.run(add_then_revise()))
+        (delta,) = database.deltas
+        self.assertEqual(delta.entities, {})
+        self.assertEqual(delta.keywords, {})
+
+    def test_revised_paragraph_changes_its_terms(self):
+        database = InMemoryAdapter()
+        kenec = in_memory_kenec(database)
+        article = _article()
+
+        async def add_then_revise() -> bool:
+            await kenec.add_article(article)
+            revision = _article(CONTENT + "\n\nPrime Minister Meloni visited Faenza.")
+            revision.id = article.id
+            _, _, _, changed = await kenec.update_article(revision)
+            return changed
+
+        self.assertTrue(asyncio.run(add_then_revise()))
+        (delta,) = database.deltas
+        self.assertIn("ORG::meloni", delta.entities)
+
+    def test_revisions_do_not_measure_lag(self):
+        governor = LoadGovernor(max_lag=timedelta(minutes=5))
+        kenec = in_memory_kenec(InMemoryAdapter(), load_governor=governor)
+        article = _article()
+        article.published_date = datetime.now(timezone.utc)
+        asyncio.run(kenec.add_article(article))
+        lag_seconds = governor.report().lag_seconds
+        # A liveblog published hours ago, revised now
+        revision = _article()
+        revision.id = article.id
+        asyncio.run(kenec.update_article(revision))
+        self.assertEqual(revision.processing_mode, "full")
+        self.assertEqual(governor.report().lag_seconds, lag_seconds)
+
+
+if __name__ == "__main__":
+    unittest.main()
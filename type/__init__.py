@@ -13,6 +13,10 @@ from ._index_constraint import (
     UNIQUE,
     UNIQUE_INDEXED,
     UNIQUE_REQUIRED,
+    NodeIndexType,
+    fulltext_index,
+    index_name,
+    range_index,
 )
 
 __all__ = [
@@ -23,4 +27,8 @@ __all__ = [
     "UNIQUE_INDEXED",
     "UNIQUE_REQUIRED",
     "PRIMARY_KEY",
+    "NodeIndexType",
+    "range_index",
+    "fulltext_index",
+    "index_name",
 ]
@@ -16,3 +16,25 @@ REQUIRED = IndexConstraintType(existence=True)
 UNIQUE_REQUIRED = IndexConstraintType(unique=True, existence=True)
 UNIQUE_INDEXED = IndexConstraintType(unique=True, indexed=True)
 PRIMARY_KEY = IndexConstraintType(unique=True, indexed=True, existence=True)
+
+
+class NodeIndexType(TypedDict):
+    """Index over one or more properties, declared by a node model as a whole"""
+
+    kind: Literal["range", "fulltext"]
+    properties: list[str]
+
+
+def range_index(*properties: str) -> NodeIndexType:
+    """Range index over properties, composite if there are several (in order of selectivity)"""
+    return NodeIndexType(kind="range", properties=list(properties))
+
+
+def fulltext_index(*properties: str) -> NodeIndexType:
+    """Full-text index over string properties, queried with `db.index.fulltext.queryNodes`"""
+    return NodeIndexType(kind="fulltext", properties=list(properties))
+
+
+def index_name(label: str, index: NodeIndexType) -> str:
+    """Name of the index a node model declares, e.g. "Article_title_fulltext" """
+    return f"{label}_{'_'.join(index['properties'])}_{index['kind']}"
@@ -1,4 +1,4 @@
-from typing import Literal
+from typing import Literal, Optional
 
 from pydantic import BaseModel
 
@@ -30,3 +30,4 @@ class Entity(BaseModel):
 
     word: str
     type: EntityType
+    score: Optional[float] = None  # Model confidence, if the backend exposes one
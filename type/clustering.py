@@ -0,0 +1,165 @@
+from datetime import datetime
+from typing import Literal, Optional
+
+import numpy as np
+from pydantic import BaseModel, ConfigDict
+
+
+class TermProfile(BaseModel):
+    """Weighted entity and keyword terms of an article or an article group
+
+    Entity terms are keyed by `entity_key` ("TYPE::word") and keyword terms by
+    `keyword_key`, both defined in `modules.clustering`.
+    """
+
+    entities: dict[str, float]
+    keywords: dict[str, float]
+
+
+class GroupProfile(TermProfile):
+    """Term profile of a stored article group"""
+
+    id: str
+    created_on: Optional[datetime] = None
+    updated_on: Optional[datetime] = None
+
+
+class GroupProfileColumns(BaseModel):
+    """Column-oriented profiles of several article groups
+
+    The terms of all groups are flattened into parallel arrays, with
+    `*_groups` holding the row (index into `ids`) each term belongs to.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    ids: list[str]
+    created_on: list[Optional[datetime]]
+    updated_on: list[Optional[datetime]]
+    entity_keys: list[str]
+    entity_weights: np.ndarray
+    entity_groups: np.ndarray
+    keyword_keys: list[str]
+    keyword_weights: np.ndarray
+    keyword_groups: np.ndarray
+
+
+class ConsolidationReport(BaseModel):
+    """Outcome of a consolidation pass over article groups"""
+
+    examined_groups: int
+    merged_groups: int  # Groups absorbed into another group
+    merge_sets: int  # Surviving groups that absorbed at least one group
+    seconds: float
+
+
+class SnapshotManifest(BaseModel):
+    """Description of a snapshot of the in-memory clustering state"""
+
+    format_version: int
+    created_on: datetime  # Changes after this time are replayed from the database
+    kind: str  # Component whose state is stored
+    dimensions: int
+    entity_weight: float
+    hashing_scheme: str
+    m: int
+    ef_construction: int
+    nodes: int  # Graph nodes, including removed ones
+    groups: int  # Indexed article groups
+
+
+BackfillPhase = Literal[
+    "clustering",  # Streaming, extracting and grouping the stored articles
+    "catching_up",  # Grouping the articles stored while the backfill ran
+    "swapping",  # Replacing the article groups by the shadow groups
+    "done",
+    "failed",
+]
+
+
+class BackfillReport(BaseModel):
+    """Progress and throughput of a backfill job"""
+
+    job_id: str
+    phase: BackfillPhase
+    articles_total: int  # Articles to group when the current pass started
+    articles_processed: int
+    articles_extracted: int  # Articles whose terms were extracted again
+    articles_reused: int  # Articles grouped by their stored terms
+    groups: int
+    elapsed_seconds: float
+    articles_per_second: float
+    eta_seconds: Optional[float]  # Estimated time left in the current pass
+
+
+class ClusteringMetrics(BaseModel):
+    """Agreement of a clustering with reference labels"""
+
+    articles: int
+    clusters: int
+    labels: int
+    bcubed_precision: float
+    bcubed_recall: float
+    bcubed_f1: float
+    adjusted_rand_index: float
+    purity: float  # Share of articles in their cluster's majority label
+    inverse_purity: float  # Share of articles in their label's majority cluster
+
+
+class ExtractedCorpus(BaseModel):
+    """Term profiles extracted once from a labelled corpus, in publication order"""
+
+    fingerprint: str  # Hash of the corpus file and extraction options
+    labels: list[str]
+    published_dates: list[datetime]
+    profiles: list[TermProfile]
+    skipped: int  # Articles without keywords or entities, never grouped
+    extraction_seconds: float
+
+
+class ThresholdSweepResult(BaseModel):
+    """Clustering metrics and replay throughput at one match threshold"""
+
+    match_threshold: float
+    metrics: ClusteringMetrics
+    seconds: float
+    articles_per_second: float
+
+
+ShardingStrategy = Literal[
+    "entity",  # Hash of an article's most mentioned entity
+    "date",  # Publication date bucket, buckets dealt to shards in turn
+]
+
+
+class ShardedClusteringReport(BaseModel):
+    """Outcome of clustering a batch of articles across worker processes"""
+
+    articles: int
+    shards: int
+    shard_articles: list[int]
+    local_groups: int  # Groups found by the shards on their own
+    merged_groups: int  # Local groups absorbed by a group of another shard
+    groups: int
+    cluster_seconds: float  # Wall time of the shards, which run concurrently
+    merge_seconds: float
+    articles_per_second: float
+
+
+class GroupAssignmentReport(BaseModel):
+    """Outcome of the optimistic creation of new article groups by this process"""
+
+    created_groups: int
+    conflicts: int  # Creations lost to another worker's group in a shared stripe
+    conflict_joins: int  # Articles that joined a group created concurrently instead
+    forced_groups: int  # Groups created anyway after the last attempt conflicted
+
+
+class TermStatisticsReport(BaseModel):
+    """Corpus statistics used to weight and stop-list terms"""
+
+    articles: int
+    tracked_terms: int  # Terms whose document frequency is known
+    stop_terms: int  # Tracked terms left out of candidate shortlisting
+    dropped_lookups: int  # Terms left out of the shortlisting of an article so far
+    refreshed_seconds_ago: Optional[float]
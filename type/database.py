@@ -1,3 +1,85 @@
-from typing import Literal
+from typing import Literal, LiteralString, Optional, cast
+
+from pydantic import BaseModel, ConfigDict
 
 DatabaseVariant = Literal["neo4j"]
+
+RelationshipType = Literal[
+    "IN_GROUP",  # (:Article)-[:IN_GROUP]->(:ArticleGroup)
+    "MENTIONS",  # (:Article|ArticleGroup)-[:MENTIONS {weight}]->(:EntityGroup)
+    "HAS_KEYWORD",  # (:Article|ArticleGroup)-[:HAS_KEYWORD {weight}]->(:KeywordGroup)
+    # Backfill namespace, swapped in place of the relationships above
+    "IN_SHADOW_GROUP",  # (:Article)-[:IN_SHADOW_GROUP]->(:ShadowArticleGroup)
+    "SHADOW_MENTIONS",  # (:Article)-[:SHADOW_MENTIONS {weight}]->(:EntityGroup)
+    "SHADOW_HAS_KEYWORD",  # (:Article)-[:SHADOW_HAS_KEYWORD {weight}]->(:KeywordGroup)
+]
+
+
+class CacheReport(BaseModel):
+    """Hit ratio and occupancy of a read-through cache"""
+
+    hits: int
+    misses: int
+    hit_ratio: float
+    size: int
+    max_size: int
+    evictions: int  # Entries dropped to stay within the size limit
+    expirations: int  # Entries dropped because their TTL elapsed
+    invalidations: int  # Entries dropped by writes in this process
+
+
+class LookupCacheReport(BaseModel):
+    """Reports of the term and article group caches of a database adapter"""
+
+    terms: CacheReport
+    groups: CacheReport
+
+
+StatementAccess = Literal["read", "write"]
+
+
+class CypherStatement(BaseModel):
+    """A named, parameterized Cypher statement whose text never changes between calls"""
+
+    model_config = ConfigDict(frozen=True)
+
+    name: str
+    text: str
+    access: StatementAccess  # Kind of managed transaction the statement runs in
+
+    @property
+    def query(self) -> LiteralString:
+        """The text, typed as the literal the driver expects
+
+        Statements are only registered from literal texts, see
+        `StatementRegistry.register`.
+        """
+        return cast(LiteralString, self.text)
+
+
+# How records returned by the driver are turned into models
+ModelHydrationMode = Literal[
+    "model",  # Validated pydantic models
+    "trusted",  # `model_construct` objects from the driver's values, without validation
+]
+
+
+class GroupStripeState(BaseModel):
+    """Version of a group stripe and the latest groups created in it"""
+
+    stripe: int
+    version: int  # 0 for a stripe no group was created in yet
+    recent_group_ids: list[str]  # Newest first
+
+
+class StatementPlanReport(BaseModel):
+    """Index usage of the execution plan of a registered statement"""
+
+    statement: str
+    access: StatementAccess
+    scans: list[str]  # Operators reading every node or relationship of a kind
+    index_lookups: list[str]  # Operators reading an index, with their details
+    estimated_rows: Optional[float]  # Rows the planner expects the statement to return
+    db_hits: Optional[int]  # Storage accesses of the whole plan, only when profiled
+    expected_scans: bool  # Whether the statement reads whole labels by design
+    error: Optional[str]  # Why the statement could not be planned
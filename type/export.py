@@ -0,0 +1,20 @@
+from typing import Literal
+
+from pydantic import BaseModel
+
+ExportTable = Literal[
+    "articles",  # Article nodes
+    "article_groups",  # ArticleGroup nodes
+    "entity_groups",  # EntityGroup nodes
+    "memberships",  # (:Article)-[:IN_GROUP]->(:ArticleGroup) edges
+    "group_mentions",  # (:ArticleGroup)-[:MENTIONS {weight}]->(:EntityGroup) edges
+]
+
+
+class ExportReport(BaseModel):
+    """Outcome of exporting tables of the graph"""
+
+    rows: dict[ExportTable, int]
+    batches: dict[ExportTable, int]
+    elapsed_seconds: float
+    rows_per_second: float
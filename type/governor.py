@@ -0,0 +1,43 @@
+from typing import Literal, Optional
+
+from pydantic import BaseModel
+
+ProcessingMode = Literal[
+    "full",  # Configured extractors on the full article
+    "degraded",  # Cheaper extractors on a truncated article, used under backlog
+]
+
+
+class LoadGovernorReport(BaseModel):
+    """Load and processing mode statistics of a load governor"""
+
+    mode: ProcessingMode
+    queue_depth: int
+    lag_seconds: Optional[float]  # Smoothed lag between publication and processing
+    mode_switches: int
+    articles_by_mode: dict[ProcessingMode, int]
+
+
+class ResourceReport(BaseModel):
+    """Effective thread and CPU settings of the process"""
+
+    cpus: int  # Logical CPUs of the machine
+    available_cpus: list[int]  # CPUs the process may run on
+    torch_intra_op_threads: Optional[int]  # None if torch is not loaded
+    torch_inter_op_threads: Optional[int]
+    blas_threads: dict[str, int]  # Threads per BLAS/OpenMP library (threadpoolctl)
+    tokenizers_parallelism: Optional[str]  # Value of TOKENIZERS_PARALLELISM
+    ner_replicas: Optional[int]
+    ner_intra_op_threads: Optional[int]
+    process_threads: int  # OS threads of the process right now
+    warnings: list[str]  # Oversubscription and settings that could not be applied
+
+
+class ResourceBenchmarkResult(BaseModel):
+    """NER throughput of a thread configuration"""
+
+    ner_replicas: int
+    ner_intra_op_threads: int
+    blas_threads: int
+    texts_per_second: float
+    error: Optional[str]  # Why the configuration could not be measured
@@ -0,0 +1,18 @@
+from typing import Literal, Optional
+
+from pydantic import BaseModel
+
+UnitState = Literal[
+    "pending",  # Not started yet
+    "loading",  # Loading models, or connecting to and migrating the database
+    "ready",
+    "failed",
+]
+
+
+class ReadinessReport(BaseModel):
+    """Startup state of the units of a KENEC model"""
+
+    ready: bool  # Whether every unit is ready and articles can be added
+    units: dict[str, UnitState]
+    error: Optional[str] = None  # Error of the first failed unit
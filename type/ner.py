@@ -0,0 +1,59 @@
+from typing import Literal, Optional
+
+from pydantic import BaseModel
+
+CascadeEscalationReason = Literal[
+    "low_confidence",  # Mean span confidence of the fast model was too low
+    "few_entities",  # Fast model found too few entities for the text length
+    "disagreement",  # Sampled comparison disagreed too much with the accurate model
+]
+
+
+class CascadeReport(BaseModel):
+    """Escalation and quality statistics of a cascade NER model"""
+
+    total: int
+    accepted_fast: int
+    escalated: int
+    escalation_rate: float
+    escalations_by_reason: dict[CascadeEscalationReason, int]
+    sampled: int
+    mean_sample_agreement: Optional[float]  # Fast vs. accurate agreement, sampled texts
+    fast_seconds: float  # Time spent in the fast model
+    accurate_seconds: float  # Time spent in the accurate model
+
+
+class GazetteerReport(BaseModel):
+    """Coverage statistics of a gazetteer NER model"""
+
+    surface_forms: int  # Known entity surface forms
+    texts: int
+    sentences: int
+    sentences_to_model: int  # Sentences run through the fallback model
+    coverage: float  # Fraction of sentences fully tagged by the gazetteer
+    gazetteer_seconds: float  # Time spent tagging with the gazetteer
+    model_seconds: float  # Time spent in the fallback model
+
+
+class NERServerReport(BaseModel):
+    """Batching statistics of a NER server"""
+
+    connections: int  # Open client connections
+    texts: int
+    batches: int
+    mean_batch_size: float
+    max_batch_size: int  # Largest batch inferred
+    failed_texts: int  # Texts of batches the model raised on
+    queue_seconds: float  # Total time texts waited for their batch
+    inference_seconds: float  # Time spent in the model
+    texts_per_second: float  # Texts per second of inference
+
+
+class ReplicaPoolReport(BaseModel):
+    """Checkout statistics of a NER replica pool"""
+
+    replicas: int
+    in_use: int  # Replicas checked out right now
+    checkouts: int
+    waits: int  # Checkouts that waited for a free replica
+    wait_seconds: float  # Total time spent waiting for a free replica
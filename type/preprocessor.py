@@ -0,0 +1,9 @@
+from pydantic import BaseModel
+
+
+class PreparedText(BaseModel):
+    """Text of an article prepared for the extractors"""
+
+    text: str
+    original_tokens: int  # Whitespace tokens in the raw title and content
+    kept_tokens: int  # Whitespace tokens kept within the budget, title included